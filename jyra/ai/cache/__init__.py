@@ -3,5 +3,7 @@ Cache module for Jyra
 """
 
 from jyra.ai.cache.response_cache import ResponseCache
+from jyra.ai.cache.semantic_cache import SemanticCache, semantic_cache
+from jyra.ai.cache.context_cache import GeminiContextCache
 
-__all__ = ['ResponseCache']
+__all__ = ['ResponseCache', 'SemanticCache', 'semantic_cache', 'GeminiContextCache']
@@ -0,0 +1,264 @@
+"""
+Gemini context caching for persona system prompts
+
+The persona preamble built for each role is identical on every call. When it is
+long enough for Gemini's explicit context caching, it is uploaded once as a
+cachedContents resource and later requests reference it by name instead of
+re-sending it. Handles are keyed by role id and tone guidance, refreshed while
+in use and deleted once idle.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import aiohttp
+
+from jyra.ai.context import estimate_tokens
+from jyra.ai.limits import provider_rate_limiter
+from jyra.ai.utils.api_errors import raise_for_api_error
+from jyra.utils.config import (
+    GEMINI_API_KEY, GEMINI_API_BASE_URL, GEMINI_CONTEXT_CACHE_ENABLED,
+    GEMINI_CACHE_TTL_SECONDS, GEMINI_CACHE_MIN_TOKENS, GEMINI_CACHE_MAX_ENTRIES
+)
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Refresh a handle when it has less than this many seconds left
+REFRESH_MARGIN_SECONDS = 300
+
+# How long to stop trying after the API refused to create a cache
+CREATE_FAILURE_BACKOFF_SECONDS = 600
+
+
+class GeminiContextCache:
+    """
+    Lifecycle manager for Gemini cachedContents handles.
+    """
+
+    def __init__(self, model_name: str, base_url: str = GEMINI_API_BASE_URL,
+                 api_key: str = GEMINI_API_KEY,
+                 enabled: bool = GEMINI_CONTEXT_CACHE_ENABLED,
+                 ttl_seconds: int = GEMINI_CACHE_TTL_SECONDS,
+                 min_tokens: int = GEMINI_CACHE_MIN_TOKENS,
+                 max_entries: int = GEMINI_CACHE_MAX_ENTRIES):
+        """
+        Initialize the context cache manager.
+
+        Args:
+            model_name (str): The Gemini model the cached content is created for
+            base_url (str): Gemini API base URL
+            api_key (str): Gemini API key
+            enabled (bool): Whether explicit context caching is used
+            ttl_seconds (int): Lifetime of a cached content resource
+            min_tokens (int): Minimum estimated prompt size worth caching
+                (Gemini rejects cached contents below a model-specific minimum)
+            max_entries (int): Maximum number of live handles
+        """
+        self.model_name = model_name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+
+        # key -> {"name", "prompt_hash", "expire_at", "last_used"}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._failed_until: Dict[str, float] = {}
+
+        self.created = 0
+        self.refreshed = 0
+        self.deleted = 0
+        self.hits = 0
+
+    @staticmethod
+    def make_key(role_context: Dict[str, Any]) -> Optional[str]:
+        """
+        Build the cache key for a role context.
+
+        Args:
+            role_context (Dict[str, Any]): Context about the current role
+
+        Returns:
+            Optional[str]: "<role_id>:<tone hash>", or None for ad-hoc contexts without a role id
+        """
+        role_id = role_context.get("role_id")
+        if role_id is None:
+            return None
+        tone = role_context.get("tone_guidance", "")
+        tone_hash = hashlib.sha1(tone.encode()).hexdigest()[:12]
+        return f"{role_id}:{tone_hash}"
+
+    async def get_handle(self, role_context: Dict[str, Any], system_prompt: str) -> Optional[str]:
+        """
+        Get a cachedContents name holding the system prompt, creating or refreshing it.
+
+        Args:
+            role_context (Dict[str, Any]): Context about the current role
+            system_prompt (str): The system prompt to cache
+
+        Returns:
+            Optional[str]: The cached content name, or None if caching does not apply
+        """
+        if not self.enabled:
+            return None
+
+        key = self.make_key(role_context)
+        if key is None or estimate_tokens(system_prompt) < self.min_tokens:
+            return None
+
+        now = time.time()
+        if self._failed_until.get(key, 0) > now:
+            return None
+
+        prompt_hash = hashlib.sha1(system_prompt.encode()).hexdigest()
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            entry = self._entries.get(key)
+
+            # The role was edited since the cache was created
+            if entry and entry["prompt_hash"] != prompt_hash:
+                await self._delete(key)
+                entry = None
+
+            if entry and entry["expire_at"] <= now:
+                self._entries.pop(key, None)
+                entry = None
+
+            try:
+                if entry:
+                    if entry["expire_at"] - now < REFRESH_MARGIN_SECONDS:
+                        await self._refresh(entry)
+                    entry["last_used"] = now
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry["name"]
+
+                name = await self._create(system_prompt)
+            except Exception as e:
+                logger.warning(
+                    f"Context cache unavailable for {key}: {str(e)}")
+                self._failed_until[key] = now + CREATE_FAILURE_BACKOFF_SECONDS
+                return None
+
+            self._entries[key] = {
+                "name": name,
+                "prompt_hash": prompt_hash,
+                "expire_at": now + self.ttl_seconds,
+                "last_used": now
+            }
+            self._failed_until.pop(key, None)
+
+        await self.expire_idle()
+        await self._evict()
+        return name
+
+    async def invalidate(self, name: str) -> None:
+        """
+        Forget a handle the API no longer accepts (e.g. expired server-side).
+
+        Args:
+            name (str): The cached content name
+        """
+        for key, entry in list(self._entries.items()):
+            if entry["name"] == name:
+                self._entries.pop(key, None)
+
+    async def expire_idle(self, idle_seconds: Optional[int] = None) -> int:
+        """
+        Delete handles that have not been used for a while.
+
+        Args:
+            idle_seconds (Optional[int]): Idle time before deletion (defaults to the TTL)
+
+        Returns:
+            int: Number of handles deleted
+        """
+        idle_seconds = self.ttl_seconds if idle_seconds is None else idle_seconds
+        cutoff = time.time() - idle_seconds
+        idle_keys = [key for key, entry in self._entries.items()
+                     if entry["last_used"] < cutoff]
+        for key in idle_keys:
+            await self._delete(key)
+        return len(idle_keys)
+
+    async def close(self) -> None:
+        """
+        Delete every handle, e.g. on shutdown.
+        """
+        for key in list(self._entries):
+            await self._delete(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache lifecycle statistics.
+
+        Returns:
+            Dict[str, Any]: Counts of live, created, refreshed and deleted handles
+        """
+        return {
+            "live": len(self._entries),
+            "hits": self.hits,
+            "created": self.created,
+            "refreshed": self.refreshed,
+            "deleted": self.deleted
+        }
+
+    async def _evict(self) -> None:
+        """Delete the least recently used handles over the cap."""
+        while len(self._entries) > self.max_entries:
+            key = next(iter(self._entries))
+            await self._delete(key)
+
+    async def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None,
+                       params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Call the cachedContents API within the shared provider quota."""
+        url = f"{self.base_url}/{path}"
+        params = {"key": self.api_key, **(params or {})}
+
+        async def send():
+            async with aiohttp.ClientSession() as session:
+                async with session.request(method, url, params=params, json=payload) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    await raise_for_api_error(response, "Gemini", self.model_name)
+
+        return await provider_rate_limiter.call_with_retry(
+            "gemini", "cachedContents", send)
+
+    async def _create(self, system_prompt: str) -> str:
+        """Create a cached content resource and return its name."""
+        result = await self._request("POST", "cachedContents", {
+            "model": f"models/{self.model_name}",
+            "systemInstruction": {"parts": [{"text": system_prompt}]},
+            "ttl": f"{self.ttl_seconds}s"
+        })
+        self.created += 1
+        logger.info(f"Created Gemini context cache {result['name']}")
+        return result["name"]
+
+    async def _refresh(self, entry: Dict[str, Any]) -> None:
+        """Extend the lifetime of a cached content resource."""
+        await self._request("PATCH", entry["name"], {
+            "ttl": f"{self.ttl_seconds}s"
+        }, params={"updateMask": "ttl"})
+        entry["expire_at"] = time.time() + self.ttl_seconds
+        self.refreshed += 1
+
+    async def _delete(self, key: str) -> None:
+        """Delete a cached content resource; failures only log."""
+        entry = self._entries.pop(key, None)
+        if not entry:
+            return
+        try:
+            await self._request("DELETE", entry["name"])
+            self.deleted += 1
+        except Exception as e:
+            logger.warning(
+                f"Error deleting context cache {entry['name']}: {str(e)}")
@@ -1,40 +1,142 @@
 """
 Response caching for AI models
+
+Responses are kept in a small in-memory LRU in front of a single SQLite table
+(data/cache/responses.db). Expiry and size eviction use indexed timestamps, so
+neither ever has to read every entry.
 """
 
 import json
 import hashlib
-import os
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
+from jyra.utils.config import (
+    RESPONSE_CACHE_MEMORY_ENTRIES, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_SIZE_MB
+)
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Number of writes between size limit checks
+ENFORCE_LIMITS_EVERY = 50
+
 
 class ResponseCache:
     """
     Cache for AI model responses to reduce API calls.
     """
 
-    def __init__(self, cache_dir: str = "data/cache", max_age_seconds: int = 3600):
+    def __init__(self, cache_dir: str = "data/cache", max_age_seconds: int = 3600,
+                 memory_entries: int = RESPONSE_CACHE_MEMORY_ENTRIES,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 max_size_mb: float = RESPONSE_CACHE_MAX_SIZE_MB):
         """
         Initialize the response cache.
 
         Args:
-            cache_dir (str): Directory to store cache files
+            cache_dir (str): Directory holding the cache database
             max_age_seconds (int): Maximum age of cache entries in seconds
+            memory_entries (int): Number of entries kept in the in-memory LRU
+            max_entries (int): Maximum number of entries in the database
+            max_size_mb (float): Maximum total size of cached responses in MB
         """
         self.cache_dir = Path(cache_dir)
         self.max_age_seconds = max_age_seconds
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
 
         # Create cache directory if it doesn't exist
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "responses.db"
+
+        # In-memory tier: cache_key -> (response, expires_at)
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self._conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, timeout=5.0)
+        self._initialize_database()
+        self.migrate_json_files()
 
         logger.info(f"Initialized response cache in {cache_dir}")
 
+    def _initialize_database(self) -> None:
+        """
+        Create the cache table and its timestamp indexes.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                cache_key TEXT PRIMARY KEY,
+                prompt TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_response_cache_expires ON response_cache (expires_at)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_response_cache_created ON response_cache (created_at)")
+            self._conn.commit()
+
+    def migrate_json_files(self) -> int:
+        """
+        Move entries from the old file-per-key JSON cache into the database.
+
+        Returns:
+            int: Number of entries migrated
+        """
+        json_files = list(self.cache_dir.glob("*.json"))
+        if not json_files:
+            return 0
+
+        rows = []
+        for cache_file in json_files:
+            try:
+                with open(cache_file, "r") as f:
+                    cache_data = json.load(f)
+                timestamp = float(cache_data["timestamp"])
+                response = cache_data["response"]
+                rows.append((cache_file.stem, cache_data.get("prompt"), response,
+                             len(response.encode()), timestamp,
+                             timestamp + self.max_age_seconds))
+            except Exception as e:
+                logger.warning(
+                    f"Skipping unreadable cache file {cache_file.name}: {str(e)}")
+
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO response_cache "
+                    "(cache_key, prompt, response, size, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        except Exception as e:
+            logger.error(f"Error migrating cache files: {str(e)}")
+            return 0
+
+        for cache_file in json_files:
+            try:
+                cache_file.unlink()
+            except OSError as e:
+                logger.warning(
+                    f"Could not remove migrated cache file {cache_file.name}: {str(e)}")
+
+        logger.info(f"Migrated {len(rows)} cache files into {self.db_path}")
+        return len(rows)
+
     def _generate_cache_key(self, prompt: str, role_context: Dict[str, Any], conversation_history: Optional[list] = None) -> str:
         """
         Generate a cache key for the given parameters.
@@ -58,6 +160,17 @@ class ResponseCache:
         cache_json = json.dumps(cache_data, sort_keys=True)
         return hashlib.md5(cache_json.encode()).hexdigest()
 
+    def _remember(self, cache_key: str, response: str, expires_at: float) -> None:
+        """
+        Put an entry in the in-memory LRU, evicting the least recently used.
+
+        Must be called with the lock held.
+        """
+        self._memory[cache_key] = (response, expires_at)
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
     def get(self, prompt: str, role_context: Dict[str, Any], conversation_history: Optional[list] = None) -> Optional[str]:
         """
         Get a cached response if available.
@@ -72,23 +185,31 @@ class ResponseCache:
         """
         cache_key = self._generate_cache_key(
             prompt, role_context, conversation_history)
-        cache_file = self.cache_dir / f"{cache_key}.json"
-
-        if not cache_file.exists():
-            return None
+        now = time.time()
 
         try:
-            # Read cache file
-            with open(cache_file, "r") as f:
-                cache_data = json.load(f)
-
-            # Check if cache is expired
-            if time.time() - cache_data["timestamp"] > self.max_age_seconds:
-                logger.info(f"Cache expired for key {cache_key}")
-                return None
+            with self._lock:
+                entry = self._memory.get(cache_key)
+                if entry:
+                    if entry[1] > now:
+                        self._memory.move_to_end(cache_key)
+                        logger.info(f"Cache hit for key {cache_key} (memory)")
+                        return entry[0]
+                    del self._memory[cache_key]
+
+                row = self._conn.execute(
+                    "SELECT response, expires_at FROM response_cache "
+                    "WHERE cache_key = ? AND expires_at > ?",
+                    (cache_key, now)
+                ).fetchone()
+
+                if not row:
+                    return None
+
+                self._remember(cache_key, row[0], row[1])
 
             logger.info(f"Cache hit for key {cache_key}")
-            return cache_data["response"]
+            return row[0]
         except Exception as e:
             logger.error(f"Error reading cache: {str(e)}")
             return None
@@ -105,24 +226,91 @@ class ResponseCache:
         """
         cache_key = self._generate_cache_key(
             prompt, role_context, conversation_history)
-        cache_file = self.cache_dir / f"{cache_key}.json"
+        now = time.time()
+        expires_at = now + self.max_age_seconds
 
         try:
-            # Create cache data
-            cache_data = {
-                "prompt": prompt,
-                "response": response,
-                "timestamp": time.time()
-            }
-
-            # Write cache file
-            with open(cache_file, "w") as f:
-                json.dump(cache_data, f)
+            with self._lock:
+                # Single-statement upsert in its own transaction
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO response_cache "
+                        "(cache_key, prompt, response, size, created_at, expires_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (cache_key, prompt, response,
+                         len(response.encode()), now, expires_at)
+                    )
+                self._remember(cache_key, response, expires_at)
+                self._writes += 1
+                enforce = self._writes % ENFORCE_LIMITS_EVERY == 0
+
+            if enforce:
+                self.enforce_limits()
 
             logger.info(f"Cached response for key {cache_key}")
         except Exception as e:
             logger.error(f"Error writing cache: {str(e)}")
 
+    def enforce_limits(self, max_entries: Optional[int] = None,
+                       max_size_bytes: Optional[int] = None) -> int:
+        """
+        Delete expired entries, then the oldest entries while over the size caps.
+
+        Args:
+            max_entries (Optional[int]): Entry cap (defaults to the cache's setting)
+            max_size_bytes (Optional[int]): Size cap in bytes (defaults to the cache's setting)
+
+        Returns:
+            int: Number of entries deleted
+        """
+        max_entries = self.max_entries if max_entries is None else max_entries
+        max_size_bytes = self.max_size_bytes if max_size_bytes is None else max_size_bytes
+
+        try:
+            with self._lock, self._conn:
+                deleted = self._conn.execute(
+                    "DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),)
+                ).rowcount
+
+                count, total_size = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache"
+                ).fetchone()
+
+                if count > max_entries:
+                    deleted += self._conn.execute(
+                        "DELETE FROM response_cache WHERE cache_key IN ("
+                        "SELECT cache_key FROM response_cache ORDER BY expires_at LIMIT ?)",
+                        (count - max_entries,)
+                    ).rowcount
+                    total_size = self._conn.execute(
+                        "SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+
+                if total_size > max_size_bytes:
+                    # Walk the oldest entries until enough space is freed
+                    to_free = total_size - max_size_bytes
+                    cutoff = None
+                    freed = 0
+                    for expires_at, size in self._conn.execute(
+                            "SELECT expires_at, size FROM response_cache ORDER BY expires_at"):
+                        freed += size
+                        cutoff = expires_at
+                        if freed >= to_free:
+                            break
+                    if cutoff is not None:
+                        deleted += self._conn.execute(
+                            "DELETE FROM response_cache WHERE expires_at <= ?", (cutoff,)
+                        ).rowcount
+
+                if deleted:
+                    self._memory.clear()
+
+            if deleted:
+                logger.info(f"Evicted {deleted} cache entries")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error enforcing cache limits: {str(e)}")
+            return 0
+
     def clear(self, max_age_seconds: Optional[int] = None) -> int:
         """
         Clear expired cache entries.
@@ -133,25 +321,81 @@ class ResponseCache:
         Returns:
             int: Number of cache entries cleared
         """
-        if max_age_seconds is None:
-            max_age_seconds = self.max_age_seconds
+        now = time.time()
 
-        cleared_count = 0
-        current_time = time.time()
+        try:
+            with self._lock, self._conn:
+                if max_age_seconds is None:
+                    cleared_count = self._conn.execute(
+                        "DELETE FROM response_cache WHERE expires_at <= ?", (now,)
+                    ).rowcount
+                else:
+                    cleared_count = self._conn.execute(
+                        "DELETE FROM response_cache WHERE created_at < ?",
+                        (now - max_age_seconds,)
+                    ).rowcount
+                self._memory.clear()
+        except Exception as e:
+            logger.error(f"Error clearing cache: {str(e)}")
+            return 0
 
-        for cache_file in self.cache_dir.glob("*.json"):
-            try:
-                # Read cache file
-                with open(cache_file, "r") as f:
-                    cache_data = json.load(f)
+        logger.info(f"Cleared {cleared_count} expired cache entries")
+        return cleared_count
 
-                # Check if cache is expired
-                if current_time - cache_data["timestamp"] > max_age_seconds:
-                    # Remove expired cache file
-                    os.remove(cache_file)
-                    cleared_count += 1
-            except Exception as e:
-                logger.error(f"Error clearing cache: {str(e)}")
+    def clear_all(self) -> int:
+        """
+        Remove every cache entry.
 
-        logger.info(f"Cleared {cleared_count} expired cache entries")
+        Returns:
+            int: Number of cache entries cleared
+        """
+        try:
+            with self._lock, self._conn:
+                cleared_count = self._conn.execute(
+                    "DELETE FROM response_cache").rowcount
+                self._memory.clear()
+        except Exception as e:
+            logger.error(f"Error clearing cache: {str(e)}")
+            return 0
+
+        logger.info(f"Cleared all {cleared_count} cache entries")
         return cleared_count
+
+    def count_stale(self, max_age_seconds: int) -> Tuple[int, int]:
+        """
+        Count entries that are expired or older than the given age.
+
+        Args:
+            max_age_seconds (int): Maximum age of cache entries to keep
+
+        Returns:
+            Tuple[int, int]: Number of entries and their total size in bytes
+        """
+        now = time.time()
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache "
+                "WHERE created_at < ? OR expires_at <= ?",
+                (now - max_age_seconds, now)
+            ).fetchone()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict[str, Any]: Entry counts and total size
+        """
+        with self._lock:
+            count, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache"
+            ).fetchone()
+            memory_count = len(self._memory)
+
+        return {
+            "entries": count,
+            "memory_entries": memory_count,
+            "size_mb": round(total_size / (1024 * 1024), 3),
+            "max_entries": self.max_entries,
+            "max_size_mb": round(self.max_size_bytes / (1024 * 1024), 3)
+        }
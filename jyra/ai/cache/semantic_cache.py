@@ -0,0 +1,301 @@
+"""
+Semantic cache for auxiliary LLM tasks
+
+Short messages such as "good morning!!" and "good morning" are classified and
+scanned for memories over and over. This cache reuses a prior answer when a new
+message normalizes to the same text, or when its embedding is close enough to a
+previously answered one, so the LLM call can be skipped.
+"""
+
+import asyncio
+import random
+import re
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+
+import numpy as np
+
+from jyra.ai.embeddings.embedding_generator import embedding_generator
+from jyra.ai.telemetry import llm_telemetry
+from jyra.utils.config import SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_AUDIT_RATE
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Per-task defaults: cosine similarity needed for a reuse, entry lifetime,
+# longest message considered for a semantic lookup, and entries kept
+DEFAULT_TASK_SETTINGS = {
+    "sentiment": {
+        "threshold": 0.92,
+        "ttl_seconds": 7 * 24 * 3600,
+        "max_chars": 280,
+        "max_entries": 2000
+    },
+    "memory_extraction": {
+        "threshold": 0.95,
+        "ttl_seconds": 24 * 3600,
+        "max_chars": 280,
+        "max_entries": 2000
+    },
+    "message_analysis": {
+        "threshold": 0.95,
+        "ttl_seconds": 24 * 3600,
+        "max_chars": 280,
+        "max_entries": 2000
+    }
+}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a message for exact-match lookups.
+
+    Lowercases, collapses repeated letters ("soooo" -> "soo") and repeated
+    punctuation ("!!!" -> "!"), and collapses whitespace.
+
+    Args:
+        text (str): The message
+
+    Returns:
+        str: Normalized text
+    """
+    text = text.lower().strip()
+    text = re.sub(r"([^\W\d_])\1{2,}", r"\1\1", text)
+    text = re.sub(r"([^\w\s])\1+", r"\1", text)
+    return " ".join(text.split())
+
+
+class _TaskStore:
+    """
+    Cached answers and statistics for one task.
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: int, max_chars: int, max_entries: int):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_chars = max_chars
+        self.max_entries = max_entries
+
+        # normalized text -> entry
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+
+        self.lookups = 0
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.audits = 0
+        self.false_hits = 0
+
+    def purge(self, now: float) -> None:
+        """Drop expired entries and the oldest entries over the cap."""
+        expired = [key for key, entry in self.entries.items()
+                   if entry["expires_at"] <= now]
+        for key in expired:
+            del self.entries[key]
+
+        # Dicts keep insertion order, so the first keys are the oldest
+        overflow = len(self.entries) - self.max_entries
+        for key in list(self.entries)[:max(0, overflow)]:
+            del self.entries[key]
+
+        if expired or overflow > 0:
+            self._matrix = None
+
+    def add(self, normalized: str, result: Any, vector: Optional[np.ndarray], now: float) -> None:
+        """Store an answer."""
+        self.entries.pop(normalized, None)
+        self.entries[normalized] = {
+            "result": result,
+            "vector": vector,
+            "expires_at": now + self.ttl_seconds
+        }
+        self._matrix = None
+        self.purge(now)
+
+    def nearest(self, vector: np.ndarray, now: float) -> Optional[Dict[str, Any]]:
+        """Get the most similar unexpired entry above the threshold."""
+        if self._matrix is None:
+            self._matrix_keys = [key for key, entry in self.entries.items()
+                                 if entry["vector"] is not None]
+            self._matrix = (np.vstack([self.entries[key]["vector"] for key in self._matrix_keys])
+                            if self._matrix_keys else None)
+
+        if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+            return None
+
+        similarities = self._matrix @ vector
+        index = int(np.argmax(similarities))
+        if similarities[index] < self.threshold:
+            return None
+
+        entry = self.entries.get(self._matrix_keys[index])
+        if not entry or entry["expires_at"] <= now:
+            return None
+        return entry
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache for auxiliary LLM tasks.
+    """
+
+    def __init__(self, enabled: bool = SEMANTIC_CACHE_ENABLED,
+                 audit_rate: float = SEMANTIC_CACHE_AUDIT_RATE,
+                 embed: Optional[Callable[[str], Awaitable[List[float]]]] = None):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            enabled (bool): Whether lookups are performed at all
+            audit_rate (float): Fraction of semantic hits recomputed in the
+                background to measure false hits
+            embed (Optional[Callable]): Embedding function; defaults to the
+                shared embedding generator
+        """
+        self.enabled = enabled
+        self.audit_rate = audit_rate
+        self._embed = embed or embedding_generator.generate_embedding
+        self._tasks: Dict[str, _TaskStore] = {}
+        self._audit_tasks = set()
+
+        for task, settings in DEFAULT_TASK_SETTINGS.items():
+            self.configure_task(task, **settings)
+
+        logger.info("Initialized semantic cache")
+
+    def configure_task(self, task: str, threshold: float = 0.95, ttl_seconds: int = 24 * 3600,
+                       max_chars: int = 280, max_entries: int = 2000) -> None:
+        """
+        Configure (or reset) the cache for a task.
+
+        Args:
+            task (str): Task name
+            threshold (float): Cosine similarity required to reuse an answer
+            ttl_seconds (int): Lifetime of cached answers
+            max_chars (int): Longest message eligible for a semantic lookup
+            max_entries (int): Maximum number of cached answers
+        """
+        self._tasks[task] = _TaskStore(
+            threshold, ttl_seconds, max_chars, max_entries)
+
+    async def _get_vector(self, text: str) -> Optional[np.ndarray]:
+        """
+        Get the unit-length embedding of a text, or None if unavailable.
+        """
+        try:
+            embedding = await self._embed(text)
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {str(e)}")
+            return None
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if vector.ndim != 1 or norm == 0:
+            return None
+        return vector / norm
+
+    async def get_or_compute(self, task: str, text: str,
+                             compute: Callable[[], Awaitable[Any]],
+                             cacheable: Optional[Callable[[Any], bool]] = None,
+                             agree: Optional[Callable[[Any, Any], bool]] = None) -> Any:
+        """
+        Return a cached answer for a similar message, or compute and cache one.
+
+        Args:
+            task (str): Task name
+            text (str): The message the task runs on
+            compute (Callable[[], Awaitable[Any]]): Makes the LLM call on a miss
+            cacheable (Optional[Callable[[Any], bool]]): Whether a computed
+                answer may be stored (e.g. not a failure fallback)
+            agree (Optional[Callable[[Any, Any], bool]]): Whether two answers are
+                equivalent, used by the false-hit audit
+
+        Returns:
+            Any: The cached or computed answer
+        """
+        store = self._tasks.get(task)
+        if not self.enabled or store is None or not text or not text.strip():
+            return await compute()
+
+        now = time.time()
+        store.lookups += 1
+        normalized = normalize_text(text)
+
+        # Fast path: same message after normalization, no embedding needed
+        entry = store.entries.get(normalized)
+        if entry and entry["expires_at"] > now:
+            store.exact_hits += 1
+            return entry["result"]
+
+        vector = None
+        if len(text) <= store.max_chars:
+            vector = await self._get_vector(text)
+            if vector is not None:
+                entry = store.nearest(vector, now)
+                if entry:
+                    store.semantic_hits += 1
+                    if self.audit_rate > 0 and random.random() < self.audit_rate:
+                        self._schedule_audit(
+                            task, text, entry["result"], compute, agree)
+                    return entry["result"]
+
+        store.misses += 1
+        result = await compute()
+        if cacheable is None or cacheable(result):
+            store.add(normalized, result, vector, time.time())
+        return result
+
+    def _schedule_audit(self, task: str, text: str, cached_result: Any,
+                        compute: Callable[[], Awaitable[Any]],
+                        agree: Optional[Callable[[Any, Any], bool]]) -> None:
+        """
+        Recompute a semantic hit in the background and record disagreements.
+        """
+        async def audit():
+            try:
+                fresh_result = await compute()
+            except Exception as e:
+                logger.warning(f"Semantic cache audit failed: {str(e)}")
+                return
+
+            store = self._tasks[task]
+            store.audits += 1
+            same = agree(cached_result, fresh_result) if agree else cached_result == fresh_result
+            if not same:
+                store.false_hits += 1
+                logger.warning(
+                    f"Semantic cache false hit for task {task}: {text[:80]!r}")
+
+        audit_task = asyncio.create_task(audit())
+        self._audit_tasks.add(audit_task)
+        audit_task.add_done_callback(self._audit_tasks.discard)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get hit rates and audit results per task.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Statistics keyed by task name
+        """
+        stats = {}
+        for task, store in self._tasks.items():
+            hits = store.exact_hits + store.semantic_hits
+            stats[task] = {
+                "entries": len(store.entries),
+                "lookups": store.lookups,
+                "exact_hits": store.exact_hits,
+                "semantic_hits": store.semantic_hits,
+                "misses": store.misses,
+                "hit_rate": round(hits / store.lookups, 3) if store.lookups else 0.0,
+                "audits": store.audits,
+                "false_hits": store.false_hits,
+                "false_hit_rate": round(store.false_hits / store.audits, 3) if store.audits else 0.0
+            }
+        return stats
+
+
+# Create a singleton instance
+semantic_cache = SemanticCache()
+llm_telemetry.register_source("semantic_cache", semantic_cache.get_stats)
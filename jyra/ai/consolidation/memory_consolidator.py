@@ -14,11 +14,21 @@ import networkx as nx
 
 from jyra.db.models.memory import Memory
 from jyra.ai.embeddings.vector_db import vector_db
+from jyra.ai.consolidation_batcher import consolidation_batcher
 from jyra.ai.models.model_manager import model_manager
+from jyra.ai.telemetry import call_site
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# How each consolidated memory should be written
+CONSOLIDATION_GUIDELINES = """1. Combine all important information from the memories
+2. Remove redundancies and duplications
+3. Organize the information in a logical way
+4. Keep the consolidated memory concise but comprehensive
+5. Use clear, factual language
+6. Preserve specific details, names, dates, and numbers"""
+
 
 class MemoryConsolidator:
     """
@@ -187,13 +197,16 @@ class MemoryConsolidator:
 
     async def generate_consolidated_memory(self,
                                            memories: List[Memory],
-                                           user_id: int) -> Optional[Dict[str, Any]]:
+                                           user_id: int,
+                                           consolidated_content: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Generate a consolidated memory from a list of related memories.
 
         Args:
             memories (List[Memory]): List of memories to consolidate
             user_id (int): User ID
+            consolidated_content (Optional[str]): Content generated beforehand,
+                e.g. in a batch; generated here if not given
 
         Returns:
             Optional[Dict[str, Any]]: Consolidated memory data, or None if consolidation failed
@@ -217,33 +230,12 @@ class MemoryConsolidator:
                 memory.importance for memory in memories) / len(memories)
             importance = min(5, max(1, round(avg_importance)))
 
-            # Prepare prompt for the AI model
-            prompt = f"""You are an AI assistant helping to consolidate related memories into a single, comprehensive memory.
-Please analyze these related memories and create a single consolidated memory that captures all the important information.
-
-MEMORIES TO CONSOLIDATE:
-{chr(10).join([f"- {content}" for content in memory_contents])}
-
-GUIDELINES:
-1. Combine all important information from the memories
-2. Remove redundancies and duplications
-3. Organize the information in a logical way
-4. Keep the consolidated memory concise but comprehensive
-5. Use clear, factual language
-6. Preserve specific details, names, dates, and numbers
-
-Please provide ONLY the consolidated memory text, without any explanations or additional comments."""
-
-            # Generate consolidated memory content
-            response_tuple = await model_manager.generate_response(prompt, user_id=user_id)
-
-            if not response_tuple or not response_tuple[0]:
-                logger.error("Failed to generate consolidated memory content")
-                return None
-
-            # Extract the response text from the tuple (response, model_name)
-            response_text = response_tuple[0]
-            consolidated_content = response_text.strip()
+            if consolidated_content is None:
+                consolidated_content = await self._generate_consolidated_content(
+                    memory_contents, user_id)
+                if not consolidated_content:
+                    logger.error("Failed to generate consolidated memory content")
+                    return None
 
             # Determine the best category
             category = self._determine_best_category(categories)
@@ -266,6 +258,40 @@ Please provide ONLY the consolidated memory text, without any explanations or ad
             logger.error(f"Error generating consolidated memory: {str(e)}")
             return None
 
+    async def _generate_consolidated_content(self, memory_contents: List[str],
+                                             user_id: int) -> Optional[str]:
+        """
+        Generate consolidated content for one group of memories with its own model call.
+
+        Args:
+            memory_contents (List[str]): Contents of the memories to consolidate
+            user_id (int): User ID
+
+        Returns:
+            Optional[str]: Consolidated content, or None if generation failed
+        """
+        # Prepare prompt for the AI model
+        prompt = f"""You are an AI assistant helping to consolidate related memories into a single, comprehensive memory.
+Please analyze these related memories and create a single consolidated memory that captures all the important information.
+
+MEMORIES TO CONSOLIDATE:
+{chr(10).join([f"- {content}" for content in memory_contents])}
+
+GUIDELINES:
+{CONSOLIDATION_GUIDELINES}
+
+Please provide ONLY the consolidated memory text, without any explanations or additional comments."""
+
+        # Generate consolidated memory content
+        with call_site("consolidation"):
+            response_tuple = await model_manager.generate_response(prompt, user_id=user_id)
+
+        if not response_tuple or not response_tuple[0]:
+            return None
+
+        # Extract the response text from the tuple (response, model_name)
+        return response_tuple[0].strip()
+
     def _determine_best_category(self, categories: Set[str]) -> str:
         """
         Determine the best category for a consolidated memory.
@@ -297,7 +323,8 @@ Please provide ONLY the consolidated memory text, without any explanations or ad
     async def perform_consolidation(self,
                                     user_id: int,
                                     memories: List[Memory],
-                                    mark_originals: bool = True) -> Optional[int]:
+                                    mark_originals: bool = True,
+                                    consolidated_content: Optional[str] = None) -> Optional[int]:
         """
         Perform consolidation of a group of memories.
 
@@ -305,13 +332,16 @@ Please provide ONLY the consolidated memory text, without any explanations or ad
             user_id (int): User ID
             memories (List[Memory]): List of memories to consolidate
             mark_originals (bool): Whether to mark original memories as consolidated
+            consolidated_content (Optional[str]): Content generated beforehand,
+                e.g. in a batch; generated here if not given
 
         Returns:
             Optional[int]: ID of the new consolidated memory, or None if consolidation failed
         """
         try:
             # Generate consolidated memory
-            consolidated_data = await self.generate_consolidated_memory(memories, user_id)
+            consolidated_data = await self.generate_consolidated_memory(
+                memories, user_id, consolidated_content)
 
             if not consolidated_data:
                 logger.error("Failed to generate consolidated memory")
@@ -387,8 +417,21 @@ Please provide ONLY the consolidated memory text, without any explanations or ad
             consolidated_count = 0
             consolidated_memory_ids = []
 
-            for cluster in candidates:
-                new_memory_id = await self.perform_consolidation(user_id, cluster)
+            # Generate the consolidated contents of all clusters, several clusters per call
+            contents = await consolidation_batcher.consolidate(
+                user_id,
+                [{"category": self._determine_best_category(
+                    set(memory.category for memory in cluster if memory.category)),
+                  "contents": [memory.content for memory in cluster]}
+                 for cluster in candidates],
+                CONSOLIDATION_GUIDELINES
+            )
+
+            for cluster, content in zip(candidates, contents):
+                if not content:
+                    continue
+                new_memory_id = await self.perform_consolidation(
+                    user_id, cluster, consolidated_content=content)
                 if new_memory_id:
                     consolidated_count += 1
                     consolidated_memory_ids.append(new_memory_id)
@@ -0,0 +1,244 @@
+"""
+Batched memory consolidation for Jyra.
+
+Consolidation used to make one model call per memory group. The batcher packs
+several groups into one structured-output request, within a prompt token
+budget, and maps the answer back to the groups by their index. A group the
+model leaves out of its answer is simply not consolidated this run. Maintenance
+runs of several users go ahead concurrently, up to a fixed number of users.
+"""
+
+import asyncio
+from typing import Dict, Any, List, Optional, Callable, Awaitable, TypeVar
+
+from jyra.ai.context import estimate_tokens
+from jyra.ai.models.model_manager import model_manager
+from jyra.ai.telemetry import call_site, llm_telemetry
+from jyra.utils.config import (
+    CONSOLIDATION_BATCH_ENABLED, CONSOLIDATION_BATCH_TOKEN_BUDGET,
+    CONSOLIDATION_BATCH_MAX_GROUPS, CONSOLIDATION_USER_CONCURRENCY
+)
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+# Answer schema for batched consolidation: one entry per group, keyed by its index
+CONSOLIDATION_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "groups": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "group": {"type": "integer"},
+                    "content": {"type": "string"}
+                },
+                "required": ["group", "content"]
+            }
+        }
+    },
+    "required": ["groups"]
+}
+
+# Prompt tokens of a group beyond its memories (header and separators)
+GROUP_OVERHEAD_TOKENS = 12
+
+# Answer tokens allowed per group, and for a whole batch
+ANSWER_TOKENS_PER_GROUP = 150
+MAX_ANSWER_TOKENS = 2000
+
+
+def render_group(index: int, group: Dict[str, Any]) -> str:
+    """
+    Render a memory group for the batch prompt.
+
+    Args:
+        index (int): Index of the group in the batch
+        group (Dict[str, Any]): Group with "category" and "contents"
+
+    Returns:
+        str: The group's section of the prompt
+    """
+    lines = [f"GROUP {index} (category: {group.get('category') or 'General'})"]
+    lines.extend(f"- {content}" for content in group["contents"])
+    return "\n".join(lines)
+
+
+def pack_groups(groups: List[Dict[str, Any]], token_budget: int,
+                max_groups: int) -> List[List[int]]:
+    """
+    Pack groups into batches that fit the prompt token budget.
+
+    Groups keep their order. A group larger than the budget on its own gets a
+    batch of its own.
+
+    Args:
+        groups (List[Dict[str, Any]]): Groups with "category" and "contents"
+        token_budget (int): Prompt tokens available for the groups of one batch
+        max_groups (int): Groups per batch at most
+
+    Returns:
+        List[List[int]]: Indices of the groups in each batch
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for index, group in enumerate(groups):
+        cost = estimate_tokens(render_group(index, group)) + GROUP_OVERHEAD_TOKENS
+        if current and (used + cost > token_budget or len(current) >= max_groups):
+            batches.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+class ConsolidationBatcher:
+    """
+    Consolidates several memory groups per model call and bounds per-user parallelism.
+    """
+
+    def __init__(self, enabled: bool = CONSOLIDATION_BATCH_ENABLED,
+                 token_budget: int = CONSOLIDATION_BATCH_TOKEN_BUDGET,
+                 max_groups: int = CONSOLIDATION_BATCH_MAX_GROUPS,
+                 user_concurrency: int = CONSOLIDATION_USER_CONCURRENCY):
+        """
+        Initialize the batcher.
+
+        Args:
+            enabled (bool): Whether groups are batched; otherwise each group gets its own call
+            token_budget (int): Prompt tokens available for the groups of one batch
+            max_groups (int): Groups per batch at most
+            user_concurrency (int): Users whose maintenance runs at the same time
+        """
+        self.enabled = enabled
+        self.token_budget = token_budget
+        self.max_groups = max_groups if enabled else 1
+        self.user_concurrency = max(1, user_concurrency)
+        self.stats = {"groups": 0, "batches": 0, "failed_batches": 0,
+                      "missing_results": 0, "users": 0}
+
+    async def consolidate(self, user_id: int, groups: List[Dict[str, Any]],
+                          guidelines: str) -> List[Optional[str]]:
+        """
+        Generate a consolidated memory for each group.
+
+        Args:
+            user_id (int): User ID
+            groups (List[Dict[str, Any]]): Groups with "category" and "contents"
+            guidelines (str): How each consolidated memory should be written
+
+        Returns:
+            List[Optional[str]]: Consolidated content per group, None where the
+                model gave no answer for the group
+        """
+        results: List[Optional[str]] = [None] * len(groups)
+        if not groups:
+            return results
+
+        self.stats["groups"] += len(groups)
+        for batch in pack_groups(groups, self.token_budget, self.max_groups):
+            answers = await self._consolidate_batch(user_id, [groups[i] for i in batch], guidelines)
+            for position, content in answers.items():
+                results[batch[position]] = content
+            self.stats["missing_results"] += len(batch) - len(answers)
+        return results
+
+    async def _consolidate_batch(self, user_id: int, groups: List[Dict[str, Any]],
+                                 guidelines: str) -> Dict[int, str]:
+        """
+        Consolidate one batch of groups with a single model call.
+
+        Args:
+            user_id (int): User ID
+            groups (List[Dict[str, Any]]): The batch's groups
+            guidelines (str): How each consolidated memory should be written
+
+        Returns:
+            Dict[int, str]: Consolidated content by position of the group in the batch
+        """
+        sections = "\n\n".join(render_group(i, group) for i, group in enumerate(groups))
+        prompt = f"""You consolidate related memories about a user into higher-level memories.
+Each group below holds related memories. For every group, write one consolidated memory that captures the information of the whole group.
+
+GUIDELINES:
+{guidelines}
+
+Answer with one entry per group, giving the group number and its consolidated memory. Never merge information across groups.
+
+{sections}"""
+
+        self.stats["batches"] += 1
+        try:
+            with call_site("consolidation"):
+                result, model_used = await model_manager.generate_structured(
+                    prompt=prompt,
+                    schema=CONSOLIDATION_BATCH_SCHEMA,
+                    temperature=0.3,  # Lower temperature for more consistent consolidation
+                    max_tokens=min(MAX_ANSWER_TOKENS, ANSWER_TOKENS_PER_GROUP * len(groups)),
+                    use_fallbacks=True,
+                    user_id=user_id
+                )
+            logger.info(f"Consolidated a batch of {len(groups)} memory groups using model: {model_used}")
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            logger.error(f"Error consolidating memory batch for user {user_id}: {str(e)}")
+            return {}
+
+        answers = {}
+        for entry in result.get("groups", []):
+            position = entry.get("group")
+            content = (entry.get("content") or "").strip()
+            # Ignore unknown groups, empty answers and repeated answers for a group
+            if isinstance(position, int) and 0 <= position < len(groups) and content \
+                    and position not in answers:
+                answers[position] = content
+        return answers
+
+    async def run_for_users(self, user_ids: List[int],
+                            run: Callable[[int], Awaitable[T]]) -> Dict[int, T]:
+        """
+        Run a maintenance function for each user, a few users at a time.
+
+        Args:
+            user_ids (List[int]): User IDs
+            run (Callable[[int], Awaitable[T]]): Runs the maintenance of one user
+
+        Returns:
+            Dict[int, T]: Result per user; users whose run failed are left out
+        """
+        semaphore = asyncio.Semaphore(self.user_concurrency)
+        results: Dict[int, T] = {}
+
+        async def run_user(user_id: int) -> None:
+            async with semaphore:
+                try:
+                    results[user_id] = await run(user_id)
+                    self.stats["users"] += 1
+                except Exception as e:
+                    logger.error(f"Error running memory maintenance for user {user_id}: {str(e)}")
+
+        await asyncio.gather(*(run_user(user_id) for user_id in user_ids))
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching counters.
+
+        Returns:
+            Dict[str, Any]: Statistics, including the model calls saved by batching
+        """
+        return {**self.stats, "enabled": self.enabled,
+                "calls_saved": self.stats["groups"] - self.stats["batches"]}
+
+
+# Create a singleton instance
+consolidation_batcher = ConsolidationBatcher()
+
+# Report batch sizes and saved calls alongside call telemetry
+llm_telemetry.register_source("consolidation_batcher", consolidation_batcher.get_stats)
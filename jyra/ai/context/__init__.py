@@ -0,0 +1,9 @@
+"""
+Context assembly module for Jyra
+"""
+
+from jyra.ai.context.context_assembler import (
+    ContextAssembler, estimate_tokens, summarize_dropped_turns
+)
+
+__all__ = ['ContextAssembler', 'estimate_tokens', 'summarize_dropped_turns']
@@ -0,0 +1,285 @@
+"""
+Token-budgeted context assembly for Jyra.
+
+This module packs the system prompt, memory context and conversation history
+into a per-model input token budget, trimming the least important parts first.
+"""
+
+import re
+from typing import List, Dict, Any, Optional, Callable
+
+from jyra.utils.config import CONTEXT_BUDGET_RATIO, CONTEXT_MAX_INPUT_TOKENS
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Approximate overhead of a single message (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Tokens held back for the history summary when older turns are dropped
+SUMMARY_RESERVE_TOKENS = 120
+
+_WORD_PATTERN = re.compile(r"[A-Za-z]+")
+_OTHER_PATTERN = re.compile(r"[^\sA-Za-z]")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Estimate the number of tokens in a text without calling a tokenizer.
+
+    ASCII words count as one token per six characters (rounded up), and every
+    digit, punctuation mark or non-ASCII character counts as one token. This is
+    slightly pessimistic for the Gemini and OpenAI tokenizers, which keeps the
+    assembled context safely inside the budget.
+
+    Args:
+        text (Optional[str]): The text to estimate
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    if not text:
+        return 0
+
+    word_tokens = sum(1 + (len(word) - 1) // 6
+                      for word in _WORD_PATTERN.findall(text))
+    return word_tokens + len(_OTHER_PATTERN.findall(text))
+
+
+def summarize_dropped_turns(messages: List[Dict[str, str]], max_items: int = 5) -> Optional[str]:
+    """
+    Build a short extractive summary of conversation turns that were trimmed.
+
+    Args:
+        messages (List[Dict[str, str]]): The dropped messages in chronological order
+        max_items (int): Maximum number of user statements to keep
+
+    Returns:
+        Optional[str]: Summary text, or None if there is nothing worth keeping
+    """
+    statements = []
+    for message in messages:
+        if message.get("role") != "user":
+            continue
+        content = " ".join(message.get("content", "").split())
+        if not content:
+            continue
+        # Keep the first sentence only
+        sentence = re.split(r"(?<=[.!?])\s", content, maxsplit=1)[0]
+        if len(sentence) > 80:
+            sentence = sentence[:77].rsplit(" ", 1)[0] + "..."
+        statements.append(sentence)
+
+    if not statements:
+        return None
+
+    # The most recent statements are the most relevant
+    statements = statements[-max_items:]
+    return "Earlier in this conversation the user said: " + "; ".join(statements)
+
+
+class ContextAssembler:
+    """
+    Packs prompt context into a token budget derived from the model's context length.
+
+    Parts are kept in priority order:
+    1. The system prompt and the current user message (never trimmed)
+    2. The most recent conversation exchange
+    3. Memory context lines, in the order given (most important first)
+    4. Older conversation history, newest first
+
+    Anything that does not fit is dropped, and dropped history is passed to the
+    summarization hook so a short summary can take its place.
+    """
+
+    def __init__(self, max_context_length: int,
+                 budget_ratio: float = CONTEXT_BUDGET_RATIO,
+                 max_input_tokens: int = CONTEXT_MAX_INPUT_TOKENS,
+                 summarizer: Optional[Callable[[List[Dict[str, str]]], Optional[str]]] = None):
+        """
+        Initialize the context assembler.
+
+        Args:
+            max_context_length (int): The model's maximum context length in tokens
+            budget_ratio (float): Fraction of the context length available for input
+            max_input_tokens (int): Absolute cap on input tokens
+            summarizer (Optional[Callable]): Hook that summarizes dropped history messages
+        """
+        self.max_context_length = max_context_length
+        self.budget_ratio = budget_ratio
+        self.max_input_tokens = max_input_tokens
+        self.summarizer = summarizer
+
+    def register_summarizer(self, summarizer: Optional[Callable[[List[Dict[str, str]]], Optional[str]]]) -> None:
+        """
+        Register the hook used to summarize dropped conversation history.
+
+        Args:
+            summarizer (Optional[Callable]): Function taking the dropped messages and
+                returning a summary string (or None to disable summaries)
+        """
+        self.summarizer = summarizer
+
+    def get_input_budget(self, max_output_tokens: int = 1000) -> int:
+        """
+        Get the input token budget for a request.
+
+        Args:
+            max_output_tokens (int): Tokens reserved for the model's response
+
+        Returns:
+            int: Number of input tokens available
+        """
+        budget = min(int(self.max_context_length * self.budget_ratio),
+                     self.max_input_tokens)
+        return max(0, min(budget, self.max_context_length - max_output_tokens))
+
+    def assemble(self, system_prompt: str, prompt: str,
+                 memory_context: Optional[str] = None,
+                 conversation_history: Optional[List[Dict[str, str]]] = None,
+                 max_output_tokens: int = 1000) -> Dict[str, Any]:
+        """
+        Assemble the context for a request within the token budget.
+
+        Args:
+            system_prompt (str): The system prompt
+            prompt (str): The current user message
+            memory_context (Optional[str]): Formatted memory context, one memory per line
+            conversation_history (Optional[List[Dict[str, str]]]): Previous messages
+            max_output_tokens (int): Tokens reserved for the model's response
+
+        Returns:
+            Dict[str, Any]: The trimmed system prompt, memory context, conversation
+            history and history summary, plus token accounting
+        """
+        budget = self.get_input_budget(max_output_tokens)
+        history = list(conversation_history or [])
+
+        used = (estimate_tokens(system_prompt) + estimate_tokens(prompt)
+                + 2 * MESSAGE_OVERHEAD_TOKENS)
+        remaining = budget - used
+
+        # Priority 2: the most recent exchange
+        recent = history[-2:]
+        older = history[:-2]
+        recent_cost = sum(self._message_cost(m) for m in recent)
+        if recent_cost > remaining:
+            older = history
+            recent = []
+        else:
+            remaining -= recent_cost
+
+        # Priority 3: memory lines, most important first
+        kept_memory_lines, dropped_memories, remaining = self._pack_memory_lines(
+            memory_context, remaining)
+
+        # Priority 4: older history, newest exchange first
+        older_cost = sum(self._message_cost(m) for m in older)
+        history_allowance = remaining
+        if older_cost > remaining and self.summarizer:
+            history_allowance = max(0, remaining - SUMMARY_RESERVE_TOKENS)
+
+        kept_older = []
+        index = len(older)
+        while index > 0:
+            # Keep user/assistant pairs together
+            start = index - 2 if index >= 2 else 0
+            chunk = older[start:index]
+            chunk_cost = sum(self._message_cost(m) for m in chunk)
+            if chunk_cost > history_allowance:
+                break
+            kept_older = chunk + kept_older
+            history_allowance -= chunk_cost
+            remaining -= chunk_cost
+            index = start
+
+        dropped_history = older[:index]
+
+        history_summary = None
+        if dropped_history and self.summarizer:
+            try:
+                history_summary = self.summarizer(dropped_history)
+            except Exception as e:
+                logger.error(f"Error in history summarizer: {str(e)}")
+                history_summary = None
+
+            if history_summary:
+                summary_cost = estimate_tokens(history_summary) + \
+                    MESSAGE_OVERHEAD_TOKENS
+                if summary_cost > remaining:
+                    history_summary = None
+                else:
+                    remaining -= summary_cost
+
+        trimmed_memory = "\n".join(kept_memory_lines)
+        if dropped_history or dropped_memories:
+            logger.info(
+                f"Context trimmed to budget {budget}: dropped {len(dropped_history)} history "
+                f"messages and {dropped_memories} memory lines")
+
+        return {
+            "system_prompt": system_prompt,
+            "memory_context": trimmed_memory,
+            "conversation_history": kept_older + recent,
+            "history_summary": history_summary,
+            "estimated_tokens": budget - remaining,
+            "budget": budget,
+            "dropped_messages": len(dropped_history),
+            "dropped_memories": dropped_memories
+        }
+
+    def _message_cost(self, message: Dict[str, str]) -> int:
+        """
+        Estimate the token cost of a conversation message.
+
+        Args:
+            message (Dict[str, str]): The message
+
+        Returns:
+            int: Estimated token cost
+        """
+        return estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+    def _pack_memory_lines(self, memory_context: Optional[str], remaining: int) -> tuple:
+        """
+        Keep whole memory lines, in order, while they fit in the remaining budget.
+
+        A leading header line (ending with a colon) is kept only if at least one
+        memory line is kept.
+
+        Args:
+            memory_context (Optional[str]): The formatted memory context
+            remaining (int): Remaining token budget
+
+        Returns:
+            tuple: (kept lines, number of dropped memory lines, remaining budget)
+        """
+        if not memory_context or not memory_context.strip():
+            return [], 0, remaining
+
+        lines = [line for line in memory_context.splitlines() if line.strip()]
+        header = None
+        if lines and lines[0].rstrip().endswith(":"):
+            header = lines.pop(0)
+
+        header_cost = estimate_tokens(header) + MESSAGE_OVERHEAD_TOKENS
+        if header_cost > remaining:
+            return [], len(lines), remaining
+
+        kept = []
+        available = remaining - header_cost
+        for line in lines:
+            line_cost = estimate_tokens(line) + 1
+            if line_cost > available:
+                # Lines are ordered by importance, so stop at the first miss
+                break
+            kept.append(line)
+            available -= line_cost
+
+        dropped = len(lines) - len(kept)
+        if not kept:
+            return [], dropped, remaining
+
+        if header:
+            kept.insert(0, header)
+        return kept, dropped, available
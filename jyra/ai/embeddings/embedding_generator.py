@@ -7,11 +7,16 @@ This module generates vector embeddings for text using various embedding models.
 import aiohttp
 import numpy as np
 from typing import List, Dict, Any, Optional, Union
-import json
 
-from jyra.utils.config import GEMINI_API_KEY, OPENAI_API_KEY, ENABLE_OPENAI
+from jyra.utils.config import (
+    GEMINI_API_KEY, OPENAI_API_KEY, ENABLE_OPENAI, GEMINI_API_BASE_URL, OPENAI_API_BASE_URL
+)
 from jyra.utils.logger import setup_logger
 from jyra.utils.exceptions import AIModelException, APIRateLimitException, APIAuthenticationException
+from jyra.ai.context import estimate_tokens
+from jyra.ai.limits import provider_rate_limiter
+from jyra.ai.telemetry import llm_telemetry, track_llm_call
+from jyra.ai.utils.api_errors import raise_for_api_error
 
 logger = setup_logger(__name__)
 
@@ -21,31 +26,37 @@ class EmbeddingGenerator:
     Class for generating vector embeddings for text.
     """
 
-    def __init__(self, model_name: str = "gemini-embedding"):
+    def __init__(self, model_name: str = "gemini-embedding", base_url: Optional[str] = None):
         """
         Initialize the embedding generator.
 
         Args:
             model_name (str): The name of the embedding model to use
+            base_url (Optional[str]): API base URL (defaults to the provider's
+                configured base URL)
         """
         self.model_name = model_name
 
         # Set up API endpoints based on the model
         if "gemini" in model_name.lower():
-            self.api_url = f"https://generativelanguage.googleapis.com/v1/models/embedding-001:embedContent?key={GEMINI_API_KEY}"
+            self.base_url = (base_url or GEMINI_API_BASE_URL).rstrip("/")
+            self.api_url = f"{self.base_url}/models/embedding-001:embedContent?key={GEMINI_API_KEY}"
             self.provider = "Google"
         elif "openai" in model_name.lower() or "ada" in model_name.lower():
-            self.api_url = "https://api.openai.com/v1/embeddings"
+            self.base_url = (base_url or OPENAI_API_BASE_URL).rstrip("/")
+            self.api_url = f"{self.base_url}/embeddings"
             self.provider = "OpenAI"
         else:
             # Default to Gemini
-            self.api_url = f"https://generativelanguage.googleapis.com/v1/models/embedding-001:embedContent?key={GEMINI_API_KEY}"
+            self.base_url = (base_url or GEMINI_API_BASE_URL).rstrip("/")
+            self.api_url = f"{self.base_url}/models/embedding-001:embedContent?key={GEMINI_API_KEY}"
             self.provider = "Google"
             self.model_name = "gemini-embedding"
 
         logger.info(
             f"Initialized embedding generator with model: {self.model_name}")
 
+    @track_llm_call("embedding")
     async def generate_embedding(self, text: str) -> List[float]:
         """
         Generate a vector embedding for the given text.
@@ -74,6 +85,9 @@ class EmbeddingGenerator:
                 # Fall back to Gemini if OpenAI is disabled
                 return await self._generate_gemini_embedding(text)
 
+        except (APIRateLimitException, APIAuthenticationException):
+            # Let callers distinguish quota and credential problems
+            raise
         except Exception as e:
             logger.error(f"Error generating embedding: {str(e)}")
             raise AIModelException(
@@ -100,54 +114,24 @@ class EmbeddingGenerator:
                 }
             }
 
-            # Make the API request
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.api_url, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-
-                        # Extract the embedding
-                        if "embedding" in result:
-                            embedding = result["embedding"]
-                            return embedding
-
-                        logger.error(f"Unexpected response format: {result}")
-                        raise AIModelException(
-                            self.model_name, "Unexpected response format")
-                    else:
-                        error_text = await response.text()
-                        logger.error(
-                            f"API error: {response.status}, {error_text}")
-
-                        try:
-                            error_data = json.loads(error_text)
-                            if "error" in error_data:
-                                error_code = error_data['error'].get('code', 0)
-                                error_message = error_data['error'].get(
-                                    'message', 'Unknown error')
-
-                                # Handle specific error codes
-                                if error_code == 429:
-                                    raise APIRateLimitException(
-                                        "Gemini", error_message)
-                                elif error_code in (401, 403):
-                                    raise APIAuthenticationException(
-                                        "Gemini", error_message)
-                                else:
-                                    raise AIModelException(
-                                        self.model_name, f"API error: {error_message}")
-                        except json.JSONDecodeError:
-                            # If we can't parse the error as JSON, use the status code
-                            if response.status == 429:
-                                raise APIRateLimitException(
-                                    "Gemini", f"Rate limit exceeded (HTTP {response.status})")
-                            elif response.status in (401, 403):
-                                raise APIAuthenticationException(
-                                    "Gemini", f"Authentication error (HTTP {response.status})")
-
-                        # Default error if no specific error was raised
-                        raise AIModelException(
-                            self.model_name, f"API error: HTTP {response.status}")
+            # Make the API request within the shared provider quota
+            result = await provider_rate_limiter.call_with_retry(
+                "gemini", "embedding-001", lambda: self._post(payload),
+                tokens=estimate_tokens(text))
+
+            # embedContent reports no usage, so the input size is estimated
+            llm_telemetry.record_usage(estimate_tokens(text), estimated=True)
+
+            # Extract the embedding (embedContent returns {"embedding": {"values": [...]}})
+            if "embedding" in result:
+                embedding = result["embedding"]
+                if isinstance(embedding, dict):
+                    embedding = embedding.get("values", [])
+                return embedding
+
+            logger.error(f"Unexpected response format: {result}")
+            raise AIModelException(
+                self.model_name, "Unexpected response format")
 
         except (AIModelException, APIRateLimitException, APIAuthenticationException):
             # Re-raise specific exceptions
@@ -183,54 +167,22 @@ class EmbeddingGenerator:
                 "Content-Type": "application/json"
             }
 
-            # Make the API request
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.api_url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        result = await response.json()
-
-                        # Extract the embedding
-                        if "data" in result and len(result["data"]) > 0 and "embedding" in result["data"][0]:
-                            embedding = result["data"][0]["embedding"]
-                            return embedding
-
-                        logger.error(f"Unexpected response format: {result}")
-                        raise AIModelException(
-                            self.model_name, "Unexpected response format")
-                    else:
-                        error_text = await response.text()
-                        logger.error(
-                            f"API error: {response.status}, {error_text}")
-
-                        try:
-                            error_data = json.loads(error_text)
-                            error_message = error_data.get(
-                                "error", {}).get("message", "Unknown error")
-                            error_type = error_data.get(
-                                "error", {}).get("type", "")
-
-                            # Handle specific error types
-                            if response.status == 429 or "rate_limit" in error_type:
-                                raise APIRateLimitException(
-                                    "OpenAI", error_message)
-                            elif response.status in (401, 403) or "authentication" in error_type:
-                                raise APIAuthenticationException(
-                                    "OpenAI", error_message)
-                            else:
-                                raise AIModelException(
-                                    self.model_name, f"API error: {error_message}")
-                        except json.JSONDecodeError:
-                            # If we can't parse the error as JSON, use the status code
-                            if response.status == 429:
-                                raise APIRateLimitException(
-                                    "OpenAI", f"Rate limit exceeded (HTTP {response.status})")
-                            elif response.status in (401, 403):
-                                raise APIAuthenticationException(
-                                    "OpenAI", f"Authentication error (HTTP {response.status})")
-
-                        # Default error if no specific error was raised
-                        raise AIModelException(
-                            self.model_name, f"API error: HTTP {response.status}")
+            # Make the API request within the shared provider quota
+            result = await provider_rate_limiter.call_with_retry(
+                "openai", "text-embedding-3-small", lambda: self._post(payload, headers),
+                tokens=estimate_tokens(text))
+
+            llm_telemetry.record_usage(
+                result.get("usage", {}).get("prompt_tokens", 0))
+
+            # Extract the embedding
+            if "data" in result and len(result["data"]) > 0 and "embedding" in result["data"][0]:
+                embedding = result["data"][0]["embedding"]
+                return embedding
+
+            logger.error(f"Unexpected response format: {result}")
+            raise AIModelException(
+                self.model_name, "Unexpected response format")
 
         except (AIModelException, APIRateLimitException, APIAuthenticationException):
             # Re-raise specific exceptions
@@ -240,6 +192,31 @@ class EmbeddingGenerator:
             raise AIModelException(
                 self.model_name, f"Unexpected error: {str(e)}")
 
+    async def _post(self, payload: Dict[str, Any],
+                    headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Send an embedding request to the provider API.
+
+        Args:
+            payload (Dict[str, Any]): The request payload
+            headers (Optional[Dict[str, str]]): Request headers
+
+        Returns:
+            Dict[str, Any]: The parsed response body
+
+        Raises:
+            AIModelException: If there's an error with the model
+            APIRateLimitException: If the API rate limit is reached
+            APIAuthenticationException: If there's an authentication error
+        """
+        api = "Gemini" if self.provider == "Google" else "OpenAI"
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.api_url, json=payload, headers=headers) as response:
+                if response.status == 200:
+                    return await response.json()
+
+                await raise_for_api_error(response, api, self.model_name)
+
     async def generate_batch_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Generate vector embeddings for a batch of texts.
@@ -0,0 +1,14 @@
+"""
+Provider rate limiting module for Jyra
+"""
+
+from jyra.ai.limits.provider_limiter import (
+    ProviderRateLimiter, TokenBucket, provider_rate_limiter
+)
+from jyra.ai.limits.work_scheduler import (
+    LLMWorkScheduler, PRIORITY_CLASSES, current_priority, llm_work, llm_work_scheduler
+)
+
+__all__ = ['ProviderRateLimiter', 'TokenBucket', 'provider_rate_limiter',
+           'LLMWorkScheduler', 'PRIORITY_CLASSES', 'current_priority', 'llm_work',
+           'llm_work_scheduler']
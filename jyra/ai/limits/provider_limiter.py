@@ -0,0 +1,410 @@
+"""
+Provider-aware client-side rate limiting for Jyra.
+
+This module keeps a requests-per-minute and tokens-per-minute token bucket for
+every provider endpoint, so that all callers (replies, background extraction,
+embeddings) share one view of the quota instead of discovering it through 429s.
+Each attempt first takes a slot from the LLM work scheduler, which orders
+interactive work ahead of background work.
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple, TypeVar
+
+from jyra.ai.limits.work_scheduler import llm_work_scheduler
+from jyra.utils.config import (
+    GEMINI_RPM, GEMINI_TPM, GEMINI_EMBED_RPM, OPENAI_RPM, OPENAI_TPM, OPENAI_EMBED_RPM,
+    LLM_MAX_RETRIES, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX, LLM_MAX_QUEUE_WAIT
+)
+from jyra.utils.exceptions import APIRateLimitException
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+
+    Reservations may drive the balance negative; the deficit is the time the
+    caller has to wait, which queues concurrent callers in arrival order.
+    """
+
+    def __init__(self, per_minute: int):
+        """
+        Initialize the bucket.
+
+        Args:
+            per_minute (int): Bucket capacity and refill rate per minute
+        """
+        self.capacity = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accumulated since the last update."""
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens +
+                          elapsed * self.refill_rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Get the time until the amount would be available, without reserving it.
+
+        Args:
+            amount (float): Number of tokens
+            now (float): Current monotonic time
+
+        Returns:
+            float: Wait time in seconds
+        """
+        self._refill(now)
+        deficit = min(amount, self.capacity) - self.tokens
+        return max(0.0, deficit / self.refill_rate)
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Reserve tokens and get the time the caller must wait before using them.
+
+        Args:
+            amount (float): Number of tokens (capped at the bucket capacity)
+            now (float): Current monotonic time
+
+        Returns:
+            float: Wait time in seconds
+        """
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.refill_rate)
+
+    def refund(self, amount: float) -> None:
+        """
+        Return unused tokens to the bucket (or take more if amount is negative).
+
+        Args:
+            amount (float): Number of tokens to return
+        """
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def utilization(self, now: float) -> float:
+        """
+        Get the fraction of the bucket currently in use.
+
+        Args:
+            now (float): Current monotonic time
+
+        Returns:
+            float: Utilization, above 1.0 when callers are queued
+        """
+        self._refill(now)
+        return (self.capacity - self.tokens) / self.capacity
+
+
+class EndpointLimiter:
+    """
+    Rate limit state and metrics for a single provider endpoint.
+    """
+
+    def __init__(self, provider: str, endpoint: str, rpm: int, tpm: int):
+        """
+        Initialize the endpoint limiter.
+
+        Args:
+            provider (str): Provider name
+            endpoint (str): Endpoint or model name
+            rpm (int): Requests per minute (0 for unlimited)
+            tpm (int): Tokens per minute (0 for unlimited)
+        """
+        self.provider = provider
+        self.endpoint = endpoint
+        self.rpm = TokenBucket(rpm) if rpm > 0 else None
+        self.tpm = TokenBucket(tpm) if tpm > 0 else None
+        self.blocked_until = 0.0
+
+        # Metrics
+        self.requests = 0
+        self.tokens = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.rate_limited = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        """Get the time until a request of the given size could start."""
+        waits = [self.blocked_until - now]
+        if self.rpm:
+            waits.append(self.rpm.wait_time(1, now))
+        if self.tpm:
+            waits.append(self.tpm.wait_time(tokens, now))
+        return max(0.0, *waits)
+
+    def reserve(self, tokens: int, now: float) -> float:
+        """Reserve capacity for a request and get the required wait."""
+        waits = [self.blocked_until - now]
+        if self.rpm:
+            waits.append(self.rpm.reserve(1, now))
+        if self.tpm:
+            waits.append(self.tpm.reserve(tokens, now))
+        self.requests += 1
+        self.tokens += tokens
+        return max(0.0, *waits)
+
+
+class ProviderRateLimiter:
+    """
+    Shared client-side rate limiter for all AI provider endpoints.
+    """
+
+    def __init__(self, max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE,
+                 backoff_max: float = LLM_BACKOFF_MAX,
+                 max_queue_wait: float = LLM_MAX_QUEUE_WAIT):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            max_retries (int): Maximum retries after a rate limit response
+            backoff_base (float): Base delay in seconds for exponential backoff
+            backoff_max (float): Maximum backoff delay in seconds
+            max_queue_wait (float): Longest a caller will wait for local quota
+                before failing fast with APIRateLimitException
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_queue_wait = max_queue_wait
+        self._limits: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._endpoints: Dict[Tuple[str, str], EndpointLimiter] = {}
+
+    def configure(self, provider: str, endpoint: str, rpm: int, tpm: int = 0) -> None:
+        """
+        Set the limits for a provider endpoint, replacing any existing state.
+
+        Args:
+            provider (str): Provider name
+            endpoint (str): Endpoint or model name
+            rpm (int): Requests per minute (0 for unlimited)
+            tpm (int): Tokens per minute (0 for unlimited)
+        """
+        key = (provider.lower(), endpoint)
+        self._limits[key] = (rpm, tpm)
+        self._endpoints.pop(key, None)
+
+    def _default_limits(self, provider: str, endpoint: str) -> Tuple[int, int]:
+        """
+        Get the configured limits for a provider endpoint.
+
+        Args:
+            provider (str): Provider name (lowercase)
+            endpoint (str): Endpoint or model name
+
+        Returns:
+            Tuple[int, int]: Requests per minute and tokens per minute
+        """
+        is_embedding = "embed" in endpoint.lower()
+        if provider == "gemini":
+            return (GEMINI_EMBED_RPM, 0) if is_embedding else (GEMINI_RPM, GEMINI_TPM)
+        if provider == "openai":
+            return (OPENAI_EMBED_RPM, 0) if is_embedding else (OPENAI_RPM, OPENAI_TPM)
+        return (0, 0)
+
+    def _get_endpoint(self, provider: str, endpoint: str) -> EndpointLimiter:
+        """Get or create the limiter for a provider endpoint."""
+        key = (provider.lower(), endpoint)
+        limiter = self._endpoints.get(key)
+        if limiter is None:
+            rpm, tpm = self._limits.get(key) or self._default_limits(*key)
+            limiter = EndpointLimiter(key[0], endpoint, rpm, tpm)
+            self._endpoints[key] = limiter
+        return limiter
+
+    async def acquire(self, provider: str, endpoint: str, tokens: int = 1,
+                      max_wait: Optional[float] = None) -> float:
+        """
+        Wait until a request to the endpoint fits the provider quota.
+
+        Args:
+            provider (str): Provider name
+            endpoint (str): Endpoint or model name
+            tokens (int): Estimated tokens for the request (input + output)
+            max_wait (Optional[float]): Longest acceptable wait in seconds;
+                defaults to the limiter's max_queue_wait
+
+        Returns:
+            float: Seconds waited
+
+        Raises:
+            APIRateLimitException: If the wait would exceed max_wait
+        """
+        limiter = self._get_endpoint(provider, endpoint)
+        max_wait = self.max_queue_wait if max_wait is None else max_wait
+        now = time.monotonic()
+
+        expected_wait = limiter.wait_time(tokens, now)
+        if expected_wait > max_wait:
+            limiter.rejected += 1
+            raise APIRateLimitException(
+                provider, f"Local quota for {endpoint} exhausted, retry in {expected_wait:.1f}s",
+                retry_after=expected_wait)
+
+        wait = limiter.reserve(tokens, now)
+        if wait > 0:
+            limiter.throttled += 1
+            limiter.wait_seconds += wait
+            logger.debug(
+                f"Throttling {provider}/{endpoint} request for {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+        return wait
+
+    def report_usage(self, provider: str, endpoint: str, estimated_tokens: int,
+                     actual_tokens: int) -> None:
+        """
+        Correct the token bucket once the real token usage of a request is known.
+
+        Args:
+            provider (str): Provider name
+            endpoint (str): Endpoint or model name
+            estimated_tokens (int): Tokens reserved when acquiring
+            actual_tokens (int): Tokens the provider reported
+        """
+        limiter = self._get_endpoint(provider, endpoint)
+        limiter.tokens += actual_tokens - estimated_tokens
+        if limiter.tpm:
+            limiter.tpm.refund(estimated_tokens - actual_tokens)
+
+    def penalize(self, provider: str, endpoint: str, delay: float) -> None:
+        """
+        Block an endpoint for a while after the provider rejected a request.
+
+        Args:
+            provider (str): Provider name
+            endpoint (str): Endpoint or model name
+            delay (float): Seconds to block the endpoint
+        """
+        limiter = self._get_endpoint(provider, endpoint)
+        limiter.blocked_until = max(
+            limiter.blocked_until, time.monotonic() + delay)
+
+    def is_blocked(self, provider: str, endpoint: str) -> bool:
+        """
+        Check whether an endpoint is currently blocked by a provider rate limit.
+
+        Args:
+            provider (str): Provider name
+            endpoint (str): Endpoint or model name
+
+        Returns:
+            bool: True if requests to the endpoint must wait for Retry-After
+        """
+        key = (provider.lower(), endpoint)
+        limiter = self._endpoints.get(key)
+        return bool(limiter and limiter.blocked_until > time.monotonic())
+
+    def get_backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Get the delay before retrying a rate-limited request.
+
+        The provider's Retry-After is honoured when given; otherwise the delay
+        grows exponentially. Jitter spreads out concurrent retries.
+
+        Args:
+            attempt (int): Zero-based retry attempt
+            retry_after (Optional[float]): Delay requested by the provider
+
+        Returns:
+            float: Delay in seconds
+        """
+        if retry_after is not None:
+            return retry_after + random.uniform(0, min(1.0, 0.1 * retry_after + 0.1))
+
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    async def call_with_retry(self, provider: str, endpoint: str,
+                              request: Callable[[], Awaitable[T]],
+                              tokens: int = 1,
+                              max_retries: Optional[int] = None,
+                              max_wait: Optional[float] = None) -> T:
+        """
+        Make a rate-limited API call, retrying on rate limit responses.
+
+        Args:
+            provider (str): Provider name
+            endpoint (str): Endpoint or model name
+            request (Callable[[], Awaitable[T]]): Coroutine factory making the call
+            tokens (int): Estimated tokens for the request (input + output)
+            max_retries (Optional[int]): Maximum retries; defaults to the limiter's setting
+            max_wait (Optional[float]): Longest acceptable wait per attempt
+
+        Returns:
+            T: The result of the request
+
+        Raises:
+            APIRateLimitException: If the request is still rate limited after retrying
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        max_wait = self.max_queue_wait if max_wait is None else max_wait
+        limiter = self._get_endpoint(provider, endpoint)
+        attempt = 0
+
+        while True:
+            try:
+                # Interactive calls get quota before background work
+                async with llm_work_scheduler.slot():
+                    await self.acquire(provider, endpoint, tokens, max_wait=max_wait)
+                    return await request()
+            except APIRateLimitException as e:
+                limiter.rate_limited += 1
+                delay = self.get_backoff_delay(attempt, e.retry_after)
+                # Every caller of this endpoint waits out the provider's limit
+                self.penalize(provider, endpoint, delay)
+
+                if attempt >= max_retries or delay > max_wait:
+                    logger.warning(
+                        f"Giving up on {provider}/{endpoint} after {attempt + 1} rate-limited attempts")
+                    if e.retry_after is None:
+                        e.retry_after = delay
+                    raise
+
+                attempt += 1
+                limiter.retries += 1
+                logger.warning(
+                    f"Rate limited by {provider}/{endpoint}, retry {attempt}/{max_retries} in {delay:.1f}s")
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get quota utilization metrics for every endpoint used so far.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Metrics keyed by "provider/endpoint"
+        """
+        now = time.monotonic()
+        metrics = {}
+        for (provider, endpoint), limiter in self._endpoints.items():
+            metrics[f"{provider}/{endpoint}"] = {
+                "rpm_limit": int(limiter.rpm.capacity) if limiter.rpm else 0,
+                "tpm_limit": int(limiter.tpm.capacity) if limiter.tpm else 0,
+                "rpm_utilization": round(limiter.rpm.utilization(now), 3) if limiter.rpm else 0.0,
+                "tpm_utilization": round(limiter.tpm.utilization(now), 3) if limiter.tpm else 0.0,
+                "requests": limiter.requests,
+                "tokens": limiter.tokens,
+                "throttled": limiter.throttled,
+                "wait_seconds": round(limiter.wait_seconds, 3),
+                "rate_limited": limiter.rate_limited,
+                "retries": limiter.retries,
+                "rejected": limiter.rejected,
+                "blocked_for": round(max(0.0, limiter.blocked_until - now), 3)
+            }
+        return metrics
+
+
+# Create a singleton instance
+provider_rate_limiter = ProviderRateLimiter()
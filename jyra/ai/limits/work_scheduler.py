@@ -0,0 +1,282 @@
+"""
+Priority scheduling of LLM work for Jyra.
+
+Replies, background memory extraction, consolidation and embedding backfills
+share one provider quota. Every provider call takes a slot from this scheduler
+first. Calls are grouped into priority classes, each with its own concurrency
+cap. Within a class, waiting calls are served round-robin across users so one
+user's backlog cannot hold up everyone else. When a slot frees up, waiting
+interactive calls go first. While interactive latency is above its target,
+background classes are throttled: bulk work is paused and background work is
+limited to a single call. Long jobs make many small calls, so they yield to
+replies between calls.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Iterator, AsyncIterator, Deque
+
+from jyra.ai.telemetry import RollingHistogram, current_call_site, llm_telemetry
+from jyra.utils.config import (
+    LLM_MAX_CONCURRENT, LLM_INTERACTIVE_CONCURRENCY, LLM_BACKGROUND_CONCURRENCY,
+    LLM_BULK_CONCURRENCY, LLM_INTERACTIVE_LATENCY_TARGET_MS
+)
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Priority classes, highest first
+PRIORITY_CLASSES = ("interactive", "background", "bulk")
+
+# Class of calls made from a call site; unlisted call sites are interactive
+CALL_SITE_CLASSES = {
+    "memory_extraction": "background",
+    "consolidation": "bulk",
+    "embedding_backfill": "bulk"
+}
+
+# Concurrency caps of the background classes while interactive latency is high
+PRESSURE_CAPS = {"background": 1, "bulk": 0}
+
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Explicit priority class and user of the current task's LLM work
+_work_class: ContextVar[Optional[str]] = ContextVar("llm_work_class", default=None)
+_work_user: ContextVar[Optional[int]] = ContextVar("llm_work_user", default=None)
+
+
+@contextmanager
+def llm_work(priority: Optional[str] = None, user_id: Optional[int] = None) -> Iterator[None]:
+    """
+    Set the priority class and user of the LLM calls made inside the block.
+
+    Args:
+        priority (Optional[str]): One of PRIORITY_CLASSES; by default the class
+            is derived from the call site
+        user_id (Optional[int]): User the work is done for, used for fair queuing
+    """
+    if priority is not None and priority not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown LLM priority class: {priority}")
+    class_token = _work_class.set(priority or _work_class.get())
+    user_token = _work_user.set(user_id if user_id is not None else _work_user.get())
+    try:
+        yield
+    finally:
+        _work_user.reset(user_token)
+        _work_class.reset(class_token)
+
+
+def current_priority() -> str:
+    """
+    Get the priority class of the current task's LLM calls.
+
+    Returns:
+        str: The priority class
+    """
+    return _work_class.get() or CALL_SITE_CLASSES.get(current_call_site(), "interactive")
+
+
+class LLMWorkScheduler:
+    """
+    Priority classes with per-class concurrency caps and per-user fair queuing.
+    """
+
+    def __init__(self, max_concurrent: int = LLM_MAX_CONCURRENT,
+                 class_limits: Optional[Dict[str, int]] = None,
+                 latency_target_ms: float = LLM_INTERACTIVE_LATENCY_TARGET_MS,
+                 latency_window_seconds: int = 60, recheck_seconds: float = 1.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrent (int): Concurrent calls across all classes
+            class_limits (Optional[Dict[str, int]]): Concurrent calls per class
+            latency_target_ms (float): Interactive p95 latency above which
+                background classes are throttled
+            latency_window_seconds (int): Window of the interactive latency histogram
+            recheck_seconds (float): How often throttled waiters are reconsidered
+        """
+        self.max_concurrent = max_concurrent
+        self.class_limits = class_limits or {
+            "interactive": LLM_INTERACTIVE_CONCURRENCY,
+            "background": LLM_BACKGROUND_CONCURRENCY,
+            "bulk": LLM_BULK_CONCURRENCY
+        }
+        self.latency_target_ms = latency_target_ms
+        self.recheck_seconds = recheck_seconds
+        self.interactive_latency = RollingHistogram(
+            LATENCY_BUCKETS_MS, latency_window_seconds, slots=6)
+
+        self._running = {name: 0 for name in PRIORITY_CLASSES}
+        # Per class: user -> waiting futures, in round-robin order
+        self._waiting: Dict[str, "OrderedDict[Any, Deque[asyncio.Future]]"] = {
+            name: OrderedDict() for name in PRIORITY_CLASSES}
+
+        self.stats = {name: {"calls": 0, "queued": 0, "wait_seconds": 0.0}
+                      for name in PRIORITY_CLASSES}
+        self._recheck: Optional[asyncio.TimerHandle] = None
+
+    def under_pressure(self) -> bool:
+        """
+        Check whether interactive work is suffering.
+
+        Returns:
+            bool: True if interactive calls are waiting or their recent p95
+                latency is above the target
+        """
+        if self._waiting["interactive"]:
+            return True
+        p95 = self.interactive_latency.summary()["p95"]
+        return p95 is not None and p95 > self.latency_target_ms
+
+    def effective_limit(self, priority: str) -> int:
+        """
+        Get the current concurrency cap of a class.
+
+        Args:
+            priority (str): The priority class
+
+        Returns:
+            int: The cap, lowered for background classes under pressure
+        """
+        limit = self.class_limits.get(priority, 1)
+        if priority in PRESSURE_CAPS and self.under_pressure():
+            return min(limit, PRESSURE_CAPS[priority])
+        return limit
+
+    def _has_capacity(self, priority: str) -> bool:
+        """Check whether a call of the class could start now."""
+        return (sum(self._running.values()) < self.max_concurrent and
+                self._running[priority] < self.effective_limit(priority))
+
+    def _has_waiting(self, up_to: str) -> bool:
+        """Check whether calls of the class or a higher one are waiting."""
+        for name in PRIORITY_CLASSES[:PRIORITY_CLASSES.index(up_to) + 1]:
+            if self._waiting[name]:
+                return True
+        return False
+
+    def _dispatch(self) -> None:
+        """Start waiting calls, highest class first and round-robin across users."""
+        for name in PRIORITY_CLASSES:
+            queues = self._waiting[name]
+            while queues and self._has_capacity(name):
+                user, queue = queues.popitem(last=False)
+                future = queue.popleft()
+                # Move the user to the back of the rotation
+                if queue:
+                    queues[user] = queue
+                if future.done():
+                    continue
+                self._running[name] += 1
+                future.set_result(None)
+            if queues:
+                if name in PRESSURE_CAPS and self._running[name] == 0:
+                    # Held back by pressure alone; look again once latency recovers
+                    self._schedule_recheck()
+                # Lower classes never overtake a class that is still waiting
+                return
+
+    def _schedule_recheck(self) -> None:
+        """Dispatch again shortly, for waiters that no release would wake."""
+        loop = asyncio.get_running_loop()
+        if self._recheck and self._recheck.when() > loop.time():
+            return
+        self._recheck = loop.call_later(self.recheck_seconds, self._dispatch)
+
+    async def _acquire(self, priority: str, user: Any) -> None:
+        """Wait for a slot in the class."""
+        if not self._has_waiting(priority) and self._has_capacity(priority):
+            self._running[priority] += 1
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiting[priority].setdefault(user, deque()).append(future)
+        self.stats[priority]["queued"] += 1
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just before the cancellation
+                self._release(priority)
+            else:
+                self._discard(priority, user, future)
+            raise
+
+    def _discard(self, priority: str, user: Any, future: asyncio.Future) -> None:
+        """Remove a cancelled waiter."""
+        queue = self._waiting[priority].get(user)
+        if queue and future in queue:
+            queue.remove(future)
+            if not queue:
+                del self._waiting[priority][user]
+
+    def _release(self, priority: str) -> None:
+        """Free a slot and start the next waiting calls."""
+        self._running[priority] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None,
+                   user_id: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Hold a slot for one LLM call.
+
+        Args:
+            priority (Optional[str]): Priority class; defaults to the current task's
+            user_id (Optional[int]): User the call is for; defaults to the current task's
+
+        Yields:
+            str: The priority class of the call
+        """
+        priority = priority or current_priority()
+        user = user_id if user_id is not None else _work_user.get()
+        start = time.monotonic()
+
+        await self._acquire(priority, user)
+        waited = time.monotonic() - start
+        self.stats[priority]["calls"] += 1
+        self.stats[priority]["wait_seconds"] += waited
+        try:
+            yield priority
+        finally:
+            if priority == "interactive":
+                self.interactive_latency.add((time.monotonic() - start) * 1000)
+            self._release(priority)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-class load and waiting times.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        classes = {}
+        for name in PRIORITY_CLASSES:
+            stats = self.stats[name]
+            classes[name] = {
+                "running": self._running[name],
+                "waiting": sum(len(queue) for queue in self._waiting[name].values()),
+                "limit": self.effective_limit(name),
+                "calls": stats["calls"],
+                "queued": stats["queued"],
+                "avg_wait_ms": round(stats["wait_seconds"] * 1000 / stats["calls"], 1)
+                if stats["calls"] else 0.0
+            }
+        return {
+            "under_pressure": self.under_pressure(),
+            "interactive_p95_ms": self.interactive_latency.summary()["p95"],
+            "classes": classes
+        }
+
+
+# Create a singleton instance
+llm_work_scheduler = LLMWorkScheduler()
+
+# Report scheduler load alongside call telemetry
+llm_telemetry.register_source("llm_scheduler", llm_work_scheduler.get_stats)
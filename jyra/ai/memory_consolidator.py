@@ -7,12 +7,20 @@ This module consolidates related memories to create higher-level memories.
 import json
 from typing import List, Dict, Any, Optional, Set
 
+from jyra.ai.consolidation_batcher import consolidation_batcher
 from jyra.ai.models.model_manager import model_manager
+from jyra.ai.telemetry import call_site
 from jyra.db.models.memory import Memory
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# How each consolidated memory should be written
+CONSOLIDATION_GUIDELINES = """1. Be concise (1-2 sentences)
+2. Capture the most important patterns or information
+3. Be more general than the individual memories
+4. Be written in a factual, declarative style"""
+
 
 class MemoryConsolidator:
     """
@@ -86,13 +94,16 @@ class MemoryConsolidator:
             logger.error(f"Error finding consolidation candidates for user {user_id}: {str(e)}")
             return []
             
-    async def consolidate_memory_group(self, user_id: int, memory_group: List[Dict[str, Any]]) -> Optional[int]:
+    async def consolidate_memory_group(self, user_id: int, memory_group: List[Dict[str, Any]],
+                                       consolidated_content: Optional[str] = None) -> Optional[int]:
         """
         Consolidate a group of memories into a single higher-level memory.
 
         Args:
             user_id (int): User ID
             memory_group (List[Dict[str, Any]]): Group of memories to consolidate
+            consolidated_content (Optional[str]): Content generated beforehand,
+                e.g. in a batch; generated here if not given
 
         Returns:
             Optional[int]: ID of the consolidated memory if successful, None otherwise
@@ -108,7 +119,8 @@ class MemoryConsolidator:
             category = memory_group[0]["category"]
             
             # Create a prompt for the AI to consolidate the memories
-            consolidated_content = await self._generate_consolidated_content(memory_contents, category)
+            if consolidated_content is None:
+                consolidated_content = await self._generate_consolidated_content(memory_contents, category)
             
             if not consolidated_content:
                 logger.warning(f"Failed to generate consolidated content for user {user_id}")
@@ -159,10 +171,7 @@ class MemoryConsolidator:
             
             Please create a single consolidated memory that captures the essential information from these individual memories.
             The consolidated memory should:
-            1. Be concise (1-2 sentences)
-            2. Capture the most important patterns or information
-            3. Be more general than the individual memories
-            4. Be written in a factual, declarative style
+            {CONSOLIDATION_GUIDELINES}
             
             Consolidated memory:
             """
@@ -177,13 +186,14 @@ class MemoryConsolidator:
             }
             
             # Use model_manager with fallback capability
-            response_tuple = await model_manager.generate_response(
-                prompt=prompt,
-                role_context=consolidation_role_context,
-                temperature=0.3,  # Lower temperature for more consistent consolidation
-                max_tokens=100,   # Short response
-                use_fallbacks=True
-            )
+            with call_site("consolidation"):
+                response_tuple = await model_manager.generate_response(
+                    prompt=prompt,
+                    role_context=consolidation_role_context,
+                    temperature=0.3,  # Lower temperature for more consistent consolidation
+                    max_tokens=100,   # Short response
+                    use_fallbacks=True
+                )
             
             # Extract response and model used
             response, model_used = response_tuple
@@ -216,10 +226,22 @@ class MemoryConsolidator:
                 logger.info(f"No consolidation candidates found for user {user_id}")
                 return []
                 
-            # Consolidate each group
+            # Generate the consolidated contents of all groups, several groups per call
+            contents = await consolidation_batcher.consolidate(
+                user_id,
+                [{"category": group[0]["category"],
+                  "contents": [memory["content"] for memory in group]}
+                 for group in consolidation_candidates],
+                CONSOLIDATION_GUIDELINES
+            )
+
+            # Consolidate each group that got an answer
             consolidated_memory_ids = []
-            for memory_group in consolidation_candidates:
-                consolidated_memory_id = await self.consolidate_memory_group(user_id, memory_group)
+            for memory_group, content in zip(consolidation_candidates, contents):
+                if not content:
+                    continue
+                consolidated_memory_id = await self.consolidate_memory_group(
+                    user_id, memory_group, content)
                 if consolidated_memory_id:
                     consolidated_memory_ids.append(consolidated_memory_id)
                     
@@ -7,10 +7,36 @@ This module extracts memories from user messages using AI.
 from typing import List, Dict, Any, Optional, Tuple
 
 from jyra.ai.models.model_manager import model_manager
+from jyra.ai.cache.semantic_cache import semantic_cache
+from jyra.ai.telemetry import call_site
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Answer schema for memory extraction (a root object, since not every
+# provider accepts a bare array as the top-level structured output)
+MEMORY_EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "memories": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "content": {"type": "string"},
+                    "category": {"type": "string"},
+                    "importance": {"type": "integer"},
+                    "confidence": {"type": "number"},
+                    "tags": {"type": "array", "items": {"type": "string"}},
+                    "expires_at": {"type": "string", "nullable": True}
+                },
+                "required": ["content", "category", "importance", "confidence", "tags"]
+            }
+        }
+    },
+    "required": ["memories"]
+}
+
 
 class MemoryExtractor:
     """
@@ -36,42 +62,48 @@ class MemoryExtractor:
             return []
 
         try:
-            # Create a prompt for the AI to extract memories
-            prompt = self._create_memory_extraction_prompt(
-                user_message, user_context)
-
-            # Get response from AI
-            # Create a simple role context for memory extraction
-            memory_role_context = {
-                "name": "Memory Extractor",
-                "personality": "Analytical and precise",
-                "speaking_style": "Concise and structured",
-                "knowledge_areas": "Personal information extraction, categorization",
-                "behaviors": "Identifies important information, categorizes effectively"
-            }
-
-            # Use model_manager with fallback capability
-            response_tuple = await model_manager.generate_response(
-                prompt=prompt,
-                role_context=memory_role_context,
-                temperature=0.3,  # Lower temperature for more consistent extraction
-                max_tokens=500,   # Limit response length
-                use_fallbacks=True
-            )
-
-            # Extract response and model used
-            response, model_used = response_tuple
-            logger.info(f"Memory extraction using model: {model_used}")
-
-            # Parse the response to extract memories
-            memories = self._parse_memory_response(response)
-
-            return memories
+            # Only "nothing to remember" answers are reused for similar messages;
+            # anything with content is always extracted fresh
+            with call_site("memory_extraction"):
+                return await semantic_cache.get_or_compute(
+                    "memory_extraction", user_message,
+                    lambda: self._extract_with_model(user_message, user_context),
+                    cacheable=lambda memories: not memories,
+                    agree=lambda a, b: not a and not b
+                )
 
         except Exception as e:
             logger.error(f"Error extracting memories: {str(e)}")
             return []
 
+    async def _extract_with_model(self, user_message: str,
+                                  user_context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Extract memories from a user message with an AI model.
+
+        Args:
+            user_message (str): The user's message
+            user_context (Optional[Dict[str, Any]]): Context about the user
+
+        Returns:
+            List[Dict[str, Any]]: List of extracted memories
+        """
+        # Create a prompt for the AI to extract memories
+        prompt = self._create_memory_extraction_prompt(
+            user_message, user_context)
+
+        # Use model_manager with fallback capability
+        result, model_used = await model_manager.generate_structured(
+            prompt=prompt,
+            schema=MEMORY_EXTRACTION_SCHEMA,
+            temperature=0.3,  # Lower temperature for more consistent extraction
+            max_tokens=500,   # Limit response length
+            use_fallbacks=True
+        )
+        logger.info(f"Memory extraction using model: {model_used}")
+
+        return self.normalize_memories(result["memories"])
+
     def _create_memory_extraction_prompt(self, user_message: str, user_context: Optional[Dict[str, Any]] = None) -> str:
         """
         Create a prompt for memory extraction.
@@ -90,140 +122,58 @@ class MemoryExtractor:
                 context_str += f"- {key}: {value}\n"
 
         prompt = f"""
-You are an AI assistant that extracts important information from user messages that should be remembered for future conversations.
-
-Extract facts, preferences, personal details, and other important information from the following message.
-Focus on information that would be useful to remember for future conversations.
-
-For each piece of information, provide:
-1. The exact content to remember
-2. The category (personal, preference, fact, event, relationship, opinion, goal, etc.)
-3. An importance score (1-5, where 5 is most important)
-4. A confidence score (0.1-1.0, where 1.0 is completely certain)
-5. A list of relevant tags (2-5 tags that help categorize this memory)
-6. An expiration date (ISO format YYYY-MM-DD) if the information is temporary, or null if permanent
-
-Format your response as a JSON array of objects with the following structure:
-[
-  {{
-    "content": "The exact information to remember",
-    "category": "category_name",
-    "importance": importance_score,
-    "confidence": confidence_score,
-    "tags": ["tag1", "tag2", "tag3"],
-    "expires_at": "YYYY-MM-DD" or null
-  }}
-]
-
-If there's nothing worth remembering, return an empty array: []
-
-Guidelines for extraction:
+Extract facts, preferences, personal details, and other important information from the user message below that would be useful to remember for future conversations.
+
+For each memory give the exact content, a category (personal, preference, fact, event, relationship, opinion, goal, etc.), importance (1-5, 5 is most important), confidence (0.1-1.0), 2-5 tags, and expires_at (YYYY-MM-DD) if the information is temporary, otherwise null.
+Return an empty list if there's nothing worth remembering.
+
+Guidelines:
 - Extract specific, actionable information rather than vague statements
 - Assign higher importance to personal preferences, strong opinions, and life events
 - Assign lower confidence to inferred information vs. explicitly stated facts
 - Use tags that would help retrieve this memory in relevant contexts
-- Set expiration dates for time-sensitive information (e.g., upcoming events)
 
 {context_str}
 User message: {user_message}
-
-Extracted memories (JSON format):
 """
         return prompt
 
-    def _parse_memory_response(self, response: str) -> List[Dict[str, Any]]:
+    def normalize_memories(self, memories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Parse the AI response to extract memories with enhanced fields.
+        Clamp scores and clean up tags and expiration dates of extracted memories.
+
+        The memories have already been validated against MEMORY_EXTRACTION_SCHEMA.
 
         Args:
-            response (str): The AI's response
+            memories (List[Dict[str, Any]]): The extracted memories
 
         Returns:
             List[Dict[str, Any]]: List of extracted memories with enhanced fields
         """
-        try:
-            # Clean up the response
-            response = response.strip()
-
-            # If the response is empty or indicates no memories, return empty list
-            if not response or response == "[]":
-                return []
-
-            # Try to extract JSON from the response
-            import json
-
-            # Find the start and end of the JSON array
-            start_idx = response.find("[")
-            end_idx = response.rfind("]") + 1
-
-            if start_idx == -1 or end_idx == 0:
-                logger.warning(
-                    f"Could not find JSON array in response: {response}")
-                return []
-
-            json_str = response[start_idx:end_idx]
-            memories = json.loads(json_str)
-
-            # Validate the memories with enhanced fields
-            valid_memories = []
-            for memory in memories:
-                if "content" in memory and "category" in memory and "importance" in memory:
-                    # Ensure importance is an integer between 1 and 5
-                    importance = int(memory["importance"])
-                    if importance < 1:
-                        importance = 1
-                    elif importance > 5:
-                        importance = 5
-
-                    # Ensure confidence is a float between 0.1 and 1.0
-                    confidence = float(memory.get("confidence", 0.8))
-                    if confidence < 0.1:
-                        confidence = 0.1
-                    elif confidence > 1.0:
-                        confidence = 1.0
-
-                    # Process tags
-                    tags = memory.get("tags", [])
-                    if not isinstance(tags, list):
-                        tags = []
-
-                    # Validate tags
-                    valid_tags = []
-                    for tag in tags:
-                        if isinstance(tag, str) and tag.strip():
-                            valid_tags.append(tag.strip().lower())
-
-                    # Limit to 5 tags maximum
-                    valid_tags = valid_tags[:5]
-
-                    # Process expiration date
-                    expires_at = memory.get("expires_at")
-                    if expires_at and expires_at.lower() == "null":
-                        expires_at = None
-
-                    # Validate expiration date format (YYYY-MM-DD)
-                    if expires_at and isinstance(expires_at, str):
-                        try:
-                            # Simple validation - could be enhanced with datetime parsing
-                            if not (len(expires_at) == 10 and expires_at[4] == '-' and expires_at[7] == '-'):
-                                expires_at = None
-                        except:
-                            expires_at = None
-
-                    valid_memories.append({
-                        "content": memory["content"],
-                        "category": memory["category"],
-                        "importance": importance,
-                        "confidence": confidence,
-                        "tags": valid_tags,
-                        "expires_at": expires_at
-                    })
-
-            return valid_memories
-
-        except Exception as e:
-            logger.error(f"Error parsing memory response: {str(e)}")
-            return []
+        valid_memories = []
+        for memory in memories:
+            # Ensure importance is between 1 and 5 and confidence between 0.1 and 1.0
+            importance = max(1, min(5, memory["importance"]))
+            confidence = max(0.1, min(1.0, float(memory["confidence"])))
+
+            # Keep at most 5 non-empty, lower-case tags
+            valid_tags = [tag.strip().lower() for tag in memory["tags"] if tag.strip()][:5]
+
+            # Validate expiration date format (YYYY-MM-DD)
+            expires_at = memory.get("expires_at")
+            if expires_at and not (len(expires_at) == 10 and expires_at[4] == '-' and expires_at[7] == '-'):
+                expires_at = None
+
+            valid_memories.append({
+                "content": memory["content"],
+                "category": memory["category"],
+                "importance": importance,
+                "confidence": confidence,
+                "tags": valid_tags,
+                "expires_at": expires_at
+            })
+
+        return valid_memories
 
 
 # Create a singleton instance
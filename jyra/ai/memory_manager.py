@@ -5,7 +5,9 @@ This module coordinates memory operations including extraction, retrieval, and c
 """
 
 from typing import List, Dict, Any, Optional
+from jyra.ai.limits.work_scheduler import llm_work
 from jyra.ai.memory_consolidator import memory_consolidator
+from jyra.ai.context import estimate_tokens
 from jyra.db.models.memory import Memory
 from jyra.utils.logger import setup_logger
 
@@ -23,7 +25,8 @@ class MemoryManager:
         pass
 
     async def process_user_message(self, user_id: int, message: str,
-                                   user_context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+                                   user_context: Optional[Dict[str, Any]] = None,
+                                   extracted_memories: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """
         Process a user message to extract and store memories.
 
@@ -31,17 +34,23 @@ class MemoryManager:
             user_id (int): User ID
             message (str): User message
             user_context (Optional[Dict[str, Any]]): Additional context about the user
+            extracted_memories (Optional[List[Dict[str, Any]]]): Memories already
+                extracted from the message (e.g. by the message analyzer), which
+                are stored without another extraction call
 
         Returns:
             List[Dict[str, Any]]: List of extracted memories
         """
         try:
-            # Extract memories from the message
-            extracted_memories = await Memory.extract_memories_from_message(
-                user_id=user_id,
-                text=message,
-                context=user_context
-            )
+            if extracted_memories is not None:
+                await Memory.store_extracted_memories(user_id, message, extracted_memories)
+            else:
+                # Extract memories from the message
+                extracted_memories = await Memory.extract_memories_from_message(
+                    user_id=user_id,
+                    text=message,
+                    context=user_context
+                )
 
             logger.info(
                 f"Extracted {len(extracted_memories)} memories from message for user {user_id}")
@@ -257,8 +266,9 @@ class MemoryManager:
                 "updated_memories": 0
             }
 
-            # Run consolidation cycle
-            consolidated_memory_ids = await memory_consolidator.run_consolidation_cycle(user_id)
+            # Run consolidation cycle, behind interactive work in the LLM scheduler
+            with llm_work("bulk", user_id=user_id):
+                consolidated_memory_ids = await memory_consolidator.run_consolidation_cycle(user_id)
             results["consolidated_memories"] = len(consolidated_memory_ids)
 
             # Clean up expired memories
@@ -316,13 +326,18 @@ class MemoryManager:
             return False
 
     async def format_memories_for_context(self, memories: List[Dict[str, Any]],
-                                          max_length: int = 1000) -> str:
+                                          max_length: int = 1000,
+                                          max_tokens: Optional[int] = None) -> str:
         """
         Format memories for inclusion in conversation context.
 
+        Memories are ordered by importance and only whole memory lines are kept,
+        so the least important memories are the ones dropped when over the limit.
+
         Args:
             memories (List[Dict[str, Any]]): List of memories
-            max_length (int): Maximum length of the formatted context
+            max_length (int): Maximum length of the formatted context in characters
+            max_tokens (Optional[int]): Maximum estimated tokens of the formatted context
 
         Returns:
             str: Formatted memory context
@@ -335,7 +350,11 @@ class MemoryManager:
             sorted_memories = sorted(
                 memories, key=lambda m: m.get("importance", 0), reverse=True)
 
-            # Format each memory
+            header = "User Memory Context:"
+            length = len(header)
+            tokens = estimate_tokens(header)
+
+            # Format each memory, stopping at the first line that does not fit
             formatted_memories = []
             for memory in sorted_memories:
                 category = memory.get("category", "general").capitalize()
@@ -343,15 +362,21 @@ class MemoryManager:
                 importance = memory.get("importance", 1)
                 # Add importance indicator for debugging (can be removed in production)
                 formatted = f"{category} [I:{importance}]: {content}"
-                formatted_memories.append(formatted)
 
-            # Join and truncate if necessary
-            context = "User Memory Context:\n" + "\n".join(formatted_memories)
+                line_tokens = estimate_tokens(formatted) + 1
+                if length + len(formatted) + 1 > max_length:
+                    break
+                if max_tokens is not None and tokens + line_tokens > max_tokens:
+                    break
 
-            if len(context) > max_length:
-                context = context[:max_length-3] + "..."
+                formatted_memories.append(formatted)
+                length += len(formatted) + 1
+                tokens += line_tokens
+
+            if not formatted_memories:
+                return ""
 
-            return context
+            return header + "\n" + "\n".join(formatted_memories)
 
         except Exception as e:
             logger.error(f"Error formatting memories for context: {str(e)}")
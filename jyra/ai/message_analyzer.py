@@ -0,0 +1,166 @@
+"""
+Message analysis module for Jyra.
+
+This module analyzes a user message in a single structured AI call, returning
+its sentiment, the memories worth extracting from it and a query for
+retrieving related memories. It replaces separate sentiment analysis and
+memory extraction calls in the message handlers.
+"""
+
+from typing import List, Dict, Any, Optional
+
+from jyra.ai.models.model_manager import model_manager
+from jyra.ai.cache.semantic_cache import semantic_cache
+from jyra.ai.memory_extractor import MEMORY_EXTRACTION_SCHEMA, memory_extractor
+from jyra.ai.sentiment.sentiment_analyzer import SENTIMENT_SCHEMA
+from jyra.ai.telemetry import call_site
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Answer schema for message analysis, combining the sentiment and memory schemas
+MESSAGE_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sentiment": SENTIMENT_SCHEMA,
+        "memories": MEMORY_EXTRACTION_SCHEMA["properties"]["memories"],
+        "retrieval_query": {
+            "type": "string",
+            "description": "Short search query for stored memories relevant to replying"
+        }
+    },
+    "required": ["sentiment", "memories", "retrieval_query"]
+}
+
+# Messages shorter than this carry nothing worth remembering
+MIN_MEMORY_MESSAGE_LENGTH = 10
+
+FALLBACK_SENTIMENT = {
+    "primary_emotion": "neutral",
+    "intensity": 3,
+    "explanation": "Could not determine sentiment"
+}
+
+
+class MessageAnalyzer:
+    """
+    Class for analyzing user messages with a single AI call.
+    """
+
+    async def analyze(self, user_message: str,
+                      user_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Analyze a user message.
+
+        Args:
+            user_message (str): The user's message
+            user_context (Optional[Dict[str, Any]]): Context about the user
+
+        Returns:
+            Dict[str, Any]: The message's "sentiment", extracted "memories" and
+                "retrieval_query"
+        """
+        if not user_message or not user_message.strip():
+            return self.fallback(user_message or "")
+
+        try:
+            # Reuse the answer for a near-identical message that had nothing to remember
+            with call_site("message_analysis"):
+                return await semantic_cache.get_or_compute(
+                    "message_analysis", user_message,
+                    lambda: self._analyze_with_model(user_message, user_context),
+                    cacheable=lambda r: not r["memories"] and r["sentiment"] != FALLBACK_SENTIMENT,
+                    agree=lambda a, b: (
+                        a["sentiment"]["primary_emotion"] == b["sentiment"]["primary_emotion"]
+                        and not a["memories"] and not b["memories"])
+                )
+        except Exception as e:
+            logger.error(f"Error analyzing message: {str(e)}")
+            return self.fallback(user_message)
+
+    async def _analyze_with_model(self, user_message: str,
+                                  user_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Analyze a user message with an AI model.
+
+        Args:
+            user_message (str): The user's message
+            user_context (Optional[Dict[str, Any]]): Context about the user
+
+        Returns:
+            Dict[str, Any]: The analysis
+        """
+        result, model_used = await model_manager.generate_structured(
+            prompt=self._create_analysis_prompt(user_message, user_context),
+            schema=MESSAGE_ANALYSIS_SCHEMA,
+            system_instruction="You are an emotionally perceptive assistant that analyzes chat messages.",
+            temperature=0.2,
+            max_tokens=600,
+            use_fallbacks=True
+        )
+        logger.info(f"Message analysis using model: {model_used}")
+
+        sentiment = result["sentiment"]
+        memories: List[Dict[str, Any]] = []
+        if len(user_message.strip()) >= MIN_MEMORY_MESSAGE_LENGTH:
+            memories = memory_extractor.normalize_memories(result["memories"])
+
+        return {
+            "sentiment": {
+                "primary_emotion": sentiment["primary_emotion"],
+                # Ensure intensity is in range 1-5
+                "intensity": max(1, min(5, sentiment["intensity"])),
+                "explanation": sentiment["explanation"]
+            },
+            "memories": memories,
+            "retrieval_query": result["retrieval_query"].strip() or user_message
+        }
+
+    def _create_analysis_prompt(self, user_message: str,
+                                user_context: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Create a prompt for message analysis.
+
+        Args:
+            user_message (str): The user's message
+            user_context (Optional[Dict[str, Any]]): Context about the user
+
+        Returns:
+            str: The prompt for the AI
+        """
+        context_str = ""
+        if user_context:
+            context_str = "User context:\n"
+            for key, value in user_context.items():
+                context_str += f"- {key}: {value}\n"
+
+        return f"""
+Analyze the user message below.
+
+sentiment: the primary emotion, its intensity from 1 (very mild) to 5 (very intense), and one sentence citing the cues.
+memories: facts, preferences, personal details and events worth remembering for future conversations, each with a category (personal, preference, fact, event, relationship, opinion, goal, etc.), importance (1-5), confidence (0.1-1.0, lower for inferred information), 2-5 tags, and expires_at (YYYY-MM-DD) for temporary information, otherwise null. Use an empty list if there's nothing worth remembering.
+retrieval_query: a short query for finding what we already know about the user that is relevant to replying.
+
+{context_str}
+User message: {user_message}
+"""
+
+    def fallback(self, user_message: str) -> Dict[str, Any]:
+        """
+        Build the analysis used when the AI call fails or times out.
+
+        Args:
+            user_message (str): The user's message
+
+        Returns:
+            Dict[str, Any]: Neutral sentiment, no memories and the message as query
+        """
+        return {
+            "sentiment": dict(FALLBACK_SENTIMENT),
+            "memories": [],
+            "retrieval_query": user_message
+        }
+
+
+# Create a singleton instance
+message_analyzer = MessageAnalyzer()
@@ -7,6 +7,8 @@ This module defines the base interface for all AI models used by Jyra.
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional, Union
 
+from jyra.ai.utils.structured_output import parse_structured, describe_schema
+
 
 class BaseAIModel(ABC):
     """
@@ -50,6 +52,45 @@ class BaseAIModel(ABC):
         """
         pass
     
+    async def generate_structured(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.2,
+        max_tokens: int = 500,
+        **kwargs
+    ) -> Any:
+        """
+        Generate a JSON answer that matches a schema.
+
+        Models with a native JSON mode override this; the default asks for
+        JSON in the prompt and validates the answer.
+        
+        Args:
+            prompt: The task prompt
+            schema: The schema the answer must match
+            system_instruction: Optional instruction sent ahead of the prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum number of tokens to generate
+            **kwargs: Additional model-specific parameters
+            
+        Returns:
+            The validated answer
+        """
+        instruction = f"Respond only with JSON matching this schema: {describe_schema(schema)}"
+        if system_instruction:
+            instruction = f"{system_instruction}\n{instruction}"
+        response = await self.generate_response(
+            prompt=f"{instruction}\n\n{prompt}",
+            role_context={},
+            temperature=temperature,
+            max_tokens=max_tokens,
+            bypass_cache=True,
+            **kwargs
+        )
+        return parse_structured(response, schema, self.model_name)
+    
     @abstractmethod
     async def is_available(self) -> bool:
         """
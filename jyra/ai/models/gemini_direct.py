@@ -2,26 +2,40 @@
 Google Gemini AI model integration for Jyra using direct API calls
 """
 
-import json
 import aiohttp
 import os
+import re
 from typing import List, Dict, Any, Optional
 
 from jyra.ai.models.base_model import BaseAIModel
-from jyra.utils.config import GEMINI_API_KEY
-from jyra.utils.exceptions import AIModelException, APIRateLimitException, APIAuthenticationException
+from jyra.utils.config import GEMINI_API_KEY, GEMINI_API_BASE_URL
+from jyra.utils.exceptions import (
+    AIModelException, APIRateLimitException, APIAuthenticationException, StructuredOutputException,
+    CachedContentRejectedException
+)
 from jyra.utils.logger import setup_logger
 from jyra.ai.cache.response_cache import ResponseCache
+from jyra.ai.cache.context_cache import GeminiContextCache
+from jyra.ai.context import ContextAssembler, estimate_tokens, summarize_dropped_turns
+from jyra.ai.limits import provider_rate_limiter
+from jyra.ai.telemetry import llm_telemetry, track_llm_call
+from jyra.ai.utils.api_errors import raise_for_api_error
+from jyra.ai.utils.structured_output import parse_structured, to_gemini_schema
 
 logger = setup_logger(__name__)
 
+# Statuses with which the API refuses an expired, deleted or foreign cached content
+CACHE_REJECTION_STATUSES = (400, 403, 404)
+_CACHED_CONTENT_PATTERN = re.compile(r"cached\s*content", re.IGNORECASE)
+
 
 class GeminiAI(BaseAIModel):
     """
     Class for interacting with Google's Gemini AI model using direct API calls.
     """
 
-    def __init__(self, model_name: str = "gemini-2.0-flash", use_cache: bool = True, cache_max_age: int = 3600):
+    def __init__(self, model_name: str = "gemini-2.0-flash", use_cache: bool = True, cache_max_age: int = 3600,
+                 base_url: Optional[str] = None):
         """
         Initialize the Gemini AI client.
 
@@ -29,9 +43,11 @@ class GeminiAI(BaseAIModel):
             model_name (str): The name of the Gemini model to use
             use_cache (bool): Whether to use response caching
             cache_max_age (int): Maximum age of cache entries in seconds
+            base_url (Optional[str]): API base URL (defaults to GEMINI_API_BASE_URL)
         """
         self._model_name = model_name
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={GEMINI_API_KEY}"
+        self.base_url = (base_url or GEMINI_API_BASE_URL).rstrip("/")
+        self.api_url = f"{self.base_url}/models/{model_name}:generateContent?key={GEMINI_API_KEY}"
 
         # Initialize cache if enabled
         self.use_cache = use_cache
@@ -42,6 +58,13 @@ class GeminiAI(BaseAIModel):
         self._max_context_length = 32768 if "gemini-2.0" in model_name else 16384
         self._supports_streaming = True
 
+        # Token-budgeted context assembly
+        self.context_assembler = ContextAssembler(
+            self._max_context_length, summarizer=summarize_dropped_turns)
+
+        # Provider-side caching of persona prompts
+        self.context_cache = GeminiContextCache(model_name, base_url=self.base_url)
+
         # Cost per 1k tokens (approximate)
         if model_name == "gemini-2.0-flash":
             self._cost_per_1k_tokens = 0.0035
@@ -56,6 +79,7 @@ class GeminiAI(BaseAIModel):
 
         logger.info(f"Initialized Gemini AI with model: {model_name}")
 
+    @track_llm_call()
     async def generate_response(
         self,
         prompt: str,
@@ -106,47 +130,44 @@ class GeminiAI(BaseAIModel):
                     prompt, role_context, conversation_history)
                 if cached_response:
                     logger.info("Using cached response")
+                    llm_telemetry.mark_cache_hit()
                     return cached_response
 
         try:
-            # Build the system prompt
-            system_prompt = self._build_system_prompt(role_context)
-
-            # Prepare the contents array for the API request
-            contents = []
-
-            # Add system prompt
-            contents.append({
-                "role": "user",
-                "parts": [{"text": system_prompt}]
-            })
-
-            # Add memory context if provided
-            if memory_context and memory_context.strip():
-                memory_prompt = f"Important context about the user:\n{memory_context}"
-                contents.append({
-                    "role": "model",
-                    "parts": [{"text": memory_prompt}]
-                })
+            # Build the system prompt: the static persona first, then the per-turn tone
+            persona_prompt = self._build_persona_prompt(role_context)
+            tone_prompt = self._build_tone_prompt(role_context)
+
+            # Fit memories and history into the input token budget
+            assembled = self.context_assembler.assemble(
+                persona_prompt + tone_prompt, prompt, memory_context, conversation_history, max_tokens)
 
             # Add conversation history
-            if conversation_history:
-                for message in conversation_history:
-                    role = "user" if message["role"] == "user" else "model"
-                    contents.append({
-                        "role": role,
-                        "parts": [{"text": message["content"]}]
-                    })
-
-            # Add the current user message
-            contents.append({
-                "role": "user",
-                "parts": [{"text": prompt}]
-            })
+            history_contents = []
+            for message in assembled["conversation_history"]:
+                role = "user" if message["role"] == "user" else "model"
+                history_contents.append({
+                    "role": role,
+                    "parts": [{"text": message["content"]}]
+                })
+
+            # Per-turn context goes after the history, so that the persona and the
+            # history form a stable prefix for the provider's prompt caching
+            turn_context = []
+            if assembled["history_summary"]:
+                turn_context.append(assembled["history_summary"])
+            if assembled["memory_context"]:
+                turn_context.append(
+                    f"Important context about the user:\n{assembled['memory_context']}")
+
+            # Use an explicit context cache for long persona prompts
+            cached_content = None
+            if self.context_cache:
+                cached_content = await self.context_cache.get_handle(
+                    role_context, persona_prompt + tone_prompt)
 
             # Prepare the request payload
             payload = {
-                "contents": contents,
                 "generationConfig": {
                     "temperature": temperature,
                     "maxOutputTokens": max_tokens,
@@ -154,74 +175,42 @@ class GeminiAI(BaseAIModel):
                     "topK": top_k
                 }
             }
+            payload.update(self._build_contents(
+                persona_prompt, tone_prompt, history_contents, turn_context, prompt, cached_content))
 
             # Add stop sequences if provided
             if stop_sequences:
                 payload["generationConfig"]["stopSequences"] = stop_sequences
 
-            # Make the API request
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.api_url, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.info(f"API response status: {response.status}")
-
-                        # Extract the response text
-                        if "candidates" in result and len(result["candidates"]) > 0:
-                            candidate = result["candidates"][0]
-                            if "content" in candidate and "parts" in candidate["content"]:
-                                parts = candidate["content"]["parts"]
-                                if len(parts) > 0 and "text" in parts[0]:
-                                    response_text = parts[0]["text"]
-                                    logger.info(
-                                        f"Generated response with {len(response_text)} characters")
-
-                                    # Cache the response if caching is enabled and not bypassed
-                                    if self.use_cache and not bypass_cache and 0.6 <= temperature <= 0.8:
-                                        self.cache.set(
-                                            prompt, role_context, conversation_history, response_text)
-
-                                    return response_text
-
-                        # If we got here, the response format was unexpected
-                        logger.error(f"Unexpected response format: {result}")
-                        raise AIModelException(
-                            self._model_name, "Unexpected response format")
-                    else:
-                        # Handle error response
-                        error_text = await response.text()
-                        logger.error(
-                            f"API error: {response.status}, {error_text}")
-
-                        try:
-                            error_data = json.loads(error_text)
-                            if "error" in error_data:
-                                error_code = error_data['error'].get('code', 0)
-                                error_message = error_data['error'].get(
-                                    'message', 'Unknown error')
-
-                                # Handle specific error codes
-                                if error_code == 429:
-                                    raise APIRateLimitException(
-                                        "Gemini", error_message)
-                                elif error_code in (401, 403):
-                                    raise APIAuthenticationException(
-                                        "Gemini", error_message)
-                                else:
-                                    raise AIModelException(
-                                        self._model_name, f"API error: {error_message}")
-                        except json.JSONDecodeError:
-                            # If we can't parse the error as JSON, use the status code
-                            if response.status == 429:
-                                raise APIRateLimitException(
-                                    "Gemini", f"Rate limit exceeded (HTTP {response.status})")
-                            elif response.status in (401, 403):
-                                raise APIAuthenticationException(
-                                    "Gemini", f"Authentication error (HTTP {response.status})")
-
-                        # Default error if no specific error was raised
-                        raise AIModelException(
-                            self._model_name, f"API error: HTTP {response.status}")
+            # Make the API request within the shared provider quota
+            estimated_tokens = assembled["estimated_tokens"] + max_tokens
+            try:
+                result = await provider_rate_limiter.call_with_retry(
+                    "gemini", self._model_name, lambda: self._post_generate(payload),
+                    tokens=estimated_tokens)
+            except CachedContentRejectedException:
+                # The cached content expired or was deleted server-side; resend in full
+                logger.warning(
+                    f"Cached content {cached_content} rejected, retrying without it")
+                await self.context_cache.invalidate(cached_content)
+                del payload["cachedContent"]
+                payload.update(self._build_contents(
+                    persona_prompt, tone_prompt, history_contents, turn_context, prompt))
+                result = await provider_rate_limiter.call_with_retry(
+                    "gemini", self._model_name, lambda: self._post_generate(payload),
+                    tokens=estimated_tokens)
+
+            self._record_usage(result, estimated_tokens)
+            response_text = self._extract_text(result)
+            logger.info(
+                f"Generated response with {len(response_text)} characters")
+
+            # Cache the response if caching is enabled and not bypassed
+            if self.use_cache and not bypass_cache and 0.6 <= temperature <= 0.8:
+                self.cache.set(
+                    prompt, role_context, conversation_history, response_text)
+
+            return response_text
 
         except (AIModelException, APIRateLimitException, APIAuthenticationException):
             # Re-raise specific exceptions
@@ -231,6 +220,182 @@ class GeminiAI(BaseAIModel):
             raise AIModelException(
                 self._model_name, f"Unexpected error: {str(e)}")
 
+    @track_llm_call()
+    async def generate_structured(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.2,
+        max_tokens: int = 500,
+        **kwargs
+    ) -> Any:
+        """
+        Generate a JSON answer using Gemini's native JSON mode.
+
+        The schema is sent as responseSchema, so the model is constrained to
+        produce matching JSON and no format instructions are needed in the prompt.
+
+        Args:
+            prompt (str): The task prompt
+            schema (Dict[str, Any]): The schema the answer must match
+            system_instruction (Optional[str]): Optional system instruction
+            temperature (float): Sampling temperature
+            max_tokens (int): Maximum response length
+            **kwargs: Additional model-specific parameters
+
+        Returns:
+            Any: The validated answer
+
+        Raises:
+            AIModelException: If there's an error with the model
+            StructuredOutputException: If the answer does not match the schema
+            APIRateLimitException: If the API rate limit is reached
+            APIAuthenticationException: If there's an authentication error
+        """
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": temperature,
+                "maxOutputTokens": max_tokens,
+                "responseMimeType": "application/json",
+                "responseSchema": to_gemini_schema(schema)
+            }
+        }
+        if system_instruction:
+            payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+
+        try:
+            estimated_tokens = estimate_tokens(
+                (system_instruction or "") + prompt) + max_tokens
+            result = await provider_rate_limiter.call_with_retry(
+                "gemini", self._model_name, lambda: self._post_generate(payload),
+                tokens=estimated_tokens)
+            self._record_usage(result, estimated_tokens)
+            return parse_structured(self._extract_text(result), schema, self._model_name)
+
+        except (AIModelException, APIRateLimitException, APIAuthenticationException):
+            # Re-raise specific exceptions (StructuredOutputException included)
+            raise
+        except Exception as e:
+            logger.error(f"Error generating structured response: {str(e)}")
+            raise AIModelException(
+                self._model_name, f"Unexpected error: {str(e)}")
+
+    def _record_usage(self, result: Dict[str, Any], estimated_tokens: int) -> None:
+        """
+        Report the token usage of a generateContent response.
+
+        Args:
+            result (Dict[str, Any]): The parsed response body
+            estimated_tokens (int): Tokens reserved with the rate limiter
+        """
+        usage = result.get("usageMetadata", {})
+        llm_telemetry.record_usage(
+            usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0),
+            usage.get("cachedContentTokenCount", 0))
+        if "totalTokenCount" in usage:
+            provider_rate_limiter.report_usage(
+                "gemini", self._model_name, estimated_tokens, usage["totalTokenCount"])
+
+    def _extract_text(self, result: Dict[str, Any]) -> str:
+        """
+        Extract the response text from a generateContent response.
+
+        Args:
+            result (Dict[str, Any]): The parsed response body
+
+        Returns:
+            str: The text of the first candidate
+
+        Raises:
+            AIModelException: If the response format is unexpected
+        """
+        if "candidates" in result and len(result["candidates"]) > 0:
+            candidate = result["candidates"][0]
+            if "content" in candidate and "parts" in candidate["content"]:
+                parts = candidate["content"]["parts"]
+                if len(parts) > 0 and "text" in parts[0]:
+                    return parts[0]["text"]
+
+        # If we got here, the response format was unexpected
+        logger.error(f"Unexpected response format: {result}")
+        raise AIModelException(
+            self._model_name, "Unexpected response format")
+
+    def _build_contents(self, persona_prompt: str, tone_prompt: str,
+                        history_contents: List[Dict[str, Any]], turn_context: List[str],
+                        prompt: str, cached_content: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the contents of a generateContent request.
+
+        With a cached content handle the persona and tone live in the cache;
+        otherwise the persona is sent first and the tone joins the per-turn context.
+
+        Args:
+            persona_prompt (str): The static persona prompt
+            tone_prompt (str): The per-turn tone prompt
+            history_contents (List[Dict[str, Any]]): Conversation history contents
+            turn_context (List[str]): Per-turn context (summary, memories)
+            prompt (str): The user's message
+            cached_content (Optional[str]): Cached content name, if any
+
+        Returns:
+            Dict[str, Any]: The "contents" (and "cachedContent") payload fields
+        """
+        turn_context = list(turn_context)
+        if tone_prompt and not cached_content:
+            turn_context.insert(0, tone_prompt.strip())
+
+        # Add the current user message
+        user_parts = [{"text": "\n\n".join(turn_context)}] if turn_context else []
+        user_parts.append({"text": prompt})
+        current_message = {"role": "user", "parts": user_parts}
+
+        if cached_content:
+            return {
+                "cachedContent": cached_content,
+                "contents": history_contents + [current_message]
+            }
+
+        system_message = {
+            "role": "user",
+            "parts": [{"text": persona_prompt}]
+        }
+        return {"contents": [system_message] + history_contents + [current_message]}
+
+    async def _post_generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a generateContent request to the Gemini API.
+
+        Args:
+            payload (Dict[str, Any]): The request payload
+
+        Returns:
+            Dict[str, Any]: The parsed response body
+
+        Raises:
+            CachedContentRejectedException: If the API refused the payload's cached content
+            AIModelException: If there's an error with the model
+            APIRateLimitException: If the API rate limit is reached
+            APIAuthenticationException: If there's an authentication error
+        """
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.api_url, json=payload) as response:
+                logger.info(f"API response status: {response.status}")
+                if response.status == 200:
+                    return await response.json()
+
+                # Only a refusal naming the cached content is worth resending
+                # without it; other errors would fail the same way again
+                if "cachedContent" in payload and response.status in CACHE_REJECTION_STATUSES:
+                    error_text = await response.text()
+                    if _CACHED_CONTENT_PATTERN.search(error_text):
+                        logger.warning(f"API refused cached content: {response.status}, {error_text}")
+                        raise CachedContentRejectedException(self._model_name, error_text)
+
+                await raise_for_api_error(response, "Gemini", self._model_name)
+
     def _build_system_prompt(self, role_context: Dict[str, Any]) -> str:
         """
         Build a system prompt based on the role context.
@@ -241,15 +406,29 @@ class GeminiAI(BaseAIModel):
         Returns:
             str: The system prompt
         """
+        return self._build_persona_prompt(role_context) + self._build_tone_prompt(role_context)
+
+    def _build_persona_prompt(self, role_context: Dict[str, Any]) -> str:
+        """
+        Build the static part of the system prompt for a role.
+
+        This text only changes when the role itself changes, which makes it
+        suitable for provider-side prompt caching.
+
+        Args:
+            role_context (Dict[str, Any]): Context about the current role
+
+        Returns:
+            str: The persona prompt
+        """
         name = role_context.get("name", "AI Assistant")
         personality = role_context.get("personality", "Helpful and friendly")
         speaking_style = role_context.get("speaking_style", "Conversational")
         knowledge_areas = role_context.get(
             "knowledge_areas", "General knowledge")
         behaviors = role_context.get("behaviors", "Responds helpfully")
-        tone_guidance = role_context.get("tone_guidance", "")
 
-        system_prompt = f"""
+        return f"""
         You are Jyra, an emotionally intelligent AI companion, currently roleplaying as {name}.
 
         Your core identity: You are Jyra (a fusion of Jyoti meaning "light" and Aura meaning "presence/emotion").
@@ -271,16 +450,26 @@ class GeminiAI(BaseAIModel):
         5. Never break the fourth wall by mentioning you are an AI
         """
 
-        # Add sentiment-based tone guidance if available
-        if tone_guidance:
-            system_prompt += f"""
+    def _build_tone_prompt(self, role_context: Dict[str, Any]) -> str:
+        """
+        Build the per-turn part of the system prompt (sentiment-based tone guidance).
+
+        Args:
+            role_context (Dict[str, Any]): Context about the current role
+
+        Returns:
+            str: The tone prompt, or an empty string if there is no guidance
+        """
+        tone_guidance = role_context.get("tone_guidance", "")
+        if not tone_guidance:
+            return ""
+
+        return f"""
 
         Current Emotional Context:
         {tone_guidance}
         """
 
-        return system_prompt
-
     def clear_cache(self, max_age_seconds: Optional[int] = None) -> int:
         """
         Clear expired cache entries.
@@ -307,7 +496,7 @@ class GeminiAI(BaseAIModel):
         try:
             # Make a simple API request to check if the model is available
             async with aiohttp.ClientSession() as session:
-                test_url = f"https://generativelanguage.googleapis.com/v1beta/models?key={GEMINI_API_KEY}"
+                test_url = f"{self.base_url}/models?key={GEMINI_API_KEY}"
                 async with session.get(test_url) as response:
                     if response.status == 200:
                         # Check if our model is in the list of available models
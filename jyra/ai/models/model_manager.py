@@ -4,12 +4,17 @@ AI model manager for Jyra.
 This module provides a manager for multiple AI models with fallback capabilities.
 """
 
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import List, Dict, Any, Optional, Union, Tuple, Callable, Awaitable
 import random
 
+import time
+
 from jyra.ai.models.base_model import BaseAIModel
 from jyra.ai.models.gemini_direct import GeminiAI
+from jyra.ai.models.model_router import ModelRouter
 from jyra.ai.models.openai_model import OpenAIModel
+from jyra.ai.limits import provider_rate_limiter
+from jyra.ai.telemetry import llm_telemetry, fallback_call, current_call_site
 from jyra.utils.exceptions import AIModelException, APIRateLimitException, APIAuthenticationException
 from jyra.utils.config import ENABLE_OPENAI
 from jyra.utils.logger import setup_logger
@@ -22,7 +27,8 @@ class ModelManager:
     Manager for multiple AI models with fallback capabilities.
     """
 
-    def __init__(self, primary_model: str = "gemini-2.0-flash", fallback_models: Optional[List[str]] = None, enable_openai: bool = False):
+    def __init__(self, primary_model: str = "gemini-2.0-flash", fallback_models: Optional[List[str]] = None,
+                 enable_openai: bool = False, router: Optional[ModelRouter] = None):
         """
         Initialize the model manager.
 
@@ -30,10 +36,12 @@ class ModelManager:
             primary_model (str): The primary model to use
             fallback_models (Optional[List[str]]): List of fallback models in order of preference
             enable_openai (bool): Whether to enable OpenAI models (disabled by default to avoid costs)
+            router (Optional[ModelRouter]): Routing policy; the primary model is its standard tier
         """
         self.models: Dict[str, BaseAIModel] = {}
         self.primary_model_name = primary_model
         self.enable_openai = enable_openai
+        self.router = router or ModelRouter(standard_model=primary_model)
 
         # Set fallback models based on OpenAI availability
         if fallback_models is None:
@@ -86,6 +94,20 @@ class ModelManager:
         except Exception as e:
             logger.error(f"Error initializing model {model_name}: {str(e)}")
 
+    def _get_provider_key(self, model_name: str) -> str:
+        """
+        Get the rate limiter provider key for a model.
+
+        Args:
+            model_name (str): The name of the model
+
+        Returns:
+            str: "openai" for OpenAI models, "gemini" otherwise
+        """
+        if "gpt" in model_name.lower() or "openai" in model_name.lower():
+            return "openai"
+        return "gemini"
+
     async def generate_response(
         self,
         prompt: str,
@@ -93,15 +115,20 @@ class ModelManager:
         conversation_history: Optional[List[Dict[str, str]]] = None,
         memory_context: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 1000,
+        max_tokens: Optional[int] = None,
         top_p: float = 0.95,
         top_k: int = 40,
         stop_sequences: Optional[List[str]] = None,
         use_fallbacks: bool = True,
+        response_length: Optional[str] = None,
+        user_id: Optional[int] = None,
         **kwargs
     ) -> Tuple[str, str]:
         """
-        Generate a response using the primary model with fallback to others if needed.
+        Generate a response using the routed model with fallback to others if needed.
+
+        The model tier and, unless given, the token budget are chosen by the
+        router from the call site and the message.
 
         Args:
             prompt (str): The user's message
@@ -109,35 +136,150 @@ class ModelManager:
             conversation_history (Optional[List[Dict[str, str]]]): Previous messages
             memory_context (Optional[str]): Context from user memories
             temperature (float): Creativity parameter (0.0 to 1.0)
-            max_tokens (int): Maximum response length
+            max_tokens (Optional[int]): Maximum response length; chosen by the router if None
             top_p (float): Nucleus sampling parameter
             top_k (int): Top-k sampling parameter
             stop_sequences (Optional[List[str]]): Sequences that will stop generation
             use_fallbacks (bool): Whether to use fallback models if the primary fails
+            response_length (Optional[str]): The user's short, medium or long preference
+            user_id (Optional[int]): User ID, for the routing A/B split
             **kwargs: Additional model-specific parameters
 
         Returns:
             Tuple[str, str]: The generated response and the name of the model that generated it
         """
-        # Try the primary model first
-        model_name = self.primary_model_name
+        decision = self.router.route(
+            current_call_site(), prompt, conversation_history, response_length, user_id, max_tokens)
+        return await self._run_routed(
+            decision,
+            lambda model: model.generate_response(
+                prompt=prompt,
+                role_context=role_context,
+                conversation_history=conversation_history,
+                memory_context=memory_context,
+                temperature=temperature,
+                max_tokens=decision["max_tokens"],
+                top_p=top_p,
+                top_k=top_k,
+                stop_sequences=stop_sequences,
+                **kwargs
+            ),
+            use_fallbacks)
+
+    async def generate_structured(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.2,
+        max_tokens: int = 500,
+        use_fallbacks: bool = True,
+        user_id: Optional[int] = None,
+        **kwargs
+    ) -> Tuple[Any, str]:
+        """
+        Generate a JSON answer matching a schema, with fallback to other models.
+
+        The model tier is chosen by the router from the call site.
+
+        Args:
+            prompt (str): The task prompt
+            schema (Dict[str, Any]): The schema the answer must match
+            system_instruction (Optional[str]): Optional system instruction
+            temperature (float): Sampling temperature
+            max_tokens (int): Maximum response length
+            use_fallbacks (bool): Whether to use fallback models if the primary fails
+            user_id (Optional[int]): User ID, for the routing A/B split
+            **kwargs: Additional model-specific parameters
+
+        Returns:
+            Tuple[Any, str]: The validated answer and the name of the model that generated it
+        """
+        decision = self.router.route(current_call_site(), user_id=user_id, max_tokens=max_tokens)
+        return await self._run_routed(
+            decision,
+            lambda model: model.generate_structured(
+                prompt=prompt,
+                schema=schema,
+                system_instruction=system_instruction,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs
+            ),
+            use_fallbacks)
+
+    async def _run_routed(
+        self,
+        decision: Dict[str, Any],
+        call: Callable[[BaseAIModel], Awaitable[Any]],
+        use_fallbacks: bool = True
+    ) -> Tuple[Any, str]:
+        """
+        Run a model call on the routed model and record the outcome with the router.
+
+        Args:
+            decision (Dict[str, Any]): The routing decision
+            call (Callable[[BaseAIModel], Awaitable[Any]]): Makes the call on a given model
+            use_fallbacks (bool): Whether to use fallback models if the routed model fails
+
+        Returns:
+            Tuple[Any, str]: The call's result and the name of the model that produced it
+        """
+        start = time.perf_counter()
+        try:
+            result, model_used = await self._run_with_fallbacks(
+                call, use_fallbacks, decision["model"])
+        except Exception:
+            self.router.record_outcome(
+                decision, None, (time.perf_counter() - start) * 1000, ok=False)
+            raise
+        self.router.record_outcome(
+            decision, model_used, (time.perf_counter() - start) * 1000)
+        return result, model_used
+
+    async def _run_with_fallbacks(
+        self,
+        call: Callable[[BaseAIModel], Awaitable[Any]],
+        use_fallbacks: bool = True,
+        model_name: Optional[str] = None
+    ) -> Tuple[Any, str]:
+        """
+        Run a model call on the primary model, falling back to others if it fails.
+
+        Args:
+            call (Callable[[BaseAIModel], Awaitable[Any]]): Makes the call on a given model
+            use_fallbacks (bool): Whether to use fallback models if the primary fails
+            model_name (Optional[str]): Model to try first instead of the primary model;
+                the primary model then becomes the first fallback
+
+        Returns:
+            Tuple[Any, str]: The call's result and the name of the model that produced it
+        """
+        fallback_names = self.fallback_model_names
+        if model_name and model_name != self.primary_model_name:
+            fallback_names = [self.primary_model_name] + \
+                [name for name in fallback_names if name != model_name]
+        else:
+            model_name = self.primary_model_name
+
+        # Try the selected model first
         model = self.models.get(model_name)
 
         if not model:
             logger.warning(
-                f"Primary model {model_name} not initialized, trying to initialize it")
+                f"Model {model_name} not initialized, trying to initialize it")
             self._initialize_model(model_name)
             model = self.models.get(model_name)
 
             if not model:
                 logger.error(
-                    f"Failed to initialize primary model {model_name}")
-                if not use_fallbacks or not self.fallback_model_names:
+                    f"Failed to initialize model {model_name}")
+                if not use_fallbacks or not fallback_names:
                     raise AIModelException(
                         model_name, "Failed to initialize model and no fallbacks available")
 
                 # Try to use a fallback model
-                model_name = self.fallback_model_names[0]
+                model_name = fallback_names[0]
                 model = self.models.get(model_name)
 
                 if not model:
@@ -146,30 +288,18 @@ class ModelManager:
                     raise AIModelException(
                         model_name, "Failed to initialize all models")
 
-        # Try to generate a response with the selected model
+        # Try the call with the selected model
         try:
-            response = await model.generate_response(
-                prompt=prompt,
-                role_context=role_context,
-                conversation_history=conversation_history,
-                memory_context=memory_context,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                top_p=top_p,
-                top_k=top_k,
-                stop_sequences=stop_sequences,
-                **kwargs
-            )
-            return response, model_name
+            return await call(model), model_name
         except (AIModelException, APIRateLimitException, APIAuthenticationException) as e:
             logger.error(f"Error with model {model_name}: {str(e)}")
 
             # If fallbacks are disabled or no fallbacks are available, re-raise the exception
-            if not use_fallbacks or not self.fallback_model_names:
+            if not use_fallbacks or not fallback_names:
                 raise
 
             # Try fallback models
-            for fallback_name in self.fallback_model_names:
+            for fallback_name in fallback_names:
                 if fallback_name == model_name:
                     continue  # Skip if it's the same as the failed model
 
@@ -185,21 +315,17 @@ class ModelManager:
                         f"Failed to initialize fallback model {fallback_name}")
                     continue
 
+                # Don't pile onto a fallback that is itself waiting out a rate limit
+                if provider_rate_limiter.is_blocked(self._get_provider_key(fallback_name), fallback_name):
+                    logger.info(
+                        f"Skipping rate-limited fallback model: {fallback_name}")
+                    continue
+
                 try:
                     logger.info(f"Trying fallback model: {fallback_name}")
-                    response = await fallback_model.generate_response(
-                        prompt=prompt,
-                        role_context=role_context,
-                        conversation_history=conversation_history,
-                        memory_context=memory_context,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        top_p=top_p,
-                        top_k=top_k,
-                        stop_sequences=stop_sequences,
-                        **kwargs
-                    )
-                    return response, fallback_name
+                    with fallback_call():
+                        result = await call(fallback_model)
+                    return result, fallback_name
                 except Exception as fallback_error:
                     logger.error(
                         f"Error with fallback model {fallback_name}: {str(fallback_error)}")
@@ -281,6 +407,24 @@ class ModelManager:
 
         return results
 
+    def get_context_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get provider-side context cache statistics for each model that has one.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Statistics keyed by model name
+        """
+        return {
+            model_name: model.context_cache.get_stats()
+            for model_name, model in self.models.items()
+            if getattr(model, "context_cache", None)
+        }
+
 
 # Create a singleton instance using the ENABLE_OPENAI config
 model_manager = ModelManager(enable_openai=ENABLE_OPENAI)
+
+# Report cache and quota statistics alongside call telemetry
+llm_telemetry.register_source("rate_limits", provider_rate_limiter.get_metrics)
+llm_telemetry.register_source("context_cache", model_manager.get_context_cache_stats)
+llm_telemetry.register_source("model_routing", model_manager.router.get_stats)
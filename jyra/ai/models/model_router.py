@@ -0,0 +1,267 @@
+"""
+Model routing for Jyra.
+
+Picks a model tier for each call. Auxiliary tasks (sentiment, memory
+extraction, message analysis, consolidation) have a fixed tier, normally the
+fast one. Replies are scored by message length, question density, conversation
+depth and the user's response length preference: trivial turns go to the fast
+tier, long or question-heavy ones to the advanced tier, everything else to the
+standard tier. The reply's token budget follows the preference and the tier.
+
+In A/B mode, users are split by a stable hash into a routed group and a
+control group that always uses the standard tier. Every decision and its
+outcome is appended to a JSON lines log for offline comparison.
+"""
+
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from jyra.ai.telemetry import RollingHistogram
+from jyra.utils.config import (
+    MODEL_ROUTING_MODE, MODEL_ROUTING_AB_FRACTION, MODEL_ROUTING_LOG_PATH,
+    MODEL_TIER_FAST, MODEL_TIER_ADVANCED,
+    MODEL_ROUTING_FAST_BELOW, MODEL_ROUTING_ADVANCED_FROM, TELEMETRY_WINDOW_SECONDS
+)
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Tier of auxiliary call sites; other call sites are scored like replies
+TASK_TIERS = {
+    "message_analysis": "fast",
+    "sentiment": "fast",
+    "memory_extraction": "fast",
+    "consolidation": "fast"
+}
+
+# Reply token budget per response length preference
+RESPONSE_LENGTH_TOKENS = {"short": 300, "medium": 800, "long": 1500}
+DEFAULT_MAX_TOKENS = 1000
+
+QUESTION_WORDS = {"what", "why", "how", "when", "where", "who", "which", "can", "could",
+                  "should", "would", "is", "are", "do", "does", "did"}
+
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_SENTENCE_PATTERN = re.compile(r"[^.!?\n]+[.!?]*")
+
+
+def extract_features(prompt: str, conversation_history: Optional[List[Dict[str, str]]] = None,
+                     response_length: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract the message features used for routing.
+
+    Args:
+        prompt (str): The user's message
+        conversation_history (Optional[List[Dict[str, str]]]): Previous messages
+        response_length (Optional[str]): short, medium or long preference
+
+    Returns:
+        Dict[str, Any]: words, sentences, questions, question_density, depth
+            and response_length
+    """
+    text = prompt or ""
+    sentences = [s.strip() for s in _SENTENCE_PATTERN.findall(text) if s.strip()]
+    questions = sum(1 for s in sentences
+                    if s.endswith("?") or s.split()[0].lower() in QUESTION_WORDS)
+    return {
+        "words": len(text.split()),
+        "sentences": len(sentences),
+        "questions": questions,
+        "question_density": round(questions / len(sentences), 2) if sentences else 0.0,
+        "depth": len(conversation_history or []),
+        "response_length": response_length
+    }
+
+
+def score_complexity(features: Dict[str, Any]) -> float:
+    """
+    Score how demanding a reply is likely to be.
+
+    Args:
+        features (Dict[str, Any]): Features from extract_features
+
+    Returns:
+        float: The score; about 0 for "ok", above 2.5 for long multi-part questions
+    """
+    score = features["words"] / 40
+    score += 0.5 * min(features["questions"], 4)
+    score += 0.5 * features["question_density"]
+    score += 0.5 * min(features["depth"], 20) / 20
+    score += {"short": -0.5, "long": 0.5}.get(features["response_length"], 0.0)
+    return round(score, 3)
+
+
+class ModelRouter:
+    """
+    Routing policy mapping tasks and messages to model tiers.
+    """
+
+    def __init__(self, standard_model: str = "gemini-2.0-flash",
+                 mode: str = MODEL_ROUTING_MODE,
+                 tier_models: Optional[Dict[str, str]] = None,
+                 fast_below: float = MODEL_ROUTING_FAST_BELOW,
+                 advanced_from: float = MODEL_ROUTING_ADVANCED_FROM,
+                 ab_fraction: float = MODEL_ROUTING_AB_FRACTION,
+                 log_path: Optional[str] = MODEL_ROUTING_LOG_PATH):
+        """
+        Initialize the router.
+
+        Args:
+            standard_model (str): Model of the standard tier, used for everything
+                when routing is off
+            mode (str): "on", "off" or "ab"
+            tier_models (Optional[Dict[str, str]]): Model name per tier, overriding
+                the configured ones
+            fast_below (float): Scores below this use the fast tier
+            advanced_from (float): Scores from this use the advanced tier
+            ab_fraction (float): Share of users routed in A/B mode
+            log_path (Optional[str]): Decision log written in A/B mode
+        """
+        if mode not in ("on", "off", "ab"):
+            logger.warning(f"Unknown model routing mode {mode}, routing disabled")
+            mode = "off"
+        self.mode = mode
+        self.tier_models = tier_models or {
+            "fast": MODEL_TIER_FAST,
+            "standard": standard_model,
+            "advanced": MODEL_TIER_ADVANCED
+        }
+        self.fast_below = fast_below
+        self.advanced_from = advanced_from
+        self.ab_fraction = ab_fraction
+        self.log_path = Path(log_path) if log_path else None
+
+        self._latency: Dict[str, RollingHistogram] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def variant(self, user_id: Optional[int]) -> str:
+        """
+        Get the A/B group of a user.
+
+        Args:
+            user_id (Optional[int]): User ID
+
+        Returns:
+            str: "routed" or "control" ("routed" without a user in A/B mode)
+        """
+        if self.mode == "off":
+            return "control"
+        if self.mode == "on" or user_id is None:
+            return "routed"
+        digest = hashlib.sha256(str(user_id).encode("utf-8")).digest()
+        return "routed" if int.from_bytes(digest[:4], "big") / 2 ** 32 < self.ab_fraction else "control"
+
+    def route(self, task: str, prompt: Optional[str] = None,
+              conversation_history: Optional[List[Dict[str, str]]] = None,
+              response_length: Optional[str] = None, user_id: Optional[int] = None,
+              max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Pick the model and token budget for a call.
+
+        Args:
+            task (str): Call site, e.g. "reply" or "sentiment"
+            prompt (Optional[str]): The user's message, for replies
+            conversation_history (Optional[List[Dict[str, str]]]): Previous messages
+            response_length (Optional[str]): short, medium or long preference
+            user_id (Optional[int]): User ID, for the A/B split
+            max_tokens (Optional[int]): Token budget set by the caller, kept as is
+
+        Returns:
+            Dict[str, Any]: task, variant, tier, model, max_tokens, score and features
+        """
+        variant = self.variant(user_id)
+        features = None
+        score = None
+
+        if task not in TASK_TIERS:
+            # Scored for the control group too, so both groups can be compared
+            features = extract_features(prompt, conversation_history, response_length)
+            score = score_complexity(features)
+
+        if variant == "control":
+            tier = "standard"
+        elif task in TASK_TIERS:
+            tier = TASK_TIERS[task]
+        else:
+            if score < self.fast_below:
+                tier = "fast"
+            elif score >= self.advanced_from:
+                tier = "advanced"
+            else:
+                tier = "standard"
+
+        if max_tokens is None:
+            max_tokens = RESPONSE_LENGTH_TOKENS.get(response_length, DEFAULT_MAX_TOKENS)
+            if tier == "fast" and variant == "routed":
+                max_tokens = min(max_tokens, RESPONSE_LENGTH_TOKENS["short"])
+
+        return {
+            "task": task,
+            "user_id": user_id,
+            "variant": variant,
+            "tier": tier,
+            "model": self.tier_models[tier],
+            "max_tokens": max_tokens,
+            "score": score,
+            "features": features
+        }
+
+    def record_outcome(self, decision: Dict[str, Any], model_used: Optional[str],
+                       latency_ms: float, ok: bool = True) -> None:
+        """
+        Record how a routed call went.
+
+        Args:
+            decision (Dict[str, Any]): The decision from route
+            model_used (Optional[str]): Model that answered (differs after a fallback)
+            latency_ms (float): Call latency including fallbacks
+            ok (bool): Whether the call succeeded
+        """
+        key = f"{decision['task']}/{decision['variant']}/{decision['tier']}"
+        stats = self.stats.setdefault(key, {"calls": 0, "errors": 0, "fallbacks": 0})
+        stats["calls"] += 1
+        if not ok:
+            stats["errors"] += 1
+        elif model_used != decision["model"]:
+            stats["fallbacks"] += 1
+        if key not in self._latency:
+            self._latency[key] = RollingHistogram(LATENCY_BUCKETS_MS, TELEMETRY_WINDOW_SECONDS)
+        self._latency[key].add(latency_ms)
+
+        if self.mode == "ab" and self.log_path:
+            self._log({
+                "time": round(time.time(), 3),
+                **{k: v for k, v in decision.items() if k != "user_id"},
+                "user": hashlib.sha256(str(decision["user_id"]).encode("utf-8")).hexdigest()[:12]
+                if decision["user_id"] is not None else None,
+                "model_used": model_used,
+                "latency_ms": round(latency_ms, 1),
+                "ok": ok
+            })
+
+    def _log(self, entry: Dict[str, Any]) -> None:
+        """Append a decision to the A/B log."""
+        try:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except Exception as e:
+            logger.error(f"Error writing model routing log: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get call counts and latency per task, variant and tier.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        routes = {}
+        for key, stats in self.stats.items():
+            latency = self._latency[key].summary()
+            routes[key] = {**stats, "p50_ms": latency["p50"], "p95_ms": latency["p95"]}
+        return {"mode": self.mode, "tiers": self.tier_models, "routes": routes}
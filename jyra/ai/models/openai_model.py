@@ -2,25 +2,33 @@
 OpenAI model implementation for Jyra.
 """
 
-import json
 import aiohttp
 from typing import List, Dict, Any, Optional
 
 from jyra.ai.models.base_model import BaseAIModel
-from jyra.utils.config import OPENAI_API_KEY
+from jyra.utils.config import OPENAI_API_KEY, OPENAI_API_BASE_URL
 from jyra.utils.exceptions import AIModelException, APIRateLimitException, APIAuthenticationException
+from jyra.ai.utils.structured_output import parse_structured, to_openai_schema, describe_schema
 from jyra.utils.logger import setup_logger
 from jyra.ai.cache.response_cache import ResponseCache
+from jyra.ai.context import ContextAssembler, estimate_tokens, summarize_dropped_turns
+from jyra.ai.limits import provider_rate_limiter
+from jyra.ai.telemetry import llm_telemetry, track_llm_call
+from jyra.ai.utils.api_errors import raise_for_api_error
 
 logger = setup_logger(__name__)
 
+# Model families that accept response_format json_schema with strict mode
+_JSON_SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+
 
 class OpenAIModel(BaseAIModel):
     """
     Class for interacting with OpenAI's models.
     """
 
-    def __init__(self, model_name: str = "gpt-3.5-turbo", use_cache: bool = True, cache_max_age: int = 3600):
+    def __init__(self, model_name: str = "gpt-3.5-turbo", use_cache: bool = True, cache_max_age: int = 3600,
+                 base_url: Optional[str] = None):
         """
         Initialize the OpenAI model client.
 
@@ -28,9 +36,11 @@ class OpenAIModel(BaseAIModel):
             model_name (str): The name of the OpenAI model to use
             use_cache (bool): Whether to use response caching
             cache_max_age (int): Maximum age of cache entries in seconds
+            base_url (Optional[str]): API base URL (defaults to OPENAI_API_BASE_URL)
         """
         self._model_name = model_name
-        self.api_url = "https://api.openai.com/v1/chat/completions"
+        self.base_url = (base_url or OPENAI_API_BASE_URL).rstrip("/")
+        self.api_url = f"{self.base_url}/chat/completions"
         self.api_key = OPENAI_API_KEY
 
         # Initialize cache if enabled
@@ -48,8 +58,13 @@ class OpenAIModel(BaseAIModel):
             
         self._supports_streaming = True
 
+        # Token-budgeted context assembly
+        self.context_assembler = ContextAssembler(
+            self._max_context_length, summarizer=summarize_dropped_turns)
+
         logger.info(f"Initialized OpenAI model: {model_name}")
 
+    @track_llm_call()
     async def generate_response(
         self,
         prompt: str,
@@ -100,35 +115,50 @@ class OpenAIModel(BaseAIModel):
                     prompt, role_context, conversation_history)
                 if cached_response:
                     logger.info("Using cached response")
+                    llm_telemetry.mark_cache_hit()
                     return cached_response
 
         try:
-            # Prepare the messages array for the API request
+            # Prepare the messages array for the API request. OpenAI caches
+            # prompt prefixes automatically, so the static persona comes first,
+            # then the append-only history, and per-turn context goes last.
             messages = []
 
             # Add system message with role context
-            system_prompt = self._build_system_prompt(role_context)
+            persona_prompt = self._build_persona_prompt(role_context)
+            tone_prompt = self._build_tone_prompt(role_context)
+
+            # Fit memories and history into the input token budget
+            assembled = self.context_assembler.assemble(
+                persona_prompt + tone_prompt, prompt, memory_context, conversation_history, max_tokens)
+
             messages.append({
                 "role": "system",
-                "content": system_prompt
+                "content": persona_prompt
             })
 
-            # Add memory context if provided
-            if memory_context and memory_context.strip():
-                memory_prompt = f"Important context about the user:\n{memory_context}"
+            # Add conversation history
+            for message in assembled["conversation_history"]:
+                role = "user" if message["role"] == "user" else "assistant"
                 messages.append({
-                    "role": "system",
-                    "content": memory_prompt
+                    "role": role,
+                    "content": message["content"]
                 })
 
-            # Add conversation history
-            if conversation_history:
-                for message in conversation_history:
-                    role = "user" if message["role"] == "user" else "assistant"
-                    messages.append({
-                        "role": role,
-                        "content": message["content"]
-                    })
+            # Add tone guidance, history summary and memory context
+            turn_context = []
+            if tone_prompt:
+                turn_context.append(tone_prompt.strip())
+            if assembled["history_summary"]:
+                turn_context.append(assembled["history_summary"])
+            if assembled["memory_context"]:
+                turn_context.append(
+                    f"Important context about the user:\n{assembled['memory_context']}")
+            if turn_context:
+                messages.append({
+                    "role": "system",
+                    "content": "\n\n".join(turn_context)
+                })
 
             # Add the current user message
             messages.append({
@@ -155,64 +185,23 @@ class OpenAIModel(BaseAIModel):
             if "presence_penalty" in kwargs:
                 payload["presence_penalty"] = kwargs["presence_penalty"]
 
-            # Make the API request
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.api_url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.info(f"API response status: {response.status}")
-
-                        # Extract the response text
-                        if "choices" in result and len(result["choices"]) > 0:
-                            choice = result["choices"][0]
-                            if "message" in choice and "content" in choice["message"]:
-                                response_text = choice["message"]["content"]
-                                logger.info(
-                                    f"Generated response with {len(response_text)} characters")
-
-                                # Cache the response if caching is enabled and not bypassed
-                                if self.use_cache and not bypass_cache and 0.6 <= temperature <= 0.8:
-                                    self.cache.set(
-                                        prompt, role_context, conversation_history, response_text)
-
-                                return response_text
-
-                        # If we got here, the response format was unexpected
-                        logger.error(f"Unexpected response format: {result}")
-                        raise AIModelException(
-                            self._model_name, "Unexpected response format")
-                    else:
-                        # Handle error response
-                        error_text = await response.text()
-                        logger.error(
-                            f"API error: {response.status}, {error_text}")
-
-                        try:
-                            error_data = json.loads(error_text)
-                            error_message = error_data.get("error", {}).get("message", "Unknown error")
-                            error_type = error_data.get("error", {}).get("type", "")
-                            
-                            # Handle specific error types
-                            if response.status == 429 or "rate_limit" in error_type:
-                                raise APIRateLimitException("OpenAI", error_message)
-                            elif response.status in (401, 403) or "authentication" in error_type:
-                                raise APIAuthenticationException("OpenAI", error_message)
-                            else:
-                                raise AIModelException(self._model_name, f"API error: {error_message}")
-                        except json.JSONDecodeError:
-                            # If we can't parse the error as JSON, use the status code
-                            if response.status == 429:
-                                raise APIRateLimitException("OpenAI", f"Rate limit exceeded (HTTP {response.status})")
-                            elif response.status in (401, 403):
-                                raise APIAuthenticationException("OpenAI", f"Authentication error (HTTP {response.status})")
-                            
-                        # Default error if no specific error was raised
-                        raise AIModelException(self._model_name, f"API error: HTTP {response.status}")
+            # Make the API request within the shared provider quota
+            estimated_tokens = assembled["estimated_tokens"] + max_tokens
+            result = await provider_rate_limiter.call_with_retry(
+                "openai", self._model_name, lambda: self._post_chat_completion(payload),
+                tokens=estimated_tokens)
+
+            self._record_usage(result, estimated_tokens)
+            response_text = self._extract_text(result)
+            logger.info(
+                f"Generated response with {len(response_text)} characters")
+
+            # Cache the response if caching is enabled and not bypassed
+            if self.use_cache and not bypass_cache and 0.6 <= temperature <= 0.8:
+                self.cache.set(
+                    prompt, role_context, conversation_history, response_text)
+
+            return response_text
 
         except (AIModelException, APIRateLimitException, APIAuthenticationException):
             # Re-raise specific exceptions
@@ -221,6 +210,149 @@ class OpenAIModel(BaseAIModel):
             logger.error(f"Error generating response: {str(e)}")
             raise AIModelException(self._model_name, f"Unexpected error: {str(e)}")
 
+    @track_llm_call()
+    async def generate_structured(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.2,
+        max_tokens: int = 500,
+        **kwargs
+    ) -> Any:
+        """
+        Generate a JSON answer using OpenAI's response_format.
+
+        Models that support structured outputs get the schema in strict
+        json_schema mode; older models use JSON mode with the schema in the
+        system message.
+
+        Args:
+            prompt (str): The task prompt
+            schema (Dict[str, Any]): The schema the answer must match
+            system_instruction (Optional[str]): Optional system instruction
+            temperature (float): Sampling temperature
+            max_tokens (int): Maximum response length
+            **kwargs: Additional model-specific parameters
+
+        Returns:
+            Any: The validated answer
+
+        Raises:
+            AIModelException: If there's an error with the model
+            StructuredOutputException: If the answer does not match the schema
+            APIRateLimitException: If the API rate limit is reached
+            APIAuthenticationException: If there's an authentication error
+        """
+        system_parts = [system_instruction] if system_instruction else []
+        if self._model_name.startswith(_JSON_SCHEMA_MODELS):
+            response_format = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": kwargs.get("schema_name", "response"),
+                    "strict": True,
+                    "schema": to_openai_schema(schema)
+                }
+            }
+        else:
+            response_format = {"type": "json_object"}
+            system_parts.append(
+                f"Respond only with JSON matching this schema: {describe_schema(schema)}")
+
+        payload = {
+            "model": self._model_name,
+            "messages": [
+                {"role": "system", "content": "\n".join(system_parts)},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": response_format
+        }
+
+        try:
+            estimated_tokens = estimate_tokens(
+                payload["messages"][0]["content"] + prompt) + max_tokens
+            result = await provider_rate_limiter.call_with_retry(
+                "openai", self._model_name, lambda: self._post_chat_completion(payload),
+                tokens=estimated_tokens)
+            self._record_usage(result, estimated_tokens)
+            return parse_structured(self._extract_text(result), schema, self._model_name)
+
+        except (AIModelException, APIRateLimitException, APIAuthenticationException):
+            # Re-raise specific exceptions (StructuredOutputException included)
+            raise
+        except Exception as e:
+            logger.error(f"Error generating structured response: {str(e)}")
+            raise AIModelException(self._model_name, f"Unexpected error: {str(e)}")
+
+    def _record_usage(self, result: Dict[str, Any], estimated_tokens: int) -> None:
+        """
+        Report the token usage of a chat completion response.
+
+        Args:
+            result (Dict[str, Any]): The parsed response body
+            estimated_tokens (int): Tokens reserved with the rate limiter
+        """
+        usage = result.get("usage", {})
+        llm_telemetry.record_usage(
+            usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0),
+            usage.get("prompt_tokens_details", {}).get("cached_tokens", 0))
+        if "total_tokens" in usage:
+            provider_rate_limiter.report_usage(
+                "openai", self._model_name, estimated_tokens, usage["total_tokens"])
+
+    def _extract_text(self, result: Dict[str, Any]) -> str:
+        """
+        Extract the response text from a chat completion response.
+
+        Args:
+            result (Dict[str, Any]): The parsed response body
+
+        Returns:
+            str: The content of the first choice
+
+        Raises:
+            AIModelException: If the response format is unexpected
+        """
+        if "choices" in result and len(result["choices"]) > 0:
+            choice = result["choices"][0]
+            if "message" in choice and choice["message"].get("content") is not None:
+                return choice["message"]["content"]
+
+        # If we got here, the response format was unexpected
+        logger.error(f"Unexpected response format: {result}")
+        raise AIModelException(
+            self._model_name, "Unexpected response format")
+
+    async def _post_chat_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a chat completion request to the OpenAI API.
+
+        Args:
+            payload (Dict[str, Any]): The request payload
+
+        Returns:
+            Dict[str, Any]: The parsed response body
+
+        Raises:
+            AIModelException: If there's an error with the model
+            APIRateLimitException: If the API rate limit is reached
+            APIAuthenticationException: If there's an authentication error
+        """
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.api_url, json=payload, headers=headers) as response:
+                logger.info(f"API response status: {response.status}")
+                if response.status == 200:
+                    return await response.json()
+
+                await raise_for_api_error(response, "OpenAI", self._model_name)
+
     def _build_system_prompt(self, role_context: Dict[str, Any]) -> str:
         """
         Build a system prompt based on the role context.
@@ -231,14 +363,25 @@ class OpenAIModel(BaseAIModel):
         Returns:
             str: The system prompt
         """
+        return self._build_persona_prompt(role_context) + self._build_tone_prompt(role_context)
+
+    def _build_persona_prompt(self, role_context: Dict[str, Any]) -> str:
+        """
+        Build the static part of the system prompt for a role.
+
+        Args:
+            role_context (Dict[str, Any]): Context about the current role
+
+        Returns:
+            str: The persona prompt
+        """
         name = role_context.get("name", "AI Assistant")
         personality = role_context.get("personality", "Helpful and friendly")
         speaking_style = role_context.get("speaking_style", "Conversational")
         knowledge_areas = role_context.get("knowledge_areas", "General knowledge")
         behaviors = role_context.get("behaviors", "Responds helpfully")
-        tone_guidance = role_context.get("tone_guidance", "")
 
-        system_prompt = f"""
+        return f"""
         You are Jyra, an emotionally intelligent AI companion, currently roleplaying as {name}.
 
         Your core identity: You are Jyra (a fusion of Jyoti meaning "light" and Aura meaning "presence/emotion").
@@ -260,16 +403,26 @@ class OpenAIModel(BaseAIModel):
         5. Never break the fourth wall by mentioning you are an AI
         """
 
-        # Add sentiment-based tone guidance if available
-        if tone_guidance:
-            system_prompt += f"""
+    def _build_tone_prompt(self, role_context: Dict[str, Any]) -> str:
+        """
+        Build the per-turn part of the system prompt (sentiment-based tone guidance).
+
+        Args:
+            role_context (Dict[str, Any]): Context about the current role
+
+        Returns:
+            str: The tone prompt, or an empty string if there is no guidance
+        """
+        tone_guidance = role_context.get("tone_guidance", "")
+        if not tone_guidance:
+            return ""
+
+        return f"""
 
         Current Emotional Context:
         {tone_guidance}
         """
 
-        return system_prompt
-
     def clear_cache(self, max_age_seconds: Optional[int] = None) -> int:
         """
         Clear expired cache entries.
@@ -296,7 +449,7 @@ class OpenAIModel(BaseAIModel):
         try:
             # Make a simple API request to check if the model is available
             async with aiohttp.ClientSession() as session:
-                test_url = "https://api.openai.com/v1/models"
+                test_url = f"{self.base_url}/models"
                 headers = {"Authorization": f"Bearer {self.api_key}"}
                 async with session.get(test_url, headers=headers) as response:
                     if response.status == 200:
@@ -10,7 +10,7 @@ from PIL import Image
 import aiohttp
 import json
 
-from jyra.utils.config import GEMINI_API_KEY
+from jyra.utils.config import GEMINI_API_KEY, GEMINI_API_BASE_URL
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -25,7 +25,7 @@ class ImageProcessor:
         """
         Initialize the image processor.
         """
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GEMINI_API_KEY}"
+        self.api_url = f"{GEMINI_API_BASE_URL}/models/gemini-1.5-flash:generateContent?key={GEMINI_API_KEY}"
         logger.info("Initialized processor")
 
     async def process(self, prompt: Optional[str] = None) -> str:
@@ -3,5 +3,6 @@ Sentiment analysis module for Jyra
 """
 
 from jyra.ai.sentiment.sentiment_analyzer import SentimentAnalyzer
+from jyra.ai.sentiment.lexicon_classifier import LexiconSentimentClassifier, lexicon_classifier
 
-__all__ = ['SentimentAnalyzer']
+__all__ = ['SentimentAnalyzer', 'LexiconSentimentClassifier', 'lexicon_classifier']
@@ -0,0 +1,259 @@
+"""
+Local lexicon-based sentiment classifier for Jyra
+
+A first tier in front of LLM sentiment analysis. An emotion lexicon picks an
+emotion from the analyzer's emotion set, and NLTK's VADER (when its lexicon is
+installed) supplies polarity and intensity. Each result carries a confidence;
+the analyzer escalates to the LLM when confidence is low or intensity is high,
+since strong emotions are where the tone of the reply matters most. A message
+without emotion words is only taken as neutral when it is short and VADER
+finds it mild: "my dog died this morning" has no word from the lexicon.
+
+Install the VADER lexicon with: python -m nltk.downloader vader_lexicon
+"""
+
+import re
+import time
+from typing import Dict, Any, List, Optional
+
+from jyra.ai.telemetry import llm_telemetry
+from jyra.utils.config import SENTIMENT_LEXICON_MIN_CONFIDENCE, SENTIMENT_ESCALATION_INTENSITY
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Words (and common inflections) that signal each emotion
+EMOTION_LEXICON = {
+    "happiness": ["happy", "glad", "great", "awesome", "wonderful", "fantastic", "amazing",
+                  "delighted", "joy", "joyful", "cheerful", "yay", "fun", "smile", "smiling",
+                  "lovely", "good", "nice", "best"],
+    "contentment": ["content", "calm", "relaxed", "peaceful", "comfortable", "cozy",
+                    "satisfied", "fine", "chill"],
+    "excitement": ["excited", "exciting", "thrilled", "pumped", "can't wait", "cant wait",
+                   "stoked", "hyped", "woohoo"],
+    "love": ["love", "loving", "adore", "crush", "sweetheart", "darling"],
+    "pride": ["proud", "accomplished", "achieved", "nailed"],
+    "optimism": ["optimistic", "positive", "looking forward", "confident", "bright side"],
+    "gratitude": ["thank", "thanks", "thankful", "grateful", "appreciate", "appreciated"],
+    "hope": ["hope", "hoping", "hopeful", "wish", "fingers crossed"],
+    "sadness": ["sad", "unhappy", "down", "depressed", "miserable", "crying", "cry", "cried",
+                "tears", "heartbroken", "upset", "blue", "gloomy"],
+    "disappointment": ["disappointed", "disappointing", "let down", "letdown", "bummed"],
+    "grief": ["grief", "grieving", "mourning", "passed away", "funeral", "lost my"],
+    "anxiety": ["anxious", "worried", "worry", "worrying", "nervous", "stressed", "stress",
+                "overwhelmed", "panic", "uneasy", "tense"],
+    "fear": ["afraid", "scared", "terrified", "frightened", "fear", "fearful"],
+    "anger": ["angry", "furious", "mad", "rage", "pissed", "hate", "livid", "outraged"],
+    "frustration": ["frustrated", "frustrating", "annoyed", "annoying", "irritated", "ugh",
+                    "fed up", "sick of"],
+    "disgust": ["disgusting", "disgusted", "gross", "revolting", "nasty", "yuck", "eww"],
+    "surprise": ["surprised", "surprising", "wow", "whoa", "unexpected", "shocked", "omg"],
+    "confusion": ["confused", "confusing", "don't understand", "dont understand", "lost",
+                  "unclear", "puzzled"],
+    "curiosity": ["curious", "wonder", "wondering", "interested", "how does", "why does"],
+    "nostalgia": ["nostalgic", "remember when", "miss the days", "back in the day",
+                  "good old days"],
+    "boredom": ["bored", "boring", "nothing to do", "dull", "meh"],
+    "loneliness": ["lonely", "alone", "isolated", "no friends", "nobody"],
+    "shame": ["ashamed", "embarrassed", "humiliated", "embarrassing"],
+    "guilt": ["guilty", "my fault", "regret", "sorry"],
+    "envy": ["jealous", "envious", "envy"]
+}
+
+POSITIVE_EMOTIONS = {"happiness", "contentment", "excitement", "love", "pride",
+                     "optimism", "gratitude", "hope"}
+NEGATIVE_EMOTIONS = {"sadness", "disappointment", "grief", "anxiety", "fear", "anger",
+                     "frustration", "disgust", "boredom", "loneliness", "shame", "guilt", "envy"}
+
+INTENSIFIERS = {"very", "so", "really", "extremely", "totally", "incredibly", "super",
+                "absolutely", "completely", "utterly"}
+NEGATIONS = {"not", "no", "never", "dont", "don't", "isnt", "isn't", "wasnt", "wasn't",
+             "cant", "can't", "aint", "ain't", "without", "hardly"}
+
+# Longest message without emotion words that may be answered as neutral locally
+NEUTRAL_MAX_WORDS = 3
+
+_TOKEN_PATTERN = re.compile(r"[a-z']+")
+
+
+def _compile_phrases(lexicon: Dict[str, List[str]]) -> List[tuple]:
+    """Compile lexicon entries into (pattern, emotion) pairs, longest first."""
+    entries = [(phrase, emotion) for emotion, phrases in lexicon.items() for phrase in phrases]
+    entries.sort(key=lambda entry: -len(entry[0]))
+    return [(re.compile(r"\b" + re.escape(phrase) + r"\b"), phrase, emotion)
+            for phrase, emotion in entries]
+
+
+class LexiconSentimentClassifier:
+    """
+    Class for classifying sentiment locally with an emotion lexicon and VADER.
+    """
+
+    def __init__(self, min_confidence: float = SENTIMENT_LEXICON_MIN_CONFIDENCE,
+                 escalation_intensity: int = SENTIMENT_ESCALATION_INTENSITY,
+                 neutral_max_words: int = NEUTRAL_MAX_WORDS):
+        """
+        Initialize the classifier.
+
+        Args:
+            min_confidence (float): Results below this confidence are escalated
+            escalation_intensity (int): Results at or above this intensity are escalated
+            neutral_max_words (int): Longest message without emotion words that
+                is confidently neutral
+        """
+        self.min_confidence = min_confidence
+        self.escalation_intensity = escalation_intensity
+        self.neutral_max_words = neutral_max_words
+        self._phrases = _compile_phrases(EMOTION_LEXICON)
+        self._vader = self._load_vader()
+        self.local_results = 0
+        self.escalations = 0
+        self.total_seconds = 0.0
+
+    @staticmethod
+    def _load_vader() -> Optional[Any]:
+        """Load NLTK's VADER analyzer, or None if its lexicon is not installed."""
+        try:
+            from nltk.sentiment.vader import SentimentIntensityAnalyzer
+            return SentimentIntensityAnalyzer()
+        except (ImportError, LookupError):
+            logger.warning(
+                "VADER lexicon not available, using the emotion lexicon only "
+                "(install it with: python -m nltk.downloader vader_lexicon)")
+            return None
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        """
+        Classify the sentiment of a message.
+
+        Args:
+            text (str): The text to classify
+
+        Returns:
+            Dict[str, Any]: primary_emotion, intensity (1-5), explanation and
+                confidence (0-1)
+        """
+        start = time.perf_counter()
+        lowered = text.lower()
+        tokens = _TOKEN_PATTERN.findall(lowered)
+
+        # Count lexicon hits per emotion, skipping negated ones ("not happy")
+        hits: Dict[str, List[str]] = {}
+        negated = False
+        matched = lowered
+        for pattern, phrase, emotion in self._phrases:
+            for match in pattern.finditer(matched):
+                preceding = _TOKEN_PATTERN.findall(matched[max(0, match.start() - 20):match.start()])
+                if any(word in NEGATIONS for word in preceding[-3:]):
+                    negated = True
+                    continue
+                hits.setdefault(emotion, []).append(phrase)
+            # Blank out matched phrases so that "let down" doesn't also count as "down"
+            matched = pattern.sub(lambda m: " " * len(m.group(0)), matched)
+
+        compound = self._vader.polarity_scores(text)["compound"] if self._vader else None
+
+        if hits:
+            emotion = max(hits, key=lambda name: len(hits[name]))
+            total = sum(len(words) for words in hits.values())
+            dominant = len(hits[emotion])
+            confidence = (dominant / total) * min(0.95, 0.6 + 0.2 * dominant)
+
+            # VADER disagreeing with the emotion's polarity means sarcasm or mixed feelings
+            if compound is not None and (
+                    (emotion in POSITIVE_EMOTIONS and compound < -0.3) or
+                    (emotion in NEGATIVE_EMOTIONS and compound > 0.3)):
+                confidence *= 0.5
+            explanation = f"Lexicon match: {', '.join(sorted(set(hits[emotion])))}"
+        else:
+            emotion = "neutral"
+            # Missing emotion words only mean neutral for a short message VADER
+            # finds mild; without VADER, or for longer or polar text, ask the LLM
+            mild = compound is not None and abs(compound) < 0.5
+            confidence = 0.7 if mild and len(tokens) <= self.neutral_max_words else 0.3
+            explanation = "No emotion words found"
+
+        if negated:
+            confidence *= 0.5
+
+        intensity = self._estimate_intensity(text, tokens, hits.get(emotion, []), compound)
+        self.total_seconds += time.perf_counter() - start
+
+        return {
+            "primary_emotion": emotion,
+            "intensity": intensity,
+            "explanation": explanation,
+            "confidence": round(confidence, 3)
+        }
+
+    def _estimate_intensity(self, text: str, tokens: List[str], emotion_words: List[str],
+                            compound: Optional[float]) -> int:
+        """
+        Estimate the intensity (1-5) of a message.
+
+        Args:
+            text (str): The original text
+            tokens (List[str]): Lower-case word tokens
+            emotion_words (List[str]): Lexicon hits for the chosen emotion
+            compound (Optional[float]): VADER compound score, if available
+
+        Returns:
+            int: The intensity
+        """
+        if compound is not None:
+            intensity = 1 + round(abs(compound) * 3)
+        else:
+            intensity = 1 + min(len(emotion_words), 2)
+
+        emphasis = 0
+        if any(token in INTENSIFIERS for token in tokens):
+            emphasis += 1
+        if "!" in text:
+            emphasis += 1
+        if any(word.isupper() and len(word) > 2 for word in text.split()):
+            emphasis += 1
+        if emotion_words:
+            intensity += min(emphasis, 2)
+
+        return max(1, min(5, intensity))
+
+    def should_escalate(self, result: Dict[str, Any]) -> bool:
+        """
+        Check whether a local result should be confirmed by the LLM.
+
+        Args:
+            result (Dict[str, Any]): A result from classify
+
+        Returns:
+            bool: True if the LLM should analyze the message
+        """
+        escalate = (result["confidence"] < self.min_confidence or
+                    result["intensity"] >= self.escalation_intensity)
+        if escalate:
+            self.escalations += 1
+        else:
+            self.local_results += 1
+        return escalate
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get how often the local tier answered and how fast it was.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        decided = self.local_results + self.escalations
+        return {
+            "vader": self._vader is not None,
+            "local_results": self.local_results,
+            "escalations": self.escalations,
+            "local_rate": round(self.local_results / decided, 3) if decided else 0.0,
+            "avg_classify_ms": round(self.total_seconds * 1000 / decided, 3) if decided else 0.0
+        }
+
+
+# Create a singleton instance
+lexicon_classifier = LexiconSentimentClassifier()
+
+# Report how many messages skip the LLM alongside call telemetry
+llm_telemetry.register_source("sentiment_lexicon", lexicon_classifier.get_stats)
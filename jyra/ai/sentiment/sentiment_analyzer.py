@@ -2,25 +2,52 @@
 Sentiment analysis module for Jyra
 """
 
-import re
 from typing import Dict, Any, Tuple, List, Optional
-import json
 
 from jyra.ai.models.model_manager import model_manager
+from jyra.ai.cache.semantic_cache import semantic_cache
+from jyra.ai.sentiment.lexicon_classifier import lexicon_classifier
+from jyra.ai.telemetry import call_site
+from jyra.utils.config import SENTIMENT_LEXICON_ENABLED
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Emotions the model may choose from
+SENTIMENT_EMOTIONS = [
+    "happiness", "contentment", "excitement", "love", "pride", "optimism",
+    "sadness", "disappointment", "grief", "anxiety", "fear", "anger",
+    "frustration", "disgust", "surprise", "confusion", "curiosity", "nostalgia",
+    "gratitude", "hope", "boredom", "loneliness", "shame", "guilt", "envy", "neutral"
+]
+
+# Answer schema for sentiment analysis
+SENTIMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "primary_emotion": {"type": "string", "enum": SENTIMENT_EMOTIONS},
+        "intensity": {"type": "integer", "description": "1 (very mild) to 5 (very intense)"},
+        "explanation": {"type": "string", "description": "One sentence citing cues in the text"}
+    },
+    "required": ["primary_emotion", "intensity", "explanation"]
+}
+
 
 class SentimentAnalyzer:
     """
     Class for analyzing sentiment in user messages.
     """
 
-    def __init__(self):
+    def __init__(self, use_lexicon: bool = SENTIMENT_LEXICON_ENABLED):
         """
         Initialize the sentiment analyzer.
+
+        Args:
+            use_lexicon (bool): Whether to try the local lexicon classifier
+                before the LLM
         """
+        self.use_lexicon = use_lexicon
+
         # Emotion categories
         self.emotions = [
             "happiness", "sadness", "anger", "fear",
@@ -43,8 +70,24 @@ class SentimentAnalyzer:
             Dict[str, Any]: Sentiment analysis results
         """
         try:
-            # Use Gemini to analyze sentiment
-            result = await self._analyze_with_gemini(text)
+            # Answer locally when the lexicon is confident and the emotion is mild
+            if self.use_lexicon:
+                local_result = lexicon_classifier.classify(text)
+                if not lexicon_classifier.should_escalate(local_result):
+                    local_result.pop("confidence")
+                    logger.info(
+                        f"Sentiment classified locally: {local_result['primary_emotion']} ({local_result['intensity']})")
+                    return local_result
+
+            # Reuse the answer for a near-identical message when possible
+            with call_site("sentiment"):
+                result = await semantic_cache.get_or_compute(
+                    "sentiment", text,
+                    lambda: self._analyze_with_gemini(text),
+                    cacheable=lambda r: r.get(
+                        "explanation") != "Could not determine sentiment",
+                    agree=lambda a, b: a["primary_emotion"] == b["primary_emotion"]
+                )
             logger.info(
                 f"Sentiment analysis completed: {result['primary_emotion']} ({result['intensity']})")
             return result
@@ -67,79 +110,31 @@ class SentimentAnalyzer:
         Returns:
             Dict[str, Any]: Sentiment analysis results
         """
-        # Create the prompt for sentiment analysis
-        prompt = f"""
-        You are Jyra, an emotionally intelligent AI companion with exceptional emotional perception abilities.
-
-        Analyze the emotional tone of the following message with nuance and depth:
-
-        "{text}"
-
-        Identify the primary emotion expressed and any underlying secondary emotions. Consider subtle cues in language, context, and expression. Rate the intensity on a scale of 1-5, where 1 is very mild and 5 is very intense.
-
-        Primary emotions to consider: happiness, contentment, excitement, love, pride, optimism, sadness, disappointment, grief, anxiety, fear, anger, frustration, disgust, surprise, confusion, curiosity, nostalgia, gratitude, hope, boredom, loneliness, shame, guilt, envy.
-
-        Provide a thoughtful explanation of why you identified these emotions, noting specific language patterns or contextual clues.
-
-        Respond in JSON format:
-        {{
-            "primary_emotion": "emotion_name",
-            "intensity": intensity_value,
-            "explanation": "thoughtful explanation with specific evidence from the text"
-        }}
-        """
-
-        # Create a role context for sentiment analysis
-        sentiment_role_context = {
-            "name": "Sentiment Analyzer",
-            "personality": "Analytical and perceptive",
-            "speaking_style": "Precise and structured",
-            "knowledge_areas": "Emotional intelligence, psychology, language patterns",
-            "behaviors": "Analyzes emotions accurately, provides structured responses"
-        }
+        # The schema carries the answer format, so the prompt only states the task
+        prompt = (
+            "Identify the primary emotion of this message and rate its intensity "
+            "from 1 (very mild) to 5 (very intense), considering subtle cues in "
+            f"language and context.\n\nMessage: \"{text}\""
+        )
 
         try:
             # Use model_manager with fallback capability
-            response_tuple = await model_manager.generate_response(
+            sentiment_data, model_used = await model_manager.generate_structured(
                 prompt=prompt,
-                role_context=sentiment_role_context,
+                schema=SENTIMENT_SCHEMA,
+                system_instruction="You are an emotionally perceptive sentiment analyzer.",
                 temperature=0.1,  # Low temperature for consistent results
-                max_tokens=200,    # Short response
-                top_p=0.95,
-                top_k=40,
+                max_tokens=120,
                 use_fallbacks=True
             )
-
-            # Extract response and model used
-            response_text, model_used = response_tuple
             logger.info(f"Sentiment analysis using model: {model_used}")
 
-            # Extract JSON from the response
-            try:
-                # Find JSON in the response
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    sentiment_data = json.loads(json_str)
-
-                    # Validate and normalize the response
-                    primary_emotion = sentiment_data.get(
-                        "primary_emotion", "neutral").lower()
-                    intensity = int(
-                        sentiment_data.get("intensity", 3))
-                    explanation = sentiment_data.get(
-                        "explanation", "")
-
-                    # Ensure intensity is in range 1-5
-                    intensity = max(1, min(5, intensity))
-
-                    return {
-                        "primary_emotion": primary_emotion,
-                        "intensity": intensity,
-                        "explanation": explanation
-                    }
-            except Exception as e:
-                logger.error(f"Error parsing sentiment JSON: {str(e)}")
+            return {
+                "primary_emotion": sentiment_data["primary_emotion"],
+                # Ensure intensity is in range 1-5
+                "intensity": max(1, min(5, sentiment_data["intensity"])),
+                "explanation": sentiment_data["explanation"]
+            }
 
         except Exception as e:
             logger.error(f"Error in sentiment analysis: {str(e)}")
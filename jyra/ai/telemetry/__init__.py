@@ -0,0 +1,11 @@
+"""
+LLM call telemetry module for Jyra
+"""
+
+from jyra.ai.telemetry.llm_telemetry import (
+    LLMTelemetry, RollingHistogram, call_site, current_call_site, fallback_call,
+    format_report, llm_telemetry, track_llm_call
+)
+
+__all__ = ['LLMTelemetry', 'RollingHistogram', 'call_site', 'current_call_site',
+           'fallback_call', 'format_report', 'llm_telemetry', 'track_llm_call']
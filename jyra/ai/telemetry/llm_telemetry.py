@@ -0,0 +1,523 @@
+"""
+LLM call telemetry for Jyra
+
+Records latency, token usage, estimated cost, cache hits and fallbacks for
+every generation and embedding call, broken down by call site (reply,
+sentiment, memory extraction, consolidation, ...) and model. Recent latency
+and token counts are kept in rolling histograms; lifetime totals are kept
+alongside them. Snapshots are written to disk periodically so that the CLI can
+read them from outside the bot process.
+"""
+
+import functools
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Callable, Iterator, Sequence
+
+from jyra.utils.config import (
+    TELEMETRY_ENABLED, TELEMETRY_WINDOW_SECONDS, TELEMETRY_FLUSH_SECONDS,
+    TELEMETRY_EXPORT_PATH
+)
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Histogram bucket upper bounds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+# The call site and call record of the task that is currently talking to a model
+_call_site: ContextVar[str] = ContextVar("llm_call_site", default="other")
+_fallback: ContextVar[bool] = ContextVar("llm_fallback", default=False)
+_active_call: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "llm_active_call", default=None)
+
+
+@contextmanager
+def call_site(name: str) -> Iterator[None]:
+    """
+    Attribute the LLM calls made inside the block to a call site.
+
+    Args:
+        name (str): Call site name, e.g. "reply" or "sentiment"
+    """
+    token = _call_site.set(name)
+    try:
+        yield
+    finally:
+        _call_site.reset(token)
+
+
+def current_call_site() -> str:
+    """
+    Get the call site of the current task.
+
+    Returns:
+        str: Call site name, "other" outside any call_site block
+    """
+    return _call_site.get()
+
+
+@contextmanager
+def fallback_call() -> Iterator[None]:
+    """
+    Mark the LLM calls made inside the block as fallback attempts.
+    """
+    token = _fallback.set(True)
+    try:
+        yield
+    finally:
+        _fallback.reset(token)
+
+
+class RollingHistogram:
+    """
+    Fixed-bucket histogram over a sliding time window.
+
+    The window is split into slots; a slot is reset when its time comes round
+    again, so old observations age out without storing individual samples.
+    """
+
+    def __init__(self, buckets: Sequence[float], window_seconds: int, slots: int = 12):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets (Sequence[float]): Bucket upper bounds in ascending order
+            window_seconds (int): Length of the window
+            slots (int): Number of slots the window is split into
+        """
+        self.buckets = tuple(buckets)
+        self.slots = slots
+        self.slot_seconds = max(1.0, window_seconds / slots)
+        self._epochs = [-1] * slots
+        self._counts = [[0] * (len(self.buckets) + 1) for _ in range(slots)]
+        self._sums = [0.0] * slots
+
+    def _slot(self, now: float) -> int:
+        """Get the slot for a timestamp, resetting it if it is stale."""
+        epoch = int(now // self.slot_seconds)
+        index = epoch % self.slots
+        if self._epochs[index] != epoch:
+            self._epochs[index] = epoch
+            self._counts[index] = [0] * (len(self.buckets) + 1)
+            self._sums[index] = 0.0
+        return index
+
+    def add(self, value: float, now: Optional[float] = None) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value (float): The observed value
+            now (Optional[float]): Observation time (defaults to now)
+        """
+        index = self._slot(time.time() if now is None else now)
+        bucket = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                bucket = i
+                break
+        self._counts[index][bucket] += 1
+        self._sums[index] += value
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Summarize the observations inside the window.
+
+        Percentiles are estimated as the upper bound of the bucket they fall in.
+
+        Args:
+            now (Optional[float]): Current time (defaults to now)
+
+        Returns:
+            Dict[str, Any]: count, mean, p50, p95, p99 and the bucket counts
+        """
+        now = time.time() if now is None else now
+        current = int(now // self.slot_seconds)
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for index, epoch in enumerate(self._epochs):
+            if epoch < 0 or current - epoch >= self.slots:
+                continue
+            counts = [a + b for a, b in zip(counts, self._counts[index])]
+            total += self._sums[index]
+
+        count = sum(counts)
+        summary = {
+            "count": count,
+            "mean": round(total / count, 1) if count else 0.0,
+            "buckets": {self._label(i): c for i, c in enumerate(counts) if c}
+        }
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            summary[name] = self._percentile(counts, q)
+        return summary
+
+    def _label(self, index: int) -> str:
+        """Get the label of a bucket."""
+        if index < len(self.buckets):
+            return f"<={self.buckets[index]:g}"
+        return f">{self.buckets[-1]:g}"
+
+    def _percentile(self, counts: List[int], q: float) -> Optional[float]:
+        """Estimate a percentile from bucket counts."""
+        count = sum(counts)
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(self.buckets):
+                    return float(self.buckets[index])
+                return float("inf")
+        return float("inf")
+
+
+class _CallSeries:
+    """
+    Aggregates for one (call site, model) pair.
+    """
+
+    def __init__(self, site: str, model: str, kind: str, window_seconds: int):
+        self.site = site
+        self.model = model
+        self.kind = kind
+        self.latency_ms = RollingHistogram(LATENCY_BUCKETS_MS, window_seconds)
+        self.tokens = RollingHistogram(TOKEN_BUCKETS, window_seconds)
+
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.fallbacks = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.estimated_tokens = 0
+        self.cost_usd = 0.0
+        self.last_error: Optional[str] = None
+
+    def add(self, record: Dict[str, Any], now: float) -> None:
+        """Fold a finished call into the aggregates."""
+        self.calls += 1
+        self.errors += 1 if record["error"] else 0
+        self.cache_hits += 1 if record["cache_hit"] else 0
+        self.fallbacks += 1 if record["fallback"] else 0
+        self.input_tokens += record["input_tokens"]
+        self.output_tokens += record["output_tokens"]
+        self.cached_tokens += record["cached_tokens"]
+        self.estimated_tokens += 1 if record["tokens_estimated"] else 0
+        self.cost_usd += record["cost_usd"]
+        if record["error"]:
+            self.last_error = record["error"]
+
+        self.latency_ms.add(record["latency_ms"], now)
+        if not record["cache_hit"] and not record["error"]:
+            self.tokens.add(record["input_tokens"] + record["output_tokens"], now)
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        """Convert the aggregates to a dictionary."""
+        return {
+            "call_site": self.site,
+            "model": self.model,
+            "kind": self.kind,
+            "calls": self.calls,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "fallbacks": self.fallbacks,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_tokens": self.cached_tokens,
+            "estimated_token_calls": self.estimated_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "last_error": self.last_error,
+            "latency_ms": self.latency_ms.summary(now),
+            "tokens": self.tokens.summary(now)
+        }
+
+
+class LLMTelemetry:
+    """
+    Collector for LLM call telemetry.
+    """
+
+    def __init__(self, enabled: bool = TELEMETRY_ENABLED,
+                 window_seconds: int = TELEMETRY_WINDOW_SECONDS,
+                 flush_seconds: int = TELEMETRY_FLUSH_SECONDS,
+                 export_path: Optional[str] = TELEMETRY_EXPORT_PATH):
+        """
+        Initialize the telemetry collector.
+
+        Args:
+            enabled (bool): Whether calls are recorded
+            window_seconds (int): Length of the rolling histogram window
+            flush_seconds (int): Minimum interval between snapshot writes
+            export_path (Optional[str]): Where snapshots are written (None to disable)
+        """
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.flush_seconds = flush_seconds
+        self.export_path = export_path
+        self.started_at = time.time()
+
+        self._series: Dict[tuple, _CallSeries] = {}
+        self._sources: Dict[str, Callable[[], Any]] = {}
+        self._last_flush = 0.0
+
+    def register_source(self, name: str, get_stats: Callable[[], Any]) -> None:
+        """
+        Include another component's statistics in snapshots.
+
+        Args:
+            name (str): Section name in the snapshot
+            get_stats (Callable[[], Any]): Returns JSON-serializable statistics
+        """
+        self._sources[name] = get_stats
+
+    @contextmanager
+    def track(self, model: str, kind: str = "generate",
+              cost_per_1k_tokens: float = 0.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Record one model call made inside the block.
+
+        Providers fill in token usage and cache hits through record_usage and
+        mark_cache_hit while the block is active.
+
+        Args:
+            model (str): Model name
+            kind (str): "generate" or "embedding"
+            cost_per_1k_tokens (float): Price used for the cost estimate
+
+        Yields:
+            Optional[Dict[str, Any]]: The call record, or None when disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        record = {
+            "call_site": _call_site.get(),
+            "model": model,
+            "kind": kind,
+            "fallback": _fallback.get(),
+            "cache_hit": False,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cached_tokens": 0,
+            "tokens_estimated": False,
+            "error": None
+        }
+        token = _active_call.set(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            _active_call.reset(token)
+            record["latency_ms"] = (time.perf_counter() - start) * 1000
+            billable = 0 if record["cache_hit"] else (
+                record["input_tokens"] + record["output_tokens"])
+            record["cost_usd"] = billable / 1000 * cost_per_1k_tokens
+            self._record(record)
+
+    def record_usage(self, input_tokens: int = 0, output_tokens: int = 0,
+                     cached_tokens: int = 0, estimated: bool = False) -> None:
+        """
+        Report token usage for the call in progress.
+
+        Args:
+            input_tokens (int): Prompt tokens
+            output_tokens (int): Completion tokens
+            cached_tokens (int): Prompt tokens served from a provider-side cache
+            estimated (bool): Whether the counts are estimates rather than
+                provider-reported usage
+        """
+        record = _active_call.get()
+        if record is None:
+            return
+        record["input_tokens"] = int(input_tokens or 0)
+        record["output_tokens"] = int(output_tokens or 0)
+        record["cached_tokens"] = int(cached_tokens or 0)
+        record["tokens_estimated"] = estimated
+
+    def mark_cache_hit(self) -> None:
+        """
+        Mark the call in progress as answered from a local cache.
+        """
+        record = _active_call.get()
+        if record is not None:
+            record["cache_hit"] = True
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        """Aggregate a finished call and flush a snapshot if one is due."""
+        now = time.time()
+        key = (record["call_site"], record["model"])
+        series = self._series.get(key)
+        if series is None:
+            series = _CallSeries(
+                record["call_site"], record["model"], record["kind"], self.window_seconds)
+            self._series[key] = series
+        series.add(record, now)
+
+        if self.export_path and now - self._last_flush >= self.flush_seconds:
+            self._last_flush = now
+            self.export(self.export_path)
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Get all telemetry as a JSON-serializable dictionary.
+
+        Returns:
+            Dict[str, Any]: Per-series aggregates, per-site totals and
+                statistics from registered sources
+        """
+        now = time.time()
+        series = [s.to_dict(now) for s in sorted(
+            self._series.values(), key=lambda s: (s.site, s.model))]
+
+        by_site: Dict[str, Dict[str, Any]] = {}
+        for item in series:
+            site = by_site.setdefault(item["call_site"], {
+                "calls": 0, "errors": 0, "cache_hits": 0, "fallbacks": 0,
+                "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0,
+                "latency_ms_total": 0.0
+            })
+            for field in ("calls", "errors", "cache_hits", "fallbacks",
+                          "input_tokens", "output_tokens", "cost_usd"):
+                site[field] += item[field]
+            site["latency_ms_total"] += item["latency_ms"]["mean"] * item["latency_ms"]["count"]
+        for site in by_site.values():
+            site["cost_usd"] = round(site["cost_usd"], 6)
+            site["latency_ms_total"] = round(site["latency_ms_total"], 1)
+
+        sources = {}
+        for name, get_stats in self._sources.items():
+            try:
+                sources[name] = get_stats()
+            except Exception as e:
+                logger.warning(f"Error collecting {name} statistics: {str(e)}")
+
+        return {
+            "generated_at": now,
+            "started_at": self.started_at,
+            "window_seconds": self.window_seconds,
+            "by_call_site": by_site,
+            "series": series,
+            "sources": sources
+        }
+
+    def export(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        Write a snapshot to a JSON file.
+
+        Args:
+            path (Optional[str]): Output path (defaults to the export path)
+
+        Returns:
+            Optional[str]: The path written, or None on failure
+        """
+        path = path or self.export_path or TELEMETRY_EXPORT_PATH
+        try:
+            output = Path(path)
+            output.parent.mkdir(parents=True, exist_ok=True)
+            temp = output.with_suffix(output.suffix + ".tmp")
+            temp.write_text(json.dumps(self.get_snapshot(), indent=2, default=str))
+            temp.replace(output)
+            return str(output)
+        except Exception as e:
+            logger.error(f"Error exporting telemetry: {str(e)}")
+            return None
+
+    def reset(self) -> None:
+        """
+        Forget all recorded calls.
+        """
+        self._series.clear()
+        self.started_at = time.time()
+
+
+def format_report(snapshot: Dict[str, Any], max_series: int = 20) -> str:
+    """
+    Format a telemetry snapshot as a plain-text report.
+
+    Args:
+        snapshot (Dict[str, Any]): A snapshot from LLMTelemetry.get_snapshot
+        max_series (int): Maximum number of per-model lines
+
+    Returns:
+        str: The report
+    """
+    window_minutes = snapshot.get("window_seconds", 0) // 60
+    lines = ["LLM calls by call site (lifetime):"]
+
+    by_site = snapshot.get("by_call_site", {})
+    if not by_site:
+        lines.append("  no calls recorded")
+    for site, totals in sorted(by_site.items(), key=lambda item: -item[1]["latency_ms_total"]):
+        lines.append(
+            f"  {site}: {totals['calls']} calls, {totals['errors']} errors, "
+            f"{totals['cache_hits']} cache hits, {totals['fallbacks']} fallbacks, "
+            f"{totals['input_tokens']}+{totals['output_tokens']} tokens, "
+            f"${totals['cost_usd']:.4f}")
+
+    series = snapshot.get("series", [])
+    if series:
+        lines.append("")
+        lines.append(f"Latency and tokens, last {window_minutes} min:")
+        for item in series[:max_series]:
+            latency = item["latency_ms"]
+            tokens = item["tokens"]
+            if not latency["count"]:
+                continue
+            lines.append(
+                f"  {item['call_site']} / {item['model']}: {latency['count']} calls, "
+                f"p50 {_format_bound(latency['p50'], LATENCY_BUCKETS_MS)} ms, "
+                f"p95 {_format_bound(latency['p95'], LATENCY_BUCKETS_MS)} ms, "
+                f"p50 tokens {_format_bound(tokens['p50'], TOKEN_BUCKETS)}")
+
+    for name, stats in snapshot.get("sources", {}).items():
+        lines.append("")
+        lines.append(f"{name}: {json.dumps(stats, default=str)}")
+
+    return "\n".join(lines)
+
+
+def _format_bound(value: Optional[float], buckets: Sequence[float]) -> str:
+    """Format a histogram percentile estimate."""
+    if value is None:
+        return "-"
+    if value == float("inf"):
+        return f">{buckets[-1]:g}"
+    return f"<={value:g}"
+
+
+def track_llm_call(kind: str = "generate") -> Callable:
+    """
+    Decorate a model method so that each call is recorded.
+
+    The instance must expose model_name and may expose cost_per_1k_tokens.
+
+    Args:
+        kind (str): "generate" or "embedding"
+
+    Returns:
+        Callable: The decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            with llm_telemetry.track(self.model_name, kind,
+                                     getattr(self, "cost_per_1k_tokens", 0.0)):
+                return await func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Create a singleton instance
+llm_telemetry = LLMTelemetry()
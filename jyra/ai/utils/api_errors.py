@@ -0,0 +1,105 @@
+"""
+API error handling utilities for Jyra.
+
+This module turns error responses from the Gemini and OpenAI HTTP APIs into
+Jyra exceptions, including the retry delay requested by the provider.
+"""
+
+import json
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Mapping
+
+from jyra.utils.exceptions import AIModelException, APIRateLimitException, APIAuthenticationException
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_DURATION_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)s\s*$")
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]] = None,
+                      error: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """
+    Get the retry delay requested by the provider.
+
+    The standard Retry-After header (seconds or HTTP date) is checked first,
+    then Gemini's RetryInfo error detail (e.g. "retryDelay": "30s").
+
+    Args:
+        headers (Optional[Mapping[str, str]]): Response headers
+        error (Optional[Dict[str, Any]]): The "error" object of the response body
+
+    Returns:
+        Optional[float]: Delay in seconds, or None if the provider did not specify one
+    """
+    value = headers.get("Retry-After") if headers else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+                if retry_at.tzinfo is None:
+                    retry_at = retry_at.replace(tzinfo=timezone.utc)
+                return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                logger.warning(f"Unparseable Retry-After header: {value}")
+
+    if error:
+        for detail in error.get("details", []) or []:
+            if not isinstance(detail, dict):
+                continue
+            if str(detail.get("@type", "")).endswith("RetryInfo"):
+                match = _DURATION_PATTERN.match(str(detail.get("retryDelay", "")))
+                if match:
+                    return float(match.group(1))
+
+    return None
+
+
+async def raise_for_api_error(response, api: str, model_name: str) -> None:
+    """
+    Raise the Jyra exception matching an unsuccessful API response.
+
+    Args:
+        response: The aiohttp response with a non-200 status
+        api (str): API name used in exception messages ("Gemini" or "OpenAI")
+        model_name (str): Name of the model that was called
+
+    Raises:
+        APIRateLimitException: If the API rate limit is reached
+        APIAuthenticationException: If there's an authentication error
+        AIModelException: For any other error
+    """
+    error_text = await response.text()
+    logger.error(f"API error: {response.status}, {error_text}")
+
+    error = {}
+    try:
+        error_data = json.loads(error_text)
+        if isinstance(error_data, dict) and isinstance(error_data.get("error"), dict):
+            error = error_data["error"]
+    except json.JSONDecodeError:
+        pass
+
+    status = response.status
+    code = error.get("code") if isinstance(error.get("code"), int) else status
+    # OpenAI reports a "type", Gemini a gRPC "status" such as RESOURCE_EXHAUSTED
+    error_type = str(error.get("type") or error.get("status") or "").lower()
+    error_message = error.get("message")
+
+    if status == 429 or code == 429 or "rate_limit" in error_type or error_type == "resource_exhausted":
+        raise APIRateLimitException(
+            api, error_message or f"Rate limit exceeded (HTTP {status})",
+            retry_after=parse_retry_after(response.headers, error))
+
+    if status in (401, 403) or code in (401, 403) or "authentication" in error_type:
+        raise APIAuthenticationException(
+            api, error_message or f"Authentication error (HTTP {status})")
+
+    if error_message:
+        raise AIModelException(model_name, f"API error: {error_message}")
+
+    raise AIModelException(model_name, f"API error: HTTP {status}")
@@ -0,0 +1,214 @@
+"""
+Structured output utilities for Jyra.
+
+Auxiliary tasks (sentiment analysis, memory extraction) describe their answer
+with a small JSON schema. The same schema is translated into Gemini's
+responseSchema and OpenAI's response_format, and model output is validated
+against it in a single pass instead of being searched for with regexes.
+
+Supported schema keywords: type (object, array, string, integer, number,
+boolean), properties, required, items, enum, nullable and description.
+"""
+
+import json
+from typing import Dict, Any, List
+
+from jyra.utils.exceptions import StructuredOutputException
+
+_TYPE_CHECKS = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "boolean": lambda value: isinstance(value, bool),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)
+}
+
+_GEMINI_KEYS = ("type", "properties", "required", "items", "enum", "nullable", "description")
+
+
+def validate_structured(value: Any, schema: Dict[str, Any], path: str = "$") -> Any:
+    """
+    Validate a decoded JSON value against a schema.
+
+    Integral floats are accepted for integer fields and returned as ints.
+
+    Args:
+        value (Any): The decoded value
+        schema (Dict[str, Any]): The schema
+        path (str): Location of the value, used in error messages
+
+    Returns:
+        Any: The validated value
+
+    Raises:
+        ValueError: If the value does not match the schema
+    """
+    if value is None:
+        if schema.get("nullable"):
+            return None
+        raise ValueError(f"{path} must not be null")
+
+    expected = schema.get("type")
+    if expected == "integer" and isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if expected and not _TYPE_CHECKS[expected](value):
+        raise ValueError(f"{path} must be of type {expected}")
+
+    if "enum" in schema and value not in schema["enum"]:
+        raise ValueError(f"{path} must be one of {schema['enum']}")
+
+    if expected == "object":
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in value:
+                raise ValueError(f"{path}.{key} is required")
+        return {
+            key: validate_structured(item, properties[key], f"{path}.{key}")
+            if key in properties else item
+            for key, item in value.items()
+        }
+
+    if expected == "array" and "items" in schema:
+        return [validate_structured(item, schema["items"], f"{path}[{i}]")
+                for i, item in enumerate(value)]
+
+    return value
+
+
+def parse_structured(text: str, schema: Dict[str, Any], model: str = None) -> Any:
+    """
+    Parse and validate a model's JSON answer.
+
+    Args:
+        text (str): The raw model output
+        schema (Dict[str, Any]): The schema the output must match
+        model (str): Model name, used in error messages
+
+    Returns:
+        Any: The validated value
+
+    Raises:
+        StructuredOutputException: If the output is not valid JSON or does not match
+    """
+    text = text.strip()
+    # Models without a native JSON mode sometimes wrap the answer in a code fence
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+
+    try:
+        return validate_structured(json.loads(text), schema)
+    except (json.JSONDecodeError, ValueError) as e:
+        raise StructuredOutputException(model, str(e))
+
+
+def to_gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a schema to Gemini's responseSchema format.
+
+    Args:
+        schema (Dict[str, Any]): The schema
+
+    Returns:
+        Dict[str, Any]: The Gemini schema (OpenAPI subset with upper-case types)
+    """
+    converted = {key: value for key, value in schema.items() if key in _GEMINI_KEYS}
+    if "type" in converted:
+        converted["type"] = converted["type"].upper()
+    if "properties" in converted:
+        converted["properties"] = {key: to_gemini_schema(value)
+                                   for key, value in converted["properties"].items()}
+    if "items" in converted:
+        converted["items"] = to_gemini_schema(converted["items"])
+    return converted
+
+
+def to_openai_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a schema to OpenAI's strict JSON schema format.
+
+    Strict mode requires every property to be listed as required and no
+    additional properties, so optional and nullable fields become nullable types.
+
+    Args:
+        schema (Dict[str, Any]): The schema
+
+    Returns:
+        Dict[str, Any]: The OpenAI JSON schema
+    """
+    converted: Dict[str, Any] = {}
+    schema_type = schema.get("type")
+    if schema_type:
+        converted["type"] = [schema_type, "null"] if schema.get("nullable") else schema_type
+    for key in ("enum", "description"):
+        if key in schema:
+            converted[key] = list(schema[key]) if key == "enum" else schema[key]
+    if "enum" in converted and schema.get("nullable"):
+        converted["enum"].append(None)
+
+    if schema_type == "object":
+        required = set(schema.get("required", []))
+        properties: Dict[str, Any] = {}
+        for key, value in schema.get("properties", {}).items():
+            if key not in required:
+                value = {**value, "nullable": True}
+            properties[key] = to_openai_schema(value)
+        converted["properties"] = properties
+        converted["required"] = list(properties)
+        converted["additionalProperties"] = False
+
+    if schema_type == "array" and "items" in schema:
+        converted["items"] = to_openai_schema(schema["items"])
+
+    return converted
+
+
+def describe_schema(schema: Dict[str, Any]) -> str:
+    """
+    Render a schema for models that only support a plain JSON mode.
+
+    Args:
+        schema (Dict[str, Any]): The schema
+
+    Returns:
+        str: A compact JSON rendering of the schema
+    """
+    return json.dumps(schema, separators=(",", ":"))
+
+
+def example_from_schema(schema: Dict[str, Any], choose: Any = None) -> Any:
+    """
+    Build a minimal value that satisfies a schema.
+
+    Used by the mock LLM server to answer structured requests.
+
+    Args:
+        schema (Dict[str, Any]): The schema
+        choose (Any): Optional callable picking an enum value from a list
+
+    Returns:
+        Any: A value matching the schema
+    """
+    if "enum" in schema:
+        options: List[Any] = schema["enum"]
+        return choose(options) if choose else options[0]
+
+    # Accept Gemini (upper-case) and OpenAI (["type", "null"]) renderings too
+    schema_type = schema.get("type") or ""
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "")
+    schema_type = schema_type.lower()
+    if schema_type == "object":
+        properties = schema.get("properties", {})
+        return {key: example_from_schema(properties[key], choose)
+                for key in schema.get("required", properties.keys())
+                if key in properties}
+    if schema_type == "array":
+        return []
+    if schema_type == "integer":
+        return 3
+    if schema_type == "number":
+        return 0.5
+    if schema_type == "boolean":
+        return False
+    return "mock"
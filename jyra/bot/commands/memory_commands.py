@@ -6,6 +6,7 @@ from jyra.bot.commands.improved_search import improved_search_memories
 from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
 
+from jyra.ai.telemetry import call_site
 from jyra.db.models.memory_semantic import generate_embeddings_for_all_memories
 from jyra.utils.logger import setup_logger
 
@@ -22,8 +23,9 @@ async def cmd_generate_embeddings(update: Update, _: ContextTypes.DEFAULT_TYPE)
     message = await update.message.reply_text("Generating embeddings for all memories... This may take a while.")
 
     try:
-        # Generate embeddings for all memories
-        await generate_embeddings_for_all_memories()
+        # Generate embeddings for all memories, behind interactive work in the LLM scheduler
+        with call_site("embedding_backfill"):
+            await generate_embeddings_for_all_memories()
 
         # Update the message to indicate completion
         await message.edit_text("✅ Embeddings generated successfully for all memories!")
@@ -0,0 +1,90 @@
+"""
+LLM telemetry commands for Jyra bot.
+"""
+
+import io
+import json
+from datetime import datetime
+
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+
+from jyra.ai.telemetry import llm_telemetry, format_report
+from jyra.db.models.user import User
+from jyra.utils.config import ADMIN_USER_IDS
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4000
+
+
+async def _is_admin(user_id: int) -> bool:
+    """
+    Check whether a user may see operational statistics.
+
+    Args:
+        user_id (int): Telegram user ID
+
+    Returns:
+        bool: True for configured or database admins
+    """
+    if user_id in ADMIN_USER_IDS:
+        return True
+    db_user = await User.get_user(user_id)
+    return bool(db_user and db_user.is_admin)
+
+
+async def cmd_llm_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Show LLM latency, token and cost statistics per call site.
+
+    Usage: /llmstats [json|reset]
+
+    Examples:
+    /llmstats - Show a summary
+    /llmstats json - Send the full snapshot as a JSON file
+    /llmstats reset - Forget the recorded calls
+    """
+    user_id = update.effective_user.id
+    if not await _is_admin(user_id):
+        await update.message.reply_text(
+            "You don't have permission to view LLM statistics.")
+        return
+
+    option = context.args[0].lower() if context.args else ""
+
+    try:
+        if option == "reset":
+            llm_telemetry.reset()
+            await update.message.reply_text("LLM statistics have been reset.")
+            return
+
+        snapshot = llm_telemetry.get_snapshot()
+
+        if option == "json":
+            data = json.dumps(snapshot, indent=2, default=str).encode()
+            filename = f"llm_telemetry_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            await update.message.reply_document(
+                document=io.BytesIO(data), filename=filename)
+            return
+
+        report = format_report(snapshot)
+        if len(report) > MAX_MESSAGE_LENGTH:
+            report = report[:MAX_MESSAGE_LENGTH] + "\n…\nUse /llmstats json for the full report."
+        await update.message.reply_text(f"📈 LLM Statistics\n\n{report}")
+
+    except Exception as e:
+        logger.error(f"Error showing LLM statistics: {str(e)}")
+        await update.message.reply_text(f"❌ Error showing LLM statistics: {str(e)}")
+
+
+def register_telemetry_commands(application) -> None:
+    """
+    Register telemetry commands.
+
+    Args:
+        application: The telegram application
+    """
+    application.add_handler(CommandHandler("llmstats", cmd_llm_stats))
@@ -11,6 +11,7 @@ from jyra.db.models.memory import Memory
 from jyra.bot.commands.visualization_commands import handle_visualization_callback
 from jyra.bot.commands.consolidation_commands import handle_consolidation_callback
 from jyra.bot.commands.decay_commands import handle_decay_callback
+from jyra.bot.utils.request_context import get_request_context
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -279,10 +280,12 @@ async def handle_settings_selection(update: Update, context: ContextTypes.DEFAUL
 
     elif setting == "memory":
         # Toggle memory setting
-        preferences = await User.get_user_preferences(user_id)
+        request = get_request_context(update, context)
+        preferences = await request.get_preferences()
         new_memory_setting = not preferences["memory_enabled"]
 
         await User.update_user_preferences(user_id, {"memory_enabled": new_memory_setting})
+        request.invalidate("preferences")
 
         # Update settings menu
         await show_settings_menu(update, context)
@@ -313,6 +316,7 @@ async def handle_settings_selection(update: Update, context: ContextTypes.DEFAUL
                 await User.update_user_preferences(user_id, {"response_length": setting_value})
             elif setting_type == "formality":
                 await User.update_user_preferences(user_id, {"formality_level": setting_value})
+            get_request_context(update, context).invalidate("preferences")
 
             # Show updated settings menu
             await show_settings_menu(update, context)
@@ -327,10 +331,9 @@ async def show_settings_menu(update: Update, context: ContextTypes.DEFAULT_TYPE)
         context (ContextTypes.DEFAULT_TYPE): The context object
     """
     query = update.callback_query
-    user_id = query.from_user.id
 
     # Get current preferences
-    preferences = await User.get_user_preferences(user_id)
+    preferences = await get_request_context(update, context).get_preferences()
 
     # Create inline keyboard with settings
     keyboard = [
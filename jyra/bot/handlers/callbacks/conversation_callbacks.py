@@ -5,11 +5,15 @@ Callback handlers for conversation controls.
 from telegram import Update, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
-from jyra.db.models.user import User
 from jyra.db.models.conversation import Conversation
 from jyra.db.models.memory import Memory
-from jyra.ui.buttons import create_callback_button, create_main_menu_keyboard
+from jyra.bot.utils.request_context import get_request_context
+from jyra.db.utils.pagination import decode_page_token
+from jyra.ui.buttons import (
+    create_callback_button, create_main_menu_keyboard, create_page_navigation_row
+)
 from jyra.ui.formatting import bold, italic, emoji_prefix
+from jyra.ai.telemetry import call_site
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -55,8 +59,7 @@ async def handle_conversation_callback(update: Update, context: ContextTypes.DEF
     
     elif callback_data.startswith("conversation_history_"):
         # View conversation history
-        page = int(callback_data.split("_")[-1])
-        await handle_view_history(update, context, page)
+        await handle_view_history(update, context, callback_data[len("conversation_history_"):])
     
     else:
         logger.warning(f"Unknown conversation callback: {callback_data}")
@@ -91,21 +94,20 @@ async def handle_regenerate(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     try:
         # Get user's current role
-        user = await User.get_user(user_id)
-        role_id = user.current_role_id if user else None
+        request = get_request_context(update, context)
+        role = await request.get_role()
+        role_id = role.role_id if role else None
         
         # Get the AI model
         from jyra.ai.models.gemini_direct import GeminiAI
         gemini_ai = GeminiAI()
         
         # Get conversation history
-        conversation_history = await Conversation.get_conversation_history(user_id, role_id, limit=5)
+        conversation_history = await request.get_history(role_id, limit=5)
         
         # Get role context
-        from jyra.db.models.role import Role
-        role = await Role.get_role(role_id) if role_id else None
-        
         role_context = {
+            "role_id": role.role_id if role else None,
             "name": role.name if role else "AI Assistant",
             "personality": role.personality if role else "Helpful and friendly",
             "speaking_style": role.speaking_style if role else "Conversational",
@@ -114,11 +116,12 @@ async def handle_regenerate(update: Update, context: ContextTypes.DEFAULT_TYPE)
         }
         
         # Generate new response
-        new_response = await gemini_ai.generate_response(
-            prompt=last_message.user_message,
-            role_context=role_context,
-            conversation_history=conversation_history[:-1]  # Exclude the last message
-        )
+        with call_site("reply"):
+            new_response = await gemini_ai.generate_response(
+                prompt=last_message.user_message,
+                role_context=role_context,
+                conversation_history=conversation_history[:-1]  # Exclude the last message
+            )
         
         # Update the conversation in the database
         await Conversation.update_bot_response(last_message.conversation_id, new_response)
@@ -154,10 +157,10 @@ async def handle_save_conversation(update: Update, context: ContextTypes.DEFAULT
     user_id = update.effective_user.id
     
     # Get the conversation history
-    user = await User.get_user(user_id)
-    role_id = user.current_role_id if user else None
+    request = get_request_context(update, context)
+    role = await request.get_role()
     
-    conversation_history = await Conversation.get_conversation_history(user_id, role_id, limit=10)
+    conversation_history = await request.get_history(role.role_id if role else None, limit=10)
     
     if not conversation_history:
         await query.message.reply_text(
@@ -233,11 +236,12 @@ async def handle_explain_response(update: Update, context: ContextTypes.DEFAULT_
         concise way. Break down why you responded this way and what factors influenced your answer.
         """
         
-        explanation = await gemini_ai.generate_response(
-            prompt=explanation_prompt,
-            role_context={"name": "Explainer", "personality": "Clear and educational"},
-            conversation_history=[]
-        )
+        with call_site("explanation"):
+            explanation = await gemini_ai.generate_response(
+                prompt=explanation_prompt,
+                role_context={"name": "Explainer", "personality": "Clear and educational"},
+                conversation_history=[]
+            )
         
         # Delete the processing message
         await processing_message.delete()
@@ -265,10 +269,10 @@ async def handle_remember_from_conversation(update: Update, context: ContextType
     user_id = update.effective_user.id
     
     # Get the conversation history
-    user = await User.get_user(user_id)
-    role_id = user.current_role_id if user else None
+    request = get_request_context(update, context)
+    role = await request.get_role()
     
-    conversation_history = await Conversation.get_conversation_history(user_id, role_id, limit=5)
+    conversation_history = await request.get_history(role.role_id if role else None, limit=5)
     
     if not conversation_history:
         await query.message.reply_text(
@@ -308,11 +312,12 @@ async def handle_remember_from_conversation(update: Update, context: ContextType
         If no clear memories can be extracted, respond with "No clear memories to extract."
         """
         
-        memory_extraction = await gemini_ai.generate_response(
-            prompt=memory_prompt,
-            role_context={"name": "Memory Extractor", "personality": "Analytical and precise"},
-            conversation_history=[]
-        )
+        with call_site("memory_extraction"):
+            memory_extraction = await gemini_ai.generate_response(
+                prompt=memory_prompt,
+                role_context={"name": "Memory Extractor", "personality": "Analytical and precise"},
+                conversation_history=[]
+            )
         
         # Parse extracted memories
         memories = []
@@ -384,21 +389,21 @@ async def handle_end_topic(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         parse_mode='HTML'
     )
 
-async def handle_view_history(update: Update, context: ContextTypes.DEFAULT_TYPE, page: int = 0) -> None:
+async def handle_view_history(update: Update, context: ContextTypes.DEFAULT_TYPE, token: str = "0") -> None:
     """
     View conversation history.
     
     Args:
         update (Update): The update object
         context (ContextTypes.DEFAULT_TYPE): The context object
-        page (int): The page number to view
+        token (str): Page token from the callback data
     """
     query = update.callback_query
     user_id = update.effective_user.id
     
-    # Get the conversation history
-    user = await User.get_user(user_id)
-    role_id = user.current_role_id if user else None
+    # Get the user's current role
+    role = await get_request_context(update, context).get_role()
+    role_id = role.role_id if role else None
     
     # Get total conversation count
     total_count = await Conversation.get_conversation_count(user_id, role_id)
@@ -412,46 +417,43 @@ async def handle_view_history(update: Update, context: ContextTypes.DEFAULT_TYPE
     # Calculate pagination
     page_size = 5
     total_pages = (total_count + page_size - 1) // page_size
+    page, cursor, backward = decode_page_token(token)
     
-    if page < 0:
-        page = 0
-    elif page >= total_pages:
-        page = total_pages - 1
-    
-    # Get paginated conversation history
-    conversation_history = await Conversation.get_conversation_history(
-        user_id, role_id, limit=page_size, offset=page * page_size
+    # Get the page after (or before) the cursor in the previous page's buttons
+    pairs, has_more = await Conversation.get_history_page(
+        user_id, role_id, cursor=cursor, backward=backward, limit=page_size
     )
     
-    if not conversation_history:
+    if not pairs:
         await query.message.reply_text(
             "I couldn't retrieve your conversation history."
         )
         return
     
+    if backward:
+        has_previous, has_next = has_more, True
+        if not has_more:
+            page = 0
+    else:
+        has_previous, has_next = cursor is not None, has_more
+    page = min(page, total_pages - 1)
+    
     # Format the conversation history
     history_text = f"{bold('Conversation History')} (Page {page + 1}/{total_pages})\n\n"
     
-    for i, message in enumerate(conversation_history):
+    for pair in pairs:
         # Add timestamp
-        timestamp = message.timestamp.strftime("%Y-%m-%d %H:%M:%S") if message.timestamp else "Unknown time"
-        
-        if i % 2 == 0:
-            # User message
-            history_text += f"{bold('You')} ({timestamp}):\n{message.user_message}\n\n"
-        else:
-            # Bot response
-            history_text += f"{bold('Jyra')}:\n{message.bot_response[:100]}...\n\n"
+        timestamp = pair["timestamp"] or "Unknown time"
+        history_text += f"{bold('You')} ({timestamp}):\n{pair['user_message']}\n\n"
+        history_text += f"{bold('Jyra')}:\n{pair['bot_response'][:100]}...\n\n"
     
     # Create navigation buttons
     keyboard = []
-    nav_row = []
-    
-    if page > 0:
-        nav_row.append(create_callback_button("⬅️ Previous", f"conversation_history_{page - 1}"))
-    
-    if page < total_pages - 1:
-        nav_row.append(create_callback_button("➡️ Next", f"conversation_history_{page + 1}"))
+    nav_row = create_page_navigation_row(
+        "conversation_history_", page,
+        Conversation.page_cursor(pairs[0]), Conversation.page_cursor(pairs[-1]),
+        has_previous, has_next
+    )
     
     if nav_row:
         keyboard.append(nav_row)
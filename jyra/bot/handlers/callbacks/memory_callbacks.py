@@ -2,19 +2,97 @@
 Callback handlers for memory management menu interactions.
 """
 
-from telegram import Update, InlineKeyboardMarkup
+from typing import List, Optional, Callable
+
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from telegram.ext import ContextTypes
 
-from jyra.ui.buttons import create_memory_keyboard, create_memory_category_keyboard, create_callback_button
+from jyra.ui.buttons import (
+    create_memory_keyboard, create_memory_category_keyboard, create_callback_button,
+    create_page_navigation_row
+)
 from jyra.ui.keyboards import create_main_menu_keyboard
 from jyra.ui.messages import get_error_message, format_message
 from jyra.ui.formatting import bold, italic, emoji_prefix
 from jyra.db.models.user import User
 from jyra.db.models.memory import Memory
+from jyra.db.utils.pagination import decode_page_token
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Memories shown per page when browsing
+MEMORY_PAGE_SIZE = 10
+
+
+async def show_memory_page(query: CallbackQuery, user_id: int, callback_data: str, title: str,
+                           keyboard: List[List[InlineKeyboardButton]],
+                           format_memory: Callable[[Memory], str], empty_text: str,
+                           empty_keyboard: Optional[List[List[InlineKeyboardButton]]] = None,
+                           footer: str = "", category: Optional[str] = None,
+                           min_importance: int = 0, max_importance: Optional[int] = None) -> None:
+    """
+    Show one page of a user's memories, most important first, with Previous/Next buttons.
+
+    Args:
+        query (CallbackQuery): The callback query to answer by editing its message
+        user_id (int): User ID
+        callback_data (str): Callback data of the screen, optionally followed by
+            ":" and a page token
+        title (str): Screen title
+        keyboard (List[List[InlineKeyboardButton]]): Buttons below the navigation row
+        format_memory (Callable[[Memory], str]): Renders one memory
+        empty_text (str): Text shown when there are no memories
+        empty_keyboard (Optional[List[List[InlineKeyboardButton]]]): Buttons shown
+            when there are no memories; the screen's buttons by default
+        footer (str): Text after the memories
+        category (Optional[str]): Filter by category
+        min_importance (int): Minimum importance level
+        max_importance (Optional[int]): Maximum importance level
+    """
+    screen, _, token = callback_data.partition(":")
+    page, cursor, backward = decode_page_token(token or "0")
+    filters = dict(category=category, min_importance=min_importance, max_importance=max_importance)
+
+    memories, has_more = await Memory.get_memory_page(
+        user_id, cursor=cursor, backward=backward, limit=MEMORY_PAGE_SIZE, **filters)
+    if not memories and cursor is not None:
+        # The page's memories were deleted since the button was sent; start over
+        page, cursor, backward = 0, None, False
+        memories, has_more = await Memory.get_memory_page(user_id, limit=MEMORY_PAGE_SIZE, **filters)
+
+    if not memories:
+        await query.message.edit_text(
+            f"{bold(title)}\n\n{empty_text}",
+            reply_markup=InlineKeyboardMarkup(empty_keyboard if empty_keyboard is not None else keyboard),
+            parse_mode='HTML'
+        )
+        return
+
+    if backward:
+        has_previous, has_next = has_more, True
+        if not has_more:
+            page = 0
+    else:
+        has_previous, has_next = cursor is not None, has_more
+
+    total = await Memory.count_memories(user_id, **filters)
+    total_pages = max(1, (total + MEMORY_PAGE_SIZE - 1) // MEMORY_PAGE_SIZE)
+    header = bold(title)
+    if total_pages > 1:
+        header += f" (Page {min(page, total_pages - 1) + 1}/{total_pages})"
+
+    nav_row = create_page_navigation_row(
+        f"{screen}:", page, Memory.page_cursor(memories[0]), Memory.page_cursor(memories[-1]),
+        has_previous, has_next
+    )
+
+    await query.message.edit_text(
+        f"{header}\n\n" + "\n\n".join(format_memory(memory) for memory in memories) + footer,
+        reply_markup=InlineKeyboardMarkup(([nav_row] if nav_row else []) + keyboard),
+        parse_mode='HTML'
+    )
+
 
 async def handle_memory_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
@@ -142,30 +220,15 @@ async def handle_memory_callback(update: Update, context: ContextTypes.DEFAULT_T
         return
 
     # Important Memories
-    elif callback_data == "memory_important":
-        # Get important memories (importance >= 4)
-        memories = await Memory.get_memories(user_id, min_importance=4)
-        if not memories:
-            await query.message.edit_text(
-                f"{bold('Important Memories')}\n\nYou don't have any high-importance memories yet.",
-                reply_markup=create_memory_keyboard(),
-                parse_mode='HTML'
-            )
-        else:
-            # Format memories with importance level
-            memory_list = []
-            for memory in memories:
-                stars = '⭐' * memory.importance
-                memory_list.append(f"{stars} {memory.content}")
-
-            text = f"{bold('Important Memories')}\n\n" + \
-                "\n\n".join(memory_list)
-
-            await query.message.edit_text(
-                text,
-                reply_markup=create_memory_keyboard(),
-                parse_mode='HTML'
-            )
+    elif callback_data == "memory_important" or callback_data.startswith("memory_important:"):
+        # Page through important memories (importance >= 4)
+        await show_memory_page(
+            query, user_id, callback_data, "Important Memories",
+            keyboard=list(create_memory_keyboard().inline_keyboard),
+            format_memory=lambda memory: f"{'⭐' * memory.importance} {memory.content}",
+            empty_text="You don't have any high-importance memories yet.",
+            min_importance=4
+        )
         return
 
     # Memory Category
@@ -219,38 +282,23 @@ async def handle_memory_callback(update: Update, context: ContextTypes.DEFAULT_T
 
     # View all memories in a category
     elif callback_data.startswith("memory_view_all_"):
-        category = callback_data[len("memory_view_all_"):]
-        # Get all memories in this category
-        memories = await Memory.get_memories(user_id, category=category)
-
-        if not memories:
-            await query.message.edit_text(
-                f"{bold(f'All {category.capitalize()} Memories')
-                   }\n\nNo memories found in this category.",
-                reply_markup=create_memory_category_keyboard(category, False),
-                parse_mode='HTML'
-            )
-        else:
-            # Format memories with IDs for potential deletion
-            memory_list = []
-            for memory in memories:
-                memory_list.append(
-                    f"ID: {memory.memory_id} - {memory.content}")
-
-            text = f"{bold(f'All {category.capitalize()} Memories')
-                      }\n\n" + "\n\n".join(memory_list)
-
+        category = callback_data[len("memory_view_all_"):].partition(":")[0]
+        # Page through the memories in this category
+        await show_memory_page(
+            query, user_id, callback_data, f"All {category.capitalize()} Memories",
+            keyboard=list(create_memory_category_keyboard(category).inline_keyboard),
+            format_memory=lambda memory: f"ID: {memory.memory_id} - {memory.content}",
+            empty_text="No memories found in this category.",
+            empty_keyboard=list(create_memory_category_keyboard(category, False).inline_keyboard),
             # Add delete instructions
-            text += f"\n\n{italic('To delete a memory, use /forget followed by the memory ID.')}"
-            await query.message.edit_text(
-                text,
-                reply_markup=create_memory_category_keyboard(category),
-                parse_mode='HTML'
-            )
+            footer=f"\n\n{italic('To delete a memory, use /forget followed by the memory ID.')}",
+            category=category
+        )
         return
 
     # View memories by importance in a category
-    elif callback_data.startswith("memory_importance_"):
+    elif callback_data.startswith("memory_importance_") and \
+            not callback_data.startswith("memory_importance_level_"):
         category = callback_data[len("memory_importance_"):]
         # Create importance selection keyboard
         keyboard = []
@@ -272,8 +320,8 @@ async def handle_memory_callback(update: Update, context: ContextTypes.DEFAULT_T
 
     # View memories with specific importance level
     elif callback_data.startswith("memory_importance_level_"):
-        parts = callback_data[len("memory_importance_level_"):].split('_')
-        if len(parts) != 2:
+        parts = callback_data[len("memory_importance_level_"):].partition(":")[0].split('_')
+        if len(parts) != 2 or not parts[1].isdigit():
             await query.message.edit_text(
                 "Invalid importance level selection.",
                 reply_markup=create_memory_keyboard(),
@@ -283,42 +331,16 @@ async def handle_memory_callback(update: Update, context: ContextTypes.DEFAULT_T
 
         category, importance = parts[0], int(parts[1])
 
-        # Get memories with the specified importance
-        memories = await Memory.get_memories(
-            user_id,
+        # Page through memories with the specified importance
+        await show_memory_page(
+            query, user_id, callback_data, f"{category.capitalize()} Memories - Importance {importance}",
+            keyboard=[[create_callback_button("⬅️ Back", f"memory_importance_{category}")]],
+            format_memory=lambda memory: f"ID: {memory.memory_id} - {memory.content}",
+            empty_text="No memories found with this importance level.",
             category=category,
             min_importance=importance,
             max_importance=importance
         )
-
-        if not memories:
-            await query.message.edit_text(
-                f"{bold(f'{category.capitalize()} Memories - Importance {importance}')
-                   }\n\nNo memories found with this importance level.",
-                reply_markup=InlineKeyboardMarkup([[
-                    create_callback_button(
-                        "⬅️ Back", f"memory_importance_{category}")
-                ]]),
-                parse_mode='HTML'
-            )
-        else:
-            # Format memories
-            memory_list = []
-            for memory in memories:
-                memory_list.append(
-                    f"ID: {memory.memory_id} - {memory.content}")
-
-            text = f"{bold(f'{category.capitalize()} Memories - Importance {importance}')
-                      }\n\n" + "\n\n".join(memory_list)
-
-            await query.message.edit_text(
-                text,
-                reply_markup=InlineKeyboardMarkup([[
-                    create_callback_button(
-                        "⬅️ Back", f"memory_importance_{category}")
-                ]]),
-                parse_mode='HTML'
-            )
         return
 
     # Export Memories
@@ -7,15 +7,24 @@ This module provides an enhanced message handler that uses the new UI components
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from jyra.db.models.user import User
-from jyra.db.models.role import Role
 from jyra.db.models.conversation import Conversation
 from jyra.db.models.memory import Memory
 from jyra.ai.models.model_manager import model_manager
 from jyra.ai.memory_manager import memory_manager
 from jyra.ai.sentiment.sentiment_analyzer import SentimentAnalyzer
+from jyra.bot.tasks.memory_extraction import memory_extraction_service
+from jyra.bot.utils.request_context import get_request_context
+from jyra.bot.utils.turn_pipeline import TurnPipeline
+from jyra.bot.utils.turn_supersession import turn_supersession
+from jyra.ai.telemetry import call_site
 from jyra.ui.keyboards import create_conversation_controls
-from jyra.ui.visual_feedback import show_loading_indicator, stop_loading_indicator, show_error_message
+from jyra.ui.visual_feedback import (
+    show_loading_indicator, stop_loading_indicator, dismiss_loading_indicator, show_error_message
+)
+from jyra.utils.config import (
+    TURN_HISTORY_TIMEOUT, TURN_MEMORY_TIMEOUT, TURN_SENTIMENT_TIMEOUT, TURN_INDICATOR_TIMEOUT
+)
+from jyra.utils.exceptions import TurnSupersededException
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -35,33 +44,16 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     user_id = update.effective_user.id
     user_message = update.message.text
 
-    # Get user from database
-    user = await User.get_user(user_id)
-    if not user:
-        # Create user if not exists
-        user = User(
-            user_id=user_id,
-            username=update.effective_user.username,
-            first_name=update.effective_user.first_name,
-            last_name=update.effective_user.last_name,
-            language_code=update.effective_user.language_code
-        )
-        await user.save()
-
-    # Get current role
-    role_id = user.current_role_id
-    if not role_id:
-        # Use default role if none is set
-        default_roles = await Role.get_all_roles(include_custom=False)
-        if default_roles:
-            role_id = default_roles[0].role_id
-            user.current_role_id = role_id
-            await user.save()
-
-    role = await Role.get_role(role_id) if role_id else None
+    # User, role and history are loaded once per update and shared with the
+    # middleware, callbacks and error handler
+    request = get_request_context(update, context)
+    role = await request.get_role()
+    role_id = role.role_id if role else None
+    preferences = await request.get_preferences()
 
     # Get role context
     role_context = {
+        "role_id": role.role_id if role else None,
         "name": role.name if role else "AI Assistant",
         "personality": role.personality if role else "Helpful and friendly",
         "speaking_style": role.speaking_style if role else "Conversational",
@@ -69,58 +61,74 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         "behaviors": role.behaviors if role else "Responds helpfully"
     }
 
-    # Get conversation history
-    conversation_history = await Conversation.get_conversation_history(user_id, role_id)
+    # A newer message from the user cancels this turn until its reply is sent;
+    # the turn's input is then answered together with the newer message
+    turn = turn_supersession.start(user_id, user_message)
+    user_message = turn.text
+
+    async def get_memory_context() -> str:
+        # Get relevant memories for the current context and format them
+        relevant_memories = await memory_manager.get_relevant_memories(
+            user_id=user_id,
+            context=user_message,
+            max_memories=7,
+            min_importance=2
+        )
+        return await memory_manager.format_memories_for_context(relevant_memories)
 
-    # Process user message for memory extraction
     user_context = {
         "role": role.name if role else "AI Assistant",
-        "recent_messages": [msg["content"] for msg in conversation_history[-3:]] if conversation_history else []
+        "recent_messages": []
     }
 
-    await memory_manager.process_user_message(user_id, user_message, user_context)
-
-    # Get relevant memories for the current context
-    relevant_memories = await memory_manager.get_relevant_memories(
-        user_id=user_id,
-        context=user_message,
-        max_memories=7,
-        min_importance=2
-    )
-
-    # Format memories for context
-    memory_context = await memory_manager.format_memories_for_context(relevant_memories)
-
-    # Show loading indicator
-    await show_loading_indicator(
-        update, context, "Thinking", animation_type="dots"
-    )
-
     try:
-        # Analyze sentiment
-        sentiment_result = await sentiment_analyzer.analyze_sentiment(user_message)
+        # Load history, retrieve memories, analyze sentiment (answered locally unless
+        # the lexicon is unsure) and show the loading indicator concurrently; late
+        # or failing stages fall back to their defaults
+        stages = await turn.run(
+            TurnPipeline("chat")
+            .add_stage("history", lambda: request.get_history(role_id),
+                       timeout=TURN_HISTORY_TIMEOUT, default=[])
+            .add_stage("memories", get_memory_context, timeout=TURN_MEMORY_TIMEOUT, default="")
+            .add_stage("sentiment", lambda: sentiment_analyzer.analyze_sentiment(user_message),
+                       timeout=TURN_SENTIMENT_TIMEOUT)
+            .add_stage("indicator", lambda: show_loading_indicator(
+                update, context, "Thinking", animation_type="dots"),
+                timeout=TURN_INDICATOR_TIMEOUT)
+            .run()
+        )
+        conversation_history = stages["history"]
+        memory_context = stages["memories"]
+        sentiment_result = stages["sentiment"]
+
+        if conversation_history:
+            user_context["recent_messages"] = [msg["content"] for msg in conversation_history[-3:]]
 
         # Store sentiment in user_data
         if "sentiment_history" not in context.user_data:
             context.user_data["sentiment_history"] = []
 
-        context.user_data["sentiment_history"].append(sentiment_result)
+        if sentiment_result:
+            context.user_data["sentiment_history"].append(sentiment_result)
 
         # Generate response with fallback capability
-        response_tuple = await model_manager.generate_response(
-            prompt=user_message,
-            role_context=role_context,
-            conversation_history=conversation_history,
-            memory_context=memory_context,
-            temperature=0.7,
-            max_tokens=1000,
-            use_fallbacks=True
-        )
+        with call_site("reply"):
+            response, model_used = await turn.run(model_manager.generate_response(
+                prompt=user_message,
+                role_context=role_context,
+                conversation_history=conversation_history,
+                memory_context=memory_context,
+                temperature=0.7,
+                use_fallbacks=True,
+                response_length=preferences.get("response_length"),
+                user_id=user_id
+            ), reply=True)
 
-        # Extract response and model used
-        response, model_used = response_tuple
         logger.info(f"Response generated using model: {model_used}")
 
+        # From here on the reply goes out even if the user sends another message
+        turn.commit()
+
         # Stop loading indicator
         await stop_loading_indicator(context, True)
 
@@ -148,6 +156,10 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         context.user_data["conversation_context"]["last_message"] = user_message
         context.user_data["conversation_context"]["current_role_id"] = role_id
 
+    except TurnSupersededException:
+        # The newer message's turn answers this input too
+        await dismiss_loading_indicator(context)
+
     except Exception as e:
         logger.error(f"Error generating response: {str(e)}")
 
@@ -161,3 +173,10 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             "I'm having trouble connecting to my AI brain right now.",
             "Please try again in a moment. If the problem persists, contact support."
         )
+
+    finally:
+        turn_supersession.finish(turn)
+
+        # Extract memories from this message in the background; rapid messages
+        # are batched per user
+        memory_extraction_service.submit(user_id, update.message.text, user_context)
@@ -14,6 +14,7 @@ from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
+from jyra.bot.utils.request_context import get_request_context
 from jyra.utils.config import ADMIN_USER_IDS
 from jyra.utils.logger import setup_logger
 from jyra.utils.error_handler import handle_error
@@ -48,11 +49,19 @@ async def error_handler(update: Optional[Update], context: ContextTypes.DEFAULT_
 
         # Build the message for admins
         update_str = update.to_dict() if isinstance(update, Update) else str(update)
+
+        # What the failed update had already loaded; nothing is fetched again here
+        loaded = {}
+        if isinstance(update, Update):
+            request = get_request_context(update, context)
+            loaded = {name: vars(value) if hasattr(value, "__dict__") else value
+                      for name, value in request.loaded().items() if name != "history"}
         message = (
             f"An exception occurred while processing an update:\n\n"
             f"<pre>update = {html.escape(json.dumps(update_str, indent=2, ensure_ascii=False))}</pre>\n\n"
             f"<pre>context.chat_data = {html.escape(str(context.chat_data))}</pre>\n\n"
             f"<pre>context.user_data = {html.escape(str(context.user_data))}</pre>\n\n"
+            f"<pre>request = {html.escape(str(loaded))}</pre>\n\n"
             f"<pre>{html.escape(tb_string)}</pre>"
         )
 
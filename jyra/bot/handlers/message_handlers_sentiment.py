@@ -2,6 +2,9 @@
 Message handlers for Jyra Telegram bot with sentiment analysis
 """
 
+import asyncio
+from typing import List, Optional, Tuple
+
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
@@ -9,14 +12,19 @@ from jyra.db.models.user import User
 from jyra.db.models.role import Role
 from jyra.db.models.conversation import Conversation
 from jyra.db.models.memory import Memory
-from jyra.ai.models.gemini_direct import GeminiAI
+from jyra.ai.models.model_manager import model_manager
 from jyra.ai.sentiment.sentiment_analyzer import SentimentAnalyzer
+from jyra.ai.message_analyzer import message_analyzer
+from jyra.ai.telemetry import call_site
+from jyra.bot.utils.turn_pipeline import TurnPipeline
+from jyra.utils.config import (
+    TURN_HISTORY_TIMEOUT, TURN_MEMORY_TIMEOUT, TURN_ANALYSIS_TIMEOUT, TURN_INDICATOR_TIMEOUT
+)
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-# Initialize AI model and sentiment analyzer
-gemini_ai = GeminiAI()
+# Initialize sentiment analyzer
 sentiment_analyzer = SentimentAnalyzer()
 
 
@@ -125,26 +133,43 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     # Get user preferences
     preferences = await User.get_user_preferences(user_id)
 
-    # Get conversation history
-    conversation_history = await Conversation.get_conversation_history(
-        user_id,
-        role_id=db_user.current_role_id
-    )
-
-    # Send typing action
-    await update.message.chat.send_action(action="typing")
+    async def get_user_memories() -> Optional[Tuple[List[Memory], str]]:
+        if not preferences["memory_enabled"]:
+            return None
 
-    # Analyze sentiment
-    sentiment = await sentiment_analyzer.analyze_sentiment(user_message)
+        # Get important memories (importance >= 3) and recent memories (any importance)
+        important_memories, recent_memories, memory_summary = await asyncio.gather(
+            Memory.get_memories(user_id, min_importance=3, limit=5),
+            Memory.get_memories(user_id, limit=10),
+            Memory.get_memory_summary(user_id)
+        )
+        return important_memories + recent_memories, memory_summary
+
+    # Load history, retrieve memories, analyze the message (sentiment and memories
+    # in a single call) and send the typing action concurrently; late or failing
+    # stages fall back to their defaults
+    stages = await (
+        TurnPipeline("sentiment_chat")
+        .add_stage("history", lambda: Conversation.get_conversation_history(
+            user_id, role_id=db_user.current_role_id),
+            timeout=TURN_HISTORY_TIMEOUT, default=[])
+        .add_stage("memories", get_user_memories, timeout=TURN_MEMORY_TIMEOUT)
+        .add_stage("analysis", lambda: message_analyzer.analyze(user_message, {
+            "name": update.effective_user.first_name,
+            "current_role": role.name
+        }), timeout=TURN_ANALYSIS_TIMEOUT, default=message_analyzer.fallback(user_message))
+        .add_stage("typing", lambda: update.message.chat.send_action(action="typing"),
+                   timeout=TURN_INDICATOR_TIMEOUT)
+        .run()
+    )
+    conversation_history = stages["history"]
+    analysis = stages["analysis"]
+    sentiment = analysis["sentiment"]
 
     # Get user memories if enabled
     user_memories = None
     if preferences["memory_enabled"]:
-        # Get important memories (importance >= 3)
-        important_memories = await Memory.get_memories(user_id, min_importance=3, limit=5)
-
-        # Get recent memories (any importance)
-        recent_memories = await Memory.get_memories(user_id, limit=10)
+        base_memories, memory_summary = stages["memories"] or ([], "")
 
         # Get category-specific memories based on sentiment
         category = "general"
@@ -160,15 +185,14 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
         # Combine memories, removing duplicates
         all_memories = {}
-        for memory in important_memories + recent_memories + category_memories:
+        for memory in base_memories + category_memories:
             if memory.memory_id not in all_memories:
                 all_memories[memory.memory_id] = memory
 
         # Convert to list of memory contents
         user_memories = [memory.content for memory in all_memories.values()]
 
-        # Get memory summary if available
-        memory_summary = await Memory.get_memory_summary(user_id)
+        # Add the memory summary if available
         if memory_summary:
             user_memories.insert(0, f"Summary: {memory_summary}")
 
@@ -206,15 +230,18 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             # Increase temperature for casual tone
             temperature = min(0.9, temperature + 0.1)
 
-        # Generate response
-        ai_response = await gemini_ai.generate_response(
-            prompt=user_message,
-            role_context=role_data,
-            conversation_history=conversation_history,
-            temperature=temperature,
-            max_tokens=300 if preferences["response_length"] == "short" else
-            800 if preferences["response_length"] == "medium" else 1500
-        )
+        # Generate response; the model tier and token budget follow the message
+        # and the response length preference
+        with call_site("reply"):
+            ai_response, model_used = await model_manager.generate_response(
+                prompt=user_message,
+                role_context=role_data,
+                conversation_history=conversation_history,
+                temperature=temperature,
+                response_length=preferences["response_length"],
+                user_id=user_id
+            )
+        logger.info(f"Response generated using model: {model_used}")
 
         # Save conversation to database
         await Conversation.add_message(
@@ -224,19 +251,12 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             bot_response=ai_response
         )
 
-        # Extract memories from user message if memory is enabled
-        if preferences["memory_enabled"]:
-            # Create context for memory extraction
-            user_context = {
-                "name": update.effective_user.first_name,
-                "current_role": role.name,
-                "sentiment": sentiment["primary_emotion"] if sentiment else "neutral"
-            }
-
-            # Extract memories asynchronously (don't wait for completion)
+        # Store the memories extracted from the user message if memory is enabled
+        if preferences["memory_enabled"] and analysis["memories"]:
+            # Store asynchronously (don't wait for completion)
             context.application.create_task(
-                Memory.extract_memories_from_message(
-                    user_id, user_message, user_context)
+                Memory.store_extracted_memories(
+                    user_id, user_message, analysis["memories"])
             )
 
         # Send response
@@ -11,6 +11,7 @@ from jyra.db.models.role import Role
 from jyra.db.models.conversation import Conversation
 from jyra.ai.models.gemini_direct import GeminiAI
 from jyra.ai.sentiment.sentiment_analyzer import SentimentAnalyzer
+from jyra.ai.telemetry import call_site
 from jyra.ai.multimodal.image_processor import ImageProcessor
 from jyra.ai.multimodal.speech_processor import SpeechProcessor
 from jyra.ai.multimodal.tts_processor import TTSProcessor
@@ -106,12 +107,13 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         if "tone_guidance" in adjustments and adjustments["tone_guidance"]:
             role_data["tone_guidance"] = adjustments["tone_guidance"]
         # Generate a more personalized response based on the image analysis
-        ai_response = await gemini_ai.generate_response(
-            prompt=f"I sent you an image and you described it as: {response}. Please respond in character.",
-            role_context=role_data,
-            temperature=adjustments.get("temperature", 0.7),
-            max_tokens=800
-        )
+        with call_site("reply"):
+            ai_response = await gemini_ai.generate_response(
+                prompt=f"I sent you an image and you described it as: {response}. Please respond in character.",
+                role_context=role_data,
+                temperature=adjustments.get("temperature", 0.7),
+                max_tokens=800
+            )
 
         # Save conversation to database
         await Conversation.add_message(
@@ -227,14 +229,15 @@ async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
                 role_data["tone_guidance"] = adjustments["tone_guidance"]
 
             # Generate response
-            ai_response = await gemini_ai.generate_response(
-                prompt=user_message,
-                role_context=role_data,
-                conversation_history=conversation_history,
-                temperature=adjustments.get("temperature", 0.7),
-                max_tokens=300 if preferences["response_length"] == "short" else
-                800 if preferences["response_length"] == "medium" else 1500
-            )
+            with call_site("reply"):
+                ai_response = await gemini_ai.generate_response(
+                    prompt=user_message,
+                    role_context=role_data,
+                    conversation_history=conversation_history,
+                    temperature=adjustments.get("temperature", 0.7),
+                    max_tokens=300 if preferences["response_length"] == "short" else
+                    800 if preferences["response_length"] == "medium" else 1500
+                )
 
             # Save conversation to database
             await Conversation.add_message(
@@ -15,6 +15,7 @@ from jyra.bot.commands.memory_commands import cmd_generate_embeddings, cmd_searc
 from jyra.bot.commands.visualization_commands import cmd_visualize_memories
 from jyra.bot.commands.consolidation_commands import cmd_consolidate_memories, cmd_show_consolidation_candidates
 from jyra.bot.commands.decay_commands import cmd_decay_memories, cmd_show_decay_candidates
+from jyra.bot.commands.telemetry_commands import cmd_llm_stats
 # Web visualization commands removed
 from jyra.utils.logger import setup_logger
 
@@ -62,6 +63,9 @@ def register_command_handlers(application: Application) -> None:
 
     # Web visualization commands removed
 
+    # Admin commands
+    application.add_handler(CommandHandler("llmstats", cmd_llm_stats))
+
     # Settings commands
     application.add_handler(CommandHandler("settings", settings_command))
 
@@ -10,8 +10,7 @@ from typing import Callable, Dict, Any, Optional
 from telegram import Update
 from telegram.ext import CallbackContext
 
-from jyra.db.models.user import User
-from jyra.db.models.conversation import Conversation
+from jyra.bot.utils.request_context import get_request_context
 
 logger = logging.getLogger(__name__)
 
@@ -32,20 +31,15 @@ def context_middleware(func: Callable) -> Callable:
             
         user_id = update.effective_user.id
         
-        # Get or create user
-        user = User.get_or_create(
-            telegram_id=user_id,
-            username=update.effective_user.username,
-            first_name=update.effective_user.first_name,
-            last_name=update.effective_user.last_name
-        )
+        # Load through the update's request context, so the handler reuses this fetch
+        request = get_request_context(update, context)
         
         # Add user to context
-        context.user_data["user"] = user
+        context.user_data["user"] = await request.get_user()
         
-        # Get conversation history
-        conversation = Conversation.get_recent_for_user(user_id)
-        context.user_data["conversation"] = conversation
+        # Get conversation history with the current role
+        role = await request.get_role()
+        context.user_data["conversation"] = await request.get_history(role.role_id if role else None)
         
         logger.debug(f"Context middleware: Added user {user_id} and conversation context")
         
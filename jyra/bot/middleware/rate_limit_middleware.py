@@ -11,16 +11,28 @@ from telegram import Update
 from telegram.ext import CallbackContext
 
 from jyra.utils.rate_limiter import RateLimiter
-from jyra.utils.config import get_config
+from jyra.utils.config import (
+    ADMIN_USER_IDS, RATE_LIMIT_WINDOW, RATE_LIMIT_MAX_REQUESTS, RATE_LIMIT_CHAT_MAX_REQUESTS,
+    RATE_LIMIT_LLM_MAX_REQUESTS, RATE_LIMIT_STATE_PATH, RATE_LIMIT_STATE_TIMEOUT_MS
+)
 
 logger = logging.getLogger(__name__)
 
+# Tiers beyond the per-user limit: group chats, and all users together
+_tiers = {}
+if RATE_LIMIT_CHAT_MAX_REQUESTS > 0:
+    _tiers["chat"] = (RATE_LIMIT_CHAT_MAX_REQUESTS, RATE_LIMIT_WINDOW)
+if RATE_LIMIT_LLM_MAX_REQUESTS > 0:
+    _tiers["llm"] = (RATE_LIMIT_LLM_MAX_REQUESTS, RATE_LIMIT_WINDOW)
+
 # Create a global rate limiter instance
-admin_user_ids = [int(uid) for uid in get_config("ADMIN_USER_IDS", "").split(",") if uid]
 RATE_LIMITER = RateLimiter(
-    window_size=int(get_config("RATE_LIMIT_WINDOW", "60")),
-    max_requests=int(get_config("RATE_LIMIT_MAX_REQUESTS", "20")),
-    admin_user_ids=admin_user_ids
+    window_size=RATE_LIMIT_WINDOW,
+    max_requests=RATE_LIMIT_MAX_REQUESTS,
+    admin_user_ids=ADMIN_USER_IDS,
+    tiers=_tiers,
+    state_path=RATE_LIMIT_STATE_PATH,
+    state_timeout_ms=RATE_LIMIT_STATE_TIMEOUT_MS
 )
 
 def rate_limit_middleware(func: Callable) -> Callable:
@@ -39,10 +51,17 @@ def rate_limit_middleware(func: Callable) -> Callable:
             return await func(update, context)
             
         user_id = update.effective_user.id
-        is_limited, request_count, reset_time = RATE_LIMITER.is_rate_limited(user_id)
+        chat = update.effective_chat
+        # A private chat is limited by its user alone
+        chat_id = chat.id if chat and chat.type != "private" and "chat" in RATE_LIMITER.tiers else None
+        is_limited, tier, request_count, reset_time = RATE_LIMITER.check(
+            user=user_id,
+            chat=chat_id,
+            llm="global" if "llm" in RATE_LIMITER.tiers else None
+        )
         
         if is_limited:
-            logger.warning(f"Rate limit applied to user {user_id}. Reset in {reset_time}s.")
+            logger.warning(f"Rate limit ({tier}) applied to user {user_id}. Reset in {reset_time}s.")
             await update.effective_message.reply_text(
                 f"⚠️ You're sending messages too quickly. Please wait {reset_time} seconds before trying again."
             )
@@ -1,3 +1,23 @@
 """
 Background tasks for Jyra bot.
 """
+
+from telegram.ext import Application
+
+from jyra.bot.tasks.memory_extraction import MemoryExtractionService, memory_extraction_service
+from jyra.db.utils.group_commit import group_commit_writer
+
+
+async def shutdown_background_tasks(application: Application) -> None:
+    """
+    Finish background work before the bot exits (used as a post_shutdown hook).
+
+    Args:
+        application (Application): The bot application
+    """
+    await memory_extraction_service.stop()
+    # Commit writes still queued, including memories saved by the extraction above
+    await group_commit_writer.stop()
+
+
+__all__ = ['MemoryExtractionService', 'memory_extraction_service', 'shutdown_background_tasks']
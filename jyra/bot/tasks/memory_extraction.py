@@ -0,0 +1,200 @@
+"""
+Background memory extraction for Jyra.
+
+Messages are buffered per user and extracted together once the user has been
+quiet for a short while, the buffer is full, or the oldest message has waited
+too long. Batches run on a small pool of worker tasks fed by a bounded queue,
+so replies never wait for extraction or for the embeddings of new memories.
+"""
+
+import asyncio
+import time
+from typing import List, Dict, Any, Optional
+
+from jyra.ai.limits.work_scheduler import llm_work
+from jyra.ai.memory_extractor import memory_extractor
+from jyra.ai.telemetry import llm_telemetry
+from jyra.db.models.memory import Memory
+from jyra.utils.config import (
+    MEMORY_EXTRACTION_DEBOUNCE_SECONDS, MEMORY_EXTRACTION_MAX_WAIT_SECONDS,
+    MEMORY_EXTRACTION_MAX_BATCH, MEMORY_EXTRACTION_WORKERS, MEMORY_EXTRACTION_QUEUE_SIZE
+)
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class MemoryExtractionService:
+    """
+    Debounced, bounded background memory extraction.
+    """
+
+    def __init__(self, debounce_seconds: float = MEMORY_EXTRACTION_DEBOUNCE_SECONDS,
+                 max_wait_seconds: float = MEMORY_EXTRACTION_MAX_WAIT_SECONDS,
+                 max_batch: int = MEMORY_EXTRACTION_MAX_BATCH,
+                 workers: int = MEMORY_EXTRACTION_WORKERS,
+                 queue_size: int = MEMORY_EXTRACTION_QUEUE_SIZE):
+        """
+        Initialize the service.
+
+        Args:
+            debounce_seconds (float): Quiet period after a user's last message
+            max_wait_seconds (float): Longest a message may wait in a buffer
+            max_batch (int): Messages that trigger an immediate extraction
+            workers (int): Number of concurrent extraction workers
+            queue_size (int): Batches that may wait for a worker before new ones are dropped
+        """
+        self.debounce_seconds = debounce_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.max_batch = max_batch
+        self.worker_count = workers
+        self.queue_size = queue_size
+
+        self._buffers: Dict[int, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+        self.stats = {"messages": 0, "batches": 0, "memories": 0, "dropped": 0, "errors": 0}
+
+    def submit(self, user_id: int, message: str,
+               user_context: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Queue a user message for memory extraction.
+
+        Must be called from the event loop. Returns immediately.
+
+        Args:
+            user_id (int): User ID
+            message (str): User message
+            user_context (Optional[Dict[str, Any]]): Context about the user; the
+                latest context of a batch is used
+        """
+        if not message or not message.strip():
+            return
+
+        self._ensure_workers()
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+
+        buffer = self._buffers.get(user_id)
+        if buffer is None:
+            buffer = {"messages": [], "first_at": now, "timer": None}
+            self._buffers[user_id] = buffer
+        buffer["messages"].append(message)
+        buffer["context"] = user_context
+        self.stats["messages"] += 1
+
+        if buffer["timer"]:
+            buffer["timer"].cancel()
+
+        if len(buffer["messages"]) >= self.max_batch:
+            self._flush(user_id)
+            return
+
+        # Wait for a quiet period, but never past the oldest message's deadline
+        delay = min(self.debounce_seconds,
+                    max(0.0, buffer["first_at"] + self.max_wait_seconds - now))
+        buffer["timer"] = loop.call_later(delay, self._flush, user_id)
+
+    def _flush(self, user_id: int) -> None:
+        """
+        Move a user's buffered messages to the work queue.
+
+        Args:
+            user_id (int): User ID
+        """
+        buffer = self._buffers.pop(user_id, None)
+        if not buffer:
+            return
+        if buffer["timer"]:
+            buffer["timer"].cancel()
+
+        try:
+            self._queue.put_nowait((user_id, buffer["messages"], buffer["context"]))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logger.warning(
+                f"Memory extraction queue full, dropped {len(buffer['messages'])} messages for user {user_id}")
+
+    def _ensure_workers(self) -> None:
+        """Start the worker pool on first use."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.worker_count)]
+        logger.info(f"Started {self.worker_count} memory extraction workers")
+
+    async def _worker(self, worker_id: int) -> None:
+        """
+        Extract and store memories for queued batches.
+
+        Args:
+            worker_id (int): Worker number, used in log messages
+        """
+        while True:
+            user_id, messages, user_context = await self._queue.get()
+            try:
+                with llm_work("background", user_id=user_id):
+                    await self._process_batch(user_id, messages, user_context)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(
+                    f"Error in memory extraction worker {worker_id} for user {user_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _process_batch(self, user_id: int, messages: List[str],
+                             user_context: Optional[Dict[str, Any]]) -> None:
+        """
+        Run one extraction call over a batch of messages and store the results.
+
+        Args:
+            user_id (int): User ID
+            messages (List[str]): The user's buffered messages, oldest first
+            user_context (Optional[Dict[str, Any]]): Context about the user
+        """
+        text = "\n".join(messages)
+        memories = await memory_extractor.extract_memories(text, user_context)
+        await Memory.store_extracted_memories(user_id, text, memories)
+
+        self.stats["batches"] += 1
+        self.stats["memories"] += len(memories)
+        logger.info(
+            f"Extracted {len(memories)} memories from {len(messages)} messages for user {user_id}")
+
+    async def drain(self) -> None:
+        """Flush every buffer and wait until all queued batches are processed."""
+        for user_id in list(self._buffers):
+            self._flush(user_id)
+        if self._queue:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """Drain pending work and stop the workers."""
+        await self.drain()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get extraction counters and current backlog.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        return {
+            **self.stats,
+            "buffered_users": len(self._buffers),
+            "queued_batches": self._queue.qsize() if self._queue else 0,
+            "workers": len(self._workers)
+        }
+
+
+# Create a singleton instance
+memory_extraction_service = MemoryExtractionService()
+
+# Report the extraction backlog alongside call telemetry
+llm_telemetry.register_source("memory_extraction_queue", memory_extraction_service.get_stats)
@@ -7,6 +7,7 @@ This module contains tasks for maintaining the memory system.
 import asyncio
 from typing import List, Dict, Any, Optional
 
+from jyra.ai.consolidation_batcher import consolidation_batcher
 from jyra.ai.memory_manager import memory_manager
 from jyra.ai.decay.memory_decay import memory_decay
 from jyra.db.models.user import User
@@ -15,6 +16,38 @@ from jyra.utils.logger import setup_logger
 logger = setup_logger(__name__)
 
 
+async def run_user_memory_maintenance(user_id: int) -> Dict[str, Any]:
+    """
+    Run memory maintenance for one user: consolidation, then memory decay.
+
+    Args:
+        user_id (int): User ID
+
+    Returns:
+        Dict[str, Any]: Results of the maintenance operations
+    """
+    # Run memory maintenance for this user
+    results = await memory_manager.run_memory_maintenance(user_id)
+
+    if results.get("consolidated_memories", 0) > 0:
+        logger.info(
+            f"Consolidated {results['consolidated_memories']} memories for user {user_id}")
+
+    # Apply memory decay
+    decay_results = await memory_decay.apply_decay_to_user_memories(
+        user_id=user_id,
+        decay_factor=0.9,  # Default decay factor
+        min_age_days=30,   # Default minimum age
+        max_decay_per_run=5  # Limit per maintenance run
+    )
+
+    if decay_results.get("decayed_count", 0) > 0:
+        logger.info(
+            f"Decayed {decay_results['decayed_count']} memories for user {user_id}")
+
+    return results
+
+
 async def run_memory_maintenance_for_all_users():
     """
     Run memory maintenance for all users.
@@ -23,6 +56,9 @@ async def run_memory_maintenance_for_all_users():
     - Memory consolidation
     - Cleaning up expired memories
     - Updating memory importance based on usage
+
+    Several users are maintained at the same time; their model calls still
+    queue behind interactive work in the LLM scheduler.
     """
     try:
         # Get all users
@@ -34,31 +70,8 @@ async def run_memory_maintenance_for_all_users():
 
         logger.info(f"Running memory maintenance for {len(users)} users")
 
-        for user in users:
-            try:
-                # Run memory maintenance for this user
-                results = await memory_manager.run_memory_maintenance(user.user_id)
-
-                if results.get("consolidated_memories", 0) > 0:
-                    logger.info(
-                        f"Consolidated {results['consolidated_memories']} memories for user {user.user_id}")
-
-                # Apply memory decay
-                decay_results = await memory_decay.apply_decay_to_user_memories(
-                    user_id=user.user_id,
-                    decay_factor=0.9,  # Default decay factor
-                    min_age_days=30,   # Default minimum age
-                    max_decay_per_run=5  # Limit per maintenance run
-                )
-
-                if decay_results.get("decayed_count", 0) > 0:
-                    logger.info(
-                        f"Decayed {decay_results['decayed_count']} memories for user {user.user_id}")
-
-            except Exception as e:
-                logger.error(
-                    f"Error running memory maintenance for user {user.user_id}: {str(e)}")
-                continue
+        await consolidation_batcher.run_for_users(
+            [user.user_id for user in users], run_user_memory_maintenance)
 
         logger.info("Memory maintenance completed for all users")
 
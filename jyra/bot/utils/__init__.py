@@ -0,0 +1,17 @@
+"""
+Bot utilities for Jyra.
+"""
+
+from jyra.bot.utils.turn_pipeline import TurnPipeline, TurnMetrics, turn_metrics
+from jyra.bot.utils.update_processor import PerUserUpdateProcessor, update_processor
+from jyra.bot.utils.send_scheduler import SendScheduler, send_scheduler
+from jyra.bot.utils.turn_supersession import Turn, TurnSupersession, turn_supersession
+from jyra.bot.utils.webhook_server import WebhookServer, run_webhook
+from jyra.bot.utils.worker_pool import WorkerPool, run_sharded, shard_for
+
+__all__ = ['TurnPipeline', 'TurnMetrics', 'turn_metrics',
+           'PerUserUpdateProcessor', 'update_processor',
+           'SendScheduler', 'send_scheduler',
+           'Turn', 'TurnSupersession', 'turn_supersession',
+           'WebhookServer', 'run_webhook',
+           'WorkerPool', 'run_sharded', 'shard_for']
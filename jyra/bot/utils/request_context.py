@@ -0,0 +1,229 @@
+"""
+Request-scoped data for Jyra.
+
+Middleware, handlers, callbacks and the error handler used to look up the
+same user, role, preferences and conversation history for one update, each
+with its own database query. A RequestContext is created for each update and
+attached to the handler's context; it loads each of these on first use and
+hands the same result to every later caller. The error handler receives a
+context object of its own from python-telegram-bot, so request contexts are
+also found through their update.
+"""
+
+import asyncio
+import weakref
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+from telegram import Update
+from telegram.ext import CallbackContext
+
+from jyra.ai.telemetry import llm_telemetry
+from jyra.db.models.conversation import Conversation
+from jyra.db.models.role import Role
+from jyra.db.models.user import User
+from jyra.utils.config import MAX_CONVERSATION_HISTORY
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Attribute of the handler context holding the request context
+CONTEXT_ATTRIBUTE = "request_context"
+
+# Request contexts of the updates being handled, by id of the update
+_active: "weakref.WeakValueDictionary[int, RequestContext]" = weakref.WeakValueDictionary()
+
+_stats = {"requests": 0, "loads": 0, "reuses": 0}
+
+
+class RequestContext:
+    """
+    User, role, preferences and history of one update, each loaded once.
+    """
+
+    def __init__(self, update: Update):
+        """
+        Initialize the request context.
+
+        Args:
+            update (Update): The update being handled
+        """
+        self.update = update
+        effective_user = update.effective_user
+        self.user_id = effective_user.id if effective_user else None
+        self._loads: Dict[Any, asyncio.Future] = {}
+        # Conversation history per role: (pairs requested, history)
+        self._history: Dict[Optional[int], Any] = {}
+
+    async def _load(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Load a value once; concurrent and later callers share the result.
+
+        A failed load is not remembered, so the next caller tries again.
+        """
+        future = self._loads.get(key)
+        if future is not None:
+            _stats["reuses"] += 1
+            return await asyncio.shield(future)
+
+        _stats["loads"] += 1
+        future = asyncio.ensure_future(loader())
+        self._loads[key] = future
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            if self._loads.get(key) is future:
+                del self._loads[key]
+            raise
+
+    async def get_user(self) -> Optional[User]:
+        """
+        Get the user of the update, creating them in the database if new.
+
+        Returns:
+            Optional[User]: The user; None for updates without a user
+        """
+        if self.user_id is None:
+            return None
+        return await self._load("user", self._load_user)
+
+    async def _load_user(self) -> User:
+        user = await User.get_user(self.user_id)
+        if not user:
+            effective_user = self.update.effective_user
+            user = User(
+                user_id=self.user_id,
+                username=effective_user.username,
+                first_name=effective_user.first_name,
+                last_name=effective_user.last_name,
+                language_code=effective_user.language_code
+            )
+            await user.save()
+        return user
+
+    async def get_role(self) -> Optional[Role]:
+        """
+        Get the user's current role, setting the first default role if none is set.
+
+        Returns:
+            Optional[Role]: The role; None if the user has no role and there are no default roles
+        """
+        if self.user_id is None:
+            return None
+        return await self._load("role", self._load_role)
+
+    async def _load_role(self) -> Optional[Role]:
+        user = await self.get_user()
+        role_id = user.current_role_id
+        if not role_id:
+            # Use default role if none is set
+            default_roles = await Role.get_all_roles(include_custom=False)
+            if default_roles:
+                role_id = default_roles[0].role_id
+                user.current_role_id = role_id
+                await user.save()
+        return await Role.get_role(role_id) if role_id else None
+
+    async def get_preferences(self) -> Dict[str, Any]:
+        """
+        Get the user's preferences.
+
+        Returns:
+            Dict[str, Any]: User preferences; defaults for updates without a user
+        """
+        if self.user_id is None:
+            return {}
+        return await self._load("preferences", lambda: User.get_user_preferences(self.user_id))
+
+    async def get_history(self, role_id: Optional[int] = None,
+                          limit: int = MAX_CONVERSATION_HISTORY) -> List[Dict[str, Any]]:
+        """
+        Get the user's recent conversation history.
+
+        A request for fewer message pairs than already loaded for the role is
+        answered from the loaded history.
+
+        Args:
+            role_id (Optional[int]): Filter by role ID
+            limit (int): Maximum number of message pairs
+
+        Returns:
+            List[Dict[str, Any]]: Conversation history, oldest first
+        """
+        if self.user_id is None:
+            return []
+        loaded = self._history.get(role_id)
+        if loaded is None or loaded[0] < limit:
+            loaded = (limit, await self._load(
+                ("history", role_id, limit),
+                lambda: Conversation.get_conversation_history(self.user_id, role_id, limit=limit)
+            ))
+            self._history[role_id] = loaded
+        else:
+            _stats["reuses"] += 1
+        # Each message pair is two entries
+        return loaded[1][-2 * limit:] if limit > 0 else []
+
+    def invalidate(self, *names: str) -> None:
+        """
+        Forget loaded values after they were changed, so the next caller reloads them.
+
+        Args:
+            *names (str): "user", "role", "preferences" or "history"; none forgets everything
+        """
+        for key in list(self._loads):
+            name = key[0] if isinstance(key, tuple) else key
+            if not names or name in names:
+                del self._loads[key]
+        if not names or "history" in names:
+            self._history.clear()
+
+    def loaded(self) -> Dict[str, Any]:
+        """
+        Get the values loaded so far, without loading anything.
+
+        Returns:
+            Dict[str, Any]: Loaded values by name
+        """
+        values = {}
+        for key, future in self._loads.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                values[key[0] if isinstance(key, tuple) else key] = future.result()
+        return values
+
+
+def get_request_context(update: Update, context: Optional[CallbackContext] = None) -> RequestContext:
+    """
+    Get the request context of an update, creating it on first use.
+
+    Args:
+        update (Update): The update being handled
+        context (Optional[CallbackContext]): The handler's context; the request
+            context is attached to it
+
+    Returns:
+        RequestContext: The update's request context
+    """
+    request = getattr(context, CONTEXT_ATTRIBUTE, None) if context is not None else None
+    if request is None or request.update is not update:
+        request = _active.get(id(update))
+        if request is None or request.update is not update:
+            request = RequestContext(update)
+            _active[id(update)] = request
+            _stats["requests"] += 1
+        if context is not None:
+            setattr(context, CONTEXT_ATTRIBUTE, request)
+    return request
+
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Get request context counters.
+
+    Returns:
+        Dict[str, Any]: Requests, database loads and loads saved by reuse
+    """
+    return {**_stats, "active": len(_active)}
+
+
+# Report loads saved per update alongside call telemetry
+llm_telemetry.register_source("request_context", get_stats)
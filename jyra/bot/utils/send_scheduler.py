@@ -0,0 +1,318 @@
+"""
+Outbound Telegram API scheduling for Jyra.
+
+Every message, edit and chat action the bot sends passes through this rate
+limiter. It spaces them out to stay within Telegram's flood limits: a global
+budget, plus a budget per chat that is stricter for groups. When Telegram
+answers with RetryAfter anyway, all sending pauses for the requested time and
+the request is retried.
+
+Edits of a message that is still waiting for its slot are coalesced: a newer
+edit of the same message, or its deletion, replaces the waiting edit, which is
+then skipped. Low-priority requests (marked with rate_limit_args={"priority":
+"low"}, e.g. loading animation frames) only use spare capacity. They are
+dropped instead of waiting, so they never delay replies.
+
+Telegram's global and group limits apply to the bot as a whole. When the bot
+runs as several worker processes, each process keeps its own budgets, so the
+global rate and the group rate are split evenly between the workers. (A
+group's messages come from several users and so reach several workers; a
+private chat only ever reaches one.)
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+from typing import Dict, Any, Optional, Callable, Coroutine, Union, List, Tuple
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from jyra.ai.telemetry import llm_telemetry
+from jyra.utils.config import (
+    SEND_GLOBAL_RATE, SEND_PRIVATE_CHAT_RATE, SEND_GROUP_CHAT_PER_MINUTE, SEND_CHAT_BURST,
+    SEND_PRESSURE_DELAY, SEND_MAX_RETRIES, WORKER_COUNT
+)
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Endpoints counted against the budgets; other calls (callback query answers,
+# getters, webhook setup) go straight through
+LIMITED_PREFIXES = ("send", "edit", "forward", "copy")
+
+# Endpoints that change an existing message; pending ones are coalesced
+EDIT_ENDPOINTS = {"editMessageText", "editMessageCaption", "editMessageReplyMarkup",
+                  "editMessageMedia"}
+
+# Idle chat budgets are pruned after this many requests
+PRUNE_EVERY = 512
+
+
+class SendBudget:
+    """
+    Token bucket whose tokens may go negative, reserving future send slots.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize the budget.
+
+        Args:
+            rate (float): Sends per second
+            burst (int): Sends allowed at once after an idle period
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update."""
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait(self, now: float) -> float:
+        """
+        Get the wait for the next free slot without taking it.
+
+        Args:
+            now (float): Current monotonic time
+
+        Returns:
+            float: Seconds until a send would be allowed
+        """
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def reserve(self, now: float) -> float:
+        """
+        Take the next free slot.
+
+        Args:
+            now (float): Current monotonic time
+
+        Returns:
+            float: Seconds to wait before sending
+        """
+        delay = self.wait(now)
+        self.tokens -= 1
+        return delay
+
+    def release(self) -> None:
+        """Give back a slot that was reserved but not used."""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+    def idle(self, now: float) -> bool:
+        """Check whether the budget is full again."""
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+class SendScheduler(BaseRateLimiter):
+    """
+    Rate limiter for outbound Telegram requests with edit coalescing and priorities.
+    """
+
+    def __init__(self, global_rate: float = SEND_GLOBAL_RATE / WORKER_COUNT,
+                 private_chat_rate: float = SEND_PRIVATE_CHAT_RATE,
+                 group_chat_per_minute: float = SEND_GROUP_CHAT_PER_MINUTE / WORKER_COUNT,
+                 chat_burst: int = SEND_CHAT_BURST,
+                 pressure_delay: float = SEND_PRESSURE_DELAY,
+                 max_retries: int = SEND_MAX_RETRIES):
+        """
+        Initialize the scheduler.
+
+        Args:
+            global_rate (float): Sends per second across all chats from this
+                process; by default this worker's share of SEND_GLOBAL_RATE
+            private_chat_rate (float): Sends per second in one private chat
+            group_chat_per_minute (float): Sends per minute in one group or channel
+                from this process; by default this worker's share
+            chat_burst (int): Sends allowed at once in an idle chat
+            pressure_delay (float): Wait for a chat's next slot above which the
+                chat counts as under pressure
+            max_retries (int): Retries of a request answered with RetryAfter
+        """
+        self.global_budget = SendBudget(global_rate, max(1, int(global_rate)))
+        self.private_chat_rate = private_chat_rate
+        self.group_chat_rate = group_chat_per_minute / 60
+        self.chat_burst = chat_burst
+        self.pressure_delay = pressure_delay
+        self.max_retries = max_retries
+
+        self._chats: Dict[Any, SendBudget] = {}
+        # Message -> marker of the edit currently waiting for it
+        self._pending_edits: Dict[Tuple[Any, Any], object] = {}
+        self._paused_until = 0.0
+        self._requests = 0
+        self.stats = {"sent": 0, "delayed": 0, "delay_seconds": 0.0, "coalesced": 0,
+                      "dropped": 0, "retry_after": 0}
+
+    async def initialize(self) -> None:
+        """Nothing to set up; budgets are created on demand."""
+
+    async def shutdown(self) -> None:
+        """Nothing to clean up."""
+
+    def _chat_budget(self, chat_id: Any) -> SendBudget:
+        """Get the budget of a chat; negative IDs and @usernames are groups or channels."""
+        budget = self._chats.get(chat_id)
+        if budget is None:
+            is_private = isinstance(chat_id, int) and chat_id > 0
+            budget = SendBudget(self.private_chat_rate if is_private else self.group_chat_rate,
+                                self.chat_burst)
+            self._chats[chat_id] = budget
+        return budget
+
+    def _prune(self, now: float) -> None:
+        """Forget chats whose budget is full again."""
+        pending_chats = {chat_id for chat_id, _ in self._pending_edits}
+        for chat_id in [chat_id for chat_id, budget in self._chats.items()
+                        if chat_id not in pending_chats and budget.idle(now)]:
+            del self._chats[chat_id]
+
+    def under_pressure(self, chat_id: Any = None) -> bool:
+        """
+        Check whether sends are backing up, overall or in a chat.
+
+        Args:
+            chat_id (Any): Chat to check besides the global budget
+
+        Returns:
+            bool: True while paused by Telegram or when the next slot is further
+                away than the pressure delay
+        """
+        now = time.monotonic()
+        if self._paused_until > now:
+            return True
+        if self.global_budget.wait(now) > self.pressure_delay:
+            return True
+        budget = self._chats.get(chat_id)
+        return budget is not None and budget.wait(now) > self.pressure_delay
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Union[bool, Dict[str, Any], List[Dict[str, Any]]]]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[Dict[str, Any]],
+    ) -> Union[bool, Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Send a request within the budgets.
+
+        Args:
+            callback: Makes the request
+            args: Positional arguments of the callback
+            kwargs: Keyword arguments of the callback
+            endpoint (str): API method, e.g. "sendMessage"
+            data (Dict[str, Any]): Parameters of the request
+            rate_limit_args (Optional[Dict[str, Any]]): {"priority": "low"} for
+                traffic that may be dropped
+
+        Returns:
+            The API result; True for skipped edits and dropped low-priority requests
+        """
+        if not endpoint.startswith(LIMITED_PREFIXES) and endpoint != "deleteMessage":
+            return await callback(*args, **kwargs)
+
+        low = isinstance(rate_limit_args, dict) and rate_limit_args.get("priority") == "low"
+        chat_id = data.get("chat_id")
+        now = time.monotonic()
+
+        self._requests += 1
+        if self._requests % PRUNE_EVERY == 0:
+            self._prune(now)
+
+        message_key = (chat_id, data.get("message_id") or data.get("inline_message_id"))
+        if endpoint == "deleteMessage":
+            # Edits still waiting for a deleted message would only fail
+            self._pending_edits.pop(message_key, None)
+            return await self._call(callback, args, kwargs, low)
+
+        chat_budget = self._chat_budget(chat_id) if chat_id is not None else None
+        if low and (self._paused_until > now or self.global_budget.wait(now) > 0 or
+                    (chat_budget and chat_budget.wait(now) > 0)):
+            # Only spare capacity is used for low-value traffic
+            self.stats["dropped"] += 1
+            return True
+
+        delay = max(self.global_budget.reserve(now),
+                    chat_budget.reserve(now) if chat_budget else 0.0,
+                    self._paused_until - now)
+
+        marker = None
+        if endpoint in EDIT_ENDPOINTS:
+            marker = object()
+            self._pending_edits[message_key] = marker
+
+        try:
+            if delay > 0:
+                self.stats["delayed"] += 1
+                self.stats["delay_seconds"] += delay
+                await asyncio.sleep(delay)
+
+            if marker is not None:
+                if self._pending_edits.get(message_key) is not marker:
+                    # A newer edit of the message, or its deletion, replaced this one
+                    self.stats["coalesced"] += 1
+                    self.global_budget.release()
+                    if chat_budget:
+                        chat_budget.release()
+                    return True
+                del self._pending_edits[message_key]
+                marker = None
+
+            return await self._call(callback, args, kwargs, low)
+        finally:
+            if marker is not None and self._pending_edits.get(message_key) is marker:
+                del self._pending_edits[message_key]
+
+    async def _call(self, callback: Callable[..., Coroutine[Any, Any, Any]], args: Any,
+                    kwargs: Dict[str, Any], low: bool) -> Any:
+        """Make a request, pausing all sends and retrying when Telegram asks to wait."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = await callback(*args, **kwargs)
+                self.stats["sent"] += 1
+                return result
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                self.stats["retry_after"] += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                logger.warning(f"Telegram flood limit hit, pausing sends for {retry_after}s")
+                if low:
+                    self.stats["dropped"] += 1
+                    return True
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(retry_after)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get send, delay, coalescing and drop counters.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        now = time.monotonic()
+        return {
+            **self.stats,
+            "delay_seconds": round(self.stats["delay_seconds"], 2),
+            "paused_seconds": round(max(0.0, self._paused_until - now), 2),
+            "global_rate": self.global_budget.rate,
+            "pending_edits": len(self._pending_edits),
+            "tracked_chats": len(self._chats)
+        }
+
+
+# Create a singleton instance
+send_scheduler = SendScheduler()
+
+# Report outbound flood control alongside call telemetry
+llm_telemetry.register_source("send_scheduler", send_scheduler.get_stats)
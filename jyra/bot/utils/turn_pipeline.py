@@ -0,0 +1,172 @@
+"""
+Concurrent pre-response pipeline for chat turns.
+
+The work a handler does before generating a reply (loading history, retrieving
+memories, analyzing sentiment, showing the typing indicator) is independent, so
+it runs as concurrent stages. Each stage has its own timeout; an optional stage
+that is late or fails is replaced by its default so the reply can go ahead
+without it. Stage and turn durations are kept in rolling histograms and
+reported with the LLM telemetry.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+from jyra.ai.telemetry import RollingHistogram, llm_telemetry
+from jyra.utils.config import TELEMETRY_WINDOW_SECONDS
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+STAGE_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class TurnMetrics:
+    """
+    Rolling per-stage timings for turn pipelines.
+    """
+
+    def __init__(self, window_seconds: int = TELEMETRY_WINDOW_SECONDS):
+        """
+        Initialize the metrics.
+
+        Args:
+            window_seconds (int): Length of the histogram window
+        """
+        self.window_seconds = window_seconds
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self._outcomes: Dict[str, Dict[str, int]] = {}
+
+    def record(self, name: str, duration_ms: float, status: str = "ok") -> None:
+        """
+        Record a stage or turn duration.
+
+        Args:
+            name (str): "<pipeline>/<stage>" or "<pipeline>/total"
+            duration_ms (float): Duration in milliseconds
+            status (str): ok, timeout or error
+        """
+        if name not in self._histograms:
+            self._histograms[name] = RollingHistogram(STAGE_BUCKETS_MS, self.window_seconds)
+            self._outcomes[name] = {"ok": 0, "timeout": 0, "error": 0}
+        self._histograms[name].add(duration_ms)
+        self._outcomes[name][status] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get latency percentiles and outcome counts per stage.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Statistics keyed by stage name
+        """
+        stats = {}
+        for name, histogram in self._histograms.items():
+            summary = histogram.summary()
+            stats[name] = {
+                "count": summary["count"],
+                "p50_ms": summary["p50"],
+                "p95_ms": summary["p95"],
+                **self._outcomes[name]
+            }
+        return stats
+
+
+class TurnPipeline:
+    """
+    A set of independent stages run concurrently before a reply.
+    """
+
+    def __init__(self, name: str, metrics: Optional["TurnMetrics"] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            name (str): Pipeline name used in metrics (e.g. "chat")
+            metrics (Optional[TurnMetrics]): Where to record timings
+        """
+        self.name = name
+        self.metrics = metrics if metrics is not None else turn_metrics
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self.timings: Dict[str, Dict[str, Any]] = {}
+
+    def add_stage(self, name: str, run: Callable[[], Awaitable[Any]],
+                  timeout: Optional[float] = None, default: Any = None,
+                  required: bool = False) -> "TurnPipeline":
+        """
+        Add a stage.
+
+        Args:
+            name (str): Stage name
+            run (Callable[[], Awaitable[Any]]): Coroutine function doing the work
+            timeout (Optional[float]): Seconds to wait before giving up on the stage
+            default (Any): Result used when an optional stage times out or fails
+            required (bool): Whether a timeout or error fails the whole turn
+
+        Returns:
+            TurnPipeline: The pipeline, for chaining
+        """
+        self._stages[name] = {"run": run, "timeout": timeout,
+                              "default": default, "required": required}
+        return self
+
+    async def _run_stage(self, name: str, stage: Dict[str, Any]) -> Any:
+        """
+        Run one stage with its timeout, falling back to its default.
+
+        Args:
+            name (str): Stage name
+            stage (Dict[str, Any]): Stage settings
+
+        Returns:
+            Any: The stage result or its default
+        """
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            return await asyncio.wait_for(stage["run"](), stage["timeout"])
+        except asyncio.TimeoutError:
+            status = "timeout"
+            logger.warning(
+                f"Stage {self.name}/{name} timed out after {stage['timeout']}s")
+            if stage["required"]:
+                raise
+            return stage["default"]
+        except Exception as e:
+            status = "error"
+            logger.error(f"Error in stage {self.name}/{name}: {str(e)}")
+            if stage["required"]:
+                raise
+            return stage["default"]
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self.timings[name] = {"ms": round(duration_ms, 1), "status": status}
+            self.metrics.record(f"{self.name}/{name}", duration_ms, status)
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run all stages concurrently.
+
+        Returns:
+            Dict[str, Any]: Stage results keyed by stage name
+
+        Raises:
+            Exception: The error of a required stage, if one fails
+        """
+        start = time.perf_counter()
+        names = list(self._stages)
+        results = await asyncio.gather(
+            *(self._run_stage(name, self._stages[name]) for name in names))
+
+        duration_ms = (time.perf_counter() - start) * 1000
+        self.timings["total"] = {"ms": round(duration_ms, 1), "status": "ok"}
+        self.metrics.record(f"{self.name}/total", duration_ms)
+        logger.debug(f"Turn pipeline {self.name}: {self.timings}")
+        return dict(zip(names, results))
+
+
+# Create a singleton instance
+turn_metrics = TurnMetrics()
+
+# Report turn stage latency alongside call telemetry
+llm_telemetry.register_source("turn_pipeline", turn_metrics.get_stats)
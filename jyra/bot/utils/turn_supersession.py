@@ -0,0 +1,216 @@
+"""
+Turn supersession for Jyra chat handlers.
+
+Users often send several short messages in a row. When a new text message
+arrives from a user whose previous turn has not replied yet, that turn is
+cancelled. Its text is carried over and answered together with the new
+message, so the user gets one reply instead of a string of replies to
+messages they have already moved past. Once a turn starts sending its reply
+it can no longer be superseded.
+
+New messages are noticed as they arrive at the update processor, while they
+still wait for the user's earlier update to finish.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Awaitable, TypeVar
+
+from telegram import Update
+
+from jyra.ai.telemetry import llm_telemetry
+from jyra.bot.utils.update_processor import update_processor
+from jyra.utils.config import TURN_SUPERSESSION_ENABLED, TURN_MERGE_WINDOW_SECONDS
+from jyra.utils.exceptions import TurnSupersededException
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+
+class Turn:
+    """
+    One chat turn that a newer message may supersede until it commits.
+    """
+
+    def __init__(self, user_id: int, messages: List[str]):
+        """
+        Initialize the turn.
+
+        Args:
+            user_id (int): User ID
+            messages (List[str]): The user's messages answered by this turn, oldest first
+        """
+        self.user_id = user_id
+        self.messages = messages
+        self.superseded = False
+        self.committed = False
+        self.reply_started = False
+        self._task: Optional[asyncio.Future] = None
+        self._cancelled_step = False
+
+    @property
+    def text(self) -> str:
+        """The combined input of the turn."""
+        return "\n".join(self.messages)
+
+    async def run(self, awaitable: Awaitable[T], reply: bool = False) -> T:
+        """
+        Run a step of the turn, cancelling it if the turn is superseded.
+
+        Args:
+            awaitable (Awaitable[T]): The step
+            reply (bool): Whether the step generates the reply
+
+        Returns:
+            T: The step's result
+
+        Raises:
+            TurnSupersededException: If a newer message superseded the turn
+        """
+        if self.superseded:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise TurnSupersededException(self.user_id)
+
+        self.reply_started = self.reply_started or reply
+        self._task = asyncio.ensure_future(awaitable)
+        try:
+            return await self._task
+        except asyncio.CancelledError:
+            # Only translate our own cancellation, not a shutdown of the handler
+            if self._cancelled_step:
+                raise TurnSupersededException(self.user_id)
+            raise
+        finally:
+            self._task = None
+            self._cancelled_step = False
+
+    def commit(self) -> None:
+        """
+        Mark the turn as replying, after which it can no longer be superseded.
+
+        Raises:
+            TurnSupersededException: If a newer message superseded the turn
+        """
+        if self.superseded:
+            raise TurnSupersededException(self.user_id)
+        self.committed = True
+
+    def supersede(self) -> bool:
+        """
+        Cancel the turn if it has not started replying.
+
+        Returns:
+            bool: True if the turn was superseded
+        """
+        if self.committed or self.superseded:
+            return False
+        self.superseded = True
+        if self._task and not self._task.done():
+            self._cancelled_step = self._task.cancel()
+        return True
+
+
+class TurnSupersession:
+    """
+    Tracks each user's unanswered turn and carries superseded input forward.
+    """
+
+    def __init__(self, enabled: bool = TURN_SUPERSESSION_ENABLED,
+                 merge_window_seconds: float = TURN_MERGE_WINDOW_SECONDS):
+        """
+        Initialize the tracker.
+
+        Args:
+            enabled (bool): Whether new messages supersede unanswered turns
+            merge_window_seconds (float): How long superseded input is kept for
+                the next turn
+        """
+        self.enabled = enabled
+        self.merge_window_seconds = merge_window_seconds
+        self._active: Dict[int, Turn] = {}
+        self._carried: Dict[int, Dict[str, Any]] = {}
+        self.stats = {"turns": 0, "superseded": 0, "merged_messages": 0,
+                      "cancelled_llm_calls": 0, "avoided_llm_calls": 0}
+
+    def start(self, user_id: int, message: str) -> Turn:
+        """
+        Start a turn, picking up input carried over from superseded turns.
+
+        Args:
+            user_id (int): User ID
+            message (str): The user's new message
+
+        Returns:
+            Turn: The turn
+        """
+        messages = [message]
+        carried = self._carried.pop(user_id, None)
+        if carried and time.monotonic() - carried["at"] <= self.merge_window_seconds:
+            messages = carried["messages"] + messages
+            self.stats["merged_messages"] += len(carried["messages"])
+
+        turn = Turn(user_id, messages)
+        self.stats["turns"] += 1
+        if self.enabled:
+            self._active[user_id] = turn
+        return turn
+
+    def finish(self, turn: Turn) -> None:
+        """
+        End a turn; a superseded turn's input is kept for the user's next turn.
+
+        Args:
+            turn (Turn): The turn
+        """
+        if self._active.get(turn.user_id) is turn:
+            del self._active[turn.user_id]
+        if not turn.superseded:
+            return
+
+        self.stats["superseded"] += 1
+        if turn.reply_started:
+            self.stats["cancelled_llm_calls"] += 1
+        else:
+            self.stats["avoided_llm_calls"] += 1
+        self._carried[turn.user_id] = {"messages": turn.messages, "at": time.monotonic()}
+        logger.info(
+            f"Turn for user {turn.user_id} superseded, carrying {len(turn.messages)} messages forward")
+
+    def notice(self, update: object) -> None:
+        """
+        Supersede the sender's unanswered turn when a new text message arrives.
+
+        Args:
+            update (object): The incoming update
+        """
+        if not self.enabled or not isinstance(update, Update):
+            return
+        message = update.message
+        if not message or not message.text or message.text.startswith("/"):
+            return
+        turn = self._active.get(update.effective_user.id if update.effective_user else None)
+        if turn:
+            turn.supersede()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get supersession counters.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        return {**self.stats, "active_turns": len(self._active),
+                "carried_users": len(self._carried)}
+
+
+# Create a singleton instance
+turn_supersession = TurnSupersession()
+
+# Watch incoming updates for messages that supersede an unanswered turn
+update_processor.add_arrival_listener(turn_supersession.notice)
+
+# Report superseded turns and avoided calls alongside call telemetry
+llm_telemetry.register_source("turn_supersession", turn_supersession.get_stats)
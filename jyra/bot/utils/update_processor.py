@@ -0,0 +1,200 @@
+"""
+Per-user ordered update processing for Jyra.
+
+Updates from different users are handled concurrently, so one slow model call
+no longer holds up everyone else's messages. Updates from the same user still
+run one at a time and in the order they arrived, which keeps context.user_data
+and the memory settings free of races. A user's queued updates wait for their
+turn before taking a global slot, so a burst from one user cannot occupy the
+slots other users need.
+
+python-telegram-bot hands every update to a task of its own as soon as it is
+fetched, so nothing upstream waits for the processor. An update is therefore
+counted from the moment it arrives, including while it waits for the base
+class's semaphore, and that backlog is what the webhook server refuses
+deliveries on.
+"""
+
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from jyra.ai.telemetry import RollingHistogram, llm_telemetry
+from jyra.utils.config import (
+    UPDATE_MAX_CONCURRENT, UPDATE_PER_USER_CONCURRENCY, UPDATE_MAX_PENDING,
+    TELEMETRY_WINDOW_SECONDS
+)
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+WAIT_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Arrival time of the update processed by the current task
+_arrived_at: ContextVar[Optional[float]] = ContextVar("update_arrived_at", default=None)
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Update processor that serializes each user's updates and runs users concurrently.
+    """
+
+    def __init__(self, max_concurrent: int = UPDATE_MAX_CONCURRENT,
+                 per_user_concurrency: int = UPDATE_PER_USER_CONCURRENCY,
+                 max_pending: int = UPDATE_MAX_PENDING):
+        """
+        Initialize the processor.
+
+        Args:
+            max_concurrent (int): Updates processed at the same time across all users
+            per_user_concurrency (int): Updates processed at the same time per user;
+                1 keeps each user's updates strictly in order
+            max_pending (int): Updates admitted to the per-user queues at once;
+                later arrivals wait, in arrival order, for one of them to finish
+        """
+        super().__init__(max(max_pending, max_concurrent))
+        self.max_concurrent = max_concurrent
+        self.per_user_concurrency = per_user_concurrency
+        self._global: Optional[asyncio.Semaphore] = None
+        # Per user: semaphore and number of updates holding or waiting for it
+        self._users: Dict[Any, Dict[str, Any]] = {}
+        self._arrival_listeners: List[Callable[[object], None]] = []
+        # Updates that arrived and are not finished, wherever they wait
+        self._backlog = 0
+        self._running = 0
+        self.queue_wait = RollingHistogram(WAIT_BUCKETS_MS, TELEMETRY_WINDOW_SECONDS)
+        self.stats = {"processed": 0, "peak_user_depth": 0, "peak_backlog": 0}
+
+    @property
+    def backlog(self) -> int:
+        """Updates that arrived and are not finished yet, running or waiting."""
+        return self._backlog
+
+    @staticmethod
+    def _user_key(update: object) -> Optional[Any]:
+        """Get the key updates are ordered by: the user, or the chat for channel posts."""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_user:
+            return update.effective_user.id
+        if update.effective_chat:
+            return f"chat:{update.effective_chat.id}"
+        return None
+
+    def add_arrival_listener(self, listener: Callable[[object], None]) -> None:
+        """
+        Call a function for every update as soon as it arrives, before it waits
+        for the user's earlier updates.
+
+        Args:
+            listener (Callable[[object], None]): Called with the update
+        """
+        self._arrival_listeners.append(listener)
+
+    async def initialize(self) -> None:
+        """Create the global semaphore on the running event loop."""
+        self._global = asyncio.Semaphore(self.max_concurrent)
+
+    async def shutdown(self) -> None:
+        """Log any updates that were still waiting."""
+        if self._backlog:
+            logger.warning(f"Update processor shut down with {self._backlog} updates pending")
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """
+        Count an update as soon as it arrives, then process it.
+
+        Args:
+            update (object): The update
+            coroutine (Awaitable[Any]): Processes the update
+        """
+        _arrived_at.set(time.monotonic())
+        self._backlog += 1
+        self.stats["peak_backlog"] = max(self.stats["peak_backlog"], self._backlog)
+
+        for listener in self._arrival_listeners:
+            try:
+                listener(update)
+            except Exception as e:
+                logger.error(f"Error in update arrival listener: {str(e)}")
+
+        try:
+            await super().process_update(update, coroutine)
+        finally:
+            self._backlog -= 1
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """
+        Process an update after the user's earlier updates and within the global limit.
+
+        Args:
+            update (object): The update
+            coroutine (Awaitable[Any]): Processes the update
+        """
+        if self._global is None:
+            await self.initialize()
+
+        key = self._user_key(update)
+        state = None
+        if key is not None:
+            state = self._users.get(key)
+            if state is None:
+                state = {"semaphore": asyncio.Semaphore(self.per_user_concurrency), "depth": 0}
+                self._users[key] = state
+            state["depth"] += 1
+            self.stats["peak_user_depth"] = max(self.stats["peak_user_depth"], state["depth"])
+
+        start = _arrived_at.get() or time.monotonic()
+        try:
+            if state is not None:
+                await state["semaphore"].acquire()
+            try:
+                async with self._global:
+                    self.queue_wait.add((time.monotonic() - start) * 1000)
+                    self._running += 1
+                    try:
+                        await coroutine
+                    finally:
+                        self._running -= 1
+                        self.stats["processed"] += 1
+            finally:
+                if state is not None:
+                    state["semaphore"].release()
+        finally:
+            if state is not None:
+                state["depth"] -= 1
+                if state["depth"] == 0:
+                    del self._users[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get concurrency and queue depth metrics.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        depths = [state["depth"] for state in self._users.values()]
+        wait = self.queue_wait.summary()
+        return {
+            **self.stats,
+            "running": self._running,
+            "max_concurrent": self.max_concurrent,
+            "per_user_concurrency": self.per_user_concurrency,
+            "backlog": self._backlog,
+            "waiting": self._backlog - self._running,
+            "active_users": len(depths),
+            "max_user_depth": max(depths, default=0),
+            "queue_wait_p50_ms": wait["p50"],
+            "queue_wait_p95_ms": wait["p95"]
+        }
+
+
+# Create a singleton instance
+update_processor = PerUserUpdateProcessor()
+
+# Report update concurrency and backlog alongside call telemetry
+llm_telemetry.register_source("update_processor", update_processor.get_stats)
@@ -0,0 +1,254 @@
+"""
+Webhook mode for Jyra.
+
+Instead of polling getUpdates, Telegram POSTs each update to an embedded
+aiohttp server. Requests must carry the configured secret token in the
+X-Telegram-Bot-Api-Secret-Token header. Accepted updates go onto the
+application's update queue and are answered right away, so Telegram can send
+the next one without waiting for a reply to be generated. When too many
+updates are waiting, new deliveries are refused with a 503; Telegram retries
+them later, which pushes the backlog back to Telegram instead of into memory.
+The application's fetcher takes updates off the queue as soon as they arrive
+and starts a task for each, so the backlog is counted as the updates still on
+the queue plus those the update processor has received and not finished.
+"""
+
+import asyncio
+import hmac
+import json
+import signal
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+from jyra.ai.telemetry import RollingHistogram, llm_telemetry
+from jyra.utils.config import (
+    WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_URL, WEBHOOK_SECRET_TOKEN,
+    WEBHOOK_MAX_QUEUE, WEBHOOK_RECORD_PATH, TELEMETRY_WINDOW_SECONDS
+)
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# Seconds Telegram is asked to wait before redelivering a refused update
+BUSY_RETRY_AFTER = 1
+
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class WebhookServer:
+    """
+    aiohttp server receiving Telegram updates for an application.
+    """
+
+    def __init__(self, application: Application, host: str = WEBHOOK_LISTEN,
+                 port: int = WEBHOOK_PORT, path: str = WEBHOOK_PATH,
+                 secret_token: str = WEBHOOK_SECRET_TOKEN, public_url: str = WEBHOOK_URL,
+                 max_queue: int = WEBHOOK_MAX_QUEUE,
+                 record_path: Optional[str] = WEBHOOK_RECORD_PATH):
+        """
+        Initialize the server.
+
+        Args:
+            application (Application): Application whose update queue receives the updates
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 picks a free port)
+            path (str): URL path Telegram posts updates to
+            secret_token (str): Token every request must carry; empty accepts any request
+            public_url (str): URL registered with Telegram on start; empty skips registration
+            max_queue (int): Updates queued or being processed before deliveries are refused
+            record_path (Optional[str]): JSON lines file every accepted update is appended to
+        """
+        self.application = application
+        self.host = host
+        self.port = port
+        self.path = "/" + path.strip("/")
+        self.secret_token = secret_token
+        self.public_url = public_url
+        self.max_queue = max_queue
+        self.record_path = Path(record_path) if record_path else None
+
+        self._runner: Optional[web.AppRunner] = None
+        self.handle_latency = RollingHistogram(LATENCY_BUCKETS_MS, TELEMETRY_WINDOW_SECONDS)
+        self.stats = {"accepted": 0, "rejected_secret": 0, "rejected_busy": 0,
+                      "invalid": 0, "peak_queue": 0}
+
+    @property
+    def url(self) -> str:
+        """Local URL updates are posted to."""
+        return f"http://{self.host}:{self.port}{self.path}"
+
+    def create_app(self) -> web.Application:
+        """
+        Create the aiohttp application.
+
+        Returns:
+            web.Application: The application
+        """
+        app = web.Application()
+        app.router.add_post(self.path, self._handle_update)
+        app.router.add_get("/healthz", self._handle_health)
+        return app
+
+    async def start(self) -> None:
+        """
+        Start serving and register the webhook with Telegram if a public URL is set.
+        """
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+        logger.info(f"Webhook server listening on {self.url}")
+
+        if self.public_url:
+            await self.application.bot.set_webhook(
+                url=self.public_url,
+                secret_token=self.secret_token or None,
+                allowed_updates=Update.ALL_TYPES
+            )
+            logger.info(f"Webhook registered at {self.public_url}")
+
+    async def stop(self) -> None:
+        """
+        Stop serving. The webhook stays registered so Telegram keeps updates
+        for the next start.
+        """
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "WebhookServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        """Validate an update and put it on the application's update queue."""
+        start = time.monotonic()
+        if self.secret_token and not hmac.compare_digest(
+                request.headers.get(SECRET_HEADER, "").encode("utf-8"),
+                self.secret_token.encode("utf-8")):
+            self.stats["rejected_secret"] += 1
+            return web.Response(status=403)
+
+        queue = self.application.update_queue
+        if self.backlog() >= self.max_queue:
+            self.stats["rejected_busy"] += 1
+            return web.Response(status=503, headers={"Retry-After": str(BUSY_RETRY_AFTER)})
+
+        try:
+            data = await request.json()
+            update = Update.de_json(data, self.application.bot)
+        except Exception as e:
+            update = None
+            logger.warning(f"Invalid webhook update: {str(e)}")
+        if update is None:
+            self.stats["invalid"] += 1
+            return web.Response(status=400)
+
+        if self.record_path:
+            self._record(data)
+
+        await queue.put(update)
+        self.stats["accepted"] += 1
+        self.stats["peak_queue"] = max(self.stats["peak_queue"], self.backlog())
+        self.handle_latency.add((time.monotonic() - start) * 1000)
+        return web.Response()
+
+    def backlog(self) -> int:
+        """
+        Count the updates received and not yet handled.
+
+        Returns:
+            int: Updates on the update queue plus those held by the update
+                processor, running or waiting
+        """
+        processor_backlog = getattr(self.application.update_processor, "backlog", 0)
+        return self.application.update_queue.qsize() + processor_backlog
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        """Report the server's counters, e.g. for a load balancer."""
+        return web.json_response(self.get_stats())
+
+    def _record(self, data: Dict[str, Any]) -> None:
+        """Append a received update to the record file."""
+        try:
+            self.record_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.record_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(data) + "\n")
+        except Exception as e:
+            logger.error(f"Error recording webhook update: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get delivery counters, queue depth and backlog.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        latency = self.handle_latency.summary()
+        return {
+            **self.stats,
+            "queue": self.application.update_queue.qsize(),
+            "backlog": self.backlog(),
+            "max_queue": self.max_queue,
+            "handle_p50_ms": latency["p50"],
+            "handle_p95_ms": latency["p95"]
+        }
+
+
+def stop_on_signals() -> asyncio.Event:
+    """
+    Create an event that is set on SIGINT or SIGTERM.
+
+    Returns:
+        asyncio.Event: The event
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            # Not supported on this platform; Ctrl+C still ends asyncio.run
+            pass
+    return stop
+
+
+async def run_webhook(application: Application, server: Optional[WebhookServer] = None) -> None:
+    """
+    Run an application in webhook mode until SIGINT or SIGTERM.
+
+    Args:
+        application (Application): The application
+        server (Optional[WebhookServer]): The server; one with the configured
+            settings by default
+    """
+    server = server or WebhookServer(application)
+    llm_telemetry.register_source("webhook", server.get_stats)
+    stop = stop_on_signals()
+
+    try:
+        async with application:
+            if application.post_init:
+                await application.post_init(application)
+            await application.start()
+            try:
+                async with server:
+                    await stop.wait()
+            finally:
+                logger.info("Stopping webhook mode")
+                await application.stop()
+    finally:
+        if application.post_shutdown:
+            await application.post_shutdown(application)
@@ -0,0 +1,440 @@
+"""
+Multi-process worker sharding for Jyra.
+
+A single process keeps all handler work on one core. With `jyra.cli bot
+--workers N`, a front process receives the updates (by polling or webhook) and
+forwards each one to one of N worker processes. Workers are full bot instances
+that receive updates over a local webhook instead of from Telegram. An update
+goes to the worker picked by a stable hash of its user, so a user's updates
+always reach the same worker. Per-user ordering and in-process caches therefore
+keep working as in a single process. Each worker has one sender that forwards
+its updates one after another, which keeps their order across retries.
+
+The front checks every worker's health endpoint and restarts workers that
+exited or stopped answering. Updates for a restarting worker wait in its queue.
+A busy worker refuses deliveries with a 503 once its backlog is full, so
+updates it cannot take yet wait in the front's queue for it, and dispatching
+waits when that queue is full too.
+"""
+
+import asyncio
+import hashlib
+import os
+import secrets
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+import aiohttp
+from telegram import Update
+from telegram.ext import Application
+
+from jyra.ai.telemetry import llm_telemetry
+from jyra.ai.utils.api_errors import parse_retry_after
+from jyra.bot.utils.webhook_server import (
+    SECRET_HEADER, WebhookServer, run_webhook, stop_on_signals
+)
+from jyra.utils.config import (
+    TELEGRAM_BOT_TOKEN, BOT_MODE, WORKER_BASE_PORT, WORKER_HEALTH_INTERVAL,
+    WORKER_HEALTH_FAILURES, WORKER_STARTUP_TIMEOUT, WORKER_QUEUE_SIZE, TELEMETRY_EXPORT_PATH
+)
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Environment variable carrying the secret shared by the front and its workers
+WORKER_SECRET_ENV = "JYRA_WORKER_SECRET"
+
+# Environment variable telling workers how many share the bot's send budgets
+WORKER_COUNT_ENV = "JYRA_WORKER_COUNT"
+
+# Local path workers receive updates on
+WORKER_PATH = "/update"
+
+# Seconds between attempts to deliver an update to an unreachable worker
+RETRY_DELAY = 0.5
+
+# Longest Retry-After a busy worker's answer may impose, in seconds
+MAX_RETRY_DELAY = 30.0
+
+
+def shard_key(update: Update) -> Any:
+    """
+    Get the key an update is sharded by: the user, or the chat for channel posts.
+
+    Args:
+        update (Update): The update
+
+    Returns:
+        Any: The key, or the update ID for updates without user or chat
+    """
+    if update.effective_user:
+        return update.effective_user.id
+    if update.effective_chat:
+        return f"chat:{update.effective_chat.id}"
+    return update.update_id
+
+
+def shard_for(key: Any, workers: int) -> int:
+    """
+    Pick the worker of a shard key.
+
+    The hash is stable across processes and restarts, unlike hash().
+
+    Args:
+        key (Any): The shard key
+        workers (int): Number of workers
+
+    Returns:
+        int: Index of the worker
+    """
+    digest = hashlib.sha256(str(key).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % workers
+
+
+def worker_telemetry_path(index: int) -> str:
+    """Telemetry snapshot file of a worker, next to the front process's snapshot."""
+    export_path = Path(TELEMETRY_EXPORT_PATH)
+    return str(export_path.with_name(f"{export_path.stem}.worker{index}{export_path.suffix}"))
+
+
+def worker_command(index: int, port: int) -> List[str]:
+    """Command line that starts a worker process."""
+    return [sys.executable, "-m", "jyra.cli", "worker", "--index", str(index), "--port", str(port)]
+
+
+class WorkerProcess:
+    """
+    One worker process and the queue of updates waiting to be forwarded to it.
+    """
+
+    def __init__(self, index: int, port: int, command: List[str], env: Dict[str, str],
+                 queue_size: int):
+        """
+        Initialize the worker.
+
+        Args:
+            index (int): Index of the worker
+            port (int): Local port the worker listens on
+            command (List[str]): Command line that starts the worker
+            env (Dict[str, str]): Environment of the worker process
+            queue_size (int): Updates held for the worker at most
+        """
+        self.index = index
+        self.port = port
+        self.command = command
+        self.env = env
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.started_at: Optional[float] = None
+        self.ready = False
+        self.health_failures = 0
+        self.health: Dict[str, Any] = {}
+        self.stats = {"forwarded": 0, "retries": 0, "dropped": 0, "restarts": 0}
+
+    @property
+    def url(self) -> str:
+        """URL updates are forwarded to."""
+        return f"http://127.0.0.1:{self.port}{WORKER_PATH}"
+
+    @property
+    def health_url(self) -> str:
+        """URL of the worker's health endpoint."""
+        return f"http://127.0.0.1:{self.port}/healthz"
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is running."""
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self) -> None:
+        """Start the worker process."""
+        self.process = await asyncio.create_subprocess_exec(*self.command, env=self.env)
+        self.started_at = time.monotonic()
+        self.ready = False
+        self.health_failures = 0
+        logger.info(f"Started worker {self.index} (pid {self.process.pid}) on port {self.port}")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the worker process, killing it if it does not exit in time.
+
+        Args:
+            timeout (float): Seconds to wait after asking it to terminate
+        """
+        if not self.alive:
+            return
+        self.process.terminate()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Worker {self.index} did not exit in time, killing it")
+            self.process.kill()
+            await self.process.wait()
+
+
+class WorkerPool:
+    """
+    Forwards updates to worker processes by user and keeps the workers running.
+    """
+
+    def __init__(self, workers: int, base_port: int = WORKER_BASE_PORT,
+                 command: Callable[[int, int], List[str]] = worker_command,
+                 health_interval: float = WORKER_HEALTH_INTERVAL,
+                 max_health_failures: int = WORKER_HEALTH_FAILURES,
+                 startup_timeout: float = WORKER_STARTUP_TIMEOUT,
+                 queue_size: int = WORKER_QUEUE_SIZE):
+        """
+        Initialize the pool.
+
+        Args:
+            workers (int): Number of worker processes
+            base_port (int): Port of the first worker; the others use the following ports
+            command (Callable[[int, int], List[str]]): Builds a worker's command line
+                from its index and port
+            health_interval (float): Seconds between health checks
+            max_health_failures (int): Failed health checks in a row before a
+                running worker is restarted
+            startup_timeout (float): Seconds a new worker has to answer its first
+                health check before failures count
+            queue_size (int): Updates held per worker before dispatching waits
+        """
+        self.secret = secrets.token_urlsafe(24)
+        self.health_interval = health_interval
+        self.max_health_failures = max_health_failures
+        self.startup_timeout = startup_timeout
+        self.workers = [
+            WorkerProcess(index, base_port + index, command(index, base_port + index),
+                          self._worker_env(index, workers), queue_size)
+            for index in range(workers)
+        ]
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _worker_env(self, index: int, workers: int) -> Dict[str, str]:
+        """Environment of a worker: the pool's secret, the worker count and its own telemetry file."""
+        return {
+            **os.environ,
+            WORKER_SECRET_ENV: self.secret,
+            WORKER_COUNT_ENV: str(workers),
+            "TELEMETRY_EXPORT_PATH": worker_telemetry_path(index)
+        }
+
+    async def start(self) -> None:
+        """Start the workers, their senders and the health checks."""
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        for worker in self.workers:
+            await worker.start()
+            self._tasks.append(asyncio.create_task(self._send_loop(worker)))
+        self._tasks.append(asyncio.create_task(self._health_loop()))
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """
+        Forward the updates still queued, then stop the workers.
+
+        Args:
+            drain_timeout (float): Seconds to wait for the queues to drain
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(worker.queue.join() for worker in self.workers)), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping workers with updates still queued")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.gather(*(worker.stop() for worker in self.workers))
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def dispatch(self, update: Update) -> int:
+        """
+        Queue an update for the worker of its user, waiting while that worker's queue is full.
+
+        Args:
+            update (Update): The update
+
+        Returns:
+            int: Index of the worker
+        """
+        index = shard_for(shard_key(update), len(self.workers))
+        await self.workers[index].queue.put(update.to_dict())
+        return index
+
+    async def _send_loop(self, worker: WorkerProcess) -> None:
+        """Forward a worker's updates one at a time, in order."""
+        while True:
+            data = await worker.queue.get()
+            try:
+                await self._forward(worker, data)
+            except Exception as e:
+                # Drop the update rather than end the worker's only sender
+                worker.stats["dropped"] += 1
+                logger.error(f"Error forwarding update {data.get('update_id')} to worker "
+                             f"{worker.index}, dropping it: {str(e)}")
+            finally:
+                worker.queue.task_done()
+
+    async def _forward(self, worker: WorkerProcess, data: Dict[str, Any]) -> None:
+        """
+        Deliver an update to a worker, retrying while the worker is busy or unreachable.
+
+        Args:
+            worker (WorkerProcess): The worker
+            data (Dict[str, Any]): The update as a dictionary
+        """
+        headers = {SECRET_HEADER: self.secret}
+        while True:
+            try:
+                async with self._session.post(worker.url, json=data, headers=headers) as response:
+                    if response.status == 200:
+                        worker.stats["forwarded"] += 1
+                        return
+                    if response.status != 503:
+                        # The worker cannot handle this update; retrying won't help
+                        worker.stats["dropped"] += 1
+                        logger.error(f"Worker {worker.index} rejected update "
+                                     f"{data.get('update_id')} with status {response.status}")
+                        return
+                    delay = min(parse_retry_after(response.headers) or RETRY_DELAY, MAX_RETRY_DELAY)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Starting or restarting; the update waits for it
+                delay = RETRY_DELAY
+            worker.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def _health_loop(self) -> None:
+        """Check the workers periodically and restart dead or unresponsive ones."""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for worker in self.workers:
+                try:
+                    await self.check_worker(worker)
+                except Exception as e:
+                    # Keep checking; a failed restart is retried on the next round
+                    logger.error(f"Error checking worker {worker.index}: {str(e)}")
+
+    async def check_worker(self, worker: WorkerProcess) -> bool:
+        """
+        Check a worker's health and restart it if it exited or keeps failing.
+
+        Args:
+            worker (WorkerProcess): The worker
+
+        Returns:
+            bool: True if the worker answered its health check
+        """
+        if worker.alive:
+            try:
+                async with self._session.get(worker.health_url,
+                                             timeout=aiohttp.ClientTimeout(total=2)) as response:
+                    if response.status == 200:
+                        worker.health = await response.json()
+                        worker.ready = True
+                        worker.health_failures = 0
+                        return True
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                # Unreachable, or answering with something other than its counters
+                pass
+            if not worker.ready and time.monotonic() - worker.started_at < self.startup_timeout:
+                # Still importing and connecting
+                return False
+            worker.health_failures += 1
+            if worker.health_failures < self.max_health_failures:
+                return False
+            logger.warning(f"Worker {worker.index} failed {worker.health_failures} health checks")
+        else:
+            logger.warning(f"Worker {worker.index} exited with code {worker.process.returncode}")
+
+        await worker.stop()
+        worker.stats["restarts"] += 1
+        await worker.start()
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-worker forwarding, restart and health metrics.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        workers = {}
+        for worker in self.workers:
+            workers[str(worker.index)] = {
+                **worker.stats,
+                "pid": worker.process.pid if worker.process else None,
+                "alive": worker.alive,
+                "ready": worker.ready,
+                "queued": worker.queue.qsize(),
+                "health_failures": worker.health_failures,
+                "uptime_seconds": round(time.monotonic() - worker.started_at, 1)
+                if worker.started_at else None,
+                "worker_queue": worker.health.get("queue"),
+                "worker_backlog": worker.health.get("backlog"),
+                "worker_handle_p95_ms": worker.health.get("handle_p95_ms")
+            }
+        return {"workers": workers}
+
+
+async def run_worker(application: Application, port: int) -> None:
+    """
+    Run a worker: the application, receiving updates from the front process.
+
+    Args:
+        application (Application): The application, built without an updater
+        port (int): Local port to listen on
+    """
+    server = WebhookServer(application, host="127.0.0.1", port=port, path=WORKER_PATH,
+                           secret_token=os.environ.get(WORKER_SECRET_ENV, ""),
+                           public_url="", record_path=None)
+    await run_webhook(application, server)
+
+
+async def run_sharded(workers: int, pool: Optional[WorkerPool] = None) -> None:
+    """
+    Receive updates in this process and forward them to worker processes until
+    SIGINT or SIGTERM.
+
+    Args:
+        workers (int): Number of worker processes
+        pool (Optional[WorkerPool]): The pool; one with the configured settings by default
+    """
+    pool = pool or WorkerPool(workers)
+    llm_telemetry.register_source("worker_pool", pool.get_stats)
+    stop = stop_on_signals()
+
+    # Only receives updates; the workers handle them and talk to Telegram
+    front = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+
+    async def forward() -> None:
+        while True:
+            update = await front.update_queue.get()
+            if update is None:
+                return
+            await pool.dispatch(update)
+
+    async with front:
+        await pool.start()
+        server = None
+        forwarder = asyncio.create_task(forward())
+        try:
+            if BOT_MODE == "webhook":
+                server = WebhookServer(front)
+                llm_telemetry.register_source("webhook", server.get_stats)
+                await server.start()
+            else:
+                await front.updater.start_polling(allowed_updates=Update.ALL_TYPES)
+            await stop.wait()
+        finally:
+            logger.info("Stopping sharded bot")
+            if server:
+                await server.stop()
+            elif front.updater.running:
+                await front.updater.stop()
+            # Updates already received are still forwarded before the workers stop
+            await front.update_queue.put(None)
+            await forwarder
+            await pool.stop()
@@ -13,7 +13,9 @@ from pathlib import Path
 import nest_asyncio
 from dotenv import load_dotenv
 
-from jyra.utils.config import validate_config
+from jyra.utils.config import (
+    validate_config, BOT_MODE, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN
+)
 from jyra.utils.logger import setup_logger
 from jyra.db.models.role import Role
 from jyra.db.init_db import init_db
@@ -23,6 +25,9 @@ from jyra.bot.handlers.register_handlers import (
     register_message_handlers
 )
 from jyra.bot.handlers.error_handlers import error_handler
+from jyra.bot.tasks import shutdown_background_tasks
+from jyra.bot.utils.send_scheduler import send_scheduler
+from jyra.bot.utils.update_processor import update_processor
 from telegram.ext import Application
 
 # Apply nest_asyncio to allow nested event loops
@@ -97,8 +102,8 @@ async def run_maintenance():
     print(f"{COLORS['GREEN']}All maintenance tasks completed!{COLORS['ENDC']}")
 
 
-async def run_bot():
-    """Run the Jyra bot."""
+async def run_bot(workers: int = 1):
+    """Run the Jyra bot, optionally sharded across worker processes."""
     from jyra.utils.config import TELEGRAM_BOT_TOKEN
     
     # Display ASCII art
@@ -119,9 +124,24 @@ async def run_bot():
     print(f"{COLORS['YELLOW']}Setting up database...{COLORS['ENDC']}")
     await setup_database()
 
+    if workers > 1:
+        from jyra.bot.utils.worker_pool import run_sharded
+        print(f"{COLORS['YELLOW']}Starting {workers} worker processes...{COLORS['ENDC']}")
+        print(f"{COLORS['YELLOW']}Press Ctrl+C to stop the bot{COLORS['ENDC']}\n")
+        logger.info(f"Starting Jyra bot with {workers} workers...")
+        await run_sharded(workers)
+        return
+
     # Create the Application
     print(f"{COLORS['YELLOW']}Initializing Telegram bot...{COLORS['ENDC']}")
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .concurrent_updates(update_processor)
+        .rate_limiter(send_scheduler)
+        .post_shutdown(shutdown_background_tasks)
+        .build()
+    )
 
     # Register handlers
     print(f"{COLORS['YELLOW']}  → Registering handlers...{COLORS['ENDC']}")
@@ -139,7 +159,82 @@ async def run_bot():
     print(f"{COLORS['BLUE']}Bot is now online and ready to chat!{COLORS['ENDC']}")
     print(f"{COLORS['YELLOW']}Press Ctrl+C to stop the bot{COLORS['ENDC']}\n")
     logger.info("Starting Jyra bot...")
-    application.run_polling()
+    if BOT_MODE == "webhook":
+        from jyra.bot.utils.webhook_server import run_webhook
+        print(f"{COLORS['YELLOW']}  → Receiving updates via webhook on "
+              f"{WEBHOOK_LISTEN}:{WEBHOOK_PORT}{WEBHOOK_PATH}{COLORS['ENDC']}")
+        await run_webhook(application)
+    else:
+        application.run_polling()
+
+
+def show_telemetry(as_json: bool = False, output: str = None, worker: int = None):
+    """Show or export the LLM telemetry snapshot written by the running bot."""
+    import json
+    from jyra.ai.telemetry import format_report
+    from jyra.utils.config import TELEMETRY_EXPORT_PATH
+
+    snapshot_path = Path(TELEMETRY_EXPORT_PATH)
+    if worker is not None:
+        from jyra.bot.utils.worker_pool import worker_telemetry_path
+        snapshot_path = Path(worker_telemetry_path(worker))
+    if not snapshot_path.exists():
+        print(f"{COLORS['RED']}No telemetry snapshot at {snapshot_path}. "
+              f"Snapshots are written while the bot is running.{COLORS['ENDC']}")
+        return
+
+    snapshot = json.loads(snapshot_path.read_text())
+
+    if output:
+        Path(output).write_text(json.dumps(snapshot, indent=2))
+        print(f"{COLORS['GREEN']}Telemetry exported to {output}{COLORS['ENDC']}")
+    elif as_json:
+        print(json.dumps(snapshot, indent=2))
+    else:
+        print(format_report(snapshot))
+
+
+async def run_mock_llm(args):
+    """Run the local mock LLM server."""
+    from jyra.testing.mock_llm_server import MockLLMServer
+
+    server = MockLLMServer(
+        host=args.host, port=args.port, latency=args.latency,
+        embed_latency=args.embed_latency, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+        seed=args.seed)
+    await server.start()
+
+    print(f"{COLORS['GREEN']}Mock LLM server running on {server.url}{COLORS['ENDC']}")
+    print(f"  GEMINI_API_BASE_URL={server.gemini_url}")
+    print(f"  OPENAI_API_BASE_URL={server.openai_url}")
+    print(f"{COLORS['YELLOW']}Press Ctrl+C to stop the server{COLORS['ENDC']}")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+
+
+async def run_worker_process(args):
+    """Run one worker of a sharded bot."""
+    from jyra.main import create_application
+    from jyra.bot.utils.worker_pool import run_worker
+
+    logger.info(f"Worker {args.index} receiving updates on port {args.port}")
+    await run_worker(create_application(with_updater=False), args.port)
+
+
+async def run_replay_updates(args):
+    """Replay recorded or generated updates against a webhook endpoint."""
+    import json
+    from jyra.testing.webhook_replay import load_updates, synthetic_updates, replay_updates
+
+    updates = load_updates(args.file) if args.file else synthetic_updates(args.count, args.users)
+    print(f"{COLORS['YELLOW']}Posting {len(updates)} updates to {args.url}...{COLORS['ENDC']}")
+    result = await replay_updates(args.url, updates, secret_token=args.secret,
+                                  concurrency=args.concurrency, rate=args.rate)
+    print(json.dumps(result, indent=2))
 
 
 async def run_db_init():
@@ -156,6 +251,13 @@ def main():
 
     # Bot command
     bot_parser = subparsers.add_parser("bot", help="Run the Jyra bot")
+    bot_parser.add_argument("--workers", type=int, default=1,
+                            help="Handle updates in this many processes, sharded by user")
+
+    # Worker command (started by bot --workers)
+    worker_parser = subparsers.add_parser("worker", help="Run one worker of a sharded bot")
+    worker_parser.add_argument("--index", type=int, required=True, help="Index of the worker")
+    worker_parser.add_argument("--port", type=int, required=True, help="Local port to receive updates on")
     
     # Maintenance command
     maintenance_parser = subparsers.add_parser("maintenance", help="Run maintenance tasks")
@@ -163,17 +265,57 @@ def main():
     # Database initialization command
     db_init_parser = subparsers.add_parser("db-init", help="Initialize the database")
     
+    # Telemetry command
+    telemetry_parser = subparsers.add_parser("telemetry", help="Show LLM call telemetry")
+    telemetry_parser.add_argument("--json", action="store_true", help="Print the raw JSON snapshot")
+    telemetry_parser.add_argument("--output", help="Export the snapshot to a file")
+    telemetry_parser.add_argument("--worker", type=int, help="Show the snapshot of a sharded worker")
+
+    # Mock LLM server command
+    mock_parser = subparsers.add_parser("mock-llm", help="Run a local mock of the Gemini and OpenAI APIs")
+    mock_parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    mock_parser.add_argument("--port", type=int, default=8089, help="Port to listen on")
+    mock_parser.add_argument("--latency", default="0",
+                             help="Latency in ms: 200, uniform:100:400, normal:300:50 or lognormal:300:0.5")
+    mock_parser.add_argument("--embed-latency", default=None, help="Latency for embedding requests")
+    mock_parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    mock_parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests failing with 429")
+    mock_parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    mock_parser.add_argument("--seed", type=int, default=0, help="Seed for latency and fault injection")
+
+    # Webhook replay command
+    replay_parser = subparsers.add_parser("replay-updates", help="POST recorded or generated updates to a webhook")
+    replay_parser.add_argument("--url", default=f"http://127.0.0.1:{WEBHOOK_PORT}{WEBHOOK_PATH}",
+                               help="Webhook URL")
+    replay_parser.add_argument("--secret", default=WEBHOOK_SECRET_TOKEN, help="Secret token header value")
+    replay_parser.add_argument("--file", help="JSON lines file of recorded updates")
+    replay_parser.add_argument("--count", type=int, default=100, help="Generated updates (without --file)")
+    replay_parser.add_argument("--users", type=int, default=10, help="Users of the generated updates")
+    replay_parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight")
+    replay_parser.add_argument("--rate", type=float, default=0.0, help="Updates per second (0 for no limit)")
+
     # Version command
     version_parser = subparsers.add_parser("version", help="Show version information")
 
     args = parser.parse_args()
 
     if args.command == "bot":
-        asyncio.run(run_bot())
+        asyncio.run(run_bot(args.workers))
+    elif args.command == "worker":
+        asyncio.run(run_worker_process(args))
     elif args.command == "maintenance":
         asyncio.run(run_maintenance())
     elif args.command == "db-init":
         asyncio.run(run_db_init())
+    elif args.command == "telemetry":
+        show_telemetry(args.json, args.output, args.worker)
+    elif args.command == "mock-llm":
+        try:
+            asyncio.run(run_mock_llm(args))
+        except KeyboardInterrupt:
+            print(f"{COLORS['YELLOW']}Mock LLM server stopped{COLORS['ENDC']}")
+    elif args.command == "replay-updates":
+        asyncio.run(run_replay_updates(args))
     elif args.command == "version":
         print(f"{COLORS['BLUE']}{ASCII_ART}{COLORS['ENDC']}")
         print(f"{COLORS['BOLD']}Jyra AI Companion v1.0.0{COLORS['ENDC']}")
@@ -134,6 +134,11 @@ def init_db():
     CREATE INDEX IF NOT EXISTS idx_conversations_user_role ON conversations (user_id, role_id)
     ''')
 
+    # Keyset pagination of history, newest first
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_conversations_user_page ON conversations (user_id, timestamp, message_id)
+    ''')
+
     # Indexes for memories table
     cursor.execute('''
     CREATE INDEX IF NOT EXISTS idx_memories_user_id ON memories (user_id)
@@ -155,6 +160,11 @@ def init_db():
     CREATE INDEX IF NOT EXISTS idx_memories_source ON memories (source)
     ''')
 
+    # Keyset pagination of memories, most important first
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_memories_user_page ON memories (user_id, importance, memory_id)
+    ''')
+
     # Indexes for memory_summaries table
     cursor.execute('''
     CREATE INDEX IF NOT EXISTS idx_memory_summaries_user_id ON memory_summaries (user_id)
@@ -3,8 +3,13 @@ Conversation model for Jyra
 """
 
 import sqlite3
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
+from jyra.db.utils.group_commit import group_commit_writer
+from jyra.db.utils.history_cache import history_cache
+from jyra.db.utils.pagination import (
+    Cursor, count_cache, keyset_condition, timestamp_key, timestamp_value
+)
 from jyra.utils.config import DATABASE_PATH, MAX_CONVERSATION_HISTORY
 from jyra.utils.logger import setup_logger
 
@@ -21,6 +26,9 @@ class Conversation:
         """
         Add a message pair to the conversation history.
 
+        The insert is committed together with concurrent writes by the group
+        commit writer; this returns once it is committed.
+
         Args:
             user_id (int): Telegram user ID
             role_id (int): Current role ID
@@ -30,18 +38,18 @@ class Conversation:
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            conn = sqlite3.connect(DATABASE_PATH)
-            cursor = conn.cursor()
-
+        def insert(cursor: sqlite3.Cursor) -> int:
             cursor.execute(
                 "INSERT INTO conversations (user_id, role_id, user_message, bot_response) "
                 "VALUES (?, ?, ?, ?)",
                 (user_id, role_id, user_message, bot_response)
             )
+            return cursor.lastrowid
 
-            conn.commit()
-            conn.close()
+        try:
+            message_id = await group_commit_writer.execute(DATABASE_PATH, insert)
+            count_cache.invalidate("conversations", user_id)
+            history_cache.append(user_id, role_id, user_message, bot_response, message_id)
 
             logger.info(f"Added message to conversation for user {user_id}")
             return True
@@ -57,6 +65,9 @@ class Conversation:
         """
         Get conversation history for a user.
 
+        Recent history is served from the history cache; on a miss the cache's
+        full capacity is read so later turns are served from it.
+
         Args:
             user_id (int): Telegram user ID
             role_id (Optional[int]): Filter by role ID
@@ -66,34 +77,47 @@ class Conversation:
             List[Dict[str, Any]]: Conversation history
         """
         try:
-            conn = sqlite3.connect(DATABASE_PATH)
-            cursor = conn.cursor()
+            pairs = history_cache.get(user_id, role_id, limit)
+            if pairs is None:
+                # Fill the cache's buffer unless more is asked than it holds
+                warm = history_cache.enabled and limit <= history_cache.capacity
+                fetch = history_cache.capacity if warm else limit
 
-            if role_id is not None:
-                cursor.execute(
-                    "SELECT user_message, bot_response, timestamp "
-                    "FROM conversations "
-                    "WHERE user_id = ? AND role_id = ? "
-                    "ORDER BY timestamp DESC LIMIT ?",
-                    (user_id, role_id, limit)
-                )
-            else:
-                cursor.execute(
-                    "SELECT user_message, bot_response, timestamp "
-                    "FROM conversations "
-                    "WHERE user_id = ? "
-                    "ORDER BY timestamp DESC LIMIT ?",
-                    (user_id, limit)
-                )
-
-            rows = cursor.fetchall()
-            conn.close()
+                conn = sqlite3.connect(DATABASE_PATH)
+                cursor = conn.cursor()
+
+                if role_id is not None:
+                    cursor.execute(
+                        "SELECT user_message, bot_response, message_id "
+                        "FROM conversations "
+                        "WHERE user_id = ? AND role_id = ? "
+                        "ORDER BY timestamp DESC, message_id DESC LIMIT ?",
+                        (user_id, role_id, fetch)
+                    )
+                else:
+                    cursor.execute(
+                        "SELECT user_message, bot_response, message_id "
+                        "FROM conversations "
+                        "WHERE user_id = ? "
+                        "ORDER BY timestamp DESC, message_id DESC LIMIT ?",
+                        (user_id, fetch)
+                    )
+
+                rows = cursor.fetchall()
+                conn.close()
 
-            # Convert to list of dictionaries and reverse to get chronological order
+                # Reverse to get chronological order
+                pairs = [(row[0], row[1]) for row in reversed(rows)]
+                if warm:
+                    history_cache.warm(user_id, role_id, pairs,
+                                       max((row[2] for row in rows), default=0))
+                    pairs = pairs[-limit:] if limit > 0 else []
+
+            # Convert to list of dictionaries
             history = []
-            for row in reversed(rows):
-                history.append({"role": "user", "content": row[0]})
-                history.append({"role": "assistant", "content": row[1]})
+            for user_message, bot_response in pairs:
+                history.append({"role": "user", "content": user_message})
+                history.append({"role": "assistant", "content": bot_response})
 
             return history
 
@@ -102,6 +126,111 @@ class Conversation:
                 f"Error getting conversation history for user {user_id}: {str(e)}")
             return []
 
+    @classmethod
+    async def get_history_page(cls, user_id: int, role_id: Optional[int] = None,
+                               cursor: Optional[Cursor] = None, backward: bool = False,
+                               limit: int = 5) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Get a page of message pairs, newest first, by keyset.
+
+        Args:
+            user_id (int): Telegram user ID
+            role_id (Optional[int]): Filter by role ID
+            cursor (Optional[Cursor]): page_cursor() of the pair the page starts
+                after (or ends before, when going backward); None for the newest pairs
+            backward (bool): Whether the page lies before the cursor
+            limit (int): Number of message pairs per page
+
+        Returns:
+            Tuple[List[Dict[str, Any]], bool]: The pairs (message_id, user_message,
+                bot_response, timestamp), newest first, and whether there are
+                more pairs beyond the page in its direction
+        """
+        try:
+            conn = sqlite3.connect(DATABASE_PATH)
+            cursor_db = conn.cursor()
+
+            query = ("SELECT message_id, user_message, bot_response, timestamp "
+                     "FROM conversations WHERE user_id = ?")
+            params: List[Any] = [user_id]
+            if role_id is not None:
+                query += " AND role_id = ?"
+                params.append(role_id)
+
+            key = (timestamp_value(cursor[0]), cursor[1]) if cursor else None
+            condition, condition_params, order = keyset_condition(
+                ["timestamp", "message_id"], key, backward)
+            query += condition + order + " LIMIT ?"
+            params.extend(condition_params)
+            # One extra row tells whether another page follows
+            params.append(limit + 1)
+
+            cursor_db.execute(query, params)
+            rows = cursor_db.fetchall()
+            conn.close()
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if backward:
+                rows.reverse()
+
+            return [{"message_id": row[0], "user_message": row[1],
+                     "bot_response": row[2], "timestamp": row[3]} for row in rows], has_more
+
+        except Exception as e:
+            logger.error(
+                f"Error getting conversation page for user {user_id}: {str(e)}")
+            return [], False
+
+    @staticmethod
+    def page_cursor(pair: Dict[str, Any]) -> Cursor:
+        """
+        Get the keyset cursor of a message pair returned by get_history_page.
+
+        Args:
+            pair (Dict[str, Any]): The message pair
+
+        Returns:
+            Cursor: Its sort key
+        """
+        return timestamp_key(pair["timestamp"]), pair["message_id"]
+
+    @classmethod
+    async def get_conversation_count(cls, user_id: int, role_id: Optional[int] = None) -> int:
+        """
+        Count a user's message pairs; counts are cached briefly.
+
+        Args:
+            user_id (int): Telegram user ID
+            role_id (Optional[int]): Filter by role ID
+
+        Returns:
+            int: Number of message pairs
+        """
+        async def count() -> int:
+            conn = sqlite3.connect(DATABASE_PATH)
+            try:
+                if role_id is not None:
+                    row = conn.execute(
+                        "SELECT COUNT(*) FROM conversations WHERE user_id = ? AND role_id = ?",
+                        (user_id, role_id)
+                    ).fetchone()
+                else:
+                    row = conn.execute(
+                        "SELECT COUNT(*) FROM conversations WHERE user_id = ?",
+                        (user_id,)
+                    ).fetchone()
+                return row[0]
+            finally:
+                conn.close()
+
+        try:
+            return await count_cache.get("conversations", user_id, role_id, count)
+        except Exception as e:
+            logger.error(
+                f"Error counting conversations for user {user_id}: {str(e)}")
+            return 0
+
     @classmethod
     async def clear_conversation_history(cls, user_id: int) -> bool:
         """
@@ -124,6 +253,8 @@ class Conversation:
 
             conn.commit()
             conn.close()
+            count_cache.invalidate("conversations", user_id)
+            history_cache.invalidate(user_id)
 
             logger.info(f"Cleared conversation history for user {user_id}")
             return True
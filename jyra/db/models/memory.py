@@ -7,6 +7,8 @@ import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Set, Tuple, Union
 
+from jyra.db.utils.group_commit import group_commit_writer
+from jyra.db.utils.pagination import Cursor, count_cache, keyset_condition
 from jyra.utils.config import DATABASE_PATH
 from jyra.utils.exceptions import DatabaseException
 from jyra.utils.logger import setup_logger
@@ -110,10 +112,7 @@ class Memory:
         Returns:
             Optional[int]: Memory ID if successful, None otherwise
         """
-        try:
-            conn = sqlite3.connect(DATABASE_PATH)
-            cursor = conn.cursor()
-
+        def write(cursor: sqlite3.Cursor) -> Optional[int]:
             # Check if similar memory already exists
             cursor.execute(
                 "SELECT memory_id, importance, confidence, recall_count FROM memories WHERE user_id = ? AND content = ?",
@@ -191,8 +190,11 @@ class Memory:
                         # Tag association already exists
                         pass
 
-            conn.commit()
-            conn.close()
+            return memory_id
+
+        try:
+            memory_id = await group_commit_writer.execute(DATABASE_PATH, write)
+            count_cache.invalidate("memories", user_id)
 
             # Generate and store embedding for the memory
             if memory_id:
@@ -352,6 +354,127 @@ class Memory:
                 f"Error getting memories for user {user_id}: {str(e)}")
             return []
 
+    @classmethod
+    async def get_memory_page(cls, user_id: int, category: Optional[str] = None,
+                              min_importance: int = 0, max_importance: Optional[int] = None,
+                              cursor: Optional[Cursor] = None, backward: bool = False,
+                              limit: int = 10) -> Tuple[List['Memory'], bool]:
+        """
+        Get a page of unexpired memories, most important first, by keyset.
+
+        Args:
+            user_id (int): User ID
+            category (Optional[str]): Filter by category
+            min_importance (int): Minimum importance level (0-5)
+            max_importance (Optional[int]): Maximum importance level (0-5)
+            cursor (Optional[Cursor]): page_cursor() of the memory the page starts
+                after (or ends before, when going backward); None for the first page
+            backward (bool): Whether the page lies before the cursor
+            limit (int): Number of memories per page
+
+        Returns:
+            Tuple[List[Memory], bool]: The memories, most important first, and
+                whether there are more memories beyond the page in its direction
+        """
+        try:
+            conn = sqlite3.connect(DATABASE_PATH)
+            cursor_db = conn.cursor()
+
+            query = """SELECT memory_id, user_id, content, category, importance,
+                       source, context, last_accessed, created_at, confidence,
+                       expires_at, recall_count, last_reinforced, is_consolidated
+                       FROM memories
+                       WHERE user_id = ? AND importance >= ?
+                       AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)"""
+            params: List[Any] = [user_id, min_importance]
+            if category is not None:
+                query += " AND category = ?"
+                params.append(category)
+            if max_importance is not None:
+                query += " AND importance <= ?"
+                params.append(max_importance)
+
+            condition, condition_params, order = keyset_condition(
+                ["importance", "memory_id"], cursor, backward)
+            query += condition + order + " LIMIT ?"
+            params.extend(condition_params)
+            # One extra row tells whether another page follows
+            params.append(limit + 1)
+
+            cursor_db.execute(query, params)
+            rows = cursor_db.fetchall()
+            conn.close()
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if backward:
+                rows.reverse()
+
+            memories = [cls(memory_id=row[0], user_id=row[1], content=row[2], category=row[3],
+                            importance=row[4], source=row[5], context=row[6],
+                            last_accessed=row[7], created_at=row[8], confidence=row[9],
+                            expires_at=row[10], recall_count=row[11], last_reinforced=row[12],
+                            is_consolidated=bool(row[13]))
+                        for row in rows]
+            return memories, has_more
+
+        except Exception as e:
+            logger.error(
+                f"Error getting memory page for user {user_id}: {str(e)}")
+            return [], False
+
+    @staticmethod
+    def page_cursor(memory: 'Memory') -> Cursor:
+        """
+        Get the keyset cursor of a memory returned by get_memory_page.
+
+        Args:
+            memory (Memory): The memory
+
+        Returns:
+            Cursor: Its sort key
+        """
+        return memory.importance, memory.memory_id
+
+    @classmethod
+    async def count_memories(cls, user_id: int, category: Optional[str] = None,
+                             min_importance: int = 0, max_importance: Optional[int] = None) -> int:
+        """
+        Count a user's unexpired memories; counts are cached briefly.
+
+        Args:
+            user_id (int): User ID
+            category (Optional[str]): Filter by category
+            min_importance (int): Minimum importance level (0-5)
+            max_importance (Optional[int]): Maximum importance level (0-5)
+
+        Returns:
+            int: Number of memories
+        """
+        async def count() -> int:
+            query = ("SELECT COUNT(*) FROM memories WHERE user_id = ? AND importance >= ? "
+                     "AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)")
+            params: List[Any] = [user_id, min_importance]
+            if category is not None:
+                query += " AND category = ?"
+                params.append(category)
+            if max_importance is not None:
+                query += " AND importance <= ?"
+                params.append(max_importance)
+            conn = sqlite3.connect(DATABASE_PATH)
+            try:
+                return conn.execute(query, params).fetchone()[0]
+            finally:
+                conn.close()
+
+        try:
+            return await count_cache.get("memories", user_id,
+                                         (category, min_importance, max_importance), count)
+        except Exception as e:
+            logger.error(
+                f"Error counting memories for user {user_id}: {str(e)}")
+            return 0
+
     @classmethod
     async def get_memory_by_id(cls, user_id: int, memory_id: int) -> Optional['Memory']:
         """
@@ -607,6 +730,7 @@ class Memory:
 
             conn.commit()
             conn.close()
+            count_cache.invalidate("memories", user_id)
 
             logger.info(f"Memory {memory_id} deleted successfully")
             return True
@@ -793,27 +917,38 @@ class Memory:
         try:
             # Use the memory extractor to get memories with enhanced fields
             extracted_memories = await memory_extractor.extract_memories(text, context)
-
-            # Store each extracted memory with enhanced fields
-            for memory in extracted_memories:
-                await cls.add_memory(
-                    user_id=user_id,
-                    content=memory["content"],
-                    category=memory["category"],
-                    importance=memory["importance"],
-                    source="extracted",
-                    context=f"Extracted from message: {text[:100]}...",
-                    confidence=memory.get("confidence", 0.8),
-                    expires_at=memory.get("expires_at"),
-                    tags=memory.get("tags", [])
-                )
-
+            await cls.store_extracted_memories(user_id, text, extracted_memories)
             return extracted_memories
         except Exception as e:
             logger.error(
                 f"Error extracting memories from message for user {user_id}: {str(e)}")
             return []
 
+    @classmethod
+    async def store_extracted_memories(cls, user_id: int, text: str,
+                                       extracted_memories: List[Dict[str, Any]]) -> None:
+        """
+        Store memories that were extracted from a user message.
+
+        Args:
+            user_id (int): User ID
+            text (str): The message the memories were extracted from
+            extracted_memories (List[Dict[str, Any]]): The extracted memories
+        """
+        # Store each extracted memory with enhanced fields
+        for memory in extracted_memories:
+            await cls.add_memory(
+                user_id=user_id,
+                content=memory["content"],
+                category=memory["category"],
+                importance=memory["importance"],
+                source="extracted",
+                context=f"Extracted from message: {text[:100]}...",
+                confidence=memory.get("confidence", 0.8),
+                expires_at=memory.get("expires_at"),
+                tags=memory.get("tags", [])
+            )
+
     @classmethod
     async def get_memory_summary(cls, user_id: int, category: Optional[str] = None) -> str:
         """
@@ -0,0 +1,219 @@
+"""
+Group commit for Jyra's database writes.
+
+Saving a message pair or a memory used to open a connection and commit a
+transaction of its own, so every turn paid for at least one fsync. Writes now
+go to a writer thread that holds one connection per database. It collects the
+writes arriving within a short window and commits them in a single
+transaction. Each write runs in a savepoint, so a failing write is rolled back
+alone and its caller gets the error, while the rest of the batch commits. A
+caller's await returns once its batch is committed, so a write is durable when
+it returns, as before. Because the commits happen on the writer thread, the
+event loop no longer waits for them.
+"""
+
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, List, Optional, Tuple, TypeVar
+
+from jyra.ai.telemetry import llm_telemetry
+from jyra.utils.config import GROUP_COMMIT_ENABLED, GROUP_COMMIT_WINDOW_MS, GROUP_COMMIT_MAX_BATCH
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+# A queued write: (database path, write function, future of its result)
+Write = Tuple[str, Callable[[sqlite3.Cursor], Any], Future]
+
+# Seconds a connection waits for another connection's lock
+BUSY_TIMEOUT = 30.0
+
+
+class GroupCommitWriter:
+    """
+    Runs write functions on a writer thread and commits them in batches.
+    """
+
+    def __init__(self, window_ms: float = GROUP_COMMIT_WINDOW_MS,
+                 max_batch: int = GROUP_COMMIT_MAX_BATCH, enabled: bool = GROUP_COMMIT_ENABLED):
+        """
+        Initialize the writer; its thread starts with the first write.
+
+        Args:
+            window_ms (float): Milliseconds a batch waits for more writes after its first
+            max_batch (int): Writes committed together at most
+            enabled (bool): Whether to batch; otherwise each write commits on its own
+        """
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.enabled = enabled
+        self._queue: "queue.Queue[Optional[Write]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"writes": 0, "failed_writes": 0, "batches": 0, "largest_batch": 0,
+                      "commit_seconds": 0.0}
+
+    async def execute(self, database_path: str, write: Callable[[sqlite3.Cursor], T]) -> T:
+        """
+        Run a write function in the next batch and wait until the batch is committed.
+
+        The function runs on the writer thread inside the batch's transaction;
+        it must not commit or roll back itself.
+
+        Args:
+            database_path (str): Database to write to
+            write (Callable[[sqlite3.Cursor], T]): Performs the write with the cursor
+
+        Returns:
+            T: The write function's result
+
+        Raises:
+            Exception: Whatever the write function or the commit raised
+        """
+        if not self.enabled:
+            return self._execute_alone(database_path, write)
+
+        future: Future = Future()
+        self._start()
+        self._queue.put((database_path, write, future))
+        # A queued write is committed even if its caller is cancelled meanwhile
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _execute_alone(self, database_path: str, write: Callable[[sqlite3.Cursor], T]) -> T:
+        """Run a write in a transaction of its own, on the calling thread."""
+        conn = sqlite3.connect(database_path)
+        try:
+            result = write(conn.cursor())
+            conn.commit()
+            self.stats["writes"] += 1
+            return result
+        except Exception:
+            conn.rollback()
+            self.stats["failed_writes"] += 1
+            raise
+        finally:
+            conn.close()
+
+    def _start(self) -> None:
+        """Start the writer thread if it isn't running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Collect writes into batches and commit them until stopped."""
+        connections: Dict[str, sqlite3.Connection] = {}
+        stopping = False
+        try:
+            while not stopping:
+                first = self._queue.get()
+                if first is None:
+                    break
+                batch = [first]
+                deadline = time.monotonic() + self.window
+                while len(batch) < self.max_batch:
+                    try:
+                        write = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if write is None:
+                        # Commit what was collected, then stop
+                        stopping = True
+                        break
+                    batch.append(write)
+
+                by_path: Dict[str, List[Write]] = {}
+                for write in batch:
+                    by_path.setdefault(write[0], []).append(write)
+                for path, writes in by_path.items():
+                    self._commit(connections, path, writes)
+        finally:
+            for conn in connections.values():
+                conn.close()
+
+    def _commit(self, connections: Dict[str, sqlite3.Connection], path: str,
+                writes: List[Write]) -> None:
+        """Run a batch of writes to one database in a single transaction."""
+        start = time.perf_counter()
+        results: List[Tuple[Future, bool, Any]] = []
+        try:
+            conn = connections.get(path)
+            if conn is None:
+                # Transactions are opened explicitly; savepoints isolate the writes
+                conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+                connections[path] = conn
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for _, write, future in writes:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    cursor.execute("SAVEPOINT write")
+                    try:
+                        results.append((future, True, write(cursor)))
+                        cursor.execute("RELEASE write")
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO write")
+                        cursor.execute("RELEASE write")
+                        results.append((future, False, e))
+                cursor.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            logger.error(f"Error committing a batch of {len(writes)} writes: {str(e)}")
+            connection = connections.pop(path, None)
+            if connection is not None:
+                connection.close()
+            results = [(future, False, e) for _, _, future in writes if not future.done()]
+
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(writes))
+        self.stats["commit_seconds"] += time.perf_counter() - start
+        for future, succeeded, value in results:
+            if succeeded:
+                self.stats["writes"] += 1
+                future.set_result(value)
+            else:
+                self.stats["failed_writes"] += 1
+                future.set_exception(value)
+
+    async def stop(self) -> None:
+        """Commit the queued writes and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            await asyncio.get_running_loop().run_in_executor(None, thread.join)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get write, batch and commit time counters.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "commit_seconds": round(self.stats["commit_seconds"], 3),
+            "mean_batch": round((self.stats["writes"] + self.stats["failed_writes"]) / batches, 2)
+            if batches else 0.0,
+            "queued": self._queue.qsize()
+        }
+
+
+# Create a singleton instance
+group_commit_writer = GroupCommitWriter()
+
+# Report write batching alongside call telemetry
+llm_telemetry.register_source("group_commit", group_commit_writer.get_stats)
@@ -0,0 +1,211 @@
+"""
+Conversation history cache for Jyra.
+
+Every turn reads the user's last message pairs, which are mostly the pairs the
+bot wrote itself a moment ago. The cache keeps a ring buffer of the newest
+pairs per user and role, filled from the database on first access and appended
+by Conversation.add_message, so history for active chats is served from RAM.
+Buffers are evicted least recently used first when the cache goes over its
+memory budget. A user's updates are always handled by the same process (see
+worker_pool), so each process's buffers stay consistent with the database.
+"""
+
+import sys
+from collections import OrderedDict, deque
+from typing import Dict, Any, Tuple, Optional, List, Deque
+
+from jyra.ai.telemetry import llm_telemetry
+from jyra.utils.config import HISTORY_CACHE_PAIRS, HISTORY_CACHE_MAX_MB
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Approximate size of a buffer and of a pair besides their strings
+BUFFER_OVERHEAD = 700
+PAIR_OVERHEAD = 64
+
+# A message pair: (user message, bot response)
+Pair = Tuple[str, str]
+
+
+class HistoryBuffer:
+    """
+    The newest message pairs of one user and role, oldest first.
+    """
+
+    def __init__(self, capacity: int, pairs: List[Pair], last_id: int = 0):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity (int): Maximum number of pairs kept
+            pairs (List[Pair]): Newest pairs from the database, oldest first
+            last_id (int): Message ID of the newest pair
+        """
+        self.pairs: Deque[Pair] = deque(maxlen=capacity)
+        self.size = BUFFER_OVERHEAD
+        self.last_id = last_id
+        for pair in pairs:
+            self.append(pair)
+
+    def append(self, pair: Pair) -> int:
+        """
+        Add a pair, dropping the oldest one when full.
+
+        Args:
+            pair (Pair): The new pair
+
+        Returns:
+            int: Change of the buffer's size in bytes
+        """
+        change = _pair_size(pair)
+        if len(self.pairs) == self.pairs.maxlen:
+            change -= _pair_size(self.pairs[0])
+        self.pairs.append(pair)
+        self.size += change
+        return change
+
+
+def _pair_size(pair: Pair) -> int:
+    """Approximate the memory used by a pair."""
+    return sys.getsizeof(pair[0]) + sys.getsizeof(pair[1]) + PAIR_OVERHEAD
+
+
+class HistoryCache:
+    """
+    Ring buffers of recent message pairs per (user, role), evicted LRU within a memory budget.
+    """
+
+    def __init__(self, capacity: int = HISTORY_CACHE_PAIRS, max_mb: float = HISTORY_CACHE_MAX_MB):
+        """
+        Initialize the cache.
+
+        Args:
+            capacity (int): Message pairs kept per user and role; 0 disables the cache
+            max_mb (float): Memory budget in megabytes
+        """
+        self.capacity = capacity
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        # (user_id, role_id) -> buffer; role_id None holds the newest pairs of all roles
+        self._buffers: "OrderedDict[Tuple[int, Optional[int]], HistoryBuffer]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "appends": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0 and self.max_bytes > 0
+
+    def get(self, user_id: int, role_id: Optional[int], limit: int) -> Optional[List[Pair]]:
+        """
+        Get the newest pairs of a user and role.
+
+        Args:
+            user_id (int): Telegram user ID
+            role_id (Optional[int]): Role ID; None for all roles
+            limit (int): Maximum number of pairs
+
+        Returns:
+            Optional[List[Pair]]: The pairs, oldest first; None if they must be
+                read from the database
+        """
+        if not self.enabled or limit > self.capacity:
+            self.stats["bypassed"] += 1
+            return None
+        buffer = self._buffers.get((user_id, role_id))
+        if buffer is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self._buffers.move_to_end((user_id, role_id))
+        pairs = list(buffer.pairs)
+        return pairs[-limit:] if limit > 0 else []
+
+    def warm(self, user_id: int, role_id: Optional[int], pairs: List[Pair], last_id: int = 0) -> None:
+        """
+        Store the newest pairs read from the database.
+
+        Args:
+            user_id (int): Telegram user ID
+            role_id (Optional[int]): Role ID; None for all roles
+            pairs (List[Pair]): The newest pairs, oldest first, at most the
+                cache's capacity; fewer only if that is all there are
+            last_id (int): Message ID of the newest pair
+        """
+        if not self.enabled:
+            return
+        key = (user_id, role_id)
+        old = self._buffers.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        buffer = HistoryBuffer(self.capacity, pairs, last_id)
+        self._buffers[key] = buffer
+        self._bytes += buffer.size
+        self._evict()
+
+    def append(self, user_id: int, role_id: int, user_message: str, bot_response: str,
+               message_id: Optional[int] = None) -> None:
+        """
+        Add a new pair to the cached buffers of the user's role and of all roles.
+
+        Buffers that aren't cached are left to be read from the database, and
+        buffers read after the pair was committed already hold it.
+
+        Args:
+            user_id (int): Telegram user ID
+            role_id (int): Role ID of the pair
+            user_message (str): User's message
+            bot_response (str): Bot's response
+            message_id (Optional[int]): Message ID of the pair
+        """
+        for key in ((user_id, role_id), (user_id, None)):
+            buffer = self._buffers.get(key)
+            if buffer is not None and (message_id is None or message_id > buffer.last_id):
+                if message_id is not None:
+                    buffer.last_id = message_id
+                self._bytes += buffer.append((user_message, bot_response))
+                self._buffers.move_to_end(key)
+                self.stats["appends"] += 1
+        self._evict()
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Drop a user's buffers after their history was changed in the database.
+
+        Args:
+            user_id (int): Telegram user ID
+        """
+        for key in [key for key in self._buffers if key[0] == user_id]:
+            self._bytes -= self._buffers.pop(key).size
+
+    def clear(self) -> None:
+        """Drop all buffers."""
+        self._buffers.clear()
+        self._bytes = 0
+
+    def _evict(self) -> None:
+        """Drop least recently used buffers until the cache is within its budget."""
+        while self._bytes > self.max_bytes and self._buffers:
+            _, buffer = self._buffers.popitem(last=False)
+            self._bytes -= buffer.size
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit, miss, append and eviction counters and the memory used.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        return {
+            **self.stats,
+            "buffers": len(self._buffers),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes
+        }
+
+
+# Create a singleton instance
+history_cache = HistoryCache()
+
+# Report history reads saved alongside call telemetry
+llm_telemetry.register_source("history_cache", history_cache.get_stats)
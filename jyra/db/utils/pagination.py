@@ -0,0 +1,213 @@
+"""
+Keyset pagination helpers for Jyra.
+
+Browsing screens page through memories and conversation history without
+OFFSET. Each page is fetched with a keyset condition: the rows after the last
+row of the previous page, in the screen's sort order, so a page costs the same
+however deep the user has paged and rows added in the meantime don't shift the
+pages. The cursor, the page number and the direction travel in the buttons'
+callback data as a compact token. Row counts for "Page X/Y" come from a small
+cache that writes to the table invalidate.
+"""
+
+import calendar
+import time
+from typing import Dict, Any, Tuple, Optional, Callable, Awaitable, List
+
+from jyra.utils.config import PAGINATION_COUNT_TTL
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Users with cached counts before expired counts are pruned
+MAX_CACHED_USERS = 1024
+
+# Cursor of a page: the sort key of one of its rows, e.g. (importance, memory_id)
+Cursor = Tuple[int, ...]
+
+
+def _to_base36(value: int) -> str:
+    """Encode a non-negative integer in base 36."""
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    text = ""
+    while True:
+        value, digit = divmod(value, 36)
+        text = digits[digit] + text
+        if value == 0:
+            return text
+
+
+def encode_page_token(page: int, cursor: Optional[Cursor] = None, backward: bool = False) -> str:
+    """
+    Encode a page request for callback data.
+
+    Args:
+        page (int): Page number, starting at 0
+        cursor (Optional[Cursor]): Sort key of the row the page starts after
+            (or ends before, when going backward); None for the first page
+        backward (bool): Whether the page lies before the cursor
+
+    Returns:
+        str: The token, e.g. "2.n.4.1z" for page 2 after the row (4, 71)
+    """
+    if cursor is None:
+        return _to_base36(page)
+    return ".".join([_to_base36(page), "p" if backward else "n"] +
+                    [_to_base36(max(0, value)) for value in cursor])
+
+
+def decode_page_token(token: str) -> Tuple[int, Optional[Cursor], bool]:
+    """
+    Decode a page request from callback data.
+
+    An unreadable token, e.g. from a button of an older version, means the first page.
+
+    Args:
+        token (str): The token
+
+    Returns:
+        Tuple[int, Optional[Cursor], bool]: Page number, cursor and whether the
+            page lies before the cursor
+    """
+    try:
+        parts = token.split(".")
+        page = int(parts[0], 36)
+        if len(parts) == 1:
+            return page, None, False
+        if parts[1] not in ("n", "p") or len(parts) < 3:
+            raise ValueError(f"invalid direction in {token!r}")
+        return page, tuple(int(part, 36) for part in parts[2:]), parts[1] == "p"
+    except ValueError as e:
+        logger.warning(f"Unreadable page token {token!r}: {str(e)}")
+        return 0, None, False
+
+
+def keyset_condition(columns: List[str], cursor: Optional[Cursor],
+                     backward: bool = False) -> Tuple[str, List[Any], str]:
+    """
+    Build the keyset condition and ordering for a page sorted by columns, descending.
+
+    Args:
+        columns (List[str]): Sort columns, most significant first; the last one
+            must be unique (e.g. the primary key)
+        cursor (Optional[Cursor]): Values of the columns at the cursor row
+        backward (bool): Whether the page lies before the cursor
+
+    Returns:
+        Tuple[str, List[Any], str]: SQL condition (starting with " AND", empty
+            without cursor), its parameters and the ORDER BY clause. Backward
+            pages come out in ascending order and must be reversed.
+    """
+    direction = "ASC" if backward else "DESC"
+    order = " ORDER BY " + ", ".join(f"{column} {direction}" for column in columns)
+    if cursor is None:
+        return "", [], order
+    placeholders = ", ".join("?" for _ in columns)
+    condition = f" AND ({', '.join(columns)}) {'>' if backward else '<'} ({placeholders})"
+    return condition, list(cursor), order
+
+
+def timestamp_key(timestamp: Optional[str]) -> int:
+    """
+    Convert a database timestamp (UTC, as written by CURRENT_TIMESTAMP) to a cursor value.
+
+    Args:
+        timestamp (Optional[str]): The timestamp
+
+    Returns:
+        int: Seconds since the epoch; 0 if the timestamp is missing or unreadable
+    """
+    try:
+        return calendar.timegm(time.strptime(str(timestamp)[:19], TIMESTAMP_FORMAT))
+    except (TypeError, ValueError):
+        return 0
+
+
+def timestamp_value(key: int) -> str:
+    """
+    Convert a cursor value back to a database timestamp.
+
+    Args:
+        key (int): Seconds since the epoch
+
+    Returns:
+        str: The timestamp
+    """
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(key))
+
+
+class CountCache:
+    """
+    Row counts per user and filter, kept for a short time and dropped on writes.
+    """
+
+    def __init__(self, ttl: float = PAGINATION_COUNT_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl (float): Seconds a count is reused
+        """
+        self.ttl = ttl
+        # (kind, user_id) -> filters -> (count, expires at)
+        self._counts: Dict[Tuple[str, int], Dict[Any, Tuple[int, float]]] = {}
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def get(self, kind: str, user_id: int, filters: Any,
+                  count: Callable[[], Awaitable[int]]) -> int:
+        """
+        Get a count, computing it when it isn't cached.
+
+        Args:
+            kind (str): Counted table, e.g. "memories"
+            user_id (int): User ID
+            filters (Any): Hashable description of the other filters
+            count (Callable[[], Awaitable[int]]): Computes the count
+
+        Returns:
+            int: The count
+        """
+        now = time.monotonic()
+        cached = self._counts.get((kind, user_id), {}).get(filters)
+        if cached and cached[1] > now:
+            self.stats["hits"] += 1
+            return cached[0]
+
+        self.stats["misses"] += 1
+        if len(self._counts) >= MAX_CACHED_USERS:
+            self._prune(now)
+        value = await count()
+        self._counts.setdefault((kind, user_id), {})[filters] = (value, now + self.ttl)
+        return value
+
+    def _prune(self, now: float) -> None:
+        """Drop users whose counts have all expired."""
+        for key in [key for key, counts in self._counts.items()
+                    if all(expires <= now for _, expires in counts.values())]:
+            del self._counts[key]
+
+    def invalidate(self, kind: str, user_id: int) -> None:
+        """
+        Drop a user's counts of a table after it changed.
+
+        Args:
+            kind (str): Counted table
+            user_id (int): User ID
+        """
+        if self._counts.pop((kind, user_id), None) is not None:
+            self.stats["invalidations"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit, miss and invalidation counters.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        return {**self.stats, "users": len(self._counts)}
+
+
+# Create a singleton instance
+count_cache = CountCache()
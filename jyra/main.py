@@ -2,18 +2,56 @@
 Main entry point for Jyra bot.
 """
 
+import asyncio
 import logging
 from telegram.ext import Application
 
-from jyra.utils.config import TELEGRAM_BOT_TOKEN, validate_config
+from jyra.utils.config import TELEGRAM_BOT_TOKEN, BOT_MODE, validate_config
 from jyra.db.init_db import init_db
 from jyra.bot.handlers.register_handlers import register_command_handlers, register_callback_handlers, register_message_handlers
 from jyra.bot.handlers.error_handlers import error_handler
+from jyra.bot.tasks import shutdown_background_tasks
+from jyra.bot.utils.send_scheduler import send_scheduler
+from jyra.bot.utils.update_processor import update_processor
+from jyra.bot.utils.webhook_server import run_webhook
 from jyra.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+def create_application(with_updater: bool = True) -> Application:
+    """
+    Build the bot application with all handlers registered.
+
+    Args:
+        with_updater (bool): Whether the application fetches updates itself;
+            sharded workers get theirs from the front process
+
+    Returns:
+        Application: The application
+    """
+    builder = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .concurrent_updates(update_processor)
+        .rate_limiter(send_scheduler)
+        .post_shutdown(shutdown_background_tasks)
+    )
+    if not with_updater:
+        builder = builder.updater(None)
+    application = builder.build()
+
+    # Register handlers
+    register_command_handlers(application)
+    register_callback_handlers(application)
+    register_message_handlers(application)
+
+    # Register error handler
+    application.add_error_handler(error_handler)
+
+    return application
+
+
 def main():
     """
     Main function to start the bot.
@@ -30,22 +68,18 @@ def main():
     init_db()
 
     # Create application
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
-
-    # Register handlers
-    register_command_handlers(application)
-    register_callback_handlers(application)
-    register_message_handlers(application)
-
-    # Register error handler
-    application.add_error_handler(error_handler)
+    application = create_application()
 
     # We'll skip the memory maintenance scheduler for now to avoid event loop issues
     # start_memory_maintenance_scheduler()
 
     # Start the bot
-    logger.info("Starting bot")
-    application.run_polling()
+    if BOT_MODE == "webhook":
+        logger.info("Starting bot in webhook mode")
+        asyncio.run(run_webhook(application))
+    else:
+        logger.info("Starting bot")
+        application.run_polling()
 
 
 if __name__ == "__main__":
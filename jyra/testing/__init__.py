@@ -0,0 +1,10 @@
+"""
+Testing utilities for Jyra
+"""
+
+from jyra.testing.mock_llm_server import MockLLMServer, parse_latency, deterministic_embedding
+from jyra.testing.offline_request import OfflineRequest
+from jyra.testing.webhook_replay import load_updates, synthetic_updates, replay_updates
+
+__all__ = ['MockLLMServer', 'parse_latency', 'deterministic_embedding',
+           'OfflineRequest', 'load_updates', 'synthetic_updates', 'replay_updates']
@@ -0,0 +1,526 @@
+"""
+Local mock of the Gemini and OpenAI HTTP APIs
+
+Serves deterministic answers for the endpoints Jyra uses, so that load and
+throughput tests can run without spending API quota:
+
+- Gemini: models/{model}:generateContent, :streamGenerateContent,
+  :embedContent, :batchEmbedContents, cachedContents and the model list
+- OpenAI: chat/completions (optionally streamed) and embeddings
+
+Latency is drawn from a configurable distribution, and a configurable share of
+requests fails with a 500 or a 429 carrying a Retry-After header. Point the
+clients at it with GEMINI_API_BASE_URL=http://127.0.0.1:8089/v1beta and
+OPENAI_API_BASE_URL=http://127.0.0.1:8089/v1.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+import numpy as np
+from aiohttp import web
+
+from jyra.ai.utils.structured_output import example_from_schema
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+GEMINI_EMBEDDING_DIMENSIONS = 768
+OPENAI_EMBEDDING_DIMENSIONS = 1536
+
+# Canned answers for prompts whose callers parse structured output
+SENTIMENT_KEYWORDS = {
+    "happiness": ("happy", "glad", "great", "awesome", "love"),
+    "sadness": ("sad", "down", "unhappy", "miss"),
+    "anxiety": ("worried", "anxious", "nervous", "stress"),
+    "anger": ("angry", "furious", "annoyed", "hate"),
+    "gratitude": ("thank", "grateful", "appreciate")
+}
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution specification.
+
+    Supported forms (all values in milliseconds):
+    "200" or "fixed:200", "uniform:100:400", "normal:300:50" (mean, stddev)
+    and "lognormal:300:0.5" (median, sigma).
+
+    Args:
+        spec (str): The specification
+
+    Returns:
+        Callable[[random.Random], float]: Draws a latency in seconds
+
+    Raises:
+        ValueError: If the specification is not understood
+    """
+    parts = str(spec).strip().lower().split(":")
+    kind, values = (parts[0], parts[1:]) if not parts[0].replace(".", "", 1).isdigit() \
+        else ("fixed", parts)
+    try:
+        values = [float(v) for v in values]
+    except ValueError:
+        raise ValueError(f"Invalid latency specification: {spec}")
+
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal" and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(max(values[0], 1e-3)), values[1]) / 1000
+    raise ValueError(f"Invalid latency specification: {spec}")
+
+
+def deterministic_embedding(text: str, dimensions: int) -> List[float]:
+    """
+    Embed a text by hashing its words into a unit vector.
+
+    Texts sharing words get similar vectors, which keeps similarity-based
+    code paths (semantic cache, memory search) meaningful under load tests.
+
+    Args:
+        text (str): The text to embed
+        dimensions (int): Vector size
+
+    Returns:
+        List[float]: The embedding
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    words = re.findall(r"\w+", text.lower()) or [""]
+    for word in words:
+        digest = hashlib.md5(word.encode()).digest()
+        index = int.from_bytes(digest[:4], "little") % dimensions
+        vector[index] += 1.0 if digest[4] % 2 else -1.0
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return [round(float(v), 6) for v in vector]
+
+
+def estimate_mock_tokens(text: str) -> int:
+    """Rough token count for usage reports."""
+    return max(1, len(text) // 4)
+
+
+class MockLLMServer:
+    """
+    aiohttp server that imitates the Gemini and OpenAI APIs.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8089,
+                 latency: str = "0", embed_latency: Optional[str] = None,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: float = 1.0, seed: int = 0,
+                 responses: Optional[List[Tuple[str, str]]] = None):
+        """
+        Initialize the mock server.
+
+        Args:
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 picks a free port)
+            latency (str): Latency distribution for generation requests
+            embed_latency (Optional[str]): Latency distribution for embedding
+                requests (defaults to the generation latency)
+            error_rate (float): Fraction of requests answered with a 500
+            rate_limit_rate (float): Fraction of requests answered with a 429
+            retry_after (float): Retry-After value sent with 429 responses
+            seed (int): Seed for latency and fault injection
+            responses (Optional[List[Tuple[str, str]]]): (substring, answer)
+                pairs checked against the prompt before the default answers
+        """
+        self.host = host
+        self.port = port
+        self.latency = parse_latency(latency)
+        self.embed_latency = parse_latency(embed_latency) if embed_latency else self.latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.responses = list(responses or [])
+        self._rng = random.Random(seed)
+
+        self._runner: Optional[web.AppRunner] = None
+        self._caches: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, int] = {}
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server (without an API version prefix)."""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def gemini_url(self) -> str:
+        """Value for GEMINI_API_BASE_URL."""
+        return f"{self.url}/v1beta"
+
+    @property
+    def openai_url(self) -> str:
+        """Value for OPENAI_API_BASE_URL."""
+        return f"{self.url}/v1"
+
+    def create_app(self) -> web.Application:
+        """
+        Create the aiohttp application.
+
+        Returns:
+            web.Application: The application
+        """
+        app = web.Application()
+        app.router.add_get("/mock/stats", self._handle_stats)
+        app.router.add_route("*", "/{path:.*}", self._dispatch)
+        return app
+
+    async def start(self) -> None:
+        """
+        Start serving in the current event loop.
+        """
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+        logger.info(f"Mock LLM server listening on {self.url}")
+
+    async def stop(self) -> None:
+        """
+        Stop serving.
+        """
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MockLLMServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _dispatch(self, request: web.Request) -> web.StreamResponse:
+        """Route a request by its path suffix, after fault injection."""
+        path = request.match_info["path"]
+        method = request.method
+
+        if path.endswith(":generateContent"):
+            endpoint, handler = "generateContent", self._gemini_generate
+        elif path.endswith(":streamGenerateContent"):
+            endpoint, handler = "streamGenerateContent", self._gemini_stream
+        elif path.endswith(":embedContent"):
+            endpoint, handler = "embedContent", self._gemini_embed
+        elif path.endswith(":batchEmbedContents"):
+            endpoint, handler = "batchEmbedContents", self._gemini_batch_embed
+        elif "cachedContents" in path:
+            endpoint, handler = "cachedContents", self._gemini_cached_contents
+        elif path.rstrip("/").endswith("models") and method == "GET":
+            endpoint, handler = "models", self._gemini_models
+        elif path.endswith("chat/completions"):
+            endpoint, handler = "chat", self._openai_chat
+        elif path.endswith("embeddings"):
+            endpoint, handler = "embeddings", self._openai_embeddings
+        else:
+            return web.json_response({"error": {"code": 404, "message": f"Unknown path: {path}"}},
+                                     status=404)
+
+        self.stats[endpoint] = self.stats.get(endpoint, 0) + 1
+        is_embedding = endpoint in ("embedContent", "batchEmbedContents", "embeddings")
+        await asyncio.sleep((self.embed_latency if is_embedding else self.latency)(self._rng))
+
+        fault = self._inject_fault(request, path)
+        if fault is not None:
+            return fault
+
+        body = await request.json() if request.can_read_body else {}
+        return await handler(request, path, body)
+
+    def _inject_fault(self, request: web.Request, path: str) -> Optional[web.Response]:
+        """Return an error response for this request, if one is due."""
+        forced = request.headers.get("X-Mock-Status")
+        roll = self._rng.random()
+        openai = not ("models/" in path or "cachedContents" in path)
+
+        if forced == "429" or (not forced and roll < self.rate_limit_rate):
+            self.stats["rate_limited"] = self.stats.get("rate_limited", 0) + 1
+            if openai:
+                body = {"error": {"message": "Rate limit reached", "type": "requests",
+                                  "code": "rate_limit_exceeded"}}
+            else:
+                body = {"error": {"code": 429, "message": "Resource has been exhausted",
+                                  "status": "RESOURCE_EXHAUSTED"}}
+            return web.json_response(body, status=429,
+                                     headers={"Retry-After": f"{self.retry_after:g}"})
+
+        if forced == "500" or (not forced and roll < self.rate_limit_rate + self.error_rate):
+            self.stats["errors"] = self.stats.get("errors", 0) + 1
+            return web.json_response(
+                {"error": {"code": 500, "message": "Internal error", "status": "INTERNAL"}},
+                status=500)
+        return None
+
+    def _answer(self, model: str, prompt: str, instructions: str = "") -> str:
+        """Build the deterministic answer for a prompt and optional system instructions."""
+        full_prompt = f"{instructions}\n{prompt}"
+        for needle, answer in self.responses:
+            if needle in full_prompt:
+                return answer
+
+        if '"primary_emotion"' in full_prompt:
+            lowered = prompt.lower()
+            emotion = next((name for name, words in SENTIMENT_KEYWORDS.items()
+                            if any(word in lowered for word in words)), "contentment")
+            return json.dumps({"primary_emotion": emotion, "intensity": 3,
+                               "explanation": "Mock sentiment analysis"})
+        if '"memories"' in full_prompt:
+            return json.dumps({"memories": []})
+
+        digest = hashlib.sha1(f"{model}\n{prompt}".encode()).hexdigest()[:8]
+        last_line = prompt.strip().splitlines()[-1].strip() if prompt.strip() else ""
+        return f"Mock reply {digest} from {model}: {last_line[:200]}"
+
+    def _structured_answer(self, model: str, prompt: str,
+                           schema: Optional[Dict[str, Any]], instructions: str = "") -> str:
+        """Build the deterministic JSON answer for a structured output request."""
+        if not schema:
+            # Plain JSON mode: use the canned answer when it is JSON
+            text = self._answer(model, prompt, instructions)
+            try:
+                json.loads(text)
+                return text
+            except ValueError:
+                return "{}"
+
+        lowered = prompt.lower()
+
+        def choose(options: List[Any]) -> Any:
+            # Pick the enum value the prompt hints at (emotions), else a stable one
+            for name, words in SENTIMENT_KEYWORDS.items():
+                if name in options and any(word in lowered for word in words):
+                    return name
+            if "contentment" in options:
+                return "contentment"
+            digest = int(hashlib.sha1(prompt.encode()).hexdigest(), 16)
+            return options[digest % len(options)]
+
+        return json.dumps(example_from_schema(schema, choose))
+
+    @staticmethod
+    def _model_from_path(path: str) -> str:
+        """Get the model name from a Gemini path."""
+        match = re.search(r"models/([^/:]+)", path)
+        return match.group(1) if match else "unknown"
+
+    @staticmethod
+    def _gemini_prompt(body: Dict[str, Any]) -> Tuple[str, int]:
+        """Get the last user text and the total input size of a Gemini request."""
+        texts = [part.get("text", "")
+                 for content in body.get("contents", [])
+                 for part in content.get("parts", [])]
+        system = body.get("systemInstruction", {}).get("parts", [])
+        input_size = sum(len(t) for t in texts) + sum(len(p.get("text", "")) for p in system)
+        user_contents = [c for c in body.get("contents", []) if c.get("role", "user") == "user"]
+        last = user_contents[-1] if user_contents else {"parts": []}
+        prompt = "\n".join(part.get("text", "") for part in last.get("parts", []))
+        return prompt, input_size
+
+    async def _gemini_generate(self, request: web.Request, path: str,
+                               body: Dict[str, Any]) -> web.Response:
+        """Handle generateContent."""
+        return web.json_response(self._gemini_result(path, body))
+
+    def _gemini_result(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a generateContent result."""
+        if body.get("cachedContent") and body["cachedContent"] not in self._caches:
+            raise web.HTTPNotFound(
+                text=json.dumps({"error": {"code": 404, "message": "CachedContent not found",
+                                           "status": "NOT_FOUND"}}),
+                content_type="application/json")
+
+        model = self._model_from_path(path)
+        prompt, input_size = self._gemini_prompt(body)
+        config = body.get("generationConfig", {})
+        if config.get("responseMimeType") == "application/json":
+            text = self._structured_answer(model, prompt, config.get("responseSchema"))
+        else:
+            text = self._answer(model, prompt)
+        cached_tokens = self._caches.get(body.get("cachedContent"), {}).get("tokens", 0)
+        prompt_tokens = estimate_mock_tokens("x" * input_size) + cached_tokens
+        output_tokens = estimate_mock_tokens(text)
+        usage = {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens
+        }
+        if cached_tokens:
+            usage["cachedContentTokenCount"] = cached_tokens
+        return {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP"
+            }],
+            "usageMetadata": usage
+        }
+
+    async def _gemini_stream(self, request: web.Request, path: str,
+                             body: Dict[str, Any]) -> web.StreamResponse:
+        """Handle streamGenerateContent as a JSON array or, with alt=sse, as events."""
+        result = self._gemini_result(path, body)
+        text = result["candidates"][0]["content"]["parts"][0]["text"]
+        words = text.split(" ")
+        chunks = []
+        for i in range(0, len(words), 4):
+            chunk_text = " ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else "")
+            chunks.append({"candidates": [{"content": {"role": "model",
+                                                       "parts": [{"text": chunk_text}]}}]})
+        chunks[-1]["candidates"][0]["finishReason"] = "STOP"
+        chunks[-1]["usageMetadata"] = result["usageMetadata"]
+
+        if request.query.get("alt") != "sse":
+            return web.json_response(chunks)
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for chunk in chunks:
+            await response.write(f"data: {json.dumps(chunk)}\r\n\r\n".encode())
+        await response.write_eof()
+        return response
+
+    async def _gemini_embed(self, request: web.Request, path: str,
+                            body: Dict[str, Any]) -> web.Response:
+        """Handle embedContent."""
+        text = " ".join(part.get("text", "") for part in body.get("content", {}).get("parts", []))
+        return web.json_response({"embedding": {
+            "values": deterministic_embedding(text, GEMINI_EMBEDDING_DIMENSIONS)}})
+
+    async def _gemini_batch_embed(self, request: web.Request, path: str,
+                                  body: Dict[str, Any]) -> web.Response:
+        """Handle batchEmbedContents."""
+        embeddings = []
+        for item in body.get("requests", []):
+            text = " ".join(part.get("text", "")
+                            for part in item.get("content", {}).get("parts", []))
+            embeddings.append(
+                {"values": deterministic_embedding(text, GEMINI_EMBEDDING_DIMENSIONS)})
+        return web.json_response({"embeddings": embeddings})
+
+    async def _gemini_cached_contents(self, request: web.Request, path: str,
+                                      body: Dict[str, Any]) -> web.Response:
+        """Handle cachedContents create, refresh and delete."""
+        if request.method == "POST":
+            name = f"cachedContents/mock-{len(self._caches) + 1}"
+            text = " ".join(part.get("text", "")
+                            for part in body.get("systemInstruction", {}).get("parts", []))
+            self._caches[name] = {"model": body.get("model"),
+                                  "tokens": estimate_mock_tokens(text)}
+            return web.json_response({"name": name, "model": body.get("model")})
+
+        name = path[path.index("cachedContents"):]
+        if name not in self._caches:
+            return web.json_response(
+                {"error": {"code": 404, "message": "CachedContent not found",
+                           "status": "NOT_FOUND"}}, status=404)
+        if request.method == "DELETE":
+            del self._caches[name]
+            return web.json_response({})
+        return web.json_response({"name": name, **self._caches[name]})
+
+    async def _gemini_models(self, request: web.Request, path: str,
+                             body: Dict[str, Any]) -> web.Response:
+        """Handle the model list used for availability checks."""
+        names = ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro", "embedding-001"]
+        return web.json_response({"models": [{"name": f"models/{n}"} for n in names]})
+
+    async def _openai_chat(self, request: web.Request, path: str,
+                           body: Dict[str, Any]) -> web.StreamResponse:
+        """Handle chat/completions."""
+        model = body.get("model", "unknown")
+        messages = body.get("messages", [])
+        user_messages = [m for m in messages if m.get("role") == "user"]
+        prompt = user_messages[-1].get("content", "") if user_messages else ""
+        response_format = body.get("response_format", {})
+        if response_format.get("type") == "json_schema":
+            text = self._structured_answer(
+                model, prompt, response_format["json_schema"].get("schema"))
+        elif response_format.get("type") == "json_object":
+            # JSON mode describes the expected answer in the system message
+            instructions = "\n".join(m.get("content", "") for m in messages
+                                     if m.get("role") == "system")
+            text = self._structured_answer(model, prompt, None, instructions)
+        else:
+            text = self._answer(model, prompt)
+        prompt_tokens = estimate_mock_tokens("".join(m.get("content", "") for m in messages))
+        completion_tokens = estimate_mock_tokens(text)
+        completion_id = "chatcmpl-" + hashlib.sha1(text.encode()).hexdigest()[:12]
+
+        if not body.get("stream"):
+            return web.json_response({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": prompt_tokens,
+                          "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens}
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            delta = word + (" " if i < len(words) - 1 else "")
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        final = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        await response.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+        await response.write_eof()
+        return response
+
+    async def _openai_embeddings(self, request: web.Request, path: str,
+                                 body: Dict[str, Any]) -> web.Response:
+        """Handle embeddings."""
+        inputs = body.get("input", "")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = body.get("dimensions", OPENAI_EMBEDDING_DIMENSIONS)
+        tokens = sum(estimate_mock_tokens(text) for text in inputs)
+        return web.json_response({
+            "object": "list",
+            "model": body.get("model", "unknown"),
+            "data": [{"object": "embedding", "index": i,
+                      "embedding": deterministic_embedding(text, dimensions)}
+                     for i, text in enumerate(inputs)],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        """Report request counts per endpoint."""
+        return web.json_response(self.stats)
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8089, **kwargs) -> None:
+    """
+    Run a mock server until cancelled.
+
+    Args:
+        host (str): Interface to listen on
+        port (int): Port to listen on
+        **kwargs: Options passed to MockLLMServer
+    """
+    server = MockLLMServer(host=host, port=port, **kwargs)
+    await server.start()
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
@@ -0,0 +1,54 @@
+"""
+Offline Bot API backend for Jyra tests
+
+A python-telegram-bot request backend that answers locally instead of calling
+Telegram: getMe returns a fixed test bot and every other method succeeds with
+True. It lets tests and local runs initialize and start a real Application,
+handlers and all, without a network connection or a valid token.
+"""
+
+import json
+from typing import List, Optional, Tuple
+
+from telegram.request import BaseRequest, RequestData
+
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# The bot getMe reports
+TEST_BOT = {"id": 123456, "is_bot": True, "first_name": "Jyra", "username": "jyra_test_bot"}
+
+
+class OfflineRequest(BaseRequest):
+    """
+    Request backend that answers Bot API calls locally and records them.
+    """
+
+    def __init__(self):
+        """Initialize the backend."""
+        self.calls: List[str] = []
+
+    async def initialize(self) -> None:
+        """Nothing to set up."""
+
+    async def shutdown(self) -> None:
+        """Nothing to clean up."""
+
+    async def do_request(self, url: str, method: str, request_data: Optional[RequestData] = None,
+                         read_timeout=None, write_timeout=None, connect_timeout=None,
+                         pool_timeout=None) -> Tuple[int, bytes]:
+        """
+        Answer a Bot API call.
+
+        Args:
+            url (str): Request URL; its last segment is the API method
+            method (str): HTTP method
+
+        Returns:
+            Tuple[int, bytes]: Status code and JSON body
+        """
+        endpoint = url.rsplit("/", 1)[-1]
+        self.calls.append(endpoint)
+        result = TEST_BOT if endpoint == "getMe" else True
+        return 200, json.dumps({"ok": True, "result": result}).encode("utf-8")
@@ -0,0 +1,132 @@
+"""
+Replay of Telegram updates against the webhook server
+
+POSTs updates to a running webhook endpoint the way Telegram does, with the
+secret token header, and reports status codes, latency and throughput. Updates
+come from a JSON lines file, e.g. one written with WEBHOOK_RECORD_PATH, or are
+generated as plain text messages from a number of users.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import aiohttp
+
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def load_updates(path: str) -> List[Dict[str, Any]]:
+    """
+    Load recorded updates from a JSON lines file.
+
+    Args:
+        path (str): The file, one update per line
+
+    Returns:
+        List[Dict[str, Any]]: The updates
+    """
+    with open(Path(path), encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_updates(count: int, users: int = 10, first_update_id: int = 1) -> List[Dict[str, Any]]:
+    """
+    Generate private text message updates, round-robin across users.
+
+    Args:
+        count (int): Number of updates
+        users (int): Number of distinct users
+        first_update_id (int): update_id of the first update
+
+    Returns:
+        List[Dict[str, Any]]: The updates, in Telegram's JSON format
+    """
+    now = int(datetime.now().timestamp())
+    updates = []
+    for i in range(count):
+        user_id = 100000 + i % max(1, users)
+        updates.append({
+            "update_id": first_update_id + i,
+            "message": {
+                "message_id": first_update_id + i,
+                "date": now,
+                "chat": {"id": user_id, "type": "private", "first_name": "Replay"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "Replay"},
+                "text": f"Replayed message {i} from user {user_id}"
+            }
+        })
+    return updates
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def replay_updates(url: str, updates: List[Dict[str, Any]], secret_token: str = "",
+                         concurrency: int = 10, rate: float = 0.0) -> Dict[str, Any]:
+    """
+    POST updates to a webhook endpoint.
+
+    Args:
+        url (str): Webhook URL
+        updates (List[Dict[str, Any]]): The updates, sent in order
+        secret_token (str): Value of the secret token header
+        concurrency (int): Requests in flight at most
+        rate (float): Updates started per second at most (0 for no limit)
+
+    Returns:
+        Dict[str, Any]: sent, statuses (count per status code, "error" for
+            connection failures), p50/p95/p99 latency in ms, seconds and throughput
+    """
+    headers = {SECRET_HEADER: secret_token} if secret_token else {}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    statuses: Dict[str, int] = {}
+    latencies: List[float] = []
+
+    async def send(session: aiohttp.ClientSession, update: Dict[str, Any]) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with session.post(url, json=update, headers=headers) as response:
+                    await response.read()
+                    status = str(response.status)
+            except aiohttp.ClientError as e:
+                logger.warning(f"Error posting update {update.get('update_id')}: {str(e)}")
+                status = "error"
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        tasks = []
+        for i, update in enumerate(updates):
+            if rate > 0:
+                # Pace the starts instead of sending everything at once
+                delay = start + i / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(session, update)))
+        await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "sent": len(updates),
+        "statuses": dict(sorted(statuses.items())),
+        "p50_ms": percentile(latencies, 0.5),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "seconds": round(elapsed, 3),
+        "updates_per_second": round(len(updates) / elapsed, 1) if elapsed else None
+    }
@@ -5,9 +5,11 @@ This module provides functions for creating consistent buttons
 throughout the bot interface.
 """
 
-from typing import List, Optional, Union, Any
+from typing import List, Optional, Union, Any, Tuple
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
+from jyra.db.utils.pagination import encode_page_token
+
 
 def create_button(text: str, callback_data: Optional[str] = None,
                   url: Optional[str] = None) -> InlineKeyboardButton:
@@ -68,6 +70,34 @@ def create_button_row(buttons: List[InlineKeyboardButton]) -> List[InlineKeyboar
     return buttons
 
 
+def create_page_navigation_row(prefix: str, page: int,
+                               first_cursor: Optional[Tuple[int, ...]],
+                               last_cursor: Optional[Tuple[int, ...]],
+                               has_previous: bool, has_next: bool) -> List[InlineKeyboardButton]:
+    """
+    Create Previous/Next buttons for a keyset-paginated list.
+
+    Args:
+        prefix: Callback data before the page token
+        page: Current page number (0-indexed)
+        first_cursor: Cursor of the first item on the page
+        last_cursor: Cursor of the last item on the page
+        has_previous: Whether there are items before the page
+        has_next: Whether there are items after the page
+
+    Returns:
+        The buttons, possibly none
+    """
+    row = []
+    if has_previous and first_cursor is not None:
+        row.append(create_callback_button(
+            "⬅️ Previous", prefix + encode_page_token(max(0, page - 1), first_cursor, backward=True)))
+    if has_next and last_cursor is not None:
+        row.append(create_callback_button(
+            "➡️ Next", prefix + encode_page_token(page + 1, last_cursor)))
+    return row
+
+
 def create_button_grid(buttons: List[InlineKeyboardButton],
                        columns: int = 2) -> List[List[InlineKeyboardButton]]:
     """
@@ -7,9 +7,12 @@ error messages, and success/confirmation messages.
 
 from typing import Optional, Dict, Any, Callable, Awaitable
 import asyncio
+import time
 from telegram import Update, Message
+from telegram.constants import ChatAction
 from telegram.ext import ContextTypes
 
+from jyra.bot.utils.send_scheduler import send_scheduler
 from jyra.ui.formatting import bold, italic, emoji_prefix
 from jyra.utils.logger import setup_logger
 
@@ -28,6 +31,9 @@ LOADING_ANIMATIONS = {
 # Default loading animation
 DEFAULT_ANIMATION = "dots"
 
+# Seconds between typing statuses shown instead of frames (Telegram shows one for 5 seconds)
+CHAT_ACTION_INTERVAL = 4.5
+
 # Success indicators
 SUCCESS_EMOJI = "✅"
 ERROR_EMOJI = "❌"
@@ -96,11 +102,24 @@ async def _animate_loading_indicator(
         duration: The duration between frames
     """
     frame = 0
+    last_chat_action = 0.0
     
     try:
         while context.user_data.get("loading_indicator", {}).get("is_running", False):
             frame = (frame + 1) % len(animation)
-            await message.edit_text(f"{animation[frame]} {text}...")
+            if send_scheduler.under_pressure(message.chat_id):
+                # Frames would only be dropped; show the typing status instead
+                if time.monotonic() - last_chat_action >= CHAT_ACTION_INTERVAL:
+                    await context.bot.send_chat_action(message.chat_id, ChatAction.TYPING)
+                    last_chat_action = time.monotonic()
+            else:
+                # Frames only use spare send capacity, so they never delay replies
+                await context.bot.edit_message_text(
+                    chat_id=message.chat_id,
+                    message_id=message.message_id,
+                    text=f"{animation[frame]} {text}...",
+                    rate_limit_args={"priority": "low"}
+                )
             await asyncio.sleep(duration)
     except Exception as e:
         logger.error(f"Error in loading animation: {str(e)}")
@@ -153,6 +172,30 @@ async def stop_loading_indicator(
     context.user_data.pop("loading_indicator", None)
 
 
+async def dismiss_loading_indicator(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Stop the loading indicator and delete its message without showing a result.
+    
+    Args:
+        context: The context object
+    """
+    loading_data = context.user_data.pop("loading_indicator", None)
+    
+    if not loading_data:
+        return
+    
+    # Stop the animation
+    loading_data["is_running"] = False
+    
+    try:
+        await context.bot.delete_message(
+            chat_id=loading_data["chat_id"],
+            message_id=loading_data["message_id"]
+        )
+    except Exception as e:
+        logger.error(f"Error dismissing loading indicator: {str(e)}")
+
+
 async def with_loading_indicator(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
@@ -16,14 +16,201 @@ MAX_CONVERSATION_HISTORY: int = int(
 DEFAULT_LANGUAGE: str = os.getenv("DEFAULT_LANGUAGE", "en")
 LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 
+# How the bot receives updates: "polling" or "webhook" (embedded HTTP server)
+BOT_MODE: str = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_LISTEN: str = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT: int = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/telegram")
+# Public URL registered with Telegram; leave empty if the webhook is set elsewhere
+WEBHOOK_URL: str = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_SECRET_TOKEN: str = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+# Updates received and not yet handled (queued or in the update processor) before
+# new deliveries are refused with a 503
+WEBHOOK_MAX_QUEUE: int = int(os.getenv("WEBHOOK_MAX_QUEUE", "512"))
+# Append every received update to this JSON lines file (for replaying)
+WEBHOOK_RECORD_PATH: str = os.getenv("WEBHOOK_RECORD_PATH", "")
+
+# Outbound Telegram API budgets (Telegram allows about 30 messages per second
+# overall, one per second in a private chat and 20 per minute in a group)
+SEND_GLOBAL_RATE: float = float(os.getenv("SEND_GLOBAL_RATE", "30"))
+SEND_PRIVATE_CHAT_RATE: float = float(os.getenv("SEND_PRIVATE_CHAT_RATE", "1"))
+SEND_GROUP_CHAT_PER_MINUTE: float = float(os.getenv("SEND_GROUP_CHAT_PER_MINUTE", "20"))
+SEND_CHAT_BURST: int = int(os.getenv("SEND_CHAT_BURST", "3"))
+# Wait (seconds) for a chat's next send slot above which low-value traffic is dropped
+SEND_PRESSURE_DELAY: float = float(os.getenv("SEND_PRESSURE_DELAY", "1.0"))
+SEND_MAX_RETRIES: int = int(os.getenv("SEND_MAX_RETRIES", "2"))
+
+# Worker processes of `jyra.cli bot --workers N` listen on consecutive local ports
+WORKER_BASE_PORT: int = int(os.getenv("WORKER_BASE_PORT", "8600"))
+WORKER_HEALTH_INTERVAL: float = float(os.getenv("WORKER_HEALTH_INTERVAL", "5"))
+WORKER_HEALTH_FAILURES: int = int(os.getenv("WORKER_HEALTH_FAILURES", "3"))
+# Seconds a new worker has to answer its first health check
+WORKER_STARTUP_TIMEOUT: float = float(os.getenv("WORKER_STARTUP_TIMEOUT", "60"))
+# Updates held for one worker before the dispatcher stops taking new ones
+WORKER_QUEUE_SIZE: int = int(os.getenv("WORKER_QUEUE_SIZE", "1000"))
+# Set by the front process for its workers: processes sharing the bot's send budgets
+WORKER_COUNT: int = max(1, int(os.getenv("JYRA_WORKER_COUNT", "1")))
+
 # AI configuration
 GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
 OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
 ENABLE_OPENAI: bool = os.getenv(
     "ENABLE_OPENAI", "false").lower() in ("true", "1", "yes")
 
+# Model routing: "on" picks a model tier per call, "off" always uses the primary
+# model, "ab" routes a share of users and logs decisions for comparison
+MODEL_ROUTING_MODE: str = os.getenv("MODEL_ROUTING_MODE", "on").lower()
+MODEL_ROUTING_AB_FRACTION: float = float(os.getenv("MODEL_ROUTING_AB_FRACTION", "0.5"))
+MODEL_ROUTING_LOG_PATH: str = os.getenv(
+    "MODEL_ROUTING_LOG_PATH", "data/model_routing.jsonl")
+# The standard tier is the model manager's primary model
+MODEL_TIER_FAST: str = os.getenv("MODEL_TIER_FAST", "gemini-1.5-flash")
+MODEL_TIER_ADVANCED: str = os.getenv("MODEL_TIER_ADVANCED", "gemini-1.5-pro")
+# Complexity scores below the first use the fast tier, from the second the advanced tier
+MODEL_ROUTING_FAST_BELOW: float = float(os.getenv("MODEL_ROUTING_FAST_BELOW", "0.5"))
+MODEL_ROUTING_ADVANCED_FROM: float = float(os.getenv("MODEL_ROUTING_ADVANCED_FROM", "2.5"))
+
+# Provider endpoints
+GEMINI_API_BASE_URL: str = os.getenv(
+    "GEMINI_API_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+OPENAI_API_BASE_URL: str = os.getenv(
+    "OPENAI_API_BASE_URL", "https://api.openai.com/v1")
+
+# Gemini context caching for persona system prompts
+GEMINI_CONTEXT_CACHE_ENABLED: bool = os.getenv(
+    "GEMINI_CONTEXT_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+GEMINI_CACHE_TTL_SECONDS: int = int(
+    os.getenv("GEMINI_CACHE_TTL_SECONDS", "3600"))
+GEMINI_CACHE_MIN_TOKENS: int = int(
+    os.getenv("GEMINI_CACHE_MIN_TOKENS", "1024"))
+GEMINI_CACHE_MAX_ENTRIES: int = int(
+    os.getenv("GEMINI_CACHE_MAX_ENTRIES", "50"))
+
+# Context assembly configuration
+CONTEXT_BUDGET_RATIO: float = float(os.getenv("CONTEXT_BUDGET_RATIO", "0.25"))
+CONTEXT_MAX_INPUT_TOKENS: int = int(
+    os.getenv("CONTEXT_MAX_INPUT_TOKENS", "4000"))
+
+# Provider rate limits per model endpoint (0 disables a limit)
+GEMINI_RPM: int = int(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TPM: int = int(os.getenv("GEMINI_TPM", "1000000"))
+GEMINI_EMBED_RPM: int = int(os.getenv("GEMINI_EMBED_RPM", "1500"))
+OPENAI_RPM: int = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM: int = int(os.getenv("OPENAI_TPM", "200000"))
+OPENAI_EMBED_RPM: int = int(os.getenv("OPENAI_EMBED_RPM", "3000"))
+
+# Retry configuration for rate-limited API calls
+LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX: float = float(os.getenv("LLM_BACKOFF_MAX", "30.0"))
+LLM_MAX_QUEUE_WAIT: float = float(os.getenv("LLM_MAX_QUEUE_WAIT", "30.0"))
+
+# LLM work scheduler: concurrent calls per priority class and overall
+LLM_MAX_CONCURRENT: int = int(os.getenv("LLM_MAX_CONCURRENT", "8"))
+LLM_INTERACTIVE_CONCURRENCY: int = int(os.getenv("LLM_INTERACTIVE_CONCURRENCY", "8"))
+LLM_BACKGROUND_CONCURRENCY: int = int(os.getenv("LLM_BACKGROUND_CONCURRENCY", "2"))
+LLM_BULK_CONCURRENCY: int = int(os.getenv("LLM_BULK_CONCURRENCY", "1"))
+# Background classes are paused while interactive p95 latency (ms) is above this
+LLM_INTERACTIVE_LATENCY_TARGET_MS: float = float(
+    os.getenv("LLM_INTERACTIVE_LATENCY_TARGET_MS", "5000"))
+
+# Response cache configuration
+RESPONSE_CACHE_MEMORY_ENTRIES: int = int(
+    os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", "256"))
+RESPONSE_CACHE_MAX_ENTRIES: int = int(
+    os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+RESPONSE_CACHE_MAX_SIZE_MB: float = float(
+    os.getenv("RESPONSE_CACHE_MAX_SIZE_MB", "100"))
+
+# Semantic cache configuration for auxiliary LLM tasks
+SEMANTIC_CACHE_ENABLED: bool = os.getenv(
+    "SEMANTIC_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+SEMANTIC_CACHE_AUDIT_RATE: float = float(
+    os.getenv("SEMANTIC_CACHE_AUDIT_RATE", "0.02"))
+
+# Update processing: users are handled concurrently, each user's updates in order
+UPDATE_MAX_CONCURRENT: int = int(os.getenv("UPDATE_MAX_CONCURRENT", "16"))
+UPDATE_PER_USER_CONCURRENCY: int = int(os.getenv("UPDATE_PER_USER_CONCURRENCY", "1"))
+# Updates admitted to the per-user queues at once; later ones wait in arrival order
+UPDATE_MAX_PENDING: int = int(os.getenv("UPDATE_MAX_PENDING", "256"))
+
+# A new message cancels the user's unanswered turn and is answered together with it
+TURN_SUPERSESSION_ENABLED: bool = os.getenv(
+    "TURN_SUPERSESSION_ENABLED", "true").lower() in ("true", "1", "yes")
+TURN_MERGE_WINDOW_SECONDS: float = float(os.getenv("TURN_MERGE_WINDOW_SECONDS", "120"))
+
+# Per-stage timeouts (seconds) of the concurrent pre-response pipeline
+TURN_HISTORY_TIMEOUT: float = float(os.getenv("TURN_HISTORY_TIMEOUT", "3.0"))
+TURN_MEMORY_TIMEOUT: float = float(os.getenv("TURN_MEMORY_TIMEOUT", "2.5"))
+TURN_SENTIMENT_TIMEOUT: float = float(os.getenv("TURN_SENTIMENT_TIMEOUT", "1.5"))
+TURN_ANALYSIS_TIMEOUT: float = float(os.getenv("TURN_ANALYSIS_TIMEOUT", "4.0"))
+TURN_INDICATOR_TIMEOUT: float = float(os.getenv("TURN_INDICATOR_TIMEOUT", "2.0"))
+
+# Background memory extraction (messages are debounced per user)
+MEMORY_EXTRACTION_DEBOUNCE_SECONDS: float = float(
+    os.getenv("MEMORY_EXTRACTION_DEBOUNCE_SECONDS", "5"))
+MEMORY_EXTRACTION_MAX_WAIT_SECONDS: float = float(
+    os.getenv("MEMORY_EXTRACTION_MAX_WAIT_SECONDS", "30"))
+MEMORY_EXTRACTION_MAX_BATCH: int = int(
+    os.getenv("MEMORY_EXTRACTION_MAX_BATCH", "5"))
+MEMORY_EXTRACTION_WORKERS: int = int(os.getenv("MEMORY_EXTRACTION_WORKERS", "2"))
+MEMORY_EXTRACTION_QUEUE_SIZE: int = int(
+    os.getenv("MEMORY_EXTRACTION_QUEUE_SIZE", "100"))
+
+# Batched memory consolidation (several groups per structured-output call)
+CONSOLIDATION_BATCH_ENABLED: bool = os.getenv(
+    "CONSOLIDATION_BATCH_ENABLED", "true").lower() in ("true", "1", "yes")
+CONSOLIDATION_BATCH_TOKEN_BUDGET: int = int(
+    os.getenv("CONSOLIDATION_BATCH_TOKEN_BUDGET", "3000"))
+CONSOLIDATION_BATCH_MAX_GROUPS: int = int(
+    os.getenv("CONSOLIDATION_BATCH_MAX_GROUPS", "8"))
+CONSOLIDATION_USER_CONCURRENCY: int = int(
+    os.getenv("CONSOLIDATION_USER_CONCURRENCY", "4"))
+
+# Local lexicon tier for sentiment analysis (escalates to the LLM when unsure)
+SENTIMENT_LEXICON_ENABLED: bool = os.getenv(
+    "SENTIMENT_LEXICON_ENABLED", "true").lower() in ("true", "1", "yes")
+SENTIMENT_LEXICON_MIN_CONFIDENCE: float = float(
+    os.getenv("SENTIMENT_LEXICON_MIN_CONFIDENCE", "0.6"))
+SENTIMENT_ESCALATION_INTENSITY: int = int(
+    os.getenv("SENTIMENT_ESCALATION_INTENSITY", "4"))
+
+# LLM call telemetry
+TELEMETRY_ENABLED: bool = os.getenv(
+    "TELEMETRY_ENABLED", "true").lower() in ("true", "1", "yes")
+TELEMETRY_WINDOW_SECONDS: int = int(
+    os.getenv("TELEMETRY_WINDOW_SECONDS", "3600"))
+TELEMETRY_FLUSH_SECONDS: int = int(
+    os.getenv("TELEMETRY_FLUSH_SECONDS", "60"))
+TELEMETRY_EXPORT_PATH: str = os.getenv(
+    "TELEMETRY_EXPORT_PATH", "data/telemetry.json")
+
 # Database configuration
 DATABASE_PATH: str = os.getenv("DATABASE_PATH", "data/jyra.db")
+# Seconds a row count shown by the browsing screens is reused
+PAGINATION_COUNT_TTL: int = int(os.getenv("PAGINATION_COUNT_TTL", "60"))
+# Conversation history cache: message pairs kept per user and role (0 disables)
+# and the memory budget of all buffers
+HISTORY_CACHE_PAIRS: int = int(
+    os.getenv("HISTORY_CACHE_PAIRS", str(MAX_CONVERSATION_HISTORY)))
+HISTORY_CACHE_MAX_MB: float = float(os.getenv("HISTORY_CACHE_MAX_MB", "32"))
+# Group commit of message and memory writes: window a batch stays open, largest batch
+GROUP_COMMIT_ENABLED: bool = os.getenv(
+    "GROUP_COMMIT_ENABLED", "true").lower() in ("true", "1", "yes")
+GROUP_COMMIT_WINDOW_MS: float = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "5"))
+GROUP_COMMIT_MAX_BATCH: int = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "256"))
+
+# User rate limiting (limits per window of RATE_LIMIT_WINDOW seconds; 0 disables a tier)
+RATE_LIMIT_WINDOW: int = int(os.getenv("RATE_LIMIT_WINDOW", "60"))
+RATE_LIMIT_MAX_REQUESTS: int = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "20"))
+RATE_LIMIT_CHAT_MAX_REQUESTS: int = int(
+    os.getenv("RATE_LIMIT_CHAT_MAX_REQUESTS", "60"))
+RATE_LIMIT_LLM_MAX_REQUESTS: int = int(
+    os.getenv("RATE_LIMIT_LLM_MAX_REQUESTS", "0"))
+# SQLite file holding the limiter state, shared by worker processes; empty keeps it per process
+RATE_LIMIT_STATE_PATH: str = os.getenv("RATE_LIMIT_STATE_PATH", "")
+# Milliseconds a check waits for another worker's lock on that file before allowing the request
+RATE_LIMIT_STATE_TIMEOUT_MS: float = float(os.getenv("RATE_LIMIT_STATE_TIMEOUT_MS", "50"))
 
 # Admin configuration
 ADMIN_USER_IDS: List[int] = [
@@ -66,4 +253,10 @@ def validate_config() -> List[str]:
     if not DATABASE_PATH:
         errors.append("DATABASE_PATH is not set")
 
+    if BOT_MODE not in ("polling", "webhook"):
+        errors.append(f"BOT_MODE must be polling or webhook, not {BOT_MODE}")
+
+    if BOT_MODE == "webhook" and not WEBHOOK_SECRET_TOKEN:
+        errors.append("WEBHOOK_SECRET_TOKEN is not set but BOT_MODE is webhook")
+
     return errors
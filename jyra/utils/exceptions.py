@@ -70,13 +70,31 @@ class AIModelException(APIException):
         super().__init__(message, details)
 
 
+class StructuredOutputException(AIModelException):
+    """Exception raised when a model's structured output does not match the schema."""
+    
+    def __init__(self, model: str = None, details: str = None):
+        super().__init__(model, details)
+        self.message = "Invalid structured output" + (f" from AI model: {model}" if model else "")
+
+
+class CachedContentRejectedException(AIModelException):
+    """Exception raised when the provider no longer accepts a cached content handle."""
+    
+    def __init__(self, model: str = None, details: str = None):
+        super().__init__(model, details)
+        self.message = "Cached content rejected" + (f" by AI model: {model}" if model else "")
+
+
 class APIRateLimitException(APIException):
     """Exception raised when an API rate limit is reached."""
     
-    def __init__(self, api: str = None, details: str = None):
+    def __init__(self, api: str = None, details: str = None, retry_after: float = None):
         message = "API rate limit reached"
         if api:
             message = f"Rate limit reached for API: {api}"
+        # Seconds the provider asked us to wait before retrying, if known
+        self.retry_after = retry_after
         super().__init__(message, details)
 
 
@@ -146,6 +164,17 @@ class InvalidConfigException(ConfigException):
         super().__init__(message, details)
 
 
+# Conversation Exceptions
+class TurnSupersededException(JyraException):
+    """Exception raised when a newer message from the user replaces a turn in progress."""
+    
+    def __init__(self, user_id: int = None, details: str = None):
+        message = "Turn superseded by a newer message"
+        if user_id is not None:
+            message = f"Turn superseded by a newer message from user {user_id}"
+        super().__init__(message, details)
+
+
 # Feature Exceptions
 class FeatureException(JyraException):
     """Base exception for feature-related errors."""
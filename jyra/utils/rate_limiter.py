@@ -3,109 +3,403 @@ Rate limiting module for Jyra.
 
 This module provides functionality to limit the rate at which users can interact with the bot,
 helping to prevent abuse and ensure fair usage of resources.
+
+Limits use the generic cell rate algorithm (GCRA): each key stores a single
+timestamp, its theoretical arrival time, so a check costs the same no matter
+how many requests the window allows. A key whose timestamp has passed is in
+the same state as a key never seen, so idle keys are evicted. Several tiers
+(per user, per chat, a global LLM budget) are checked together, and a request
+blocked by one tier is charged to none. State lives in memory, or in a SQLite
+file to share it between worker processes. A check runs on the event loop, so
+it waits only briefly for another process holding the file's lock; if the lock
+isn't free by then, the request is let through rather than stalling every
+chat of the process.
 """
 
+import math
+import sqlite3
+import threading
 import time
-from collections import defaultdict
-from typing import Dict, Tuple, Optional
-import logging
+from pathlib import Path
+from typing import Dict, Tuple, Optional, List, Any, Callable
+
+from jyra.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Idle keys are evicted after this many checks
+EVICT_EVERY = 1024
+
+# Theoretical arrival times per key before a check, new times after it (None keeps them)
+UpdateFunc = Callable[[List[Optional[float]]], Optional[List[float]]]
+
+
+class RateLimit:
+    """
+    A limit of max_requests per window_size seconds for each key of a tier.
+    """
+
+    def __init__(self, max_requests: int, window_size: float):
+        """
+        Initialize the limit.
+
+        Args:
+            max_requests (int): Maximum number of requests allowed in the window
+            window_size (float): Time window in seconds
+        """
+        self.max_requests = max(1, max_requests)
+        self.window_size = window_size
+        self.interval = window_size / self.max_requests
+
+    def apply(self, tat: Optional[float], now: float) -> Tuple[bool, float, int]:
+        """
+        Check a request against the limit.
+
+        Args:
+            tat (Optional[float]): Theoretical arrival time of the key, None if unknown
+            now (float): Current time
+
+        Returns:
+            Tuple[bool, float, int]: A tuple containing:
+                - Whether the request is allowed
+                - The new theoretical arrival time if allowed, otherwise the
+                  time in seconds until it would be
+                - Number of requests counted in the current window
+        """
+        new_tat = max(tat or now, now) + self.interval
+        if new_tat - now <= self.window_size:
+            return True, new_tat, math.ceil((new_tat - now) / self.interval - 1e-9)
+        return False, new_tat - self.window_size - now, self.max_requests
+
+
+class MemoryLimitStore:
+    """
+    Theoretical arrival times kept in this process.
+    """
+
+    def __init__(self):
+        """Initialize the store."""
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def update(self, keys: List[str], func: UpdateFunc) -> None:
+        """
+        Read the keys' times and write the ones func returns, atomically.
+
+        Args:
+            keys (List[str]): Keys to update
+            func (UpdateFunc): Computes the new times from the current ones
+        """
+        with self._lock:
+            new_tats = func([self._tats.get(key) for key in keys])
+            if new_tats is not None:
+                self._tats.update(zip(keys, new_tats))
+
+    def evict(self, now: float) -> int:
+        """
+        Forget keys whose theoretical arrival time has passed.
+
+        Args:
+            now (float): Current time
+
+        Returns:
+            int: Number of keys evicted
+        """
+        with self._lock:
+            idle = [key for key, tat in self._tats.items() if tat <= now]
+            for key in idle:
+                del self._tats[key]
+        return len(idle)
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """
+        Forget one key, or all keys.
+
+        Args:
+            key (Optional[str]): Key to forget; None forgets all keys
+        """
+        with self._lock:
+            if key is None:
+                self._tats.clear()
+            else:
+                self._tats.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class SQLiteLimitStore:
+    """
+    Theoretical arrival times kept in a SQLite file shared by several processes.
+    """
+
+    def __init__(self, path: str, timeout_ms: float = 50):
+        """
+        Initialize the store.
+
+        Args:
+            path (str): Database file; created if missing
+            timeout_ms (float): Milliseconds an update waits for another
+                process's lock before it fails with sqlite3.OperationalError
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Transactions are opened explicitly so each check holds the write lock.
+        # Setting up the file may wait longer than a check would.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0,
+                                     isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT PRIMARY KEY,
+                tat REAL NOT NULL
+            )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_tat ON rate_limits (tat)")
+            self._conn.execute(f"PRAGMA busy_timeout={max(0, int(timeout_ms))}")
+
+    def update(self, keys: List[str], func: UpdateFunc) -> None:
+        """
+        Read the keys' times and write the ones func returns, atomically.
+
+        Args:
+            keys (List[str]): Keys to update
+            func (UpdateFunc): Computes the new times from the current ones
+
+        Raises:
+            sqlite3.OperationalError: If another process held the lock too long
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    f"SELECT key, tat FROM rate_limits WHERE key IN ({', '.join('?' * len(keys))})",
+                    keys
+                ).fetchall()
+                stored = dict(rows)
+                new_tats = func([stored.get(key) for key in keys])
+                if new_tats is not None:
+                    self._conn.executemany(
+                        "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                        list(zip(keys, new_tats))
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def evict(self, now: float) -> int:
+        """
+        Forget keys whose theoretical arrival time has passed.
+
+        Args:
+            now (float): Current time
+
+        Returns:
+            int: Number of keys evicted
+        """
+        with self._lock:
+            return self._conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,)).rowcount
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """
+        Forget one key, or all keys.
+
+        Args:
+            key (Optional[str]): Key to forget; None forgets all keys
+        """
+        with self._lock:
+            if key is None:
+                self._conn.execute("DELETE FROM rate_limits")
+            else:
+                self._conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
 
-logger = logging.getLogger(__name__)
 
 class RateLimiter:
     """
     A rate limiter that restricts the number of requests a user can make within a time window.
-    
+
     Attributes:
-        user_requests (Dict[int, list]): Dictionary mapping user IDs to their request timestamps
-        window_size (int): Time window in seconds
-        max_requests (int): Maximum number of requests allowed in the window
+        tiers (Dict[str, RateLimit]): Limits by tier name; "user" is always present
+        window_size (int): Time window in seconds of the user tier
+        max_requests (int): Maximum number of requests allowed in the window of the user tier
         admin_user_ids (list): List of admin user IDs that bypass rate limiting
     """
-    
-    def __init__(self, window_size: int = 60, max_requests: int = 20, admin_user_ids: Optional[list] = None):
+
+    def __init__(self, window_size: int = 60, max_requests: int = 20, admin_user_ids: Optional[list] = None,
+                 tiers: Optional[Dict[str, Tuple[int, int]]] = None, state_path: str = "",
+                 state_timeout_ms: float = 50):
         """
         Initialize the rate limiter.
-        
+
         Args:
             window_size (int): Time window in seconds (default: 60)
             max_requests (int): Maximum number of requests allowed in the window (default: 20)
             admin_user_ids (list, optional): List of admin user IDs that bypass rate limiting
+            tiers (Dict[str, Tuple[int, int]], optional): Further tiers, as
+                name -> (max_requests, window_size), e.g. "chat" or "llm"
+            state_path (str, optional): SQLite file shared with other processes;
+                empty keeps the state in this process
+            state_timeout_ms (float, optional): Milliseconds a check waits for
+                another process's lock on the SQLite file before letting the
+                request through
         """
-        self.user_requests = defaultdict(list)
-        self.window_size = window_size
-        self.max_requests = max_requests
+        self.tiers: Dict[str, RateLimit] = {"user": RateLimit(max_requests, window_size)}
+        for name, (tier_requests, tier_window) in (tiers or {}).items():
+            self.tiers[name] = RateLimit(tier_requests, tier_window)
         self.admin_user_ids = admin_user_ids or []
-        
+        self.store = (SQLiteLimitStore(state_path, state_timeout_ms) if state_path
+                      else MemoryLimitStore())
+        self._checks = 0
+        self._failed_open = 0
+
+    @property
+    def window_size(self) -> float:
+        return self.tiers["user"].window_size
+
+    @property
+    def max_requests(self) -> int:
+        return self.tiers["user"].max_requests
+
+    def check(self, **subjects: Any) -> Tuple[bool, Optional[str], int, int]:
+        """
+        Check a request against several tiers at once.
+
+        The request is only counted when every tier allows it.
+
+        Args:
+            **subjects: Key per tier to check, e.g. user=user_id, chat=chat_id,
+                llm="global"; None skips the tier
+
+        Returns:
+            Tuple[bool, Optional[str], int, int]: A tuple containing:
+                - Whether the request is rate limited
+                - The tier that limited it, None if allowed
+                - Number of requests made in the current window of the first tier
+                - Time in seconds until the limiting tier allows a request
+        """
+        if subjects.get("user") in self.admin_user_ids:
+            return False, None, 0, 0
+
+        checked = [(name, key) for name, key in subjects.items() if key is not None]
+        unknown = [name for name, _ in checked if name not in self.tiers]
+        if unknown:
+            raise ValueError(f"Unknown rate limit tier: {', '.join(unknown)}")
+        if not checked:
+            return False, None, 0, 0
+
+        now = time.time()
+        outcome: Dict[str, Any] = {}
+
+        def decide(tats: List[Optional[float]]) -> Optional[List[float]]:
+            new_tats = []
+            for (name, _), tat in zip(checked, tats):
+                allowed, value, count = self.tiers[name].apply(tat, now)
+                outcome.setdefault("count", count)
+                if not allowed:
+                    outcome.update(tier=name, wait=value)
+                    return None
+                new_tats.append(value)
+            return new_tats
+
+        try:
+            self.store.update([f"{name}:{key}" for name, key in checked], decide)
+        except sqlite3.OperationalError as e:
+            # Another process holds the shared state; don't stall the event loop for it
+            self._failed_open += 1
+            logger.warning(f"Rate limit state unavailable, allowing request: {str(e)}")
+            return False, None, 0, 0
+
+        self._checks += 1
+        if self._checks % EVICT_EVERY == 0:
+            self.evict_idle(now)
+
+        tier = outcome.get("tier")
+        if tier is None:
+            return False, None, outcome["count"], 0
+        return True, tier, outcome["count"], int(outcome["wait"]) + 1
+
     def is_rate_limited(self, user_id: int) -> Tuple[bool, int, int]:
         """
         Check if a user is rate limited.
-        
+
         Args:
             user_id (int): The user ID to check
-            
+
         Returns:
             Tuple[bool, int, int]: A tuple containing:
                 - Whether the user is rate limited (True if limited, False otherwise)
                 - Number of requests made in the current window
                 - Time in seconds until the rate limit resets
         """
-        # Admin users bypass rate limiting
-        if user_id in self.admin_user_ids:
-            return False, 0, 0
-            
-        current_time = time.time()
-        
-        # Remove requests outside the current time window
-        self.user_requests[user_id] = [
-            req_time for req_time in self.user_requests[user_id]
-            if current_time - req_time <= self.window_size
-        ]
-        
-        # Count requests in the current window
-        request_count = len(self.user_requests[user_id])
-        
-        # If under the limit, add the current request and allow
-        if request_count < self.max_requests:
-            self.user_requests[user_id].append(current_time)
-            return False, request_count + 1, 0
-            
-        # Calculate time until oldest request expires
-        if self.user_requests[user_id]:
-            oldest_request = min(self.user_requests[user_id])
-            reset_time = int(oldest_request + self.window_size - current_time) + 1
-        else:
-            reset_time = 0
-            
-        logger.warning(f"Rate limit exceeded for user {user_id}. {request_count} requests in {self.window_size}s window.")
-        return True, request_count, reset_time
-        
+        is_limited, _, request_count, reset_time = self.check(user=user_id)
+        if is_limited:
+            logger.warning(f"Rate limit exceeded for user {user_id}. {request_count} requests in {self.window_size}s window.")
+        return is_limited, request_count, reset_time
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Forget keys that have been idle long enough to be back at their full allowance.
+
+        Args:
+            now (float, optional): Current time
+
+        Returns:
+            int: Number of keys evicted
+        """
+        try:
+            return self.store.evict(now if now is not None else time.time())
+        except Exception as e:
+            logger.error(f"Error evicting idle rate limit keys: {str(e)}")
+            return 0
+
     def reset_for_user(self, user_id: int) -> None:
         """
         Reset the rate limit for a specific user.
-        
+
         Args:
             user_id (int): The user ID to reset
         """
-        if user_id in self.user_requests:
-            del self.user_requests[user_id]
-            logger.info(f"Rate limit reset for user {user_id}")
-            
+        self.store.reset(f"user:{user_id}")
+        logger.info(f"Rate limit reset for user {user_id}")
+
     def reset_all(self) -> None:
         """Reset rate limits for all users."""
-        self.user_requests.clear()
+        self.store.reset()
         logger.info("Rate limits reset for all users")
-        
+
     def update_limits(self, window_size: Optional[int] = None, max_requests: Optional[int] = None) -> None:
         """
-        Update the rate limiting parameters.
-        
+        Update the rate limiting parameters of the user tier.
+
         Args:
             window_size (int, optional): New time window in seconds
             max_requests (int, optional): New maximum number of requests allowed in the window
         """
-        if window_size is not None:
-            self.window_size = window_size
-        if max_requests is not None:
-            self.max_requests = max_requests
+        self.tiers["user"] = RateLimit(
+            max_requests if max_requests is not None else self.max_requests,
+            window_size if window_size is not None else self.window_size
+        )
         logger.info(f"Rate limits updated: {self.max_requests} requests per {self.window_size}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the limits and the number of tracked keys.
+
+        Returns:
+            Dict[str, Any]: Statistics
+        """
+        return {
+            "tiers": {name: f"{limit.max_requests}/{limit.window_size}s" for name, limit in self.tiers.items()},
+            "tracked_keys": len(self.store),
+            "shared": isinstance(self.store, SQLiteLimitStore),
+            "failed_open": self._failed_open
+        }
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Group commit benchmark for Jyra.
+
+Simulates many users chatting at once, each saving message pairs with
+Conversation.add_message, and measures write throughput and latency with one
+commit per write and with group commit. Each run uses a fresh database in a
+temporary directory, so the numbers reflect the disk it lives on; pass --dir
+to benchmark the disk holding the real database.
+"""
+
+import os
+import sys
+import sqlite3
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Add the parent directory to the path so we can import jyra modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jyra.db.models import conversation as conversation_module
+from jyra.db.models.conversation import Conversation
+from jyra.db.utils.group_commit import GroupCommitWriter
+from jyra.db.utils.history_cache import history_cache
+from jyra.utils.logger import setup_logger
+
+# Set up logging
+logger = setup_logger(__name__)
+
+
+def create_database(path: str) -> None:
+    """
+    Create a database holding the conversations table and its indexes.
+
+    Args:
+        path (str): Database file
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+    CREATE TABLE conversations (
+        message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        role_id INTEGER,
+        user_message TEXT,
+        bot_response TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_conversations_user_role ON conversations (user_id, role_id);
+    CREATE INDEX idx_conversations_user_page ON conversations (user_id, timestamp, message_id);
+    """)
+    conn.close()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Get a percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def simulate(writer: GroupCommitWriter, users: int, turns: int,
+                   think_ms: float) -> Dict[str, Any]:
+    """
+    Let users save message pairs concurrently.
+
+    Args:
+        writer (GroupCommitWriter): Writer used by the conversation model
+        users (int): Number of concurrent users
+        turns (int): Message pairs saved per user
+        think_ms (float): Mean pause between a user's turns in milliseconds
+
+    Returns:
+        Dict[str, Any]: Throughput, latency and batch statistics
+    """
+    latencies: List[float] = []
+
+    async def user(user_id: int) -> None:
+        for turn in range(turns):
+            if think_ms:
+                await asyncio.sleep(random.expovariate(1000 / think_ms))
+            start = time.perf_counter()
+            await Conversation.add_message(user_id, 1, f"message {turn}", f"reply {turn}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(user_id) for user_id in range(1, users + 1)))
+    elapsed = time.perf_counter() - start
+    await writer.stop()
+
+    stats = writer.get_stats()
+    return {
+        "writes_per_second": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "batches": stats["batches"],
+        "mean_batch": stats["mean_batch"]
+    }
+
+
+async def run_benchmark(user_counts: List[int], turns: int, think_ms: float,
+                        window_ms: float, directory: str) -> None:
+    """
+    Run the benchmark and print a report.
+
+    Args:
+        user_counts (List[int]): Numbers of concurrent users to simulate
+        turns (int): Message pairs saved per user
+        think_ms (float): Mean pause between a user's turns in milliseconds
+        window_ms (float): Group commit window in milliseconds
+        directory (str): Directory for the benchmark databases
+    """
+    # The cache is irrelevant to writes and would only hold the benchmark's pairs
+    history_cache.capacity = 0
+
+    print(f"{turns} message pairs per user, think time {think_ms:g} ms, "
+          f"group commit window {window_ms:g} ms")
+    for users in user_counts:
+        for name, writer in (("Per write", GroupCommitWriter(enabled=False)),
+                             ("Grouped", GroupCommitWriter(window_ms=window_ms))):
+            with tempfile.TemporaryDirectory(dir=directory) as temp_dir:
+                database_path = os.path.join(temp_dir, "benchmark.db")
+                create_database(database_path)
+                conversation_module.DATABASE_PATH = database_path
+                conversation_module.group_commit_writer = writer
+
+                result = await simulate(writer, users, turns, think_ms)
+
+            batches = (f"  {result['batches']} commits, {result['mean_batch']:.1f} writes each"
+                       if writer.enabled else "")
+            print(f"{users:5} users  {name + ':':10} {result['writes_per_second']:8.0f} writes/s  "
+                  f"p50 {result['p50']:7.1f} ms  p95 {result['p95']:7.1f} ms{batches}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark group commit of conversation writes")
+    parser.add_argument("--users", type=int, nargs="+", default=[100, 1000],
+                        help="Numbers of concurrent users to simulate (default: 100 1000)")
+    parser.add_argument("--turns", type=int, default=5,
+                        help="Message pairs saved per user (default: 5)")
+    parser.add_argument("--think-ms", type=float, default=0,
+                        help="Mean pause between a user's turns in milliseconds (default: 0)")
+    parser.add_argument("--window-ms", type=float, default=5,
+                        help="Group commit window in milliseconds (default: 5)")
+    parser.add_argument("--dir", default=None,
+                        help="Directory for the benchmark databases (default: system temp)")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.users, args.turns, args.think_ms, args.window_ms, args.dir))
+
+
+if __name__ == "__main__":
+    main()
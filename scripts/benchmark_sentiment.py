@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+"""
+Sentiment tier benchmark for Jyra.
+
+Compares the local lexicon classifier, the LLM and the tiered analyzer
+(lexicon first, LLM on escalation) on a labelled sample of messages, and
+measures their latency.
+
+Accuracy is reported both for the exact emotion and for the tone bucket that
+SentimentAnalyzer.get_response_adjustment maps it to, since the bucket is what
+changes the reply. Run against the real API (GEMINI_API_KEY) for meaningful
+LLM numbers, or with --mock to exercise the pipeline against the local mock
+LLM server.
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+# Add the parent directory to the path so we can import jyra modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jyra.ai.sentiment.lexicon_classifier import LexiconSentimentClassifier
+from jyra.ai.sentiment.sentiment_analyzer import SentimentAnalyzer
+from jyra.utils.logger import setup_logger
+
+# Set up logging
+logger = setup_logger(__name__)
+
+# Used only for its response adjustments
+tone_analyzer = SentimentAnalyzer(use_lexicon=False)
+
+# Labelled sample: (message, expected emotion)
+LABELLED_SAMPLE: List[Tuple[str, str]] = [
+    ("I'm so happy today, everything went right!", "happiness"),
+    ("That was a great movie, really fun", "happiness"),
+    ("Thanks so much for your help yesterday", "gratitude"),
+    ("I really appreciate you listening to me", "gratitude"),
+    ("I can't wait for the concert on Saturday!!", "excitement"),
+    ("We're going to Japan next month, I'm thrilled", "excitement"),
+    ("I love spending evenings with my family", "love"),
+    ("I finally finished my thesis, I'm so proud", "pride"),
+    ("I hope the interview goes well tomorrow", "hope"),
+    ("Just relaxing on the couch with some tea", "contentment"),
+    ("I feel sad and I don't know why", "sadness"),
+    ("I've been crying all night", "sadness"),
+    ("I'm disappointed they cancelled the trip", "disappointment"),
+    ("My grandmother passed away last week", "grief"),
+    ("I'm worried about my exam results", "anxiety"),
+    ("I'm so stressed with work right now", "anxiety"),
+    ("I'm scared of the dark since I was a kid", "fear"),
+    ("I'm furious that they lied to me", "anger"),
+    ("I hate when people are late", "anger"),
+    ("Ugh, my laptop crashed again, so annoying", "frustration"),
+    ("That food was disgusting", "disgust"),
+    ("Wow, I didn't expect that at all", "surprise"),
+    ("I'm confused about how this works", "confusion"),
+    ("I'm curious how black holes form", "curiosity"),
+    ("Remember when we used to play outside all day?", "nostalgia"),
+    ("I'm so bored, there's nothing to do", "boredom"),
+    ("I feel lonely since I moved to the city", "loneliness"),
+    ("I'm embarrassed about what I said at the party", "shame"),
+    ("I feel guilty for forgetting her birthday", "guilt"),
+    ("I'm a bit jealous of my brother's new job", "envy"),
+    ("What time is it in Tokyo?", "neutral"),
+    ("Can you recommend a book?", "neutral"),
+    ("I had pasta for lunch", "neutral"),
+    ("ok", "neutral"),
+    ("I'm not happy with how this turned out", "disappointment"),
+    ("Oh great, another Monday. Just what I needed.", "frustration"),
+    ("I don't even know what I'm feeling anymore", "confusion"),
+    ("My dog is sick and I can't stop thinking about it", "anxiety"),
+    ("The sunset tonight was beautiful", "happiness"),
+    ("Nobody ever replies to my messages", "loneliness"),
+]
+
+
+def tone_bucket(emotion: str) -> str:
+    """
+    Map an emotion onto the response adjustment it produces.
+
+    Args:
+        emotion (str): The emotion
+
+    Returns:
+        str: The tone bucket
+    """
+    guidance = tone_analyzer.get_response_adjustment(
+        {"primary_emotion": emotion, "intensity": 3})["tone_guidance"]
+    return guidance.replace(emotion, "<emotion>")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Get a percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def score(results: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Score results against the labelled sample.
+
+    Args:
+        results (List[Dict[str, Any]]): Results in sample order
+
+    Returns:
+        Dict[str, float]: Exact and tone bucket accuracy
+    """
+    exact = sum(1 for (_, label), result in zip(LABELLED_SAMPLE, results)
+                if result["primary_emotion"] == label)
+    bucket = sum(1 for (_, label), result in zip(LABELLED_SAMPLE, results)
+                 if tone_bucket(result["primary_emotion"]) == tone_bucket(label))
+    return {"exact": exact / len(results), "tone": bucket / len(results)}
+
+
+async def run_benchmark(use_llm: bool, repeat: int) -> None:
+    """
+    Run the benchmark and print a report.
+
+    Args:
+        use_llm (bool): Whether to call the LLM
+        repeat (int): Local classifier timing repetitions per message
+    """
+    classifier = LexiconSentimentClassifier()
+    messages = [message for message, _ in LABELLED_SAMPLE]
+
+    # Local tier: accuracy, escalation and latency
+    local_results = [classifier.classify(message) for message in messages]
+    local_latencies = []
+    for message in messages:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            classifier.classify(message)
+        local_latencies.append((time.perf_counter() - start) * 1000 / repeat)
+    kept = [(label, result) for (_, label), result in zip(LABELLED_SAMPLE, local_results)
+            if not classifier.should_escalate(result)]
+    kept_correct = sum(1 for label, result in kept
+                       if tone_bucket(result["primary_emotion"]) == tone_bucket(label))
+
+    local_score = score(local_results)
+    print(f"Sample: {len(messages)} labelled messages (VADER: {classifier._vader is not None})")
+    print(f"Lexicon:  exact {local_score['exact']:.0%}  tone {local_score['tone']:.0%}  "
+          f"p50 {percentile(local_latencies, 0.5):.3f} ms  p95 {percentile(local_latencies, 0.95):.3f} ms")
+    print(f"Answered locally: {len(kept)}/{len(messages)} "
+          f"(tone accuracy on those: {kept_correct / len(kept) if kept else 0:.0%})")
+
+    if not use_llm:
+        return
+
+    # LLM tier and the tiered analyzer
+    llm = SentimentAnalyzer(use_lexicon=False)
+    tiered = SentimentAnalyzer(use_lexicon=True)
+    for name, analyzer in (("LLM", llm), ("Tiered", tiered)):
+        results, latencies = [], []
+        for message in messages:
+            start = time.perf_counter()
+            results.append(await analyzer.analyze_sentiment(message))
+            latencies.append((time.perf_counter() - start) * 1000)
+        result_score = score(results)
+        print(f"{name + ':':9} exact {result_score['exact']:.0%}  tone {result_score['tone']:.0%}  "
+              f"p50 {percentile(latencies, 0.5):.1f} ms  p95 {percentile(latencies, 0.95):.1f} ms  "
+              f"mean {statistics.mean(latencies):.1f} ms")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    """Run the benchmark, optionally against the mock LLM server."""
+    if not args.mock:
+        await run_benchmark(not args.local_only, args.repeat)
+        return
+
+    from jyra.ai.models.gemini_direct import GeminiAI
+    from jyra.ai.models.model_manager import model_manager
+    from jyra.ai.cache.semantic_cache import semantic_cache
+    from jyra.testing.mock_llm_server import MockLLMServer
+
+    async with MockLLMServer(port=0, latency=args.mock_latency) as server:
+        for model in {model_manager.primary_model_name, *model_manager.router.tier_models.values()}:
+            model_manager.models[model] = GeminiAI(
+                model_name=model, use_cache=False, base_url=server.gemini_url)
+        semantic_cache.enabled = False
+        await run_benchmark(True, args.repeat)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the sentiment analysis tiers")
+    parser.add_argument("--local-only", action="store_true",
+                        help="Only benchmark the local lexicon classifier")
+    parser.add_argument("--mock", action="store_true",
+                        help="Use the local mock LLM server instead of the real API")
+    parser.add_argument("--mock-latency", default="lognormal:400:0.4",
+                        help="Mock LLM latency distribution (default: lognormal:400:0.4)")
+    parser.add_argument("--repeat", type=int, default=200,
+                        help="Timing repetitions per message for the local classifier")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -36,6 +36,9 @@ except ImportError:
             self.cache_dir = Path(cache_dir)
             self.max_age_seconds = max_age_seconds
 
+        def clear_all(self):
+            return 0
+
     # Dummy GeminiAI class for fallback
     class GeminiAI:
         def __init__(self, use_cache=True):
@@ -64,18 +67,7 @@ def clear_cache(max_age_hours=None, force=False):
 
         if os.path.exists(cache_dir):
             try:
-                # Count files before deletion
-                file_count = sum(1 for _ in cache_dir.glob("*.json"))
-
-                # Delete all cache files individually instead of removing the directory
-                deleted_count = 0
-                for cache_file in cache_dir.glob("*.json"):
-                    try:
-                        os.remove(cache_file)
-                        deleted_count += 1
-                    except Exception as e:
-                        logger.error(f"Error deleting {cache_file}: {str(e)}")
-
+                deleted_count = ResponseCache(cache_dir=str(cache_dir)).clear_all()
                 logger.info(f"Deleted {deleted_count} cache entries")
                 return deleted_count
             except Exception as e:
@@ -0,0 +1,175 @@
+"""
+Integration tests for Gemini context caching against a local mock API
+"""
+
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from jyra.ai.cache.context_cache import GeminiContextCache
+from jyra.ai.models.gemini_direct import GeminiAI
+from jyra.utils.exceptions import AIModelException, APIAuthenticationException
+
+
+def create_mock_gemini_app(calls, errors=None):
+    """Create a minimal cachedContents/generateContent mock; errors are (status, message) to fail with next."""
+    caches = {}
+    errors = errors if errors is not None else []
+
+    async def create_cache(request):
+        body = await request.json()
+        name = f"cachedContents/{len(caches) + 1}"
+        caches[name] = body
+        calls.append(("create", name))
+        return web.json_response({"name": name, "model": body["model"]})
+
+    async def update_cache(request):
+        name = f"cachedContents/{request.match_info['cache_id']}"
+        calls.append(("refresh", name, request.query.get("updateMask")))
+        return web.json_response({"name": name})
+
+    async def delete_cache(request):
+        name = f"cachedContents/{request.match_info['cache_id']}"
+        caches.pop(name, None)
+        calls.append(("delete", name))
+        return web.json_response({})
+
+    async def generate(request):
+        body = await request.json()
+        calls.append(("generate", body))
+        if errors:
+            status, message = errors.pop(0)
+            return web.json_response({"error": {"code": status, "message": message}}, status=status)
+        if "cachedContent" in body and body["cachedContent"] not in caches:
+            return web.json_response(
+                {"error": {"code": 404, "message": "CachedContent not found", "status": "NOT_FOUND"}},
+                status=404)
+        return web.json_response({
+            "candidates": [{"content": {"parts": [{"text": "Hello from the mock"}]}}],
+            "usageMetadata": {"totalTokenCount": 42, "cachedContentTokenCount": 30}
+        })
+
+    app = web.Application()
+    app.router.add_post("/cachedContents", create_cache)
+    app.router.add_patch("/cachedContents/{cache_id}", update_cache)
+    app.router.add_delete("/cachedContents/{cache_id}", delete_cache)
+    app.router.add_post("/models/{model_action}", generate)
+    return app
+
+
+PERSONA = "You are a helpful companion with a long and detailed persona. " * 20
+
+
+@pytest.mark.asyncio
+async def test_context_cache_lifecycle():
+    """Test creating, reusing, refreshing and deleting cached contents."""
+    calls = []
+    server = TestServer(create_mock_gemini_app(calls))
+    await server.start_server()
+    try:
+        cache = GeminiContextCache("gemini-test", base_url=str(server.make_url("")),
+                                   api_key="test", enabled=True, min_tokens=10)
+        role_context = {"role_id": 1, "tone_guidance": "Be calm."}
+
+        first = await cache.get_handle(role_context, PERSONA)
+        second = await cache.get_handle(role_context, PERSONA)
+        assert first == second == "cachedContents/1"
+
+        # A different tone is cached separately
+        other = await cache.get_handle({"role_id": 1, "tone_guidance": "Be upbeat."}, PERSONA)
+        assert other == "cachedContents/2"
+
+        # Contexts without a role id and short prompts are not cached
+        assert await cache.get_handle({"name": "Helper"}, PERSONA) is None
+        assert await cache.get_handle(role_context, "short") is None
+
+        # A handle close to expiry is refreshed
+        cache._entries[GeminiContextCache.make_key(role_context)]["expire_at"] = time.time() + 1
+        await cache.get_handle(role_context, PERSONA)
+        assert ("refresh", "cachedContents/1", "ttl") in calls
+
+        await cache.close()
+        assert cache.get_stats()["live"] == 0
+        assert sorted(c[1] for c in calls if c[0] == "delete") == [
+            "cachedContents/1", "cachedContents/2"]
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_gemini_uses_cached_content():
+    """Test that generate_response references the cache and recovers when it expires."""
+    calls = []
+    server = TestServer(create_mock_gemini_app(calls))
+    await server.start_server()
+    try:
+        base_url = str(server.make_url("")).rstrip("/")
+        model = GeminiAI(model_name="gemini-test", use_cache=False)
+        model.api_url = f"{base_url}/models/gemini-test:generateContent?key=test"
+        model.context_cache = GeminiContextCache(
+            "gemini-test", base_url=base_url, api_key="test", enabled=True, min_tokens=10)
+        model._build_persona_prompt = lambda role_context: PERSONA
+
+        role_context = {"role_id": 7, "tone_guidance": "Be warm."}
+        history = [{"role": "user", "content": "Hi"},
+                   {"role": "assistant", "content": "Hello!"}]
+
+        response = await model.generate_response("How are you?", role_context, history)
+        assert response == "Hello from the mock"
+
+        payload = [c[1] for c in calls if c[0] == "generate"][-1]
+        assert payload["cachedContent"] == "cachedContents/1"
+        assert payload["contents"][0]["parts"][0]["text"] == "Hi"
+        assert payload["contents"][-1]["parts"][-1]["text"] == "How are you?"
+
+        # The cache disappears server-side: the request is resent in full
+        await model.context_cache._request("DELETE", "cachedContents/1")
+        response = await model.generate_response("Still there?", role_context, history)
+        assert response == "Hello from the mock"
+
+        payload = [c[1] for c in calls if c[0] == "generate"][-1]
+        assert "cachedContent" not in payload
+        assert payload["contents"][0]["parts"][0]["text"] == PERSONA
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_gemini_only_resends_when_cached_content_is_rejected():
+    """Test that other errors neither resend the request nor drop the cache handle."""
+    calls = []
+    errors = []
+    server = TestServer(create_mock_gemini_app(calls, errors))
+    await server.start_server()
+    try:
+        base_url = str(server.make_url("")).rstrip("/")
+        model = GeminiAI(model_name="gemini-test", use_cache=False)
+        model.api_url = f"{base_url}/models/gemini-test:generateContent?key=test"
+        model.context_cache = GeminiContextCache(
+            "gemini-test", base_url=base_url, api_key="test", enabled=True, min_tokens=10)
+        model._build_persona_prompt = lambda role_context: PERSONA
+        role_context = {"role_id": 7, "tone_guidance": "Be warm."}
+
+        for status, message, exception in ((500, "Internal error", AIModelException),
+                                           (401, "API key not valid", APIAuthenticationException),
+                                           (400, "Invalid argument", AIModelException)):
+            errors.append((status, message))
+            generated = len([c for c in calls if c[0] == "generate"])
+            with pytest.raises(exception):
+                await model.generate_response("Hi", role_context, [])
+            assert len([c for c in calls if c[0] == "generate"]) == generated + 1
+
+        # The handle survived and is still used
+        await model.generate_response("Hi", role_context, [])
+        payload = [c[1] for c in calls if c[0] == "generate"][-1]
+        assert payload["cachedContent"] == "cachedContents/1"
+
+        # A refusal naming the cached content is resent in full
+        errors.append((403, "Permission denied on CachedContent cachedContents/1"))
+        assert await model.generate_response("Hi", role_context, []) == "Hello from the mock"
+        payload = [c[1] for c in calls if c[0] == "generate"][-1]
+        assert "cachedContent" not in payload
+    finally:
+        await server.close()
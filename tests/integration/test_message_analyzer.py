@@ -0,0 +1,52 @@
+"""
+Integration tests for fused message analysis against the mock LLM server
+"""
+
+import pytest
+
+from jyra.ai import message_analyzer as analyzer_module
+from jyra.ai.cache.semantic_cache import semantic_cache
+from jyra.ai.message_analyzer import MessageAnalyzer
+from jyra.ai.models.gemini_direct import GeminiAI
+from jyra.ai.models.model_manager import ModelManager
+from jyra.ai.models.model_router import ModelRouter
+from jyra.testing.mock_llm_server import MockLLMServer
+
+
+@pytest.mark.asyncio
+async def test_single_call_per_message(monkeypatch):
+    """Test that sentiment, memories and a retrieval query come from one call."""
+    async with MockLLMServer(port=0) as server:
+        manager = ModelManager(primary_model="gemini-2.0-flash", fallback_models=[],
+                               router=ModelRouter(mode="off"))
+        manager.models["gemini-2.0-flash"] = GeminiAI(
+            model_name="gemini-2.0-flash", use_cache=False, base_url=server.gemini_url)
+        monkeypatch.setattr(analyzer_module, "model_manager", manager)
+        monkeypatch.setattr(semantic_cache, "enabled", False)
+
+        analysis = await MessageAnalyzer().analyze(
+            "I'm so worried about my exam on Friday", {"name": "Sam"})
+
+        assert analysis["sentiment"]["primary_emotion"] == "anxiety"
+        assert 1 <= analysis["sentiment"]["intensity"] <= 5
+        assert analysis["memories"] == []
+        assert analysis["retrieval_query"]
+        assert server.stats["generateContent"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_on_failure(monkeypatch):
+    """Test the neutral fallback when every model fails."""
+    async with MockLLMServer(port=0, error_rate=1.0) as server:
+        manager = ModelManager(primary_model="gemini-2.0-flash", fallback_models=[],
+                               router=ModelRouter(mode="off"))
+        manager.models["gemini-2.0-flash"] = GeminiAI(
+            model_name="gemini-2.0-flash", use_cache=False, base_url=server.gemini_url)
+        monkeypatch.setattr(analyzer_module, "model_manager", manager)
+        monkeypatch.setattr(semantic_cache, "enabled", False)
+
+        analysis = await MessageAnalyzer().analyze("Hello there, how are you?")
+
+        assert analysis["sentiment"]["primary_emotion"] == "neutral"
+        assert analysis["memories"] == []
+        assert analysis["retrieval_query"] == "Hello there, how are you?"
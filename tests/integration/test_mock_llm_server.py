@@ -0,0 +1,129 @@
+"""
+Integration tests for the local mock LLM server
+"""
+
+import random
+
+import aiohttp
+import pytest
+
+from jyra.ai.embeddings.embedding_generator import EmbeddingGenerator
+from jyra.ai.models.gemini_direct import GeminiAI
+from jyra.ai.models.openai_model import OpenAIModel
+from jyra.ai.sentiment.sentiment_analyzer import SENTIMENT_SCHEMA
+from jyra.testing.mock_llm_server import MockLLMServer, parse_latency
+
+
+def test_parse_latency():
+    """Test latency distribution specifications."""
+    rng = random.Random(1)
+
+    assert parse_latency("200")(rng) == 0.2
+    assert parse_latency("fixed:50")(rng) == 0.05
+    assert 0.1 <= parse_latency("uniform:100:400")(rng) <= 0.4
+    assert parse_latency("lognormal:300:0.5")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1")
+
+
+@pytest.mark.asyncio
+async def test_gemini_generate_is_deterministic():
+    """Test that GeminiAI talks to the mock and gets stable answers."""
+    async with MockLLMServer(port=0) as server:
+        model = GeminiAI(model_name="gemini-2.0-flash", use_cache=False,
+                         base_url=server.gemini_url)
+        role_context = {"name": "Test Assistant"}
+
+        first = await model.generate_response("Hello, how are you today?", role_context)
+        second = await model.generate_response("Hello, how are you today?", role_context)
+        other = await model.generate_response("Tell me about the sea.", role_context)
+
+        assert first == second
+        assert first.startswith("Mock reply")
+        assert first != other
+        assert server.stats["generateContent"] == 3
+
+
+@pytest.mark.asyncio
+async def test_openai_chat():
+    """Test that OpenAIModel talks to the mock."""
+    async with MockLLMServer(port=0) as server:
+        model = OpenAIModel(model_name="gpt-3.5-turbo", use_cache=False,
+                            base_url=server.openai_url)
+
+        response = await model.generate_response("What's my name?", {"name": "Helper"})
+
+        assert "What's my name?" in response
+        assert server.stats["chat"] == 1
+
+
+@pytest.mark.asyncio
+async def test_structured_output():
+    """Test native JSON mode on both providers."""
+    async with MockLLMServer(port=0) as server:
+        gemini = GeminiAI(model_name="gemini-2.0-flash", use_cache=False,
+                          base_url=server.gemini_url)
+        strict = OpenAIModel(model_name="gpt-4o-mini", use_cache=False,
+                             base_url=server.openai_url)
+        legacy = OpenAIModel(model_name="gpt-3.5-turbo", use_cache=False,
+                             base_url=server.openai_url)
+        prompt = 'Message: "I am so worried about tomorrow"'
+
+        for model in (gemini, strict):
+            result = await model.generate_structured(prompt, SENTIMENT_SCHEMA)
+            assert result["primary_emotion"] == "anxiety"
+            assert isinstance(result["intensity"], int)
+
+        # JSON mode without a schema gets the canned sentiment answer
+        result = await legacy.generate_structured(prompt, SENTIMENT_SCHEMA)
+        assert result["primary_emotion"] == "anxiety"
+
+
+@pytest.mark.asyncio
+async def test_embeddings_are_similarity_preserving():
+    """Test deterministic embeddings that keep similar texts close."""
+    async with MockLLMServer(port=0) as server:
+        generator = EmbeddingGenerator(base_url=server.gemini_url)
+
+        a = await generator.generate_embedding("I love green tea in the morning")
+        b = await generator.generate_embedding("I love green tea")
+        c = await generator.generate_embedding("The stock market crashed")
+
+        assert len(a) == 768
+        assert a == await generator.generate_embedding("I love green tea in the morning")
+        assert generator.cosine_similarity(a, b) > generator.cosine_similarity(a, c)
+
+
+@pytest.mark.asyncio
+async def test_batch_and_streaming_endpoints():
+    """Test batchEmbedContents and streamGenerateContent."""
+    async with MockLLMServer(port=0) as server, aiohttp.ClientSession() as session:
+        url = f"{server.gemini_url}/models/embedding-001:batchEmbedContents"
+        async with session.post(url, json={"requests": [
+                {"content": {"parts": [{"text": "one"}]}},
+                {"content": {"parts": [{"text": "two"}]}}]}) as response:
+            result = await response.json()
+        assert len(result["embeddings"]) == 2
+
+        url = f"{server.gemini_url}/models/gemini-2.0-flash:streamGenerateContent"
+        async with session.post(url, json={"contents": [
+                {"role": "user", "parts": [{"text": "Stream this please"}]}]}) as response:
+            chunks = await response.json()
+        text = "".join(chunk["candidates"][0]["content"]["parts"][0]["text"] for chunk in chunks)
+        assert "Stream this please" in text
+        assert "usageMetadata" in chunks[-1]
+
+
+@pytest.mark.asyncio
+async def test_fault_injection():
+    """Test 429 injection with Retry-After and forced errors."""
+    async with MockLLMServer(port=0, rate_limit_rate=1.0, retry_after=7) as server, \
+            aiohttp.ClientSession() as session:
+        url = f"{server.gemini_url}/models/gemini-2.0-flash:generateContent"
+        async with session.post(url, json={"contents": []}) as response:
+            assert response.status == 429
+            assert response.headers["Retry-After"] == "7"
+
+        async with session.post(url, json={"contents": []},
+                                headers={"X-Mock-Status": "500"}) as response:
+            assert response.status == 500
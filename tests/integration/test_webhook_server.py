@@ -0,0 +1,130 @@
+"""
+Integration tests for webhook mode and the update replay harness
+"""
+
+import asyncio
+
+import aiohttp
+import pytest
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+
+from jyra.bot.utils.update_processor import PerUserUpdateProcessor
+from jyra.bot.utils.webhook_server import WebhookServer
+from jyra.testing.offline_request import OfflineRequest
+from jyra.testing.webhook_replay import load_updates, synthetic_updates, replay_updates
+
+
+def make_application():
+    """Build an application without contacting Telegram."""
+    return Application.builder().token("123456:TEST").build()
+
+
+def make_server(application, **kwargs):
+    """Build a webhook server on a free local port."""
+    settings = {"host": "127.0.0.1", "port": 0, "path": "/telegram",
+                "secret_token": "s3cret", "public_url": "", "record_path": None}
+    settings.update(kwargs)
+    return WebhookServer(application, **settings)
+
+
+@pytest.mark.asyncio
+async def test_updates_are_queued_in_order():
+    """Test that valid deliveries end up on the application's update queue."""
+    application = make_application()
+    async with make_server(application) as server:
+        result = await replay_updates(server.url, synthetic_updates(5, users=2),
+                                      secret_token="s3cret", concurrency=1)
+
+    assert result["statuses"] == {"200": 5}
+    queue = application.update_queue
+    updates = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert all(isinstance(update, Update) for update in updates)
+    assert [update.update_id for update in updates] == [1, 2, 3, 4, 5]
+    assert updates[1].effective_user.id == 100001
+
+
+@pytest.mark.asyncio
+async def test_requests_without_the_secret_are_rejected():
+    """Test that only requests carrying the secret token are accepted."""
+    application = make_application()
+    async with make_server(application) as server:
+        wrong = await replay_updates(server.url, synthetic_updates(2), secret_token="guess")
+        missing = await replay_updates(server.url, synthetic_updates(1))
+
+        assert wrong["statuses"] == {"403": 2}
+        assert missing["statuses"] == {"403": 1}
+        assert server.get_stats()["rejected_secret"] == 3
+    assert application.update_queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_refuses_deliveries():
+    """Test that deliveries are refused with a 503 while the queue is full."""
+    application = make_application()
+    async with make_server(application, max_queue=2) as server:
+        result = await replay_updates(server.url, synthetic_updates(4),
+                                      secret_token="s3cret", concurrency=1)
+
+        assert result["statuses"] == {"200": 2, "503": 2}
+        assert server.get_stats()["rejected_busy"] == 2
+        assert application.update_queue.qsize() == 2
+
+
+@pytest.mark.asyncio
+async def test_busy_running_application_refuses_deliveries():
+    """Test that a started application with slow handlers gets 503s once its backlog is full."""
+    application = (Application.builder().token("123456:TEST")
+                   .request(OfflineRequest()).get_updates_request(OfflineRequest())
+                   .updater(None)
+                   .concurrent_updates(PerUserUpdateProcessor(max_concurrent=2, max_pending=4))
+                   .build())
+    release = asyncio.Event()
+    handled = []
+
+    async def slow(update, context):
+        await release.wait()
+        handled.append(update.update_id)
+
+    application.add_handler(TypeHandler(Update, slow))
+    async with application:
+        await application.start()
+        try:
+            async with make_server(application, max_queue=6) as server:
+                busy = await replay_updates(server.url, synthetic_updates(20, users=20),
+                                            secret_token="s3cret", concurrency=1)
+                # The fetcher empties the queue; the backlog lives in the processor
+                assert application.update_queue.qsize() == 0
+                assert application.update_processor.backlog == 6
+                assert busy["statuses"] == {"200": 6, "503": 14}
+                assert server.get_stats()["rejected_busy"] == 14
+
+                release.set()
+                for _ in range(100):
+                    if len(handled) == 6:
+                        break
+                    await asyncio.sleep(0.01)
+                retried = await replay_updates(server.url, synthetic_updates(2, users=2),
+                                               secret_token="s3cret", concurrency=1)
+                assert retried["statuses"] == {"200": 2}
+        finally:
+            release.set()
+            await application.stop()
+
+    assert len(handled) == 8
+
+
+@pytest.mark.asyncio
+async def test_invalid_bodies_and_recording(tmp_path):
+    """Test that malformed bodies get a 400 and accepted updates are recorded."""
+    application = make_application()
+    record_path = tmp_path / "updates.jsonl"
+    async with make_server(application, record_path=str(record_path)) as server:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(server.url, data="not json",
+                                    headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"}) as response:
+                assert response.status == 400
+        await replay_updates(server.url, synthetic_updates(3), secret_token="s3cret")
+
+    recorded = load_updates(str(record_path))
+    assert sorted(update["update_id"] for update in recorded) == [1, 2, 3]
@@ -0,0 +1,239 @@
+"""
+Integration tests for multi-process worker sharding
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime
+
+import pytest
+from telegram import Update, Message, Chat, User
+
+from jyra.bot.utils.worker_pool import WorkerPool, shard_for, shard_key
+
+# Stand-in worker: logs the update IDs it receives to <dir>/<port>.log
+STUB_WORKER = """
+import sys
+from aiohttp import web
+
+port, log_dir, secret = int(sys.argv[1]), sys.argv[2], sys.argv[3]
+
+async def update(request):
+    if request.headers.get("X-Telegram-Bot-Api-Secret-Token") != secret:
+        return web.Response(status=403)
+    data = await request.json()
+    with open(f"{log_dir}/{port}.log", "a") as f:
+        f.write(f"{data['update_id']} {data['message']['from']['id']}\\n")
+    return web.Response()
+
+async def health(request):
+    return web.json_response({"queue": 0})
+
+app = web.Application()
+app.router.add_post("/update", update)
+app.router.add_get("/healthz", health)
+web.run_app(app, host="127.0.0.1", port=port, print=None)
+"""
+
+# Misbehaving worker: answers the first deliveries with 503s carrying an HTTP
+# date and a malformed Retry-After, and its health endpoint with plain text
+FLAKY_WORKER = """
+import sys
+from aiohttp import web
+
+port, log_dir = int(sys.argv[1]), sys.argv[2]
+busy = ["Wed, 21 Oct 2015 07:28:00 GMT", "soon"]
+
+async def update(request):
+    if busy:
+        return web.Response(status=503, headers={"Retry-After": busy.pop(0)})
+    data = await request.json()
+    with open(f"{log_dir}/{port}.log", "a") as f:
+        f.write(f"{data['update_id']} {data['message']['from']['id']}\\n")
+    return web.Response()
+
+async def health(request):
+    return web.Response(text="starting")
+
+app = web.Application()
+app.router.add_post("/update", update)
+app.router.add_get("/healthz", health)
+web.run_app(app, host="127.0.0.1", port=port, print=None)
+"""
+
+# Real worker: the bot's worker entry point with a slow handler that waits for
+# <dir>/release and logs the update IDs it handled to <dir>/handled.log
+APP_WORKER = """
+import asyncio, os, sys
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+from jyra.bot.utils.update_processor import PerUserUpdateProcessor
+from jyra.bot.utils.worker_pool import run_worker
+from jyra.testing.offline_request import OfflineRequest
+
+port, log_dir = int(sys.argv[1]), sys.argv[2]
+
+async def slow(update, context):
+    while not os.path.exists(os.path.join(log_dir, "release")):
+        await asyncio.sleep(0.05)
+    with open(os.path.join(log_dir, "handled.log"), "a") as f:
+        f.write(f"{update.update_id}\\n")
+
+application = (Application.builder().token("123456:TEST")
+               .request(OfflineRequest()).get_updates_request(OfflineRequest())
+               .updater(None)
+               .concurrent_updates(PerUserUpdateProcessor(max_concurrent=2, max_pending=2))
+               .build())
+application.add_handler(TypeHandler(Update, slow))
+asyncio.run(run_worker(application, port))
+"""
+
+
+def make_update(update_id, user_id):
+    """Build a private chat message update from a user."""
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id, date=datetime.now(),
+        chat=Chat(id=user_id, type="private"),
+        from_user=User(id=user_id, first_name="Test", is_bot=False),
+        text=f"message {update_id}"))
+
+
+def make_pool(tmp_path, workers=2, base_port=18600, **kwargs):
+    """Build a pool of stub workers logging into tmp_path."""
+    pool = WorkerPool(workers, base_port=base_port, command=lambda index, port: [], **kwargs)
+    for worker in pool.workers:
+        worker.command = [sys.executable, "-c", STUB_WORKER, str(worker.port),
+                          str(tmp_path), pool.secret]
+    return pool
+
+
+async def read_logs(tmp_path, pool, expected, timeout=10.0):
+    """Wait until the workers logged the expected number of updates."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        logs = {}
+        for worker in pool.workers:
+            path = tmp_path / f"{worker.port}.log"
+            lines = path.read_text().split("\n") if path.exists() else []
+            logs[worker.index] = [tuple(map(int, line.split())) for line in lines if line]
+        if sum(len(entries) for entries in logs.values()) >= expected:
+            return logs
+        assert asyncio.get_running_loop().time() < deadline, "updates were not delivered"
+        await asyncio.sleep(0.05)
+
+
+def test_users_map_to_stable_workers():
+    """Test that a user always maps to the same worker and users spread out."""
+    update = make_update(1, 42)
+    assert shard_key(update) == 42
+    assert shard_for(42, 4) == shard_for(shard_key(make_update(2, 42)), 4)
+    assert len({shard_for(user_id, 4) for user_id in range(100)}) == 4
+
+
+@pytest.mark.asyncio
+async def test_updates_reach_their_worker_in_order(tmp_path):
+    """Test that each user's updates go to one worker, in order."""
+    pool = make_pool(tmp_path, health_interval=60)
+    await pool.start()
+    try:
+        for i in range(40):
+            await pool.dispatch(make_update(i + 1, 1000 + i % 5))
+        logs = await read_logs(tmp_path, pool, 40)
+    finally:
+        await pool.stop()
+
+    for index, entries in logs.items():
+        for update_id, user_id in entries:
+            assert shard_for(user_id, 2) == index
+        for user_id in {user for _, user in entries}:
+            ids = [update_id for update_id, user in entries if user == user_id]
+            assert ids == sorted(ids)
+    assert sum(worker.stats["forwarded"] for worker in pool.workers) == 40
+
+
+@pytest.mark.asyncio
+async def test_dead_worker_is_restarted(tmp_path):
+    """Test that a worker that exits is restarted and gets its queued updates."""
+    pool = make_pool(tmp_path, workers=1, base_port=18650, health_interval=0.1)
+    await pool.start()
+    try:
+        await pool.dispatch(make_update(1, 7))
+        await read_logs(tmp_path, pool, 1)
+
+        worker = pool.workers[0]
+        worker.process.kill()
+        await worker.process.wait()
+        await pool.dispatch(make_update(2, 7))
+        logs = await read_logs(tmp_path, pool, 2)
+
+        assert logs[0] == [(1, 7), (2, 7)]
+        stats = pool.get_stats()["workers"]["0"]
+        assert stats["restarts"] >= 1
+        assert stats["alive"]
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_saturated_worker_holds_updates_in_front_queue(tmp_path):
+    """Test that a busy worker's backlog stays bounded and the rest waits in the front."""
+    pool = WorkerPool(1, base_port=18700, command=lambda index, port: [],
+                      health_interval=60, queue_size=50)
+    worker = pool.workers[0]
+    worker.command = [sys.executable, "-c", APP_WORKER, str(worker.port), str(tmp_path)]
+    worker.env["WEBHOOK_MAX_QUEUE"] = "3"
+    await pool.start()
+    try:
+        for i in range(12):
+            await pool.dispatch(make_update(i + 1, 2000 + i))
+
+        # Wait until the worker took what it can and refused the next delivery
+        deadline = asyncio.get_running_loop().time() + 30
+        while worker.stats["retries"] == 0 or worker.stats["forwarded"] < 3:
+            assert asyncio.get_running_loop().time() < deadline, "worker never filled up"
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.5)
+
+        assert worker.stats["forwarded"] == 3
+        assert worker.queue.qsize() >= 8
+        assert await pool.check_worker(worker)
+        assert worker.health["backlog"] == 3
+        assert worker.health["rejected_busy"] >= 1
+
+        (tmp_path / "release").touch()
+        handled_path = tmp_path / "handled.log"
+        while not handled_path.exists() or len(handled_path.read_text().split()) < 12:
+            assert asyncio.get_running_loop().time() < deadline + 30, "updates were not handled"
+            await asyncio.sleep(0.1)
+    finally:
+        (tmp_path / "release").touch()
+        await pool.stop()
+
+    assert sorted(map(int, handled_path.read_text().split())) == list(range(1, 13))
+    assert worker.stats["forwarded"] == 12
+
+
+@pytest.mark.asyncio
+async def test_sender_and_health_checks_survive_bad_answers(tmp_path):
+    """Test that odd Retry-After values, unsendable updates and non-JSON health keep the loops running."""
+    pool = WorkerPool(1, base_port=18750, command=lambda index, port: [], health_interval=60)
+    worker = pool.workers[0]
+    worker.command = [sys.executable, "-c", FLAKY_WORKER, str(worker.port), str(tmp_path)]
+    await pool.start()
+    try:
+        # An update that cannot be serialized is dropped without ending the sender
+        await worker.queue.put({"update_id": 1, "bad": object()})
+        await pool.dispatch(make_update(2, 7))
+        logs = await read_logs(tmp_path, pool, 1)
+
+        assert logs[0] == [(2, 7)]
+        assert worker.stats["dropped"] == 1
+        assert worker.stats["forwarded"] == 1
+        assert worker.stats["retries"] >= 2
+
+        assert not await pool.check_worker(worker)
+        assert worker.alive
+        assert all(not task.done() for task in pool._tasks)
+    finally:
+        await pool.stop()
@@ -0,0 +1,95 @@
+"""
+Unit tests for batched memory consolidation
+"""
+
+import asyncio
+
+import pytest
+
+from jyra.ai.consolidation_batcher import ConsolidationBatcher, pack_groups
+from jyra.ai.models.model_manager import model_manager
+
+
+def make_groups(count, memories=3, words=5):
+    """Build memory groups with short contents."""
+    return [{"category": "preference",
+             "contents": [" ".join(f"word{g}{m}{w}" for w in range(words)) for m in range(memories)]}
+            for g in range(count)]
+
+
+def test_groups_are_packed_within_budget():
+    """Test that batches respect the token budget and the group cap."""
+    groups = make_groups(6)
+    assert pack_groups(groups, token_budget=10000, max_groups=4) == [[0, 1, 2, 3], [4, 5]]
+
+    small = pack_groups(groups, token_budget=60, max_groups=8)
+    assert [i for batch in small for i in batch] == list(range(6))
+    assert all(len(batch) < 6 for batch in small)
+
+    # A group over the budget on its own still gets a batch
+    assert pack_groups(make_groups(2, words=200), token_budget=10, max_groups=8) == [[0], [1]]
+
+
+@pytest.mark.asyncio
+async def test_results_are_mapped_to_their_groups(monkeypatch):
+    """Test that one call consolidates several groups, by group index."""
+    calls = []
+
+    async def generate_structured(prompt, schema, **kwargs):
+        calls.append(prompt)
+        # Out of order, with an unknown group, a duplicate and group 2 missing
+        return {"groups": [{"group": 1, "content": "summary 1"},
+                           {"group": 0, "content": "summary 0"},
+                           {"group": 0, "content": "again"},
+                           {"group": 7, "content": "unknown"}]}, "test-model"
+
+    monkeypatch.setattr(model_manager, "generate_structured", generate_structured)
+    batcher = ConsolidationBatcher(token_budget=10000, max_groups=8)
+
+    results = await batcher.consolidate(1, make_groups(3), "Be concise")
+
+    assert len(calls) == 1
+    assert "GROUP 2" in calls[0]
+    assert results == ["summary 0", "summary 1", None]
+    stats = batcher.get_stats()
+    assert stats["calls_saved"] == 2
+    assert stats["missing_results"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_leaves_groups_unconsolidated(monkeypatch):
+    """Test that a failing call only affects the groups of its batch."""
+    async def generate_structured(prompt, schema, **kwargs):
+        if "word10" in prompt:
+            raise RuntimeError("provider error")
+        return {"groups": [{"group": 0, "content": "summary"}]}, "test-model"
+
+    monkeypatch.setattr(model_manager, "generate_structured", generate_structured)
+    batcher = ConsolidationBatcher(enabled=False)
+
+    results = await batcher.consolidate(1, make_groups(2), "Be concise")
+
+    assert results == ["summary", None]
+    assert batcher.get_stats()["failed_batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_users_run_with_bounded_parallelism():
+    """Test that only a few users are maintained at the same time."""
+    batcher = ConsolidationBatcher(user_concurrency=2)
+    running = []
+    peak = []
+
+    async def run(user_id):
+        running.append(user_id)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(user_id)
+        if user_id == 3:
+            raise RuntimeError("database error")
+        return user_id * 10
+
+    results = await batcher.run_for_users([1, 2, 3, 4, 5], run)
+
+    assert max(peak) == 2
+    assert results == {1: 10, 2: 20, 4: 40, 5: 50}
@@ -0,0 +1,85 @@
+"""
+Unit tests for token-budgeted context assembly
+"""
+
+import os
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '../..')))
+
+from jyra.ai.context import ContextAssembler, estimate_tokens, summarize_dropped_turns
+
+
+class TestContextAssembler(unittest.TestCase):
+    """Test the context assembler."""
+
+    def setUp(self):
+        """Build a long conversation and memory context."""
+        self.history = []
+        for i in range(40):
+            self.history.append(
+                {"role": "user", "content": f"Message number {i}. " + "word " * 30})
+            self.history.append(
+                {"role": "assistant", "content": f"Reply number {i}. " + "word " * 30})
+        self.memory_context = "User Memory Context:\n" + "\n".join(
+            f"Personal [I:{5 - i % 5}]: memory line {i} " + "detail " * 10 for i in range(30))
+
+    def test_estimate_tokens(self):
+        """Test the token estimator."""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens(None), 0)
+        self.assertEqual(estimate_tokens("hello world"), 2)
+        self.assertGreater(estimate_tokens("hello, world!"), 2)
+
+    def test_small_context_is_untouched(self):
+        """Test that context within budget is passed through unchanged."""
+        assembler = ContextAssembler(32768)
+        history = self.history[:4]
+        result = assembler.assemble("System prompt", "Hi", "User Memory Context:\nA: b",
+                                    history, max_output_tokens=1000)
+
+        self.assertEqual(result["conversation_history"], history)
+        self.assertEqual(result["memory_context"], "User Memory Context:\nA: b")
+        self.assertEqual(result["dropped_messages"], 0)
+        self.assertIsNone(result["history_summary"])
+
+    def test_trimmed_to_budget(self):
+        """Test that oversized context is trimmed to fit the budget."""
+        assembler = ContextAssembler(8192, budget_ratio=0.25, max_input_tokens=4000)
+        result = assembler.assemble("System prompt", "Hi", self.memory_context,
+                                    self.history, max_output_tokens=1000)
+
+        self.assertLessEqual(result["estimated_tokens"], result["budget"])
+        self.assertEqual(result["budget"], 2048)
+        self.assertGreater(result["dropped_messages"], 0)
+        # The most recent exchange is always kept
+        self.assertEqual(result["conversation_history"][-2:], self.history[-2:])
+        # Memory lines are kept whole and in order
+        for line in result["memory_context"].splitlines()[1:]:
+            self.assertIn(line, self.memory_context.splitlines())
+
+    def test_memories_preferred_over_old_history(self):
+        """Test that memories outrank older conversation history."""
+        assembler = ContextAssembler(8192, budget_ratio=0.25, max_input_tokens=4000)
+        result = assembler.assemble("System prompt", "Hi", self.memory_context,
+                                    self.history, max_output_tokens=1000)
+
+        self.assertEqual(result["dropped_memories"], 0)
+
+    def test_summarizer_hook(self):
+        """Test that dropped history is summarized by the registered hook."""
+        assembler = ContextAssembler(8192, budget_ratio=0.25, max_input_tokens=4000)
+        assembler.register_summarizer(summarize_dropped_turns)
+        result = assembler.assemble("System prompt", "Hi", None,
+                                    self.history, max_output_tokens=1000)
+
+        self.assertIsNotNone(result["history_summary"])
+        self.assertIn("Message number", result["history_summary"])
+        self.assertLessEqual(result["estimated_tokens"], result["budget"])
+
+
+if __name__ == '__main__':
+    unittest.main()
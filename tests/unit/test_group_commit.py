@@ -0,0 +1,98 @@
+"""
+Unit tests for the group commit writer
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from jyra.db.utils.group_commit import GroupCommitWriter
+from jyra.db.utils.history_cache import HistoryCache
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Create a database with a single table."""
+    path = str(tmp_path / "writes.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (item_id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _insert(name):
+    def write(cursor):
+        cursor.execute("INSERT INTO items (name) VALUES (?)", (name,))
+        return cursor.lastrowid
+    return write
+
+
+def _names(path):
+    conn = sqlite3.connect(path)
+    names = [row[0] for row in conn.execute("SELECT name FROM items ORDER BY item_id")]
+    conn.close()
+    return names
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_a_commit(database):
+    """Test that writes arriving together are committed in one batch."""
+    writer = GroupCommitWriter(window_ms=50, max_batch=100)
+    ids = await asyncio.gather(*(writer.execute(database, _insert(f"item {i}")) for i in range(20)))
+    await writer.stop()
+
+    assert sorted(ids) == list(range(1, 21))
+    assert len(_names(database)) == 20
+    assert writer.stats["batches"] < 20
+    assert writer.stats["largest_batch"] > 1
+
+
+@pytest.mark.asyncio
+async def test_failing_write_is_rolled_back_alone(database):
+    """Test that a failing write raises for its caller while the rest of its batch commits."""
+    writer = GroupCommitWriter(window_ms=50)
+    results = await asyncio.gather(
+        writer.execute(database, _insert("first")),
+        writer.execute(database, _insert("first")),
+        writer.execute(database, _insert("second")),
+        return_exceptions=True
+    )
+    await writer.stop()
+
+    assert isinstance(results[1], sqlite3.IntegrityError)
+    assert _names(database) == ["first", "second"]
+    assert writer.get_stats()["failed_writes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_still_commits(database):
+    """Test that a queued write is committed when its caller is cancelled."""
+    writer = GroupCommitWriter(window_ms=50)
+    task = asyncio.ensure_future(writer.execute(database, _insert("kept")))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await writer.stop()
+
+    assert _names(database) == ["kept"]
+
+
+@pytest.mark.asyncio
+async def test_disabled_writer_commits_each_write(database):
+    """Test that a disabled writer commits writes on their own."""
+    writer = GroupCommitWriter(enabled=False)
+    assert await writer.execute(database, _insert("alone")) == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        await writer.execute(database, _insert("alone"))
+    assert _names(database) == ["alone"]
+    assert writer.stats["batches"] == 0
+
+
+def test_history_cache_skips_pairs_it_already_read():
+    """Test that a pair committed before its buffer was read isn't appended twice."""
+    cache = HistoryCache(capacity=3, max_mb=1)
+    cache.warm(1, 1, [("a", "b"), ("c", "d")], last_id=7)
+    cache.append(1, 1, "c", "d", message_id=7)
+    cache.append(1, 1, "e", "f", message_id=8)
+    assert cache.get(1, 1, 3) == [("a", "b"), ("c", "d"), ("e", "f")]
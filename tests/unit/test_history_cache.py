@@ -0,0 +1,94 @@
+"""
+Unit tests for the conversation history cache
+"""
+
+import sqlite3
+
+import pytest
+
+from jyra.db.models import conversation as conversation_module
+from jyra.db.models.conversation import Conversation
+from jyra.db.utils.history_cache import HistoryCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Point the conversation model at a fresh database and a fresh cache."""
+    path = str(tmp_path / "jyra.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE conversations (
+        message_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, role_id INTEGER,
+        user_message TEXT, bot_response TEXT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(conversation_module, "DATABASE_PATH", path)
+    history_cache = HistoryCache(capacity=3, max_mb=1)
+    monkeypatch.setattr(conversation_module, "history_cache", history_cache)
+    return history_cache
+
+
+def _insert(user_id, role_id, count):
+    conn = sqlite3.connect(conversation_module.DATABASE_PATH)
+    conn.executemany(
+        "INSERT INTO conversations (user_id, role_id, user_message, bot_response) VALUES (?, ?, ?, ?)",
+        [(user_id, role_id, f"message {i}", f"reply {i}") for i in range(count)])
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.asyncio
+async def test_history_is_served_from_warmed_buffer(cache):
+    """Test that history is read once and then kept up to date by add_message."""
+    _insert(1, 1, 5)
+
+    history = await Conversation.get_conversation_history(1, role_id=1, limit=2)
+    assert [entry["content"] for entry in history] == ["message 3", "reply 3", "message 4", "reply 4"]
+    assert cache.stats["misses"] == 1
+
+    await Conversation.add_message(1, 1, "new", "answer")
+    # Rows the cache doesn't know about are not read again
+    _insert(1, 1, 1)
+    history = await Conversation.get_conversation_history(1, role_id=1, limit=3)
+    assert [entry["content"] for entry in history[::2]] == ["message 3", "message 4", "new"]
+    assert cache.stats["hits"] == 1
+
+    # More than the buffer holds goes to the database
+    history = await Conversation.get_conversation_history(1, role_id=1, limit=10)
+    assert len(history) == 14
+    assert cache.stats["bypassed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_all_roles_buffer_and_clearing(cache):
+    """Test that a pair lands in the role's and the all-roles buffer, and clearing drops both."""
+    assert await Conversation.get_conversation_history(1, role_id=2, limit=3) == []
+    assert await Conversation.get_conversation_history(1, limit=3) == []
+
+    await Conversation.add_message(1, 2, "hello", "hi")
+    assert len(await Conversation.get_conversation_history(1, role_id=2, limit=3)) == 2
+    assert len(await Conversation.get_conversation_history(1, limit=3)) == 2
+    assert cache.stats["appends"] == 2
+
+    await Conversation.clear_conversation_history(1)
+    assert cache.get_stats()["buffers"] == 0
+    assert await Conversation.get_conversation_history(1, limit=3) == []
+
+
+def test_least_recently_used_buffers_are_evicted():
+    """Test that the memory budget evicts the least recently used buffers."""
+    cache = HistoryCache(capacity=2, max_mb=0.01)
+    long_text = "x" * 2000
+    for user_id in range(3):
+        cache.warm(user_id, None, [(long_text, long_text)])
+    assert cache.get(0, None, 1) is None
+    assert cache.get(2, None, 1) == [(long_text, long_text)]
+    assert cache.stats["evictions"] >= 1
+    assert cache.get_stats()["bytes"] <= cache.max_bytes
+
+    # A full buffer keeps its size when it wraps around
+    cache = HistoryCache(capacity=2, max_mb=1)
+    cache.warm(1, 1, [("a", "b"), ("c", "d")])
+    size = cache.get_stats()["bytes"]
+    cache.append(1, 1, "e", "f")
+    assert cache.get(1, 1, 2) == [("c", "d"), ("e", "f")]
+    assert cache.get_stats()["bytes"] == size
@@ -0,0 +1,115 @@
+"""
+Unit tests for the local lexicon sentiment classifier
+"""
+
+import pytest
+
+from jyra.ai.sentiment import sentiment_analyzer as sentiment_module
+from jyra.ai.sentiment.lexicon_classifier import LexiconSentimentClassifier, lexicon_classifier
+from jyra.ai.sentiment.sentiment_analyzer import SentimentAnalyzer
+
+DISTRESS_MESSAGES = ["I want to kill myself", "my dog died this morning", "I got fired today"]
+
+
+class FakeVader:
+    """Stands in for VADER with a fixed compound score."""
+
+    def __init__(self, compound):
+        self.compound = compound
+
+    def polarity_scores(self, text):
+        return {"compound": self.compound}
+
+
+def make_classifier(vader=None, **kwargs):
+    """Build a classifier with the given VADER stand-in, or none."""
+    classifier = LexiconSentimentClassifier(min_confidence=0.6, escalation_intensity=4, **kwargs)
+    classifier._vader = vader
+    return classifier
+
+
+def test_confident_mild_emotion_stays_local():
+    """Test that a clear, mild emotion is answered without the LLM."""
+    classifier = LexiconSentimentClassifier(min_confidence=0.6, escalation_intensity=4)
+    result = classifier.classify("I'm worried about my exam tomorrow")
+
+    assert result["primary_emotion"] == "anxiety"
+    assert result["confidence"] >= 0.6
+    assert not classifier.should_escalate(result)
+
+
+def test_longer_phrases_win():
+    """Test that multi-word phrases take precedence over their parts."""
+    classifier = LexiconSentimentClassifier()
+
+    assert classifier.classify("I feel so let down by them")["primary_emotion"] == "disappointment"
+    assert classifier.classify("My cat passed away")["primary_emotion"] == "grief"
+
+
+def test_uncertain_or_intense_messages_escalate():
+    """Test escalation on negation, mixed emotions and high intensity."""
+    classifier = LexiconSentimentClassifier(min_confidence=0.6, escalation_intensity=4)
+
+    negated = classifier.classify("I am not happy with this")
+    assert classifier.should_escalate(negated)
+
+    mixed = classifier.classify("I'm excited but also nervous and scared")
+    assert mixed["confidence"] < 0.6
+    assert classifier.should_escalate(mixed)
+
+    intense = classifier.classify("I'm SO happy, this is amazing!!!")
+    assert intense["intensity"] >= 4
+    assert classifier.should_escalate(intense)
+
+    stats = classifier.get_stats()
+    assert stats["escalations"] == 3
+    assert stats["local_results"] == 0
+
+
+def test_plain_message_is_neutral():
+    """Test that a message without emotion words is neutral and mild."""
+    classifier = LexiconSentimentClassifier()
+    result = classifier.classify("What time is it in Tokyo?")
+
+    assert result["primary_emotion"] == "neutral"
+    assert result["intensity"] <= 2
+
+
+def test_messages_without_emotion_words_escalate_without_vader():
+    """Test that, without VADER, a missing emotion word is not taken as neutral."""
+    classifier = make_classifier()
+
+    for text in DISTRESS_MESSAGES + ["ok"]:
+        result = classifier.classify(text)
+        assert result["confidence"] < 0.6, text
+        assert classifier.should_escalate(result), text
+
+
+def test_only_short_mild_messages_without_emotion_words_stay_local():
+    """Test that VADER's verdict only settles short messages without emotion words."""
+    classifier = make_classifier(FakeVader(0.0))
+
+    assert not classifier.should_escalate(classifier.classify("see you tomorrow"))
+    for text in DISTRESS_MESSAGES:
+        assert classifier.should_escalate(classifier.classify(text)), text
+
+    polar = make_classifier(FakeVader(-0.8))
+    assert polar.should_escalate(polar.classify("kill me now"))
+
+
+@pytest.mark.asyncio
+async def test_analyzer_asks_the_llm_about_distress(monkeypatch):
+    """Test that the analyzer sends distress without emotion words to the LLM."""
+    monkeypatch.setattr(lexicon_classifier, "_vader", None)
+    asked = []
+
+    async def get_or_compute(namespace, text, compute, **kwargs):
+        asked.append(text)
+        return {"primary_emotion": "sadness", "intensity": 5, "explanation": "LLM"}
+
+    monkeypatch.setattr(sentiment_module.semantic_cache, "get_or_compute", get_or_compute)
+    analyzer = SentimentAnalyzer(use_lexicon=True)
+
+    for text in DISTRESS_MESSAGES:
+        assert (await analyzer.analyze_sentiment(text))["primary_emotion"] == "sadness"
+    assert asked == DISTRESS_MESSAGES
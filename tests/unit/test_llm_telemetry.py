@@ -0,0 +1,82 @@
+"""
+Unit tests for LLM call telemetry
+"""
+
+import json
+
+import pytest
+
+from jyra.ai.telemetry.llm_telemetry import (
+    LLMTelemetry, RollingHistogram, call_site, fallback_call, format_report
+)
+
+
+def test_rolling_histogram_window():
+    """Test percentiles and that old observations age out."""
+    histogram = RollingHistogram((100, 500, 1000), window_seconds=60, slots=6)
+    for value in (50, 80, 300, 2000):
+        histogram.add(value, now=1000.0)
+
+    summary = histogram.summary(now=1000.0)
+    assert summary["count"] == 4
+    assert summary["p50"] == 100
+    assert summary["p99"] == float("inf")
+
+    # A minute later the observations are outside the window
+    histogram.add(700, now=1061.0)
+    summary = histogram.summary(now=1061.0)
+    assert summary["count"] == 1
+    assert summary["p50"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_track_records_calls_per_site():
+    """Test that usage, cache hits, fallbacks and errors are aggregated."""
+    telemetry = LLMTelemetry(enabled=True, export_path=None)
+
+    with call_site("sentiment"):
+        with telemetry.track("gemini-2.0-flash", cost_per_1k_tokens=0.5):
+            telemetry.record_usage(300, 100, cached_tokens=200)
+        with telemetry.track("gemini-2.0-flash", cost_per_1k_tokens=0.5):
+            telemetry.mark_cache_hit()
+
+    with call_site("reply"), fallback_call():
+        with pytest.raises(RuntimeError):
+            with telemetry.track("gemini-1.5-flash"):
+                raise RuntimeError("boom")
+
+    # Outside a tracked call usage reports are ignored
+    telemetry.record_usage(1000, 1000)
+
+    snapshot = telemetry.get_snapshot()
+    sentiment = snapshot["by_call_site"]["sentiment"]
+    assert sentiment["calls"] == 2
+    assert sentiment["cache_hits"] == 1
+    assert sentiment["input_tokens"] == 300
+    assert sentiment["cost_usd"] == pytest.approx(0.2)
+
+    reply = snapshot["series"][0]
+    assert reply["call_site"] == "reply"
+    assert reply["errors"] == 1
+    assert reply["fallbacks"] == 1
+    assert reply["last_error"] == "RuntimeError"
+
+
+def test_export_and_report(tmp_path):
+    """Test exporting a snapshot with registered sources and formatting it."""
+    telemetry = LLMTelemetry(enabled=True, export_path=None)
+    telemetry.register_source("rate_limits", lambda: {"gemini/test": {"requests": 1}})
+    with call_site("memory_extraction"):
+        with telemetry.track("embedding-001", kind="embedding"):
+            telemetry.record_usage(12, estimated=True)
+
+    path = telemetry.export(str(tmp_path / "telemetry.json"))
+    snapshot = json.loads((tmp_path / "telemetry.json").read_text())
+
+    assert path.endswith("telemetry.json")
+    assert snapshot["series"][0]["kind"] == "embedding"
+    assert snapshot["sources"]["rate_limits"]["gemini/test"]["requests"] == 1
+
+    report = format_report(snapshot)
+    assert "memory_extraction: 1 calls" in report
+    assert "rate_limits" in report
@@ -0,0 +1,73 @@
+"""
+Unit tests for debounced background memory extraction
+"""
+
+import asyncio
+
+import pytest
+
+from jyra.bot.tasks.memory_extraction import MemoryExtractionService
+
+
+class RecordingService(MemoryExtractionService):
+    """Service that records batches instead of calling the model."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+
+    async def _process_batch(self, user_id, messages, user_context):
+        await asyncio.sleep(0.01)
+        self.batches.append((user_id, list(messages), user_context))
+
+
+@pytest.mark.asyncio
+async def test_rapid_messages_are_batched():
+    """Test that messages within the quiet period become one extraction."""
+    service = RecordingService(debounce_seconds=0.05, max_wait_seconds=5, max_batch=10)
+
+    service.submit(1, "I just moved to Berlin", {"role": "Friend"})
+    service.submit(1, "My new flat is near the river", {"role": "Friend"})
+    service.submit(2, "I have a cat called Miso")
+    assert service.batches == []
+
+    await asyncio.sleep(0.15)
+    assert sorted(service.batches, key=lambda batch: batch[0]) == [
+        (1, ["I just moved to Berlin", "My new flat is near the river"], {"role": "Friend"}),
+        (2, ["I have a cat called Miso"], None)
+    ]
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_size_and_max_wait_trigger_flush():
+    """Test the size threshold and the deadline for a chatty user."""
+    service = RecordingService(debounce_seconds=0.05, max_wait_seconds=0.12, max_batch=3)
+
+    for i in range(3):
+        service.submit(1, f"message {i}")
+    await asyncio.sleep(0.03)
+    assert service.batches == [(1, ["message 0", "message 1", "message 2"], None)]
+
+    # Keep talking faster than the debounce; the deadline still flushes
+    for i in range(5):
+        service.submit(1, f"more {i}")
+        await asyncio.sleep(0.03)
+    await asyncio.sleep(0.05)
+    assert len(service.batches) >= 2
+    assert service.batches[1][1][0] == "more 0"
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_and_stop_drains():
+    """Test bounded queueing and draining on shutdown."""
+    service = RecordingService(debounce_seconds=10, max_batch=1, workers=1, queue_size=1)
+
+    for user_id in range(4):
+        service.submit(user_id, "hello there")
+    await service.stop()
+
+    assert service.stats["dropped"] >= 1
+    assert len(service.batches) + service.stats["dropped"] == 4
+    assert service.get_stats()["workers"] == 0
@@ -0,0 +1,94 @@
+"""
+Unit tests for complexity-based model routing
+"""
+
+import json
+
+from jyra.ai.models.model_router import ModelRouter, extract_features, score_complexity
+
+TIERS = {"fast": "fast-model", "standard": "standard-model", "advanced": "advanced-model"}
+
+LONG_MESSAGE = (
+    "I've been thinking about changing careers from accounting to software engineering. "
+    "What skills should I learn first? How long does it usually take to get a first job? "
+    "Should I do a bootcamp or study on my own, and how do I explain the switch in interviews?"
+)
+
+
+def test_features():
+    """Test the message features used for routing."""
+    features = extract_features("Hi! How are you? I had a long day.",
+                                [{"role": "user", "content": "hey"}] * 4, "short")
+
+    assert features["words"] == 9
+    assert features["sentences"] == 3
+    assert features["questions"] == 1
+    assert features["question_density"] == 0.33
+    assert features["depth"] == 4
+    assert features["response_length"] == "short"
+
+
+def test_replies_are_routed_by_complexity():
+    """Test that trivial turns go to the fast tier and demanding ones to the advanced tier."""
+    router = ModelRouter(mode="on", tier_models=TIERS, log_path=None)
+
+    trivial = router.route("reply", "ok thanks", response_length="medium")
+    assert trivial["tier"] == "fast"
+    assert trivial["model"] == "fast-model"
+    assert trivial["max_tokens"] == 300
+
+    normal = router.route("reply", "How was your weekend? Mine was quiet.",
+                          response_length="medium")
+    assert normal["tier"] == "standard"
+    assert normal["max_tokens"] == 800
+
+    demanding = router.route("reply", LONG_MESSAGE, response_length="long")
+    assert demanding["tier"] == "advanced"
+    assert demanding["max_tokens"] == 1500
+    assert demanding["score"] == score_complexity(demanding["features"])
+
+
+def test_auxiliary_tasks_use_fast_tier():
+    """Test that auxiliary call sites use their fixed tier and keep the caller's budget."""
+    router = ModelRouter(mode="on", tier_models=TIERS, log_path=None)
+
+    decision = router.route("sentiment", max_tokens=150)
+
+    assert decision["model"] == "fast-model"
+    assert decision["max_tokens"] == 150
+    assert decision["features"] is None
+
+
+def test_routing_off_uses_standard_model():
+    """Test that disabled routing keeps every call on the standard model."""
+    router = ModelRouter(standard_model="gemini-2.0-flash", mode="off", log_path=None)
+
+    assert router.route("sentiment")["model"] == "gemini-2.0-flash"
+    decision = router.route("reply", LONG_MESSAGE, response_length="short")
+    assert decision["model"] == "gemini-2.0-flash"
+    assert decision["max_tokens"] == 300
+
+
+def test_ab_split_and_log(tmp_path):
+    """Test that users are split stably and outcomes are logged in A/B mode."""
+    log_path = tmp_path / "routing.jsonl"
+    router = ModelRouter(mode="ab", tier_models=TIERS, ab_fraction=0.5, log_path=str(log_path))
+
+    variants = {user_id: router.variant(user_id) for user_id in range(200)}
+    assert set(variants.values()) == {"routed", "control"}
+    assert 60 < list(variants.values()).count("routed") < 140
+    assert all(router.variant(user_id) == variant for user_id, variant in variants.items())
+
+    control_user = next(user_id for user_id, variant in variants.items() if variant == "control")
+    decision = router.route("reply", "ok", user_id=control_user)
+    assert decision["model"] == "standard-model"
+    router.record_outcome(decision, "standard-model", 420.0)
+
+    entry = json.loads(log_path.read_text().strip())
+    assert entry["variant"] == "control"
+    assert entry["model_used"] == "standard-model"
+    assert entry["latency_ms"] == 420.0
+    assert entry["features"]["words"] == 1
+    assert "user_id" not in entry
+    assert entry["user"] != str(control_user)
+    assert router.get_stats()["routes"]["reply/control/standard"]["calls"] == 1
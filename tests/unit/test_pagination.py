@@ -0,0 +1,124 @@
+"""
+Unit tests for keyset pagination of memories and conversation history
+"""
+
+import sqlite3
+
+import pytest
+
+from jyra.db.models import conversation as conversation_module
+from jyra.db.models import memory as memory_module
+from jyra.db.models.conversation import Conversation
+from jyra.db.models.memory import Memory
+from jyra.db.utils.history_cache import history_cache
+from jyra.db.utils.pagination import (
+    CountCache, count_cache, decode_page_token, encode_page_token
+)
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Point the models at a fresh database with the paginated tables."""
+    path = str(tmp_path / "jyra.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE conversations (
+        message_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, role_id INTEGER,
+        user_message TEXT, bot_response TEXT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+    conn.execute("""CREATE TABLE memories (
+        memory_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, content TEXT,
+        category TEXT DEFAULT 'general', importance INTEGER DEFAULT 1, source TEXT,
+        context TEXT, last_accessed TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        confidence REAL DEFAULT 1.0, expires_at TIMESTAMP, recall_count INTEGER DEFAULT 0,
+        last_reinforced TIMESTAMP, is_consolidated INTEGER DEFAULT 0)""")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(conversation_module, "DATABASE_PATH", path)
+    monkeypatch.setattr(memory_module, "DATABASE_PATH", path)
+    count_cache._counts.clear()
+    history_cache.clear()
+    return path
+
+
+def test_page_tokens_round_trip():
+    """Test that page tokens encode page, cursor and direction compactly."""
+    token = encode_page_token(12, (5, 123456), backward=True)
+    assert decode_page_token(token) == (12, (5, 123456), True)
+    assert decode_page_token(encode_page_token(3)) == (3, None, False)
+    assert len("memory_importance_level_relationships_5:" +
+               encode_page_token(999, (5, 10 ** 9), backward=True)) <= 64
+
+    # Tokens from older buttons, e.g. plain page numbers, still open a page
+    assert decode_page_token("garbage.x") == (0, None, False)
+
+
+@pytest.mark.asyncio
+async def test_memory_pages_follow_keyset(database):
+    """Test paging forward and back through memories with equal importance."""
+    conn = sqlite3.connect(database)
+    conn.executemany("INSERT INTO memories (user_id, content, importance) VALUES (?, ?, ?)",
+                     [(1, f"memory {i}", 5 - i % 3) for i in range(7)] + [(2, "other", 5)])
+    conn.execute("INSERT INTO memories (user_id, content, importance, expires_at) "
+                 "VALUES (1, 'expired', 5, '2000-01-01 00:00:00')")
+    conn.commit()
+    conn.close()
+
+    first, has_more = await Memory.get_memory_page(1, limit=3)
+    assert has_more
+    second, has_more = await Memory.get_memory_page(1, cursor=Memory.page_cursor(first[-1]), limit=3)
+    third, has_more = await Memory.get_memory_page(1, cursor=Memory.page_cursor(second[-1]), limit=3)
+    assert not has_more
+
+    seen = [m.content for m in first + second + third]
+    assert len(seen) == len(set(seen)) == 7
+    keys = [Memory.page_cursor(m) for m in first + second + third]
+    assert keys == sorted(keys, reverse=True)
+
+    back, has_more = await Memory.get_memory_page(
+        1, cursor=Memory.page_cursor(second[0]), backward=True, limit=3)
+    assert [m.memory_id for m in back] == [m.memory_id for m in first]
+    assert not has_more
+
+    assert await Memory.count_memories(1) == 7
+    assert await Memory.count_memories(1, min_importance=5) == 3
+
+
+@pytest.mark.asyncio
+async def test_history_pages_and_cached_count(database):
+    """Test paging through history newest first, and count invalidation."""
+    conn = sqlite3.connect(database)
+    conn.executemany(
+        "INSERT INTO conversations (user_id, role_id, user_message, bot_response, timestamp) "
+        "VALUES (1, 1, ?, 'reply', ?)",
+        [(f"message {i}", f"2026-01-01 10:00:{i // 2:02d}") for i in range(6)])
+    conn.commit()
+    conn.close()
+
+    first, has_more = await Conversation.get_history_page(1, 1, limit=4)
+    assert [pair["user_message"] for pair in first] == [f"message {i}" for i in (5, 4, 3, 2)]
+    assert has_more
+    rest, has_more = await Conversation.get_history_page(
+        1, 1, cursor=Conversation.page_cursor(first[-1]), limit=4)
+    assert [pair["user_message"] for pair in rest] == ["message 1", "message 0"]
+    assert not has_more
+
+    assert await Conversation.get_conversation_count(1, 1) == 6
+    hits = count_cache.stats["hits"]
+    assert await Conversation.get_conversation_count(1, 1) == 6
+    assert count_cache.stats["hits"] == hits + 1
+
+    await Conversation.add_message(1, 1, "new", "reply")
+    assert await Conversation.get_conversation_count(1, 1) == 7
+
+
+@pytest.mark.asyncio
+async def test_count_cache_expires():
+    """Test that counts are recomputed once their time is up."""
+    cache = CountCache(ttl=0)
+    calls = []
+
+    async def count():
+        calls.append(1)
+        return len(calls)
+
+    assert await cache.get("memories", 1, None, count) == 1
+    assert await cache.get("memories", 1, None, count) == 2
@@ -0,0 +1,85 @@
+"""
+Unit tests for the provider rate limiter
+"""
+
+import pytest
+
+from jyra.ai.limits import ProviderRateLimiter
+from jyra.ai.utils.api_errors import parse_retry_after
+from jyra.utils.exceptions import APIRateLimitException
+
+
+@pytest.mark.asyncio
+async def test_acquire_within_quota():
+    """Test that requests within the quota are not delayed."""
+    limiter = ProviderRateLimiter()
+    limiter.configure("gemini", "test-model", rpm=60, tpm=10000)
+
+    for _ in range(5):
+        waited = await limiter.acquire("gemini", "test-model", tokens=100)
+        assert waited == 0
+
+    metrics = limiter.get_metrics()["gemini/test-model"]
+    assert metrics["requests"] == 5
+    assert metrics["tokens"] == 500
+    assert metrics["throttled"] == 0
+
+
+@pytest.mark.asyncio
+async def test_acquire_fails_fast_when_exhausted():
+    """Test that a caller is rejected when the wait exceeds max_wait."""
+    limiter = ProviderRateLimiter()
+    limiter.configure("gemini", "test-model", rpm=1)
+
+    await limiter.acquire("gemini", "test-model")
+    with pytest.raises(APIRateLimitException) as exc_info:
+        await limiter.acquire("gemini", "test-model", max_wait=0.1)
+
+    assert exc_info.value.retry_after > 0
+    assert limiter.get_metrics()["gemini/test-model"]["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_honours_retry_after():
+    """Test that a rate-limited call is retried after the requested delay."""
+    limiter = ProviderRateLimiter(max_retries=2)
+    limiter.configure("openai", "test-model", rpm=600)
+    calls = []
+
+    async def request():
+        calls.append(1)
+        if len(calls) == 1:
+            raise APIRateLimitException("OpenAI", "slow down", retry_after=0.05)
+        return "ok"
+
+    result = await limiter.call_with_retry("openai", "test-model", request)
+
+    assert result == "ok"
+    assert len(calls) == 2
+    metrics = limiter.get_metrics()["openai/test-model"]
+    assert metrics["rate_limited"] == 1
+    assert metrics["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_gives_up():
+    """Test that retries stop after max_retries."""
+    limiter = ProviderRateLimiter(max_retries=1, backoff_base=0.01)
+    limiter.configure("gemini", "test-model", rpm=600)
+
+    async def request():
+        raise APIRateLimitException("Gemini", "quota exceeded")
+
+    with pytest.raises(APIRateLimitException):
+        await limiter.call_with_retry("gemini", "test-model", request)
+
+    assert limiter.get_metrics()["gemini/test-model"]["rate_limited"] == 2
+
+
+def test_parse_retry_after():
+    """Test parsing retry delays from headers and Gemini error details."""
+    assert parse_retry_after({"Retry-After": "12"}) == 12.0
+    assert parse_retry_after({}, {
+        "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "7s"}]
+    }) == 7.0
+    assert parse_retry_after({}, {}) is None
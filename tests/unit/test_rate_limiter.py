@@ -0,0 +1,110 @@
+"""
+Unit tests for the GCRA rate limiter
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from jyra.utils import rate_limiter
+from jyra.utils.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Stands in for the time module with a settable clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", fake)
+    return fake
+
+
+def test_limits_after_max_requests(clock):
+    """Test that a user is limited after the window's requests, then recovers."""
+    limiter = RateLimiter(window_size=60, max_requests=3)
+
+    assert [limiter.is_rate_limited(1) for _ in range(3)] == [
+        (False, 1, 0), (False, 2, 0), (False, 3, 0)]
+    assert limiter.is_rate_limited(1) == (True, 3, 21)
+    assert not limiter.is_rate_limited(2)[0]
+
+    # One request's worth of the window later, one more is allowed
+    clock.now += 20
+    assert limiter.is_rate_limited(1) == (False, 3, 0)
+    assert limiter.is_rate_limited(1)[0]
+
+
+def test_admins_bypass_limits(clock):
+    """Test that admin users are never limited."""
+    limiter = RateLimiter(window_size=60, max_requests=1, admin_user_ids=[7])
+
+    assert [limiter.is_rate_limited(7)[0] for _ in range(5)] == [False] * 5
+
+
+def test_blocked_request_is_charged_to_no_tier(clock):
+    """Test that a request limited by one tier doesn't count against the others."""
+    limiter = RateLimiter(window_size=60, max_requests=5, tiers={"chat": (2, 60)})
+
+    assert not limiter.check(user=1, chat=-100)[0]
+    assert not limiter.check(user=2, chat=-100)[0]
+    assert limiter.check(user=3, chat=-100)[:2] == (True, "chat")
+
+    # User 3 was not charged for the blocked request
+    assert limiter.check(user=3)[2] == 1
+    with pytest.raises(ValueError):
+        limiter.check(user=1, unknown=1)
+
+
+def test_idle_keys_are_evicted(clock):
+    """Test that keys back at their full allowance are forgotten."""
+    limiter = RateLimiter(window_size=60, max_requests=10)
+    for user_id in range(100):
+        limiter.is_rate_limited(user_id)
+    assert len(limiter.store) == 100
+
+    clock.now += 6
+    limiter.is_rate_limited(1000)
+    assert limiter.evict_idle() == 100
+    assert len(limiter.store) == 1
+
+
+def test_sqlite_state_is_shared(clock, tmp_path):
+    """Test that limiters on the same state file share their counts."""
+    path = str(tmp_path / "limits.db")
+    first = RateLimiter(window_size=60, max_requests=2, state_path=path)
+    second = RateLimiter(window_size=60, max_requests=2, state_path=path)
+
+    assert not first.is_rate_limited(1)[0]
+    assert not second.is_rate_limited(1)[0]
+    assert first.is_rate_limited(1)[0]
+    assert second.get_stats()["tracked_keys"] == 1
+
+    second.reset_for_user(1)
+    assert not first.is_rate_limited(1)[0]
+
+
+def test_locked_sqlite_state_fails_open_quickly(clock, tmp_path):
+    """Test that a check doesn't wait long for another process's lock on the state."""
+    path = str(tmp_path / "limits.db")
+    limiter = RateLimiter(window_size=60, max_requests=1, state_path=path, state_timeout_ms=20)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+
+    start = time.perf_counter()
+    assert limiter.is_rate_limited(1) == (False, 0, 0)
+    assert time.perf_counter() - start < 1
+    assert limiter.get_stats()["failed_open"] == 1
+
+    other.execute("COMMIT")
+    other.close()
+    assert not limiter.is_rate_limited(1)[0]
+    assert limiter.is_rate_limited(1)[0]
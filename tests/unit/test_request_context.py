@@ -0,0 +1,118 @@
+"""
+Unit tests for the request-scoped context
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from telegram import Update, Message, Chat, User as TelegramUser
+
+from jyra.bot.utils import request_context
+from jyra.bot.utils.request_context import get_request_context
+from jyra.db.models.conversation import Conversation
+from jyra.db.models.role import Role
+from jyra.db.models.user import User
+
+
+def make_update(update_id, user_id, text="hi"):
+    """Build a private chat message update from a user."""
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id, date=datetime.now(),
+        chat=Chat(id=user_id, type="private"),
+        from_user=TelegramUser(id=user_id, first_name="Test", is_bot=False),
+        text=text))
+
+
+class FakeContext:
+    """Stands in for a handler's CallbackContext."""
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace the model lookups with ones counting their calls."""
+    counts = {"user": 0, "role": 0, "preferences": 0, "history": []}
+
+    async def get_user(user_id):
+        counts["user"] += 1
+        await asyncio.sleep(0.01)
+        user = User(user_id=user_id)
+        user.current_role_id = 3
+        return user
+
+    async def get_role(role_id):
+        counts["role"] += 1
+        role = Role.__new__(Role)
+        role.role_id = role_id
+        return role
+
+    async def get_preferences(user_id):
+        counts["preferences"] += 1
+        return {"language": "en"}
+
+    async def get_history(user_id, role_id=None, limit=10):
+        counts["history"].append(limit)
+        return [{"role": "user", "content": str(i)} for i in range(2 * limit)]
+
+    monkeypatch.setattr(User, "get_user", get_user)
+    monkeypatch.setattr(User, "get_user_preferences", get_preferences)
+    monkeypatch.setattr(Role, "get_role", get_role)
+    monkeypatch.setattr(Conversation, "get_conversation_history", get_history)
+    return counts
+
+
+@pytest.mark.asyncio
+async def test_data_is_loaded_once_per_update(calls):
+    """Test that middleware, handler and error handler share one fetch."""
+    update = make_update(1, 5)
+    middleware_context, error_context = FakeContext(), FakeContext()
+
+    request = get_request_context(update, middleware_context)
+    users = await asyncio.gather(request.get_user(), request.get_user())
+    role = await get_request_context(update, middleware_context).get_role()
+
+    # The error handler gets a context of its own; the update leads to the same data
+    assert get_request_context(update, error_context) is request
+    assert error_context.request_context is request
+    assert request.loaded()["role"] is role
+
+    assert users[0] is users[1]
+    assert role.role_id == 3
+    assert calls["user"] == 1
+    assert calls["role"] == 1
+
+    # Another update starts fresh
+    assert get_request_context(make_update(2, 5), FakeContext()) is not request
+
+
+@pytest.mark.asyncio
+async def test_shorter_history_is_served_from_loaded_history(calls):
+    """Test that history requests for fewer pairs reuse the loaded history."""
+    request = get_request_context(make_update(1, 5))
+
+    full = await request.get_history(3, limit=10)
+    recent = await request.get_history(3, limit=5)
+    await request.get_history(3, limit=20)
+
+    assert recent == full[-10:]
+    assert calls["history"] == [10, 20]
+
+
+@pytest.mark.asyncio
+async def test_invalidated_and_failed_loads_are_reloaded(calls, monkeypatch):
+    """Test that changed values and failed loads are fetched again."""
+    request = get_request_context(make_update(1, 5))
+    await request.get_preferences()
+    await request.get_preferences()
+    request.invalidate("preferences")
+    await request.get_preferences()
+    assert calls["preferences"] == 2
+
+    async def failing_get_user(user_id):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(User, "get_user", failing_get_user)
+    with pytest.raises(RuntimeError):
+        await request.get_user()
+    assert "user" not in request.loaded()
+    assert request_context.get_stats()["reuses"] >= 1
@@ -0,0 +1,74 @@
+"""
+Unit tests for the tiered response cache
+"""
+
+import json
+import time
+import tempfile
+import unittest
+from pathlib import Path
+
+from jyra.ai.cache.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test the response cache."""
+
+    def setUp(self):
+        """Create a temporary cache directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = self.temp_dir.name
+
+    def tearDown(self):
+        """Remove the temporary cache directory."""
+        self.temp_dir.cleanup()
+
+    def test_set_and_get(self):
+        """Test storing and reading a response from both tiers."""
+        cache = ResponseCache(cache_dir=self.cache_dir, memory_entries=1)
+        cache.set("hello", {"name": "Jyra"}, [], "Hi there!")
+        cache.set("other", {"name": "Jyra"}, [], "Other response")
+
+        # "hello" has been evicted from memory and is read from SQLite
+        self.assertEqual(cache.get("hello", {"name": "Jyra"}, []), "Hi there!")
+        self.assertIsNone(cache.get("missing", {"name": "Jyra"}, []))
+
+        # Entries survive a new cache instance
+        reopened = ResponseCache(cache_dir=self.cache_dir)
+        self.assertEqual(reopened.get("other", {"name": "Jyra"}, []), "Other response")
+
+    def test_expiry(self):
+        """Test that expired entries are not returned and are cleared."""
+        cache = ResponseCache(cache_dir=self.cache_dir, max_age_seconds=-1)
+        cache.set("hello", {}, [], "Hi there!")
+
+        self.assertIsNone(cache.get("hello", {}, []))
+        self.assertEqual(cache.clear(), 1)
+
+    def test_entry_cap(self):
+        """Test that the oldest entries are evicted over the entry cap."""
+        cache = ResponseCache(cache_dir=self.cache_dir, max_entries=3)
+        for i in range(5):
+            cache.set(f"prompt {i}", {}, [], f"response {i}")
+
+        self.assertEqual(cache.enforce_limits(), 2)
+        self.assertEqual(cache.get_stats()["entries"], 3)
+        self.assertIsNone(cache.get("prompt 0", {}, []))
+        self.assertEqual(cache.get("prompt 4", {}, []), "response 4")
+
+    def test_migrate_json_files(self):
+        """Test migrating the legacy file-per-key cache."""
+        legacy = ResponseCache.__new__(ResponseCache)
+        key = legacy._generate_cache_key("hello", {}, [])
+        with open(Path(self.cache_dir) / f"{key}.json", "w") as f:
+            json.dump({"prompt": "hello", "response": "Hi!",
+                      "timestamp": time.time()}, f)
+
+        cache = ResponseCache(cache_dir=self.cache_dir)
+
+        self.assertEqual(cache.get("hello", {}, []), "Hi!")
+        self.assertEqual(list(Path(self.cache_dir).glob("*.json")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Unit tests for the semantic cache
+"""
+
+import pytest
+
+from jyra.ai.cache.semantic_cache import SemanticCache, normalize_text
+
+
+async def fake_embed(text):
+    """Embed texts so that greetings are close to each other."""
+    if "morning" in text or text.startswith("gm"):
+        return [1.0, 0.05, 0.0]
+    return [0.0, 0.0, 1.0]
+
+
+def make_counter(result):
+    """Build a compute function that counts its calls."""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return result
+
+    return compute, calls
+
+
+def test_normalize_text():
+    """Test message normalization."""
+    assert normalize_text("Good Morning!!!") == normalize_text("good   morning!")
+    assert normalize_text("sooooo happy") == "soo happy"
+
+
+@pytest.mark.asyncio
+async def test_exact_and_semantic_hits():
+    """Test that similar messages reuse the cached answer."""
+    cache = SemanticCache(enabled=True, audit_rate=0.0, embed=fake_embed)
+    compute, calls = make_counter({"primary_emotion": "happiness"})
+
+    first = await cache.get_or_compute("sentiment", "Good morning!!", compute)
+    second = await cache.get_or_compute("sentiment", "good morning!", compute)
+    third = await cache.get_or_compute("sentiment", "morning, everyone", compute)
+
+    assert first == second == third
+    assert len(calls) == 1
+
+    stats = cache.get_stats()["sentiment"]
+    assert stats["exact_hits"] == 1
+    assert stats["semantic_hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dissimilar_and_uncacheable():
+    """Test that dissimilar messages and uncacheable answers are computed."""
+    cache = SemanticCache(enabled=True, audit_rate=0.0, embed=fake_embed)
+    compute, calls = make_counter([{"content": "likes tea"}])
+
+    await cache.get_or_compute("memory_extraction", "good morning", compute,
+                               cacheable=lambda memories: not memories)
+    await cache.get_or_compute("memory_extraction", "good morning", compute,
+                               cacheable=lambda memories: not memories)
+    await cache.get_or_compute("memory_extraction", "I love green tea", compute)
+
+    assert len(calls) == 3
@@ -0,0 +1,139 @@
+"""
+Unit tests for the outbound Telegram send scheduler
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from telegram.error import RetryAfter
+
+from jyra.bot.utils.send_scheduler import SendScheduler
+
+
+def make_scheduler(**kwargs):
+    """Build a scheduler with fast budgets for tests."""
+    settings = {"global_rate": 100, "private_chat_rate": 20, "chat_burst": 1}
+    settings.update(kwargs)
+    return SendScheduler(**settings)
+
+
+async def send(scheduler, log, endpoint, low=False, fail=None, **data):
+    """Pass a request through the scheduler, recording when it is made."""
+    async def callback():
+        if fail:
+            error = fail.pop(0) if fail else None
+            if error:
+                raise error
+        log.append((endpoint, data.get("text"), time.monotonic()))
+        return {"ok": True}
+
+    return await scheduler.process_request(
+        callback, (), {}, endpoint, data, {"priority": "low"} if low else None)
+
+
+@pytest.mark.asyncio
+async def test_sends_to_a_chat_are_spaced():
+    """Test that a chat's sends follow its rate while other chats go ahead."""
+    scheduler = make_scheduler()
+    log = []
+
+    await asyncio.gather(*(send(scheduler, log, "sendMessage", chat_id=1, text=str(i))
+                           for i in range(3)),
+                         send(scheduler, log, "sendMessage", chat_id=2, text="other"))
+
+    times = {text: at for _, text, at in log}
+    assert times["2"] - times["0"] >= 0.09
+    assert times["other"] - times["0"] < 0.04
+    assert scheduler.get_stats()["delayed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_waiting_edits_of_a_message_are_coalesced():
+    """Test that only the latest of several waiting edits is sent."""
+    scheduler = make_scheduler()
+    log = []
+
+    await send(scheduler, log, "sendMessage", chat_id=1, text="reply")
+    results = await asyncio.gather(*(
+        send(scheduler, log, "editMessageText", chat_id=1, message_id=5, text=f"edit {i}")
+        for i in range(3)))
+
+    assert [text for endpoint, text, _ in log if endpoint == "editMessageText"] == ["edit 2"]
+    assert results[:2] == [True, True]
+    assert scheduler.get_stats()["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_skips_waiting_edits():
+    """Test that deleting a message skips edits still waiting for it."""
+    scheduler = make_scheduler()
+    log = []
+
+    await send(scheduler, log, "sendMessage", chat_id=1, text="loading")
+    edit = asyncio.create_task(
+        send(scheduler, log, "editMessageText", chat_id=1, message_id=5, text="frame"))
+    await asyncio.sleep(0)
+    await send(scheduler, log, "deleteMessage", chat_id=1, message_id=5)
+
+    assert await edit is True
+    assert [endpoint for endpoint, _, _ in log] == ["sendMessage", "deleteMessage"]
+
+
+@pytest.mark.asyncio
+async def test_low_priority_only_uses_spare_capacity():
+    """Test that low-priority requests are dropped instead of waiting."""
+    scheduler = make_scheduler(private_chat_rate=1, pressure_delay=0.5)
+    log = []
+
+    assert await send(scheduler, log, "editMessageText", low=True,
+                      chat_id=1, message_id=5, text="frame") == {"ok": True}
+    await send(scheduler, log, "sendMessage", chat_id=1, text="reply")
+    assert await send(scheduler, log, "editMessageText", low=True,
+                      chat_id=1, message_id=5, text="late frame") is True
+
+    assert [text for _, text, _ in log] == ["frame", "reply"]
+    assert scheduler.get_stats()["dropped"] == 1
+    assert scheduler.under_pressure(1)
+    assert not scheduler.under_pressure(2)
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_and_retries():
+    """Test that a flood error pauses sending and the request is retried."""
+    scheduler = make_scheduler()
+    log = []
+
+    result = await send(scheduler, log, "sendMessage", fail=[RetryAfter(1)],
+                        chat_id=1, text="reply")
+
+    assert result == {"ok": True}
+    assert len(log) == 1
+    stats = scheduler.get_stats()
+    assert stats["retry_after"] == 1
+    assert stats["sent"] == 1
+
+    # Low-priority requests are given up instead of retried
+    assert await send(scheduler, log, "sendChatAction", low=True, fail=[RetryAfter(1)],
+                      chat_id=3) is True
+
+
+def test_workers_split_the_bot_wide_budgets():
+    """Test that a worker started by the pool sends at its share of the global and group rates."""
+    from jyra.bot.utils.worker_pool import WorkerPool, WORKER_COUNT_ENV
+
+    pool = WorkerPool(3, command=lambda index, port: [])
+    env = pool.workers[0].env
+    assert env[WORKER_COUNT_ENV] == "3"
+
+    output = subprocess.run(
+        [sys.executable, "-c",
+         "from jyra.bot.utils.send_scheduler import send_scheduler as s;"
+         "print(s.global_budget.rate, s.group_chat_rate * 60)"],
+        env={**env, "SEND_GLOBAL_RATE": "30", "SEND_GROUP_CHAT_PER_MINUTE": "21"},
+        capture_output=True, text=True, check=True, cwd=os.getcwd()
+    ).stdout.split()
+    assert [float(value) for value in output[-2:]] == pytest.approx([10.0, 7.0])
@@ -0,0 +1,92 @@
+"""
+Unit tests for structured output schemas and parsing
+"""
+
+import json
+
+import pytest
+
+from jyra.ai.memory_extractor import MEMORY_EXTRACTION_SCHEMA, memory_extractor
+from jyra.ai.sentiment.sentiment_analyzer import SENTIMENT_SCHEMA
+from jyra.ai.utils.structured_output import (
+    parse_structured, to_gemini_schema, to_openai_schema, example_from_schema
+)
+from jyra.utils.exceptions import StructuredOutputException
+
+
+def test_parse_valid_answer():
+    """Test parsing a valid answer, with integral floats coerced to int."""
+    result = parse_structured(
+        '{"primary_emotion": "sadness", "intensity": 4.0, "explanation": "Says they feel down"}',
+        SENTIMENT_SCHEMA)
+
+    assert result["primary_emotion"] == "sadness"
+    assert result["intensity"] == 4
+    assert isinstance(result["intensity"], int)
+
+
+def test_parse_fenced_answer():
+    """Test that a code fence around the JSON is tolerated."""
+    text = '```json\n{"memories": []}\n```'
+
+    assert parse_structured(text, MEMORY_EXTRACTION_SCHEMA) == {"memories": []}
+
+
+@pytest.mark.parametrize("text", [
+    "The user seems happy.",
+    '{"primary_emotion": "elation", "intensity": 3, "explanation": ""}',
+    '{"primary_emotion": "happiness", "intensity": "high", "explanation": ""}',
+    '{"primary_emotion": "happiness", "explanation": ""}',
+])
+def test_parse_invalid_answer(text):
+    """Test that malformed or non-matching answers raise StructuredOutputException."""
+    with pytest.raises(StructuredOutputException):
+        parse_structured(text, SENTIMENT_SCHEMA, "gemini-2.0-flash")
+
+
+def test_nullable_fields():
+    """Test that nullable fields accept null and others do not."""
+    memory = {"content": "Has an exam on Friday", "category": "event", "importance": 4,
+              "confidence": 0.9, "tags": ["exam"], "expires_at": None}
+    result = parse_structured(json.dumps({"memories": [memory]}), MEMORY_EXTRACTION_SCHEMA)
+    assert result["memories"][0]["expires_at"] is None
+
+    memory["content"] = None
+    with pytest.raises(StructuredOutputException):
+        parse_structured(json.dumps({"memories": [memory]}), MEMORY_EXTRACTION_SCHEMA)
+
+
+def test_provider_schemas():
+    """Test the Gemini and OpenAI renderings of a schema."""
+    gemini = to_gemini_schema(MEMORY_EXTRACTION_SCHEMA)
+    item = gemini["properties"]["memories"]["items"]
+    assert gemini["type"] == "OBJECT"
+    assert item["properties"]["expires_at"] == {"type": "STRING", "nullable": True}
+
+    openai = to_openai_schema(MEMORY_EXTRACTION_SCHEMA)
+    item = openai["properties"]["memories"]["items"]
+    assert item["additionalProperties"] is False
+    assert set(item["required"]) == set(item["properties"])
+    assert item["properties"]["expires_at"]["type"] == ["string", "null"]
+    assert item["properties"]["content"]["type"] == "string"
+
+
+def test_example_matches_schema():
+    """Test that generated examples validate against their schema."""
+    example = example_from_schema(to_gemini_schema(SENTIMENT_SCHEMA))
+
+    assert parse_structured(json.dumps(example), SENTIMENT_SCHEMA) == example
+
+
+def test_normalize_memories():
+    """Test clamping of scores and clean-up of tags and dates."""
+    memories = memory_extractor.normalize_memories([{
+        "content": "Loves hiking", "category": "preference", "importance": 9,
+        "confidence": 0.01, "tags": [" Outdoors ", "", "Hiking", "a", "b", "c", "d"],
+        "expires_at": "next week"
+    }])
+
+    assert memories == [{
+        "content": "Loves hiking", "category": "preference", "importance": 5,
+        "confidence": 0.1, "tags": ["outdoors", "hiking", "a", "b", "c"], "expires_at": None
+    }]
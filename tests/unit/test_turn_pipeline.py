@@ -0,0 +1,79 @@
+"""
+Unit tests for the concurrent pre-response pipeline
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from jyra.bot.utils.turn_pipeline import TurnPipeline, TurnMetrics
+
+
+def delayed(value, seconds):
+    """Build a stage that returns a value after a delay."""
+    async def run():
+        await asyncio.sleep(seconds)
+        return value
+    return run
+
+
+async def failing():
+    raise RuntimeError("database is locked")
+
+
+@pytest.mark.asyncio
+async def test_stages_run_concurrently():
+    """Test that the turn takes as long as its slowest stage, not the sum."""
+    pipeline = (
+        TurnPipeline("chat", metrics=TurnMetrics())
+        .add_stage("history", delayed(["hi"], 0.1))
+        .add_stage("memories", delayed("likes tea", 0.1))
+        .add_stage("sentiment", delayed({"primary_emotion": "neutral"}, 0.1))
+    )
+
+    start = time.perf_counter()
+    results = await pipeline.run()
+    elapsed = time.perf_counter() - start
+
+    assert results == {"history": ["hi"], "memories": "likes tea",
+                       "sentiment": {"primary_emotion": "neutral"}}
+    assert elapsed < 0.25
+
+
+@pytest.mark.asyncio
+async def test_late_and_failing_stages_use_defaults():
+    """Test that optional stages degrade to their defaults."""
+    metrics = TurnMetrics()
+    pipeline = (
+        TurnPipeline("chat", metrics=metrics)
+        .add_stage("history", delayed(["hi"], 0.01), timeout=1.0)
+        .add_stage("memories", delayed("likes tea", 1.0), timeout=0.05, default="")
+        .add_stage("sentiment", failing, default=None)
+    )
+
+    results = await pipeline.run()
+
+    assert results == {"history": ["hi"], "memories": "", "sentiment": None}
+    assert pipeline.timings["memories"]["status"] == "timeout"
+    assert pipeline.timings["sentiment"]["status"] == "error"
+    assert pipeline.timings["total"]["ms"] < 500
+
+    stats = metrics.get_stats()
+    assert stats["chat/history"]["ok"] == 1
+    assert stats["chat/memories"]["timeout"] == 1
+    assert stats["chat/sentiment"]["error"] == 1
+    assert stats["chat/total"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_required_stage_failure_is_raised():
+    """Test that a failing required stage fails the turn."""
+    pipeline = (
+        TurnPipeline("chat", metrics=TurnMetrics())
+        .add_stage("history", failing, required=True)
+        .add_stage("memories", delayed("likes tea", 0.01))
+    )
+
+    with pytest.raises(RuntimeError):
+        await pipeline.run()
@@ -0,0 +1,141 @@
+"""
+Unit tests for turn supersession
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from telegram import Update, Message, Chat, User
+
+from jyra.bot.utils.turn_supersession import TurnSupersession
+from jyra.bot.utils.update_processor import PerUserUpdateProcessor
+from jyra.utils.exceptions import TurnSupersededException
+
+
+def make_update(update_id, user_id, text):
+    """Build a private chat message update from a user."""
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id, date=datetime.now(),
+        chat=Chat(id=user_id, type="private"),
+        from_user=User(id=user_id, first_name="Test", is_bot=False),
+        text=text))
+
+
+@pytest.mark.asyncio
+async def test_superseded_reply_is_cancelled_and_carried():
+    """Test that a newer message cancels the reply and is answered with the old one."""
+    supersession = TurnSupersession()
+    turn = supersession.start(1, "hi")
+    cancelled = []
+
+    async def generate():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    step = asyncio.create_task(turn.run(generate(), reply=True))
+    await asyncio.sleep(0.01)
+    supersession.notice(make_update(2, 1, "are you there?"))
+
+    with pytest.raises(TurnSupersededException):
+        await step
+    supersession.finish(turn)
+    assert cancelled == [True]
+
+    next_turn = supersession.start(1, "are you there?")
+    assert next_turn.text == "hi\nare you there?"
+    stats = supersession.get_stats()
+    assert stats["cancelled_llm_calls"] == 1
+    assert stats["merged_messages"] == 1
+
+
+
+@pytest.mark.asyncio
+async def test_handler_cancellation_is_not_taken_for_supersession():
+    """Test that cancelling the handler itself propagates even after supersession."""
+    supersession = TurnSupersession()
+    turn = supersession.start(1, "hi")
+    step = asyncio.create_task(turn.run(asyncio.sleep(10), reply=True))
+    await asyncio.sleep(0.01)
+
+    step.cancel()
+    await asyncio.sleep(0)
+    supersession.notice(make_update(2, 1, "are you there?"))
+
+    with pytest.raises(asyncio.CancelledError):
+        await step
+    assert turn.superseded
+
+@pytest.mark.asyncio
+async def test_committed_turn_is_not_superseded():
+    """Test that a turn sending its reply finishes normally."""
+    supersession = TurnSupersession()
+    turn = supersession.start(1, "hi")
+    assert await turn.run(asyncio.sleep(0, "reply"), reply=True) == "reply"
+    turn.commit()
+
+    supersession.notice(make_update(2, 1, "thanks"))
+    supersession.finish(turn)
+
+    assert not turn.superseded
+    assert supersession.start(1, "thanks").text == "thanks"
+
+
+@pytest.mark.asyncio
+async def test_turn_superseded_before_reply_avoids_the_call():
+    """Test that a turn superseded between steps never starts its reply."""
+    supersession = TurnSupersession()
+    turn = supersession.start(1, "hi")
+    await turn.run(asyncio.sleep(0))
+    supersession.notice(make_update(2, 1, "hello?"))
+
+    with pytest.raises(TurnSupersededException):
+        await turn.run(asyncio.sleep(0), reply=True)
+    supersession.finish(turn)
+
+    stats = supersession.get_stats()
+    assert stats["avoided_llm_calls"] == 1
+    assert stats["cancelled_llm_calls"] == 0
+
+
+def test_commands_and_other_users_do_not_supersede():
+    """Test that only the same user's text messages supersede a turn."""
+    supersession = TurnSupersession()
+    turn = supersession.start(1, "hi")
+
+    supersession.notice(make_update(2, 1, "/help"))
+    supersession.notice(make_update(3, 2, "hello"))
+
+    assert not turn.superseded
+
+
+def test_carried_input_expires():
+    """Test that superseded input older than the merge window is dropped."""
+    supersession = TurnSupersession(merge_window_seconds=0)
+    turn = supersession.start(1, "hi")
+    turn.supersede()
+    supersession.finish(turn)
+
+    assert supersession.start(1, "later").text == "later"
+
+
+@pytest.mark.asyncio
+async def test_processor_notifies_on_arrival():
+    """Test that arrival listeners see updates before they wait for earlier ones."""
+    processor = PerUserUpdateProcessor(max_concurrent=4)
+    await processor.initialize()
+    seen = []
+    processor.add_arrival_listener(lambda update: seen.append(update.update_id))
+    release = asyncio.Event()
+
+    first = asyncio.create_task(processor.process_update(make_update(1, 1, "a"), release.wait()))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(processor.process_update(make_update(2, 1, "b"), asyncio.sleep(0)))
+    await asyncio.sleep(0.01)
+
+    assert seen == [1, 2]
+    release.set()
+    await asyncio.gather(first, second)
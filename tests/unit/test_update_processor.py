@@ -0,0 +1,107 @@
+"""
+Unit tests for per-user ordered update processing
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from telegram import Update, Message, Chat, User
+
+from jyra.bot.utils.update_processor import PerUserUpdateProcessor
+
+
+def make_update(update_id, user_id):
+    """Build a private chat message update from a user."""
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id, date=datetime.now(),
+        chat=Chat(id=user_id, type="private"),
+        from_user=User(id=user_id, first_name="Test", is_bot=False),
+        text=f"message {update_id}"))
+
+
+async def handle(log, label, seconds=0.03):
+    """Record the start and end of a handler."""
+    log.append(("start", label))
+    await asyncio.sleep(seconds)
+    log.append(("end", label))
+
+
+@pytest.mark.asyncio
+async def test_same_user_updates_run_in_order():
+    """Test that a user's updates never overlap and keep their order."""
+    processor = PerUserUpdateProcessor(max_concurrent=8)
+    await processor.initialize()
+    log = []
+
+    await asyncio.gather(*(
+        processor.process_update(make_update(i, 1), handle(log, i)) for i in range(4)))
+
+    assert log == [(event, i) for i in range(4) for event in ("start", "end")]
+    assert processor.get_stats()["peak_user_depth"] == 4
+
+
+@pytest.mark.asyncio
+async def test_users_are_processed_concurrently():
+    """Test that a slow user does not hold up another user."""
+    processor = PerUserUpdateProcessor(max_concurrent=2)
+    await processor.initialize()
+    log = []
+
+    tasks = [asyncio.create_task(processor.process_update(make_update(i, 1), handle(log, f"a{i}")))
+             for i in range(3)]
+    tasks.append(asyncio.create_task(
+        processor.process_update(make_update(10, 2), handle(log, "b"))))
+    await asyncio.gather(*tasks)
+
+    # The other user starts alongside the first update of the busy user
+    assert log.index(("start", "b")) < log.index(("end", "a0"))
+    assert log.index(("end", "b")) < log.index(("start", "a2"))
+
+    stats = processor.get_stats()
+    assert stats["processed"] == 4
+    assert stats["running"] == 0
+    assert stats["waiting"] == 0
+    assert stats["active_users"] == 0
+
+
+@pytest.mark.asyncio
+async def test_global_limit_is_respected():
+    """Test that no more than max_concurrent updates run at once."""
+    processor = PerUserUpdateProcessor(max_concurrent=2)
+    await processor.initialize()
+    running = []
+    peak = []
+
+    async def tracked():
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.pop()
+
+    await asyncio.gather(*(
+        processor.process_update(make_update(i, i), tracked()) for i in range(6)))
+
+    assert max(peak) == 2
+
+
+@pytest.mark.asyncio
+async def test_backlog_counts_updates_waiting_for_admission():
+    """Test that updates beyond max_pending still count as backlog while they wait."""
+    processor = PerUserUpdateProcessor(max_concurrent=1, max_pending=2)
+    await processor.initialize()
+    release = asyncio.Event()
+
+    tasks = [asyncio.create_task(processor.process_update(make_update(i, i), release.wait()))
+             for i in range(6)]
+    await asyncio.sleep(0.01)
+
+    stats = processor.get_stats()
+    assert processor.backlog == stats["backlog"] == 6
+    assert stats["running"] == 1
+    assert stats["waiting"] == 5
+    assert stats["peak_backlog"] == 6
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert processor.backlog == 0
@@ -0,0 +1,103 @@
+"""
+Unit tests for the LLM work scheduler
+"""
+
+import asyncio
+
+import pytest
+
+from jyra.ai.limits.work_scheduler import LLMWorkScheduler, current_priority, llm_work
+from jyra.ai.telemetry import call_site
+
+
+async def run_call(scheduler, order, label, priority=None, user_id=None, hold=0.01):
+    """Make one scheduled call and record when it started."""
+    async with scheduler.slot(priority, user_id):
+        order.append(label)
+        await asyncio.sleep(hold)
+
+
+def test_priority_follows_call_site():
+    """Test that call sites map onto priority classes unless overridden."""
+    assert current_priority() == "interactive"
+    with call_site("memory_extraction"):
+        assert current_priority() == "background"
+    with call_site("consolidation"):
+        assert current_priority() == "bulk"
+        with llm_work("interactive"):
+            assert current_priority() == "interactive"
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_go_first():
+    """Test that a freed slot goes to the highest waiting class."""
+    scheduler = LLMWorkScheduler(max_concurrent=1,
+                                 class_limits={"interactive": 4, "background": 4, "bulk": 4})
+    order = []
+
+    first = asyncio.create_task(run_call(scheduler, order, "bulk-1", "bulk", hold=0.05))
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.create_task(run_call(scheduler, order, "bulk-2", "bulk")),
+        asyncio.create_task(run_call(scheduler, order, "background", "background")),
+        asyncio.create_task(run_call(scheduler, order, "interactive", "interactive"))
+    ]
+    await asyncio.gather(first, *tasks)
+
+    assert order == ["bulk-1", "interactive", "background", "bulk-2"]
+
+
+@pytest.mark.asyncio
+async def test_users_are_served_round_robin():
+    """Test that one user's backlog does not hold up other users."""
+    scheduler = LLMWorkScheduler(class_limits={"interactive": 4, "background": 1, "bulk": 1})
+    order = []
+
+    tasks = [asyncio.create_task(run_call(scheduler, order, f"a{i}", "background", user_id=1))
+             for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(run_call(scheduler, order, "b0", "background", user_id=2)))
+    await asyncio.gather(*tasks)
+
+    assert order == ["a0", "a1", "b0", "a2"]
+
+
+@pytest.mark.asyncio
+async def test_background_is_throttled_while_replies_are_slow():
+    """Test that bulk work pauses while interactive latency is above target."""
+    scheduler = LLMWorkScheduler(latency_target_ms=1000, recheck_seconds=0.02,
+                                 class_limits={"interactive": 4, "background": 2, "bulk": 2})
+    scheduler.interactive_latency.add(8000)
+
+    assert scheduler.under_pressure()
+    assert scheduler.effective_limit("background") == 1
+    assert scheduler.effective_limit("bulk") == 0
+
+    order = []
+    bulk = asyncio.create_task(run_call(scheduler, order, "bulk", "bulk"))
+    await asyncio.sleep(0.05)
+    assert order == []
+    assert scheduler.get_stats()["classes"]["bulk"]["waiting"] == 1
+
+    # Latency recovers; the waiting bulk call starts without any other release
+    scheduler.latency_target_ms = 10000
+    await asyncio.wait_for(bulk, 1.0)
+    assert order == ["bulk"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_is_removed():
+    """Test that a cancelled call does not keep its place in the queue."""
+    scheduler = LLMWorkScheduler(max_concurrent=1)
+    order = []
+
+    first = asyncio.create_task(run_call(scheduler, order, "first", hold=0.03))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(run_call(scheduler, order, "cancelled"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await first
+    await run_call(scheduler, order, "next")
+
+    assert order == ["first", "next"]
+    assert scheduler.get_stats()["classes"]["interactive"]["running"] == 0